@@ -10,21 +10,25 @@ import time
 import urllib.parse
 import urllib.request
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-import requests
-
-from flask import Flask, has_app_context, jsonify, render_template, request, session, redirect, url_for
+from flask import Flask, Response, has_app_context, jsonify, render_template, request, session, redirect, url_for
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import (
     APIConfig,
+    ConditionalResponseConfig,
     DatabaseConfig,
     Environment,
+    LiveStreamConfig,
     LoggingConfig,
+    PriceHedgingConfig,
+    PriceHubConfig,
     SecurityConfig,
+    TickRecorderConfig,
     TimeConfig,
     TradingConfig,
     get_cache_ttl,
@@ -34,8 +38,17 @@ from config import (
 
 try:
     # Try relative import first (for module import - Vercel/main.py)
-    from ..scripts.exchange_sync import get_sync_service, initialize_sync_service
-    from .unified_data_sync_service import enhanced_cache, start_unified_data_sync_service
+    from ..scripts.exchange_sync import EXCHANGE_SYNC_SERVICE_NAME, get_sync_service, initialize_sync_service
+    from .unified_data_sync_service import (
+        UNIFIED_SERVICE_NAME,
+        enhanced_cache,
+        get_unified_service_config,
+        is_unified_service_running,
+        reconfigure_unified_data_sync_service,
+        restart_unified_data_sync_service,
+        start_unified_data_sync_service,
+        stop_unified_data_sync_service,
+    )
     from .models import (
         TradeConfiguration,
         UserCredentials,
@@ -44,6 +57,7 @@ try:
         db,
         format_iran_time,
         get_iran_time,
+        open_candle_buffer,
         utc_to_iran_time,
     )
     from .unified_exchange_client import (
@@ -51,7 +65,7 @@ try:
         LBankClient,
         ToobitClient,
         create_exchange_client,
-        create_wrapped_exchange_client,
+        market_data_clients,
     )
     from .vercel_sync import get_vercel_sync_service, initialize_vercel_sync_service
 except ImportError:
@@ -69,24 +83,54 @@ except ImportError:
         TradeConfiguration,
         format_iran_time,
         get_iran_time,
+        open_candle_buffer,
         utc_to_iran_time,
     )
-    from scripts.exchange_sync import initialize_sync_service, get_sync_service
+    from scripts.exchange_sync import EXCHANGE_SYNC_SERVICE_NAME, initialize_sync_service, get_sync_service
     from api.vercel_sync import initialize_vercel_sync_service, get_vercel_sync_service
     from api.unified_exchange_client import (
         ToobitClient,
         LBankClient,
         HyperliquidClient,
         create_exchange_client,
-        create_wrapped_exchange_client,
+        market_data_clients,
+    )
+    from api.unified_data_sync_service import (
+        UNIFIED_SERVICE_NAME,
+        enhanced_cache,
+        get_unified_service_config,
+        is_unified_service_running,
+        reconfigure_unified_data_sync_service,
+        restart_unified_data_sync_service,
+        start_unified_data_sync_service,
+        stop_unified_data_sync_service,
     )
-    from api.unified_data_sync_service import enhanced_cache, start_unified_data_sync_service
 
+from api.async_http import CancelToken, async_http
+from api.binance_weight_budget import WeightBudgetExhausted, binance_weight_budget
 from api.circuit_breaker import (
     CircuitBreakerError,
     circuit_manager,
     with_circuit_breaker,
 )
+from api.leader_election import leader_election
+from api.latency_model import batch_latency_model, price_latency_model
+from api.live_stream import (
+    diff_positions,
+    format_comment,
+    format_event,
+    format_retry,
+    live_streams,
+    parse_last_event_id,
+)
+from api.price_hub import price_hub
+from api.shared_price_cache import configure_shared_price_cache
+from api.single_flight import get_single_flight_status, klines_flight, price_flight
+from api.service_supervisor import service_supervisor
+from api.state_versions import format_version, make_etag, parse_version, user_state_versions
+from api.sync_metrics import sync_metrics
+from api.sync_priorities import sync_priorities
+from api.tick_recorder import tick_recorder
 from api.error_handler import (
     create_success_response,
     create_validation_error,
@@ -1061,22 +1105,36 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db.init_app(app)
 
 # Initialize unified data sync service (combines cache cleanup and klines workers)
-# Only start if enabled in system settings (persists across app restarts)
-try:
-    with app.app_context():
-        from api.models import SystemSettings
-        worker_enabled = SystemSettings.get_worker_enabled()
-        
-        if worker_enabled:
-            start_unified_data_sync_service(app)
-            logging.info("Unified data sync service started (enabled in system settings)")
-        else:
-            logging.info("Unified data sync service NOT started (disabled in system settings)")
-except Exception as e:
-    # If settings table doesn't exist yet (first run), default to DISABLED
-    logging.warning(f"Could not check worker state from database (table may not exist yet): {e}")
-    logging.info("Defaulting to DISABLED - Admin can enable via admin panel")
-    # Don't start worker on first run - let admin enable it manually
+# Only run if enabled in system settings (persists across app restarts). The elected
+# leader process re-checks the setting on every election pass, so admin start/stop
+# requests served by any worker take effect in the leader.
+def _unified_service_enabled():
+    try:
+        with app.app_context():
+            from api.models import SystemSettings
+            return SystemSettings.get_worker_enabled()
+    except Exception as e:
+        # If settings table doesn't exist yet (first run), default to DISABLED
+        logging.warning(f"Could not check worker state from database (table may not exist yet): {e}")
+        logging.info("Defaulting to DISABLED - Admin can enable via admin panel")
+        return False
+
+
+leader_election.register(
+    UNIFIED_SERVICE_NAME,
+    start=lambda: start_unified_data_sync_service(app),
+    stop=stop_unified_data_sync_service,
+    should_run=_unified_service_enabled,
+)
+
+# Heartbeat supervision: restart the loop only when it stops reporting progress
+service_supervisor.register(
+    UNIFIED_SERVICE_NAME,
+    restart=lambda: restart_unified_data_sync_service(app),
+    is_running=is_unified_service_running,
+    reconfigure=reconfigure_unified_data_sync_service,
+    get_config=get_unified_service_config,
+)
 
 
 # Database migration helpers
@@ -1371,10 +1429,15 @@ def init_database():
     """Initialize database tables safely"""
     try:
         with app.app_context():
+            # Partitioned klines_cache must exist before create_all would create the plain table
+            from .klines_partitioning import ensure_klines_partitions, prepare_klines_table
+
+            prepare_klines_table()
             db.create_all()
             logging.info("Database tables created successfully")
             # Run migrations after table creation
             run_database_migrations()
+            ensure_klines_partitions()
     except Exception as e:
         logging.error(f"Database initialization error: {e}")
 
@@ -1382,8 +1445,24 @@ def init_database():
 # Initialize database conditionally
 if not os.environ.get("VERCEL"):
     init_database()
-    # Initialize background exchange sync service for Replit
-    exchange_sync_service = initialize_sync_service(app, db)
+    # Periodic flusher for write-behind open-candle updates
+    open_candle_buffer.start(app)
+    # Initialize background exchange sync service for Replit - the loop runs in the leader only
+    exchange_sync_service = initialize_sync_service(app, db, start=False)
+    leader_election.register(EXCHANGE_SYNC_SERVICE_NAME, start=exchange_sync_service.start, stop=exchange_sync_service.stop)
+    service_supervisor.register(
+        EXCHANGE_SYNC_SERVICE_NAME,
+        restart=exchange_sync_service.restart,
+        is_running=lambda: exchange_sync_service.running,
+        reconfigure=exchange_sync_service.reconfigure,
+        get_config=exchange_sync_service.get_config,
+    )
+    service_supervisor.start()
+    # Price hub producer (serverless instances start it lazily on the first price read)
+    price_hub.start()
+    # Optional tick log for offline replay (scripts/tick_replay.py)
+    if TickRecorderConfig.ENABLED:
+        tick_recorder.start(price_hub)
     vercel_sync_service = None
 else:
     # For Vercel, initialize on first request using newer Flask syntax
@@ -1400,6 +1479,12 @@ else:
             vercel_sync_service = initialize_vercel_sync_service(app, db)
             initialized = True
 
+# Share cached prices across worker processes when PRICE_CACHE_BACKEND is set
+configure_shared_price_cache(app, enhanced_cache)
+
+# Start the registered background services in whichever process wins their election
+leader_election.start(app)
+
 
 # Bot token and webhook URL from environment with proper validation
 def get_bot_token() -> Optional[str]:
@@ -1430,6 +1515,33 @@ user_preferences_lock = threading.RLock()
 user_trade_configs: Dict[int, Dict[str, Any]] = {}  # {user_id: {trade_id: TradeConfig}}
 user_selected_trade: Dict[int, Optional[str]] = {}  # {user_id: trade_id}
 
+
+def _get_trading_demand_symbols():
+    """Symbols with open positions or pending limit orders (hot tier for the klines sync)"""
+    with trade_configs_lock:
+        return {
+            config.symbol
+            for trades in list(user_trade_configs.values())
+            for config in list(trades.values())
+            if getattr(config, "symbol", None) and config.status in ("active", "pending")
+        }
+
+
+sync_priorities.register_demand_source(_get_trading_demand_symbols)
+
+
+@app.before_request
+def _record_smc_demand():
+    """Feed /api/smc-* traffic into the sync priorities so viewed symbols stay fresh"""
+    if not request.path.startswith("/api/smc-"):
+        return
+    symbol = (request.view_args or {}).get("symbol") or request.args.get("symbol")
+    if symbol:
+        sync_priorities.record_request(symbol)
+    elif request.path == "/api/smc-signals":
+        for supported_symbol in TradingConfig.SUPPORTED_SYMBOLS:
+            sync_priorities.record_request(supported_symbol)
+
 # Whitelist configuration
 BOT_OWNER_ID = os.environ.get("BOT_OWNER_ID", Environment.DEFAULT_TEST_USER_ID)  # Bot owner's telegram user ID
 WHITELIST_ENABLED = os.environ.get("WHITELIST_ENABLED", "true").lower() == "true"
@@ -2618,66 +2730,28 @@ def api_health_check():
         except:
             cb_status = "unknown"
 
-        # CORE MONITORING: Trigger position monitoring and price updates
-        monitoring_results = trigger_core_monitoring()
-
-        # HEALTH PING BOOST: Activate extended monitoring for Render
-        boost_status = "not_activated"
-        try:
-            sync_service = get_sync_service()
-            if sync_service and hasattr(sync_service, "trigger_health_ping_boost"):
-                print(f"[RENDER-HEALTH] Activating Health Ping Boost for enhanced monitoring")
-                logging.info("[RENDER-HEALTH] Activating Health Ping Boost for enhanced monitoring")
-                sync_service.trigger_health_ping_boost()
-                boost_status = "activated"
-                print(f"[RENDER-HEALTH] Health Ping Boost activated - monitoring every 10s for 3 minutes")
-                logging.info("[RENDER-HEALTH] Health Ping Boost activated - monitoring every 10s for 3 minutes")
-            else:
-                logging.warning(
-                    "HEALTH CHECK: Sync service not available for Health Ping Boost"
-                )
-                boost_status = "service_unavailable"
-        except Exception as e:
-            logging.warning(f"Health ping boost activation failed: {e}")
-            boost_status = f"failed: {str(e)}"
-
-        # KLINES RESTART: Prevent gaps by also restarting unified data sync service
-        klines_restart_status = "not_attempted"
-        try:
-            from .unified_data_sync_service import restart_unified_data_sync_service, get_unified_service_status
-            print(f"[RENDER-KLINES] Starting klines service restart to prevent gaps")
-            logging.info("[RENDER-KLINES] Starting klines service restart to prevent gaps")
-            
-            # Get status before restart
-            pre_restart_status = get_unified_service_status()
-            restart_success = restart_unified_data_sync_service(app)
-            
-            if restart_success:
-                klines_restart_status = "restarted"
-                post_restart_status = get_unified_service_status()
-                print(f"[RENDER-KLINES] SUCCESS: Klines service restarted - service_running: {post_restart_status.get('service_running', 'unknown')}")
-                logging.info(f"[RENDER-KLINES] SUCCESS: Klines service restarted - service_running: {post_restart_status.get('service_running', 'unknown')}")
-            else:
-                klines_restart_status = "restart_failed"
-                print(f"[RENDER-KLINES] WARNING: Klines service restart returned False")
-                logging.warning("[RENDER-KLINES] WARNING: Klines service restart returned False")
-        except Exception as e:
-            print(f"[RENDER-KLINES] ERROR: Klines restart failed - {str(e)}")
-            logging.warning(f"[RENDER-KLINES] ERROR: Klines restart failed - {str(e)}")
-            klines_restart_status = f"failed: {str(e)}"
+        # LIVENESS: Background loops heartbeat to the supervisor, which restarts only stalled
+        # services - the health check reports their state instead of restarting or running
+        # anything (position/TP-SL monitoring lives in the supervised exchange sync loop)
+        liveness = service_supervisor.get_liveness()
+        stalled_services = [name for name, state in liveness.items() if state == "stalled"]
 
         # Monitor system load (basic check)
         active_configs = sum(len(configs) for configs in user_trade_configs.values())
 
         health_data = {
-            "status": "healthy" if db_status == "healthy" else "degraded",
+            "status": "healthy" if db_status == "healthy" and not stalled_services else "degraded",
             "timestamp": get_iran_time().isoformat(),
             "api_version": "1.0",
             "database": db_status,
             "services": {
                 "cache": cache_status,
-                "monitoring": "running",
+                "monitoring": liveness.get(EXCHANGE_SYNC_SERVICE_NAME, "unknown"),
                 "circuit_breakers": cb_status,
+                "leader_election": {
+                    name: entry["role"] for name, entry in leader_election.get_status()["services"].items()
+                },
+                "background": liveness,
             },
             "metrics": {
                 "active_trade_configs": active_configs,
@@ -2690,22 +2764,17 @@ def api_health_check():
                 "vercel": Environment.IS_VERCEL,
                 "replit": Environment.IS_REPLIT,
             },
-            "monitoring": monitoring_results,
-            "health_ping_boost": {
-                "status": boost_status,
-                "duration_seconds": 180,
-                "enhanced_interval_seconds": 10,
-            },
-            "klines_restart": {
-                "status": klines_restart_status,
-                "purpose": "prevent_gaps_when_offline",
+            "liveness": {
+                "services": liveness,
+                "stalled": stalled_services,
+                "supervisor_running": service_supervisor.get_status()["running"],
             },
         }
 
         # RENDER LOG: Health check completed
         execution_time = time.time() - start_time
-        print(f"[RENDER-HEALTH] Health check completed in {execution_time:.2f}s - Status: {health_data['status']}, Boost: {boost_status}, Klines: {klines_restart_status}")
-        logging.info(f"[RENDER-HEALTH] Health check completed in {execution_time:.2f}s - Status: {health_data['status']}, Boost: {boost_status}, Klines: {klines_restart_status}")
+        print(f"[RENDER-HEALTH] Health check completed in {execution_time:.2f}s - Status: {health_data['status']}, Stalled: {stalled_services or 'none'}")
+        logging.info(f"[RENDER-HEALTH] Health check completed in {execution_time:.2f}s - Status: {health_data['status']}, Stalled: {stalled_services or 'none'}")
 
         # Return appropriate HTTP status
         status_code = 200 if health_data["status"] == "healthy" else 503
@@ -2856,6 +2925,7 @@ def exchange_sync_status():
 
     if sync_service:
         status = sync_service.get_sync_status(user_id)
+        status["leadership"] = leader_election.get_service_status("exchange_sync")
         return jsonify(status)
     else:
         return jsonify({"error": "Exchange sync service not available"}), 503
@@ -3595,29 +3665,30 @@ def get_system_status():
         "cache_stats": {}
     }
 
-    # Add API performance metrics
-    for api_name, metrics in api_performance_metrics.items():
-        if metrics["requests"] is not None and metrics["requests"] > 0:
-            success_rate = (metrics["successes"] / metrics["requests"]) * 100
-            avg_response_time = metrics.get("avg_response_time", 0)
-            last_success = metrics.get("last_success")
-            system_status["api_performance"][api_name] = {
-                "success_rate": round(success_rate, 2),
-                "avg_response_time": round(avg_response_time, 3),
-                "total_requests": metrics["requests"],
-                "last_success": last_success.isoformat() if last_success else None,
-            }
-        else:
-            system_status["api_performance"][api_name] = {
-                "success_rate": 0,
-                "avg_response_time": 0,
-                "total_requests": 0,
-                "last_success": None,
-            }
+    # Add API performance metrics (sliding-window latency model)
+    for api_name in get_api_priority():
+        metrics = price_latency_model.get_source_status(api_name)
+        success_rate = metrics.get("success_rate")
+        last_success = metrics.get("last_success")
+        system_status["api_performance"][api_name] = {
+            "success_rate": round(success_rate * 100, 2) if success_rate is not None else 0,
+            "avg_response_time": round(metrics.get("mean") or 0, 3),
+            "p50_response_time": metrics.get("p50"),
+            "p95_response_time": metrics.get("p95"),
+            "hedge_delay": round(price_latency_model.hedge_delay(api_name), 3),
+            "total_requests": metrics.get("total_requests", 0),
+            "last_success": datetime.utcfromtimestamp(last_success).isoformat() if last_success else None,
+        }
+    system_status["price_hedging"] = {
+        name: value for name, value in price_latency_model.get_status().items() if name != "sources"
+    }
+    system_status["batch_api_performance"] = batch_latency_model.get_status()["sources"]
 
     # Add enhanced cache statistics
     cache_stats = enhanced_cache.get_cache_stats()
     system_status["cache_stats"] = cache_stats
+    system_status["conditional_responses"] = user_state_versions.get_status()
+    system_status["market_data_clients"] = market_data_clients.get_status()
 
     return jsonify(system_status)
 
@@ -3695,6 +3766,21 @@ def circuit_breaker_health():
     )
 
 
+@app.route("/api/price-hub/status")
+def price_hub_status():
+    """Get price hub producer status and the latest tick per tracked symbol"""
+    try:
+        return jsonify(
+            {
+                **price_hub.get_status(),
+                "single_flight": get_single_flight_status(),
+                "tick_recorder": tick_recorder.get_status(),
+            }
+        )
+    except Exception as e:
+        return jsonify({"error": str(e), "status": "error"}), 500
+
+
 @app.route("/api/klines-worker/status")
 def klines_worker_status():
     """Get klines background worker status and statistics (unified service)"""
@@ -3709,6 +3795,9 @@ def klines_worker_status():
             "cache_statistics": status.get("cache_statistics", {}),
             "circuit_breaker_status": status.get("circuit_breaker_status", {}),
             "last_cache_cleanup": status.get("last_cache_cleanup", "never"),
+            "sync_metrics": status.get("sync_metrics", sync_metrics.get_status()),
+            "single_flight": klines_flight.get_status(),
+            "leadership": status.get("leadership", {}),
             "status": "running" if status.get("service_running", False) else "stopped"
         }
         
@@ -3720,11 +3809,17 @@ def klines_worker_status():
         }), 500
 
 
+@app.route("/api/klines-worker/metrics")
+def klines_worker_metrics():
+    """Sync-cycle metrics in the Prometheus text exposition format (this process only)"""
+    return app.response_class(sync_metrics.prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/api/admin/klines-debug")
 def admin_klines_debug():
     """Get comprehensive klines debugging information for Admin panel"""
     try:
-        from .models import KlinesCache, db
+        from .models import KlinesCache, db, get_timeframe_seconds
         from datetime import datetime, timedelta
         from config import RollingWindowConfig, TradingConfig
         from sqlalchemy import func, and_, desc
@@ -3766,15 +3861,8 @@ def admin_klines_debug():
                 
                 timestamps = [t.timestamp for t in timestamps_query]
                 
-                # Check for gaps based on timeframe
-                if timeframe == "1h":
-                    expected_delta = timedelta(hours=1)
-                elif timeframe == "4h":
-                    expected_delta = timedelta(hours=4)
-                elif timeframe == "1d":
-                    expected_delta = timedelta(days=1)
-                else:
-                    expected_delta = timedelta(hours=1)  # default
+                # Check for gaps based on the timeframe's candle period
+                expected_delta = timedelta(seconds=get_timeframe_seconds(timeframe))
                 
                 # Find gaps (only check recent data to avoid too many historical gaps)
                 recent_timestamps = timestamps[-50:] if len(timestamps) > 50 else timestamps
@@ -3880,25 +3968,24 @@ def get_symbol_price(symbol):
     try:
         symbol = symbol.upper()
 
-        # Check enhanced cache for existing data
-        cached_result = enhanced_cache.get_price(symbol)
-        if cached_result:
-            price, price_source, cache_info = cached_result
-        else:
-            price = get_live_market_price(symbol, prefer_exchange=True)
-            # Get fresh cache info after fetching
-            fresh_cached_result = enhanced_cache.get_price(symbol)
-            if fresh_cached_result:
-                _, price_source, cache_info = fresh_cached_result
-            else:
-                price_source = "unknown"
-                cache_info = {"cached": False}
+        # In-memory read from the price hub (its producer does the upstream fetching)
+        tick = price_hub.get_tick(
+            symbol, wait=PriceHubConfig.FIRST_TICK_WAIT, stale_max_age=PriceHubConfig.STALE_MAX_AGE
+        )
+        if tick is None:
+            raise Exception(f"Unable to fetch live market price for {symbol} from any source")
+        cache_info = {
+            "cached": True,
+            "age_seconds": round(tick.age(), 3),
+            "version": tick.version,
+            "volatility": enhanced_cache.volatility_tracker.get_volatility(symbol),
+        }
 
         return jsonify(
             {
                 "symbol": symbol,
-                "price": price,
-                "price_source": price_source,
+                "price": tick.price,
+                "price_source": tick.source,
                 "timestamp": get_iran_time().isoformat(),
                 "cache_info": cache_info,
             }
@@ -3930,31 +4017,53 @@ def get_multiple_prices():
 
         symbols = [s.upper() for s in symbols]
 
-        # Batch fetch prices
-        futures = {}
-        for symbol in symbols:
-            future = price_executor.submit(get_live_market_price, symbol, True)
-            futures[future] = symbol
+        # In-memory batch read from the price hub; prices are reported from the hub's
+        # ticks so the response version matches the prices actually sent
+        prices = get_live_market_prices(symbols, True)
+        ticks = price_hub.snapshot(list(prices))
+
+        # Prices are not per user: the version is the newest hub tick among the symbols. Tick
+        # versions only move when a price changes, so an unchanged re-fetch keeps the ETag
+        # (304) and since=<version> deltas stay empty
+        version = max((tick.version for tick in ticks.values()), default=0)
+        etag = make_etag(
+            "prices", f"{zlib.crc32(','.join(symbols).encode()):x}.{zlib.crc32(','.join(sorted(ticks)).encode()):x}", version
+        )
+        if ConditionalResponseConfig.ENABLED and request.if_none_match.contains_weak(etag):
+            return _not_modified_response(etag)
+
+        # since=<version> (JSON body or query): only symbols with a newer tick, plus failures
+        since = parse_version(data.get("since") or request.args.get("since"))
+        delta = ConditionalResponseConfig.ENABLED and since is not None and since <= price_hub.version
 
         results = {}
-        for future in as_completed(futures, timeout=TimeConfig.DEFAULT_API_TIMEOUT):
-            symbol = futures[future]
-            try:
-                price = future.result()
-                results[symbol] = {"price": price, "status": "success"}
-            except Exception as e:
-                results[symbol] = {"price": None, "status": "error", "error": str(e)}
+        for symbol in symbols:
+            tick = ticks.get(symbol)
+            if tick is not None:
+                if delta and tick.version <= since:
+                    continue
+                results[symbol] = {"price": tick.price, "status": "success"}
+            else:
+                results[symbol] = {
+                    "price": None,
+                    "status": "error",
+                    "error": f"Unable to fetch live market price for {symbol} from any source",
+                }
 
-        return jsonify(
-            {
-                "results": results,
-                "timestamp": get_iran_time().isoformat(),
-                "total_symbols": len(symbols),
-                "successful": len(
-                    [r for r in results.values() if r["status"] == "success"]
-                ),
-            }
-        )
+        payload = {
+            "results": results,
+            "timestamp": get_iran_time().isoformat(),
+            "total_symbols": len(symbols),
+            "successful": len(ticks),
+        }
+        if not ConditionalResponseConfig.ENABLED:
+            return jsonify(payload)
+        payload["version"] = format_version(version)
+        if delta:
+            payload["delta"] = True
+        response = jsonify(payload)
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -4724,6 +4833,55 @@ def debug_position_close_test():
     return jsonify(debug_info)
 
 
+def _not_modified_response(etag):
+    user_state_versions.record_not_modified()
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _conditional_state_response(scope, chat_id, payload, positions_key="positions"):
+    """
+    JSON response for a user's state with ETag and since=<version> support
+
+    The state version covers the positions (by trade id) and every other payload field
+    except the timestamp. A matching If-None-Match gets 304 Not Modified; ?since=<version>
+    narrows payload[positions_key] to the positions changed after that version and lists
+    the trade ids removed since (a version this process cannot answer gets the full payload).
+    """
+    if not ConditionalResponseConfig.ENABLED:
+        return jsonify(payload)
+
+    positions = payload.get(positions_key) or {}
+    entries = dict(positions) if isinstance(positions, dict) else {position["trade_id"]: position for position in positions}
+    entries["__state__"] = {key: value for key, value in payload.items() if key not in (positions_key, "timestamp")}
+
+    version = user_state_versions.update(scope, chat_id, entries)
+    etag = make_etag(scope, chat_id, version)
+    if request.if_none_match.contains_weak(etag):
+        return _not_modified_response(etag)
+
+    payload = dict(payload, version=format_version(version))
+    since = request.args.get("since")
+    if since:
+        delta = user_state_versions.changes_since(scope, chat_id, parse_version(since))
+        if delta is not None:
+            changed = set(delta["changed"])
+            if isinstance(positions, dict):
+                payload[positions_key] = {trade_id: data for trade_id, data in positions.items() if trade_id in changed}
+            else:
+                payload[positions_key] = [position for position in positions if position["trade_id"] in changed]
+            payload["removed"] = delta["removed"]
+            payload["delta"] = True
+
+    response = jsonify(payload)
+    response.set_etag(etag, weak=True)
+    # Browsers revalidate every poll (If-None-Match) instead of reusing the body unchecked
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @app.route("/api/margin-data")
 def margin_data():
     """Get comprehensive margin data for a specific user"""
@@ -4805,7 +4963,9 @@ def margin_data():
             ):
                 total_realized_pnl += config.realized_pnl
 
-    return jsonify(
+    return _conditional_state_response(
+        "margin",
+        chat_id,
         {
             "user_id": user_id,
             "summary": {
@@ -4828,7 +4988,7 @@ def margin_data():
             },
             "positions": user_positions,
             "timestamp": get_iran_time().isoformat(),
-        }
+        },
     )
 
 
@@ -4855,17 +5015,17 @@ def _validate_authenticated_user():
     # Get authenticated user from session or Telegram WebApp data
     user_id = get_authenticated_user()
     if not user_id:
-        return None, jsonify({"error": "Authentication required"}), 401
+        return None, (jsonify({"error": "Authentication required"}), 401)
     
     # Check whitelist if enabled
     if WHITELIST_ENABLED and not is_user_whitelisted(user_id):
-        return None, jsonify({"error": "Access not authorized"}), 403
+        return None, (jsonify({"error": "Access not authorized"}), 403)
     
     try:
         chat_id = int(user_id)
         return chat_id, None
     except ValueError:
-        return None, jsonify({"error": "Invalid user ID format"}), 400
+        return None, (jsonify({"error": "Invalid user ID format"}), 400)
 
 
 def _handle_environment_sync(user_id, chat_id):
@@ -4995,14 +5155,16 @@ def live_position_update():
 
     # Check if user has trades loaded
     if chat_id not in user_trade_configs:
-        return jsonify(
+        return _conditional_state_response(
+            "live",
+            chat_id,
             {
                 "positions": {},
                 "total_unrealized_pnl": 0.0,
                 "active_positions_count": 0,
                 "timestamp": get_iran_time().isoformat(),
                 "update_type": "live_prices",
-            }
+            },
         )
 
     # Select appropriate update strategy
@@ -5019,7 +5181,9 @@ def live_position_update():
     # Calculate total P&L (realized + unrealized)
     total_pnl = total_realized_pnl + total_unrealized_pnl
 
-    return jsonify(
+    return _conditional_state_response(
+        "live",
+        chat_id,
         {
             "positions": live_data,
             "total_unrealized_pnl": total_unrealized_pnl,
@@ -5028,10 +5192,167 @@ def live_position_update():
             "active_positions_count": active_positions_count,
             "timestamp": get_iran_time().isoformat(),
             "update_type": "live_prices",
-        }
+        },
     )
 
 
+def _live_stream_symbols(chat_id, requested_symbols):
+    """Symbols a live stream follows: the user's open positions plus any requested ones"""
+    symbols = set(requested_symbols)
+    for config in user_trade_configs.get(chat_id, {}).values():
+        if config.status in ["active", "pending"] and config.symbol:
+            symbols.add(config.symbol.upper())
+    return symbols
+
+
+def _live_stream_monitor_pass(after_version):
+    """
+    Shared position monitoring for every user with an open live stream
+
+    Runs on the stream registry's monitor thread, once per batch of price changes - the
+    same strategy the polling endpoint selects (paper TP/SL, break-even), but one pass
+    for all streams instead of one per stream. Skipped when no followed symbol moved.
+    """
+    user_ids = live_streams.user_ids()
+    followed = set()
+    for user_id in user_ids:
+        followed |= _live_stream_symbols(user_id, ())
+    if not followed or not price_hub.ticks_since(after_version, followed):
+        return
+
+    with app.app_context():
+        try:
+            if Environment.IS_RENDER or any(_check_paper_trading_positions(user_id) for user_id in user_ids):
+                # Covers every user's positions (includes TP/SL monitoring)
+                update_all_positions_with_live_data()
+            else:
+                update_positions_lightweight()
+        finally:
+            db.session.remove()
+
+
+def _live_positions_payload(chat_id):
+    """Position entries and totals in the /api/positions/live-update shape (reads only - the monitor updates)"""
+    if chat_id not in user_trade_configs:
+        return {}, {"total_unrealized_pnl": 0.0, "total_realized_pnl": 0.0, "total_pnl": 0.0, "active_positions_count": 0}
+
+    live_data, total_unrealized_pnl, active_positions_count = _build_live_position_data(chat_id)
+    total_realized_pnl = _calculate_total_realized_pnl(chat_id)
+    return live_data, {
+        "total_unrealized_pnl": total_unrealized_pnl,
+        "total_realized_pnl": total_realized_pnl,
+        "total_pnl": total_realized_pnl + total_unrealized_pnl,
+        "active_positions_count": active_positions_count,
+    }
+
+
+@app.route("/api/stream/live")
+def live_stream():
+    """
+    Server-Sent Events stream of price ticks and position P&L changes for the mini app
+
+    Replaces polling /api/positions/live-update: one long-lived connection per client,
+    written to after the shared position monitor has processed a price change for a
+    followed symbol. Query
+    parameter symbols=BTCUSDT,ETHUSDT adds symbols beyond the user's positions.
+    Serverless deployments answer 204, which tells EventSource to stop (the mini app
+    then keeps polling).
+    """
+    if not LiveStreamConfig.ENABLED or Environment.IS_VERCEL:
+        return Response(status=204)
+
+    chat_id, error_response = _validate_authenticated_user()
+    if error_response:
+        return error_response
+    if not live_streams.has_capacity():
+        return jsonify({"error": "Live stream capacity reached, use polling"}), 503
+    live_streams.start_monitor(price_hub, _live_stream_monitor_pass)
+
+    _handle_environment_sync(str(chat_id), chat_id)
+    # generate() only reads in-memory state - hand the request's DB connection back to the
+    # pool now instead of holding it for the life of the stream
+    db.session.remove()
+    requested_symbols = {
+        symbol.strip().upper()
+        for symbol in request.args.get("symbols", "").split(",")
+        if symbol.strip()
+    }
+    requested_symbols = set(sorted(requested_symbols)[: TradingConfig.MAX_SYMBOLS_BATCH])
+    resume_version = parse_last_event_id(request.headers.get("Last-Event-ID"))
+
+    def generate():
+        try:
+            with live_streams.connection(chat_id) as stream_id:
+                yield format_retry(LiveStreamConfig.RETRY_MS)
+
+                symbols = _live_stream_symbols(chat_id, requested_symbols)
+                price_hub.track(symbols)
+                version = price_hub.version
+
+                # Snapshot (or, after a reconnect, everything published since the last event seen)
+                ticks = price_hub.ticks_since(resume_version, symbols) if resume_version else price_hub.snapshot(symbols)
+                yield format_event("prices", {symbol: tick.to_dict() for symbol, tick in ticks.items()}, version)
+                positions, totals = _live_positions_payload(chat_id)
+                yield format_event(
+                    "positions",
+                    {"positions": positions, "removed": [], **totals, "update_type": "snapshot", "timestamp": get_iran_time().isoformat()},
+                    version,
+                )
+                live_streams.record_event(stream_id)
+
+                closes_at = time.time() + LiveStreamConfig.MAX_STREAM_SECONDS
+                while time.time() < closes_at:
+                    timeout = min(LiveStreamConfig.HEARTBEAT_INTERVAL, closes_at - time.time())
+                    new_version = live_streams.wait_for_pass(version, timeout)
+                    if new_version <= version:
+                        price_hub.track(symbols)  # keep followed symbols in the producer's demand set
+                        live_streams.record_heartbeat()
+                        yield format_comment("heartbeat")
+                        continue
+
+                    # Only ticks the monitor pass covered - later ones arrive with the next pass
+                    ticks = {
+                        symbol: tick
+                        for symbol, tick in price_hub.ticks_since(version, symbols).items()
+                        if tick.version <= new_version
+                    }
+                    version = new_version
+
+                    symbols = _live_stream_symbols(chat_id, requested_symbols)
+                    if not ticks:
+                        continue  # no followed price moved - positions are unchanged too
+                    yield format_event("prices", {symbol: tick.to_dict() for symbol, tick in ticks.items()}, version)
+
+                    current, totals = _live_positions_payload(chat_id)
+                    delta = diff_positions(positions, current)
+                    if delta["positions"] or delta["removed"]:
+                        positions = current
+                        yield format_event(
+                            "positions",
+                            {**delta, **totals, "update_type": "delta", "timestamp": get_iran_time().isoformat()},
+                            version,
+                        )
+                    live_streams.record_event(stream_id)
+        except RuntimeError as e:
+            yield format_event("error", {"error": str(e)})
+        except GeneratorExit:
+            pass  # client went away
+        except Exception as e:
+            logging.error(f"LIVE-STREAM: Stream for user {chat_id} failed: {e}")
+            yield format_event("error", {"error": "stream failed"})
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # disable proxy buffering (nginx)
+    return response
+
+
+@app.route("/api/stream/status")
+def live_stream_status():
+    """Open live streams in this worker process"""
+    return jsonify(live_streams.get_status())
+
+
 @app.route("/api/trading/new")
 def api_trading_new():
     """Create new trading configuration"""
@@ -7252,67 +7573,55 @@ def whitelist_status():
 
 
 
-# Enhanced caching system replaces basic price cache
-# price_cache, cache_lock, and cache_ttl now handled by enhanced_cache
-api_performance_metrics = {
-    "binance": {
-        "requests": 0,
-        "successes": 0,
-        "avg_response_time": 0,
-        "last_success": None,
-    },
-    "coingecko": {
-        "requests": 0,
-        "successes": 0,
-        "avg_response_time": 0,
-        "last_success": None,
-    },
-    "cryptocompare": {
-        "requests": 0,
-        "successes": 0,
-        "avg_response_time": 0,
-        "last_success": None,
-    },
-}
-
 # Thread pool for concurrent API requests
 price_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="price_api")
 
 
 def update_api_metrics(api_name, success, response_time):
-    """Update API performance metrics"""
-    metrics = api_performance_metrics[api_name]
-    current_requests = metrics.get("requests", 0)
-    metrics["requests"] = current_requests + 1
-    if success:
-        current_successes = metrics.get("successes", 0)
-        metrics["successes"] = current_successes + 1
-        metrics["last_success"] = datetime.utcnow()
-        # Update rolling average response time
-        current_avg = metrics.get("avg_response_time", 0)
-        if current_avg == 0:
-            metrics["avg_response_time"] = response_time
-        else:
-            metrics["avg_response_time"] = (current_avg * 0.8) + (response_time * 0.2)
+    """Record one completed request in the per-source latency model"""
+    if async_http.scope_cancelled():
+        # Cancelled because a hedged request to another source won - says nothing about this one
+        return
+    price_latency_model.record(api_name, response_time, success)
 
 
-def get_api_priority():
-    """Get API priority based on performance metrics"""
-    apis = []
-    for api_name, metrics in api_performance_metrics.items():
-        requests_count = metrics.get("requests", 0)
-        if requests_count is not None and requests_count > 0:
-            successes_count = metrics.get("successes", 0)
-            avg_response_time = metrics.get("avg_response_time", 0)
-            success_rate = successes_count / requests_count
-            score = success_rate * 100 - (avg_response_time or 0)
-            apis.append((api_name, score))
-        else:
-            apis.append((api_name, 50))  # Default score for untested APIs
+def update_batch_api_metrics(api_name, success, response_time):
+    """Record one completed batch request (kept apart from the per-symbol latency model)"""
+    batch_latency_model.record(api_name, response_time, success)
 
-    # Sort by score (higher is better)
-    apis.sort(key=lambda x: x[1], reverse=True)
-    return [api[0] for api in apis]
+
+def get_api_priority():
+    """Price sources ordered by the latency model's expected cost (best first)"""
+    return price_latency_model.rank()
+
+
+# CoinGecko coin ids for supported trading pairs (extended symbol mapping)
+COINGECKO_SYMBOL_MAP = {
+    "BTCUSDT": "bitcoin",
+    "ETHUSDT": "ethereum",
+    "BNBUSDT": "binancecoin",
+    "ADAUSDT": "cardano",
+    "DOGEUSDT": "dogecoin",
+    "SOLUSDT": "solana",
+    "DOTUSDT": "polkadot",
+    "LINKUSDT": "chainlink",
+    "LTCUSDT": "litecoin",
+    "MATICUSDT": "matic-network",
+    "AVAXUSDT": "avalanche-2",
+    "UNIUSDT": "uniswap",
+    "XRPUSDT": "ripple",
+    "ALGOUSDT": "algorand",
+    "ATOMUSDT": "cosmos",
+    "FTMUSDT": "fantom",
+    "MANAUSDT": "decentraland",
+    "SANDUSDT": "the-sandbox",
+    "AXSUSDT": "axie-infinity",
+    "CHZUSDT": "chiliz",
+    "ENJUSDT": "enjincoin",
+    "GMTUSDT": "stepn",
+    "APTUSDT": "aptos",
+    "NEARUSDT": "near",
+}
 
 
 @with_circuit_breaker("binance_api", failure_threshold=3, recovery_timeout=30)
@@ -7326,7 +7635,7 @@ def fetch_binance_price(symbol):
             "Accept": "application/json",
         }
 
-        response = requests.get(
+        response = async_http.get(
             url, headers=headers, timeout=TimeConfig.FAST_API_TIMEOUT
         )
         response.raise_for_status()
@@ -7348,35 +7657,7 @@ def fetch_coingecko_price(symbol):
     """Fetch price from CoinGecko API with circuit breaker protection"""
     start_time = time.time()
     try:
-        # Extended symbol mapping with more pairs
-        symbol_map = {
-            "BTCUSDT": "bitcoin",
-            "ETHUSDT": "ethereum",
-            "BNBUSDT": "binancecoin",
-            "ADAUSDT": "cardano",
-            "DOGEUSDT": "dogecoin",
-            "SOLUSDT": "solana",
-            "DOTUSDT": "polkadot",
-            "LINKUSDT": "chainlink",
-            "LTCUSDT": "litecoin",
-            "MATICUSDT": "matic-network",
-            "AVAXUSDT": "avalanche-2",
-            "UNIUSDT": "uniswap",
-            "XRPUSDT": "ripple",
-            "ALGOUSDT": "algorand",
-            "ATOMUSDT": "cosmos",
-            "FTMUSDT": "fantom",
-            "MANAUSDT": "decentraland",
-            "SANDUSDT": "the-sandbox",
-            "AXSUSDT": "axie-infinity",
-            "CHZUSDT": "chiliz",
-            "ENJUSDT": "enjincoin",
-            "GMTUSDT": "stepn",
-            "APTUSDT": "aptos",
-            "NEARUSDT": "near",
-        }
-
-        coin_id = symbol_map.get(symbol)
+        coin_id = COINGECKO_SYMBOL_MAP.get(symbol)
         if not coin_id:
             raise Exception(f"Symbol {symbol} not supported by CoinGecko")
 
@@ -7386,7 +7667,7 @@ def fetch_coingecko_price(symbol):
             "Accept": "application/json",
         }
 
-        response = requests.get(
+        response = async_http.get(
             url, headers=headers, timeout=TimeConfig.EXTENDED_API_TIMEOUT
         )
         response.raise_for_status()
@@ -7417,7 +7698,7 @@ def fetch_cryptocompare_price(symbol):
             "Accept": "application/json",
         }
 
-        response = requests.get(
+        response = async_http.get(
             url, headers=headers, timeout=TimeConfig.EXTENDED_API_TIMEOUT
         )
         response.raise_for_status()
@@ -7438,34 +7719,151 @@ def fetch_cryptocompare_price(symbol):
         raise e
 
 
-@with_circuit_breaker("toobit_api", failure_threshold=3, recovery_timeout=60)
-def get_toobit_price(symbol, user_id=None):
-    """Get live price directly from Toobit exchange with circuit breaker protection"""
+# Batch price fetchers - one upstream request per source for a whole symbol list.
+# Symbols the source does not return are simply absent from the result dict.
+PRICE_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json",
+}
+
+
+# Symbols Binance rejected as unknown (-1121) -> time until which batches leave them out
+binance_invalid_symbols = {}
+
+
+def _binance_ticker_request(params):
+    """One GET /api/v3/ticker/price against the shared weight budget (weight 4 for a list or all symbols)"""
+    # Skip to the next source rather than wait for the window
+    if not binance_weight_budget.acquire(4, timeout=TimeConfig.BINANCE_WEIGHT_REQUEST_WAIT):
+        raise WeightBudgetExhausted("No Binance weight budget for batch prices")
+    response = async_http.get(
+        "https://api.binance.com/api/v3/ticker/price",
+        params=params,
+        headers=PRICE_REQUEST_HEADERS,
+        timeout=TimeConfig.FAST_API_TIMEOUT,
+    )
+    binance_weight_budget.record_response(response)
+    return response
+
+
+def _is_binance_invalid_symbol(response):
+    if response.status_code != 400:
+        return False
     try:
-        # Ensure we're in Flask application context
-        if not has_app_context():
-            with app.app_context():
-                return get_toobit_price(symbol, user_id)
+        return response.json().get("code") == -1121
+    except ValueError:
+        return False
 
-        # Try to get user credentials to use their exchange connection
-        if user_id:
-            user_creds = UserCredentials.query.filter_by(
-                telegram_user_id=str(user_id), is_active=True
-            ).first()
 
-            if user_creds and user_creds.has_credentials():
-                client = create_exchange_client(user_creds, testnet=False)
+@with_circuit_breaker("binance_batch_api", failure_threshold=3, recovery_timeout=30)
+def fetch_binance_prices(symbols):
+    """
+    Fetch prices for several symbols from Binance in one request
 
-                toobit_price = client.get_ticker_price(symbol)
-                if toobit_price:
-                    return toobit_price, "toobit"
+    Binance fails the whole list when one symbol is unknown or delisted (-1121). The
+    all-symbols ticker (same weight) then tells which ones it does not list; those are
+    left out of batches for TimeConfig.BINANCE_INVALID_SYMBOL_TTL.
+    """
+    now = time.time()
+    wanted = sorted(symbol for symbol in symbols if binance_invalid_symbols.get(symbol, 0) < now)
+    if not wanted:
+        return {}
 
-        # Fallback: Create anonymous client for public market data
-        # Use wrapped anonymous client that can handle multiple exchanges
-        anonymous_client = create_wrapped_exchange_client(
-            exchange_name="toobit", testnet=False
+    start_time = time.time()
+    try:
+        response = _binance_ticker_request({"symbols": json.dumps(wanted, separators=(",", ":"))})
+        if _is_binance_invalid_symbol(response):
+            response = _binance_ticker_request(None)
+            response.raise_for_status()
+            data = response.json()
+            listed = {item.get("symbol") for item in data}
+            unlisted = [symbol for symbol in wanted if symbol not in listed]
+            for symbol in unlisted:
+                binance_invalid_symbols[symbol] = now + TimeConfig.BINANCE_INVALID_SYMBOL_TTL
+            logging.warning(f"Binance does not list {', '.join(unlisted)} - left out of batch requests")
+        else:
+            response.raise_for_status()
+            data = response.json()
+
+        update_batch_api_metrics("binance", True, time.time() - start_time)
+        return {item["symbol"]: float(item["price"]) for item in data if item.get("symbol") in wanted}
+    except Exception as e:
+        update_batch_api_metrics("binance", False, time.time() - start_time)
+        raise e
+
+
+@with_circuit_breaker("coingecko_batch_api", failure_threshold=4, recovery_timeout=45)
+def fetch_coingecko_prices(symbols):
+    """Fetch prices for several symbols from CoinGecko in one request"""
+    coin_ids = {COINGECKO_SYMBOL_MAP[symbol]: symbol for symbol in symbols if symbol in COINGECKO_SYMBOL_MAP}
+    if not coin_ids:
+        return {}
+
+    start_time = time.time()
+    try:
+        response = async_http.get(
+            "https://api.coingecko.com/api/v3/simple/price",
+            params={"ids": ",".join(sorted(coin_ids)), "vs_currencies": "usd"},
+            headers=PRICE_REQUEST_HEADERS,
+            timeout=TimeConfig.EXTENDED_API_TIMEOUT,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        update_batch_api_metrics("coingecko", True, time.time() - start_time)
+        return {
+            coin_ids[coin_id]: float(quote["usd"])
+            for coin_id, quote in data.items()
+            if coin_id in coin_ids and "usd" in quote
+        }
+    except Exception as e:
+        update_batch_api_metrics("coingecko", False, time.time() - start_time)
+        raise e
+
+
+@with_circuit_breaker("cryptocompare_batch_api", failure_threshold=4, recovery_timeout=45)
+def fetch_cryptocompare_prices(symbols):
+    """Fetch prices for several symbols from CryptoCompare in one request"""
+    base_symbols = {
+        symbol.replace("USDT", "").replace("BUSD", "").replace("USDC", ""): symbol
+        for symbol in symbols
+    }
+
+    start_time = time.time()
+    try:
+        response = async_http.get(
+            "https://min-api.cryptocompare.com/data/pricemulti",
+            params={"fsyms": ",".join(sorted(base_symbols)), "tsyms": "USD"},
+            headers=PRICE_REQUEST_HEADERS,
+            timeout=TimeConfig.EXTENDED_API_TIMEOUT,
         )
-        toobit_price = anonymous_client.get_ticker_price(symbol)
+        response.raise_for_status()
+        data = response.json()
+
+        if data.get("Response") == "Error":
+            raise Exception(data.get("Message", "CryptoCompare batch request failed"))
+
+        update_batch_api_metrics("cryptocompare", True, time.time() - start_time)
+        return {
+            base_symbols[base]: float(quote["USD"])
+            for base, quote in data.items()
+            if base in base_symbols and isinstance(quote, dict) and "USD" in quote
+        }
+    except Exception as e:
+        update_batch_api_metrics("cryptocompare", False, time.time() - start_time)
+        raise e
+
+
+@with_circuit_breaker("toobit_api", failure_threshold=3, recovery_timeout=60)
+def get_toobit_price(symbol, user_id=None):
+    """
+    Get live price from Toobit's public ticker with circuit breaker protection
+
+    Reads through the process-wide market-data client: no user credentials and no
+    database access. user_id is kept for compatibility.
+    """
+    try:
+        toobit_price = market_data_clients.get_ticker_price("toobit", symbol)
         if toobit_price:
             return toobit_price, "toobit"
 
@@ -7477,36 +7875,14 @@ def get_toobit_price(symbol, user_id=None):
 
 @with_circuit_breaker("hyperliquid_api", failure_threshold=3, recovery_timeout=60)
 def get_hyperliquid_price(symbol, user_id=None):
-    """Get live price directly from Hyperliquid exchange with circuit breaker protection"""
-    try:
-        # Ensure we're in Flask application context
-        if not has_app_context():
-            with app.app_context():
-                return get_hyperliquid_price(symbol, user_id)
-
-        # Try to get user credentials to use their exchange connection
-        if user_id:
-            user_creds = UserCredentials.query.filter_by(
-                telegram_user_id=str(user_id), is_active=True
-            ).first()
-
-            if (
-                user_creds
-                and user_creds.has_credentials()
-                and user_creds.exchange_name == "hyperliquid"
-            ):
-                client = create_exchange_client(user_creds, testnet=False)
-
-                hyperliquid_price = client.get_ticker_price(symbol)
-                if hyperliquid_price:
-                    return hyperliquid_price, "hyperliquid"
+    """
+    Get live price from Hyperliquid's public order book with circuit breaker protection
 
-        # Fallback: Create anonymous client for public market data
-        # Use wrapped anonymous client that can handle multiple exchanges
-        anonymous_client = create_wrapped_exchange_client(
-            exchange_name="hyperliquid", testnet=False
-        )
-        hyperliquid_price = anonymous_client.get_ticker_price(symbol)
+    Reads through the process-wide market-data client (one SDK Info client per process):
+    no user credentials and no database access. user_id is kept for compatibility.
+    """
+    try:
+        hyperliquid_price = market_data_clients.get_ticker_price("hyperliquid", symbol)
         if hyperliquid_price:
             return hyperliquid_price, "hyperliquid"
 
@@ -7516,170 +7892,275 @@ def get_hyperliquid_price(symbol, user_id=None):
         return None, None
 
 
-def _get_user_credentials_safe(user_id):
-    """Safely get user credentials with proper app context handling"""
-    if not user_id:
-        return None
+def _run_cancellable(token, fetch, symbol):
+    """Run one source's fetch with its HTTP requests registered under token"""
+    with async_http.cancel_scope(token):
+        return fetch(symbol)
 
-    try:
-        if has_app_context():
-            return UserCredentials.query.filter_by(
-                telegram_user_id=str(user_id), is_active=True
-            ).first()
-        else:
-            # We're running in a background thread, need app context
-            with app.app_context():
-                return UserCredentials.query.filter_by(
-                    telegram_user_id=str(user_id), is_active=True
-                ).first()
-    except Exception as context_error:
-        logging.debug(f"Database query failed due to context issue: {context_error}")
-        return None
 
+def _try_hedged_apis(symbol, api_priority, api_functions):
+    """
+    Resolve one symbol source by source with hedged requests
 
-def _try_preferred_exchange(symbol, user_id, use_cache):
-    """Try to get price from user's preferred exchange"""
-    user_creds = _get_user_credentials_safe(user_id)
+    The best-ranked source is asked first. When the newest request has not answered
+    within its source's hedge delay (p50/p95 from the latency model), or a request fails,
+    the next source is asked - at most PriceHedgingConfig.MAX_PARALLEL at a time. The
+    first price wins and the requests still in flight are cancelled.
+    """
+    sources = [api_name for api_name in api_priority if api_name in api_functions]
+    if not sources:
+        return None, None
 
-    if not (user_creds and user_creds.exchange_name):
-        return None
+    deadline = time.time() + TimeConfig.QUICK_API_TIMEOUT
+    running = {}  # future -> (api_name, cancel token)
+    next_source = 0
+    hedge_at = None
+    price_latency_model.record_hedge("hedged_calls")
+
+    def launch():
+        nonlocal next_source, hedge_at
+        api_name = sources[next_source]
+        next_source += 1
+        token = CancelToken()
+        future = price_executor.submit(_run_cancellable, token, api_functions[api_name], symbol)
+        running[future] = (api_name, token)
+        hedge_at = time.time() + price_latency_model.hedge_delay(api_name)
+
+    def cancel_running():
+        for future, (_, token) in running.items():
+            token.cancel()
+            future.cancel()
+        price_latency_model.record_hedge("cancelled", len(running))
+
+    launch()
+    while running:
+        can_hedge = next_source < len(sources) and len(running) < PriceHedgingConfig.MAX_PARALLEL
+        wake_at = min(deadline, hedge_at) if can_hedge else deadline
+        done, _ = wait(list(running), timeout=max(0.0, wake_at - time.time()), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            api_name, _ = running.pop(future)
+            try:
+                price, source = future.result()
+                if price is not None:
+                    if api_name != sources[0]:
+                        price_latency_model.record_hedge("hedge_wins")
+                    cancel_running()
+                    return price, source
+            except CircuitBreakerError as e:
+                logging.warning(f"{api_name} circuit breaker is open: {str(e)}")
+            except Exception as e:
+                logging.warning(f"{api_name} API failed for {symbol}: {str(e)}")
 
-    if user_creds.exchange_name == "hyperliquid":
-        hyperliquid_price, source = get_hyperliquid_price(symbol, user_id)
-        if hyperliquid_price:
-            if use_cache:
-                enhanced_cache.set_price(symbol, hyperliquid_price, "hyperliquid")
-            logging.info(
-                f"Retrieved live price for {symbol} from Hyperliquid exchange: ${hyperliquid_price}"
-            )
-            return hyperliquid_price
-    else:
-        # Default to Toobit for other exchanges (backward compatibility)
-        toobit_price, source = get_toobit_price(symbol, user_id)
-        if toobit_price:
-            if use_cache:
-                enhanced_cache.set_price(symbol, toobit_price, "toobit")
-            logging.info(
-                f"Retrieved live price for {symbol} from Toobit exchange: ${toobit_price}"
-            )
-            return toobit_price
+            # A failed source hands over to the next one straight away
+            if next_source < len(sources) and len(running) < PriceHedgingConfig.MAX_PARALLEL:
+                launch()
 
-    return None
+        if time.time() >= deadline:
+            logging.warning(f"Hedged price requests timed out for {symbol}")
+            cancel_running()
+            break
+        if not done and can_hedge and time.time() >= hedge_at:
+            price_latency_model.record_hedge("hedges_sent")
+            launch()
 
+    price_latency_model.record_hedge("exhausted")
+    return None, None
 
-def _try_fallback_exchange(symbol, user_id, use_cache):
-    """Try fallback to Toobit if no user_id provided"""
-    toobit_price, source = get_toobit_price(symbol, user_id)
-    if toobit_price:
-        if use_cache:
-            enhanced_cache.set_price(symbol, toobit_price, "toobit")
-        logging.info(
-            f"Retrieved live price for {symbol} from Toobit exchange: ${toobit_price}"
-        )
-        return toobit_price
-    return None
 
+def _try_batch_apis(symbols, api_priority, batch_functions):
+    """Resolve symbols source by source with one request per source, in priority order"""
+    prices = {}
+    remaining = set(symbols)
 
-def _try_concurrent_apis(symbol, api_priority, api_functions):
-    """Try concurrent API requests for faster response"""
-    futures = {}
+    for api_name in api_priority:
+        if not remaining:
+            break
+        if api_name not in batch_functions:
+            continue
+        try:
+            source_prices = batch_functions[api_name](remaining)
+        except CircuitBreakerError as e:
+            logging.warning(f"{api_name} batch circuit breaker is open: {str(e)}")
+            continue
+        except Exception as e:
+            logging.warning(f"{api_name} batch price request failed: {str(e)}")
+            continue
 
-    # Submit requests to top 2 performing APIs concurrently
-    for api_name in api_priority[:2]:
-        if api_name in api_functions:
-            future = price_executor.submit(api_functions[api_name], symbol)
-            futures[future] = api_name
+        for symbol, price in source_prices.items():
+            prices[symbol] = (price, api_name)
+        remaining -= source_prices.keys()
 
-    # Wait for first successful response
-    try:
-        for future in as_completed(futures, timeout=TimeConfig.QUICK_API_TIMEOUT):
-            try:
-                price, source = future.result()
-                return price, source
-            except CircuitBreakerError as e:
-                logging.warning(f"{futures[future]} circuit breaker is open: {str(e)}")
-                continue
-            except Exception as e:
-                logging.warning(f"{futures[future]} API failed for {symbol}: {str(e)}")
-                continue
-    except Exception as e:
-        logging.warning(f"Concurrent API requests timed out for {symbol}")
+    return prices
 
-    return None, None
 
+@with_circuit_breaker("toobit_batch_api", failure_threshold=3, recovery_timeout=60)
+def fetch_toobit_prices(symbols):
+    """Fetch prices for several symbols from Toobit's public all-symbols ticker in one request"""
+    return market_data_clients.get_ticker_prices("toobit", symbols)
+
+
+def _exchange_price_lookup(symbol):
+    """Toobit ticker lookup, shared with a lookup for the symbol still in flight from an earlier pass"""
+    return price_flight.do(("toobit", symbol), lambda: get_toobit_price(symbol))[0]
+
+
+def _fallback_price_lookup(symbol, api_priority, api_functions):
+    """Per-symbol fallback chain, shared with a lookup for the symbol still in flight"""
+
+    return price_flight.do(("fallback", symbol), lambda: _try_hedged_apis(symbol, api_priority, api_functions))[0]
+
+
+def fetch_hub_prices(symbols):
+    """
+    Price hub producer: resolve every tracked symbol from upstream
+
+    Runs on the price hub's producer thread only - request handlers and monitors read the
+    hub. Toobit's public ticker goes first (the venue positions trade on): one all-symbols
+    request, then per-symbol tickers only for symbols it did not return. Then one request
+    per fallback source for the symbols still missing, then per-symbol fallbacks for
+    symbols absent from every batch response. Per-symbol lookups go through price_flight:
+    a lookup that outlived the previous pass's timeout is joined, not repeated.
+
+    With a shared price cache, symbols another worker refreshed within the hub interval
+    are taken from it (with their original fetch time) instead of being fetched again.
 
-def _try_sequential_apis(symbol, api_priority, api_functions):
-    """Try remaining APIs sequentially if concurrent requests failed"""
-    for api_name in api_priority[2:]:
-        if api_name in api_functions:
+    Returns:
+        Dict of symbol -> (price, source) or (price, source, fetched_at)
+    """
+    results = {
+        symbol: (entry["price"], entry["source"], entry["timestamp"])
+        for symbol, entry in enhanced_cache.get_shared_prices(symbols, PriceHubConfig.REFRESH_INTERVAL).items()
+    }
+    symbols = [symbol for symbol in symbols if symbol not in results]
+    if not symbols:
+        return results
+
+    # PRIORITY 1: Exchange tickers (public market data, no user credentials) - batch first
+    try:
+        for symbol, price in fetch_toobit_prices(symbols).items():
+            results[symbol] = (price, "toobit")
+    except CircuitBreakerError as e:
+        logging.warning(f"toobit batch circuit breaker is open: {str(e)}")
+    except Exception as e:
+        logging.warning(f"toobit batch price request failed: {str(e)}")
+
+    unbatched = [symbol for symbol in symbols if symbol not in results]
+    futures = {price_executor.submit(_exchange_price_lookup, symbol): symbol for symbol in unbatched}
+    try:
+        for future in as_completed(futures, timeout=TimeConfig.QUICK_API_TIMEOUT):
             try:
-                price_result = api_functions[api_name](symbol)
-                if price_result and len(price_result) == 2:
-                    return price_result
-            except CircuitBreakerError as e:
-                logging.warning(f"{api_name} circuit breaker is open: {str(e)}")
-                continue
+                price, source = future.result()
+                if price:
+                    results[futures[future]] = (price, source)
             except Exception as e:
-                logging.warning(f"{api_name} API failed for {symbol}: {str(e)}")
-                continue
-    return None, None
+                logging.warning(f"Exchange price lookup failed for {futures[future]}: {e}")
+    except Exception:
+        logging.warning(f"Exchange price lookups timed out for {len(unbatched)} hub symbols")
 
+    missing = [symbol for symbol in symbols if symbol not in results]
+    if not missing:
+        return results
 
-def get_live_market_price(symbol, use_cache=True, user_id=None, prefer_exchange=True):
-    """Enhanced price fetching - refactored for better maintainability"""
-    # Check enhanced cache first
-    if use_cache:
-        cached_result = enhanced_cache.get_price(symbol)
-        if cached_result:
-            price, source, cache_info = cached_result
-            return price
-
-    # PRIORITY 1: Try user's preferred exchange first
-    if prefer_exchange and user_id:
-        exchange_price = _try_preferred_exchange(symbol, user_id, use_cache)
-        if exchange_price:
-            return exchange_price
-    elif prefer_exchange:
-        # Fallback to Toobit if no user_id provided
-        exchange_price = _try_fallback_exchange(symbol, user_id, use_cache)
-        if exchange_price:
-            return exchange_price
-
-    # Get optimal API order based on performance
+    # PRIORITY 2: One request per fallback source for all remaining symbols
     api_priority = get_api_priority()
+    batch_functions = {
+        "binance": fetch_binance_prices,
+        "coingecko": fetch_coingecko_prices,
+        "cryptocompare": fetch_cryptocompare_prices,
+    }
+    results.update(_try_batch_apis(missing, batch_latency_model.rank(api_priority), batch_functions))
 
-    # Define API functions mapping
+    # PRIORITY 3: Per-symbol fallback only for symbols absent from every batch response
     api_functions = {
         "binance": fetch_binance_price,
         "coingecko": fetch_coingecko_price,
         "cryptocompare": fetch_cryptocompare_price,
     }
+    for symbol in missing:
+        if symbol in results:
+            continue
+        price, source = _fallback_price_lookup(symbol, api_priority, api_functions)
+        if price is not None:
+            results[symbol] = (price, source)
 
-    # Try concurrent requests for faster response
-    success_price, success_source = _try_concurrent_apis(
-        symbol, api_priority, api_functions
-    )
+    return results
+
+
+def _price_hub_max_age(use_cache, max_age):
+    """Staleness bound for a read: explicit max_age, or the fresh bound when the caller bypasses caching"""
+    if max_age is not None:
+        return max_age
+    return PriceHubConfig.DEFAULT_MAX_AGE if use_cache else PriceHubConfig.FRESH_MAX_AGE
 
-    # If concurrent requests failed, try remaining APIs sequentially
-    if success_price is None:
-        success_price, success_source = _try_sequential_apis(
-            symbol, api_priority, api_functions
-        )
 
-    if success_price is None:
-        # No emergency fallback needed - enhanced cache handles stale data automatically
+def _price_hub_stale_max_age(use_cache, max_age):
+    """Stale fallback for a read: only callers on the default bound accept an older tick"""
+    if max_age is not None or not use_cache:
+        return None
+    return PriceHubConfig.STALE_MAX_AGE
+
+
+def get_live_market_price(symbol, use_cache=True, user_id=None, prefer_exchange=True, max_age=None):
+    """
+    Latest price for a symbol from the central price hub
+
+    An in-memory read - the hub's producer does all upstream fetching. A symbol the hub
+    has never priced is tracked from now on and the call waits up to
+    PriceHubConfig.FIRST_TICK_WAIT for its first tick; a known symbol never waits and
+    falls back to a tick up to PriceHubConfig.STALE_MAX_AGE old (use_cache=True only).
+    user_id and prefer_exchange are kept for compatibility; the producer picks the sources.
+
+    Args:
+        symbol: Trading symbol
+        use_cache: False tightens the staleness bound to PriceHubConfig.FRESH_MAX_AGE
+        max_age: Maximum accepted staleness in seconds
+
+    Raises:
+        Exception: No tick fresher than the staleness bound is available
+    """
+    price = price_hub.get_price(
+        symbol,
+        max_age=_price_hub_max_age(use_cache, max_age),
+        wait=PriceHubConfig.FIRST_TICK_WAIT,
+        stale_max_age=_price_hub_stale_max_age(use_cache, max_age),
+    )
+    if price is None:
         raise Exception(
             f"Unable to fetch live market price for {symbol} from any source"
         )
+    return price
 
-    # Cache the successful result using enhanced cache
-    if use_cache and success_source:
-        enhanced_cache.set_price(symbol, success_price, success_source)
 
-    logging.info(
-        f"Retrieved live price for {symbol} from {success_source}: ${success_price}"
+def get_live_market_prices(symbols, use_cache=True, user_id=None, prefer_exchange=True, max_age=None):
+    """
+    Batch counterpart of get_live_market_price for a list of symbols
+
+    Returns:
+        Dict of symbol -> price for every symbol with a fresh enough tick
+    """
+    return price_hub.get_prices(
+        symbols,
+        max_age=_price_hub_max_age(use_cache, max_age),
+        wait=PriceHubConfig.FIRST_TICK_WAIT,
+        stale_max_age=_price_hub_stale_max_age(use_cache, max_age),
     )
-    return success_price
+
+
+def _collect_hub_symbols():
+    """Price hub symbol provider: symbols of active positions (runs on the producer thread)"""
+    with app.app_context():
+        return _collect_active_symbols()
+
+
+# Central price feed: one producer per process, in-memory reads everywhere else.
+# The enhanced cache keeps receiving every tick (volatility tracking, cache statistics).
+price_hub.configure(
+    fetch_hub_prices,
+    pinned=TradingConfig.SUPPORTED_SYMBOLS,
+    symbol_providers=[_collect_hub_symbols],
+)
+price_hub.subscribe(lambda tick: enhanced_cache.set_price(tick.symbol, tick.price, tick.source, timestamp=tick.timestamp))
 
 
 def _collect_symbols_for_batch_update():
@@ -7707,25 +8188,15 @@ def _collect_symbols_for_batch_update():
 
 
 def _batch_fetch_symbol_prices(symbols_to_update, user_id=None):
-    """Batch fetch prices for all symbols concurrently."""
+    """Batch fetch prices for all symbols with one upstream request per source."""
     symbol_prices = {}
     if symbols_to_update:
-        futures = {}
-        for symbol in symbols_to_update:
-            # Prioritize Toobit exchange for accurate trading prices
-            future = price_executor.submit(
-                get_live_market_price, symbol, True, user_id, True
-            )
-            futures[future] = symbol
+        # Prioritize Toobit exchange for accurate trading prices
+        symbol_prices = get_live_market_prices(symbols_to_update, True, user_id, True)
 
-        # Collect results with timeout
-        for future in as_completed(futures, timeout=TimeConfig.PRICE_API_TIMEOUT):
-            symbol = futures[future]
-            try:
-                price = future.result()
-                symbol_prices[symbol] = price
-            except Exception as e:
-                logging.warning(f"Failed to update price for {symbol}: {e}")
+        for symbol in symbols_to_update:
+            if symbol not in symbol_prices:
+                logging.warning(f"Failed to update price for {symbol}")
                 # Use cached price if available from enhanced cache
                 cached_result = enhanced_cache.get_price(symbol)
                 if cached_result:
@@ -8678,18 +9149,10 @@ def _fetch_breakeven_symbol_prices(symbols_needed):
     if not symbols_needed:
         return symbol_prices
 
-    futures = {}
+    symbol_prices = get_live_market_prices(symbols_needed, True)
     for symbol in symbols_needed:
-        future = price_executor.submit(get_live_market_price, symbol, True)
-        futures[future] = symbol
-
-    for future in as_completed(futures, timeout=TimeConfig.QUICK_API_TIMEOUT):
-        symbol = futures[future]
-        try:
-            price = future.result()
-            symbol_prices[symbol] = price
-        except Exception as e:
-            logging.warning(f"Failed to get price for break-even check {symbol}: {e}")
+        if symbol not in symbol_prices:
+            logging.warning(f"Failed to get price for break-even check {symbol}")
 
     return symbol_prices
 
@@ -9653,7 +10116,9 @@ def admin_cleanup_worker_status():
             'klines_cache_count': klines_cache_count,
             'service_type': 'unified',
             'klines_tracking': unified_status.get('klines_tracking', {}),
-            'cache_statistics': unified_status.get('cache_statistics', {})
+            'cache_statistics': unified_status.get('cache_statistics', {}),
+            'role': unified_status['leadership']['role'],
+            'leadership': unified_status['leadership']
         }
         
         return jsonify({
@@ -9879,10 +10344,16 @@ def admin_database_backup():
 def admin_restart_cache_worker():
     """Restart the cache cleanup worker"""
     try:
-        from .unified_data_sync_service import restart_unified_data_sync_service
-        
         admin_username = session.get("admin_username", "admin")
-        
+
+        leadership = leader_election.get_service_status(UNIFIED_SERVICE_NAME)
+        if leadership['role'] != 'leader':
+            return jsonify({
+                'success': False,
+                'error': 'This worker is a follower - the worker runs in the leader process',
+                'leadership': leadership
+            }), 409
+
         # Restart the unified data sync service
         success = restart_unified_data_sync_service(app)
         
@@ -10000,7 +10471,6 @@ def admin_clear_klines_cache():
 def admin_stop_data_sync():
     """Stop the unified data sync service to prevent rate limiting"""
     try:
-        from .unified_data_sync_service import stop_unified_data_sync_service
         from .models import SystemSettings
         
         admin_username = session.get("admin_username", "admin")
@@ -10014,14 +10484,16 @@ def admin_stop_data_sync():
                 'error': 'Failed to persist worker state to database - check logs for details'
             }), 500
         
-        # Only stop the worker after successfully persisting state
-        stop_unified_data_sync_service()
+        # Only stop the worker after successfully persisting state - the election pass
+        # stops it here if this process leads, otherwise the leader applies it within seconds
+        leader_election.reconcile()
         
         logging.info(f"Data sync service stopped by admin {admin_username} - state persisted to database")
         
         return jsonify({
             'success': True,
             'message': 'Data sync service stopped successfully (persisted across restarts)',
+            'leadership': leader_election.get_service_status(UNIFIED_SERVICE_NAME),
             'timestamp': get_iran_time().isoformat()
         })
         
@@ -10035,7 +10507,6 @@ def admin_stop_data_sync():
 def admin_start_data_sync():
     """Start the unified data sync service"""
     try:
-        from .unified_data_sync_service import start_unified_data_sync_service
         from .models import SystemSettings
         
         admin_username = session.get("admin_username", "admin")
@@ -10049,14 +10520,16 @@ def admin_start_data_sync():
                 'error': 'Failed to persist worker state to database - check logs for details'
             }), 500
         
-        # Only start the worker after successfully persisting state
-        start_unified_data_sync_service(app)
+        # Only start the worker after successfully persisting state - the election pass
+        # starts it here if this process leads, otherwise the leader applies it within seconds
+        leader_election.reconcile()
         
         logging.info(f"Data sync service started by admin {admin_username} - state persisted to database")
         
         return jsonify({
             'success': True,
             'message': 'Data sync service started successfully (persisted across restarts)',
+            'leadership': leader_election.get_service_status(UNIFIED_SERVICE_NAME),
             'timestamp': get_iran_time().isoformat()
         })
             
@@ -10085,6 +10558,98 @@ def admin_data_sync_status():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/admin/datasync/boost", methods=["POST"])
+@admin_login_required
+def admin_boost_data_sync():
+    """Temporarily refresh a symbol (or one of its timeframes) at the hot-tier interval"""
+    try:
+        data = request.get_json() or {}
+        symbol = str(data.get("symbol", "")).upper()
+        timeframe = data.get("timeframe")
+        duration = data.get("duration")
+
+        if not symbol:
+            return jsonify({"error": "symbol is required"}), 400
+        if timeframe is not None and timeframe not in ("15m", "1h", "4h", "1d"):
+            return jsonify({"error": "timeframe must be one of 15m, 1h, 4h, 1d"}), 400
+        try:
+            duration = float(duration) if duration is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "duration must be a number of seconds"}), 400
+
+        expires_at = sync_priorities.boost(symbol, timeframe, duration)
+
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'timeframe': timeframe or 'all',
+            'expires_at': datetime.utcfromtimestamp(expires_at).isoformat(),
+            'timestamp': get_iran_time().isoformat()
+        })
+
+    except Exception as e:
+        logging.error(f"Error boosting data sync priority: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/admin/services/status")
+@admin_login_required
+def admin_services_status():
+    """Heartbeat liveness, restarts and runtime configuration of the background services"""
+    try:
+        return jsonify({
+            'success': True,
+            'supervisor': service_supervisor.get_status(),
+            'leadership': leader_election.get_status(),
+            'timestamp': get_iran_time().isoformat()
+        })
+
+    except Exception as e:
+        logging.error(f"Error getting background service status: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/admin/services/<service_name>/config", methods=["POST"])
+@admin_login_required
+def admin_reconfigure_service(service_name):
+    """
+    Change a running background service's intervals or symbol list without restarting it
+
+    Body (unified_data_sync): {"symbols": ["BTCUSDT", ...], "intervals": {"1h": 60, ...}}
+    Body (exchange_sync): {"sync_interval": 30}
+    """
+    try:
+        data = request.get_json() or {}
+        admin_username = session.get("admin_username", "admin")
+
+        leadership = leader_election.get_service_status(service_name)
+        if leadership['role'] != 'leader':
+            return jsonify({
+                'success': False,
+                'error': 'This worker is a follower - the service runs in the leader process',
+                'leadership': leadership
+            }), 409
+
+        try:
+            config = service_supervisor.reconfigure(service_name, **data)
+        except KeyError:
+            return jsonify({"error": f"Unknown service: {service_name}"}), 404
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        logging.info(f"Background service {service_name} reconfigured by admin {admin_username}: {data}")
+        return jsonify({
+            'success': True,
+            'service': service_name,
+            'config': config,
+            'timestamp': get_iran_time().isoformat()
+        })
+
+    except Exception as e:
+        logging.error(f"Error reconfiguring background service {service_name}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/admin/smc/diagnostic", methods=["POST"])
 @admin_login_required
 def admin_smc_diagnostic():
@@ -0,0 +1,519 @@
+"""
+Async HTTP - one asyncio event loop thread serving every upstream HTTP call
+
+Blocking `requests` calls tie up a thread each for the whole round trip, and each
+requests.get (or per-client requests.Session) opens its own TCP and TLS connection.
+Upstream fetches (Binance klines, the fetch_*_price functions, SMCAnalyzer candles) and
+the Toobit/LBank exchange clients go through a single aiohttp session running on a
+dedicated event-loop thread:
+- pooled keep-alive connections, reused across requests to the same host
+- per-host in-flight limits (AsyncHttpConfig.PER_HOST_LIMITS) and request timeouts
+- retries for idempotent methods on connection errors and 502/503/504, with backoff,
+  inside the caller's timeout
+- per-host metrics: requests, errors, retries, connections opened vs reused, latency
+- a sync facade (get / request / get_many / submit) for Flask handlers and worker
+  threads, and session() - a requests.Session stand-in for the exchange clients
+
+Callers keep the `requests` contract: responses expose status_code, headers, text,
+json() and raise_for_status(), and transport failures surface as
+requests.exceptions.Timeout / ConnectionError, so circuit breakers, the Binance weight
+budget and existing except-clauses work unchanged. get_many() keeps hundreds of
+requests in flight on the loop while the calling thread waits once.
+
+Requests submitted inside cancel_scope(token) are cancelled on the loop by
+token.cancel() - the blocked caller sees concurrent.futures.CancelledError. Hedged
+price requests use this to drop the losing request.
+"""
+
+import asyncio
+import concurrent.futures
+import json as jsonlib
+import logging
+import os
+import random
+import ssl
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Import configuration constants
+try:
+    from config import AsyncHttpConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import AsyncHttpConfig
+
+
+class HttpResponse:
+    """Fully-read response with the subset of requests.Response used by the fetchers"""
+
+    def __init__(self, url: str, status_code: int, headers: CaseInsensitiveDict, content: bytes, reason: str = ""):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.reason = reason
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self
+            )
+
+
+def _normalize_fields(fields: Any) -> Any:
+    """requests-style params/form data for aiohttp: None values dropped, lists repeated, values as str"""
+    if not isinstance(fields, dict):
+        return fields
+    normalized = []
+    for key, value in fields.items():
+        if value is None:
+            continue
+        for item in value if isinstance(value, (list, tuple)) else (value,):
+            normalized.append((key, str(item)))
+    return normalized
+
+
+_ssl_contexts: Dict[str, ssl.SSLContext] = {}
+
+
+def _ssl_option(verify: Union[bool, str]) -> Union[bool, ssl.SSLContext]:
+    """aiohttp ssl= argument for a requests-style verify (bool or CA bundle path)"""
+    if isinstance(verify, str):
+        if verify not in _ssl_contexts:
+            _ssl_contexts[verify] = ssl.create_default_context(cafile=verify)
+        return _ssl_contexts[verify]
+    return bool(verify)
+
+
+class _HostMetrics:
+    """Counters and recent latencies for one upstream host"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.statuses: Dict[str, int] = {}
+        self.latencies = deque(maxlen=AsyncHttpConfig.LATENCY_SAMPLES)
+
+    def record(self, latency: float, status: int) -> None:
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            status_class = f"{status // 100}xx"
+            self.statuses[status_class] = self.statuses.get(status_class, 0) + 1
+
+    def record_error(self) -> None:
+        with self.lock:
+            self.requests += 1
+            self.errors += 1
+
+    def get_status(self) -> Dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            connections = self.connections_opened + self.connections_reused
+
+            def quantile(q: float) -> Optional[float]:
+                return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "reuse_ratio": round(self.connections_reused / connections, 3) if connections else None,
+                "latency_p50_ms": quantile(0.5),
+                "latency_p95_ms": quantile(0.95),
+                "statuses": dict(self.statuses),
+            }
+
+
+class HttpSession:
+    """
+    requests.Session stand-in on the shared transport: default headers plus
+    request/get/post/put/delete, so exchange clients keep their call sites while their
+    connections come from the process-wide pool
+    """
+
+    def __init__(self, client: "AsyncHttpClient", headers: Optional[Dict] = None):
+        self._client = client
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        data: Any = None,
+        json: Any = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        verify: Union[bool, str] = True,
+    ) -> "HttpResponse":
+        merged_headers = dict(self.headers)
+        merged_headers.update(headers or {})
+        return self._client.request(
+            method.upper(), url, params=params, data=data, json=json, headers=merged_headers or None, timeout=timeout, verify=verify
+        )
+
+    def get(self, url: str, **kwargs) -> "HttpResponse":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "HttpResponse":
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> "HttpResponse":
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> "HttpResponse":
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        pass  # connections belong to the shared pool
+
+
+class CancelToken:
+    """Cancels every request submitted under it (and any submitted after cancellation)"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._futures: List[concurrent.futures.Future] = []
+        self._lock = threading.Lock()
+
+    def _register(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if not self.cancelled:
+                self._futures.append(future)
+                return
+        future.cancel()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.cancel()
+
+
+class AsyncHttpClient:
+    """
+    aiohttp session on a background event loop with per-host concurrency limits
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._local = threading.local()
+
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "cancelled": 0,
+        }
+        self._host_in_flight: Dict[str, int] = {}
+        self._host_metrics: Dict[str, _HostMetrics] = {}
+
+    # ---- lifecycle -------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the event-loop thread (called lazily by the first request)"""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+
+            # After a fork the parent's loop thread does not exist in the child - start fresh
+            self._pid = os.getpid()
+            self._host_semaphores = {}
+            self._host_in_flight = {}
+            self._host_metrics = {}
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._thread_main, args=(ready,), name="AsyncHttpLoop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            logging.info(
+                f"ASYNC-HTTP: Event loop started (pool {AsyncHttpConfig.TOTAL_CONNECTIONS}, "
+                f"default per-host limit {AsyncHttpConfig.DEFAULT_PER_HOST_LIMIT})"
+            )
+
+    def stop(self) -> None:
+        """Close the session and stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or self._pid != os.getpid():
+                return
+            self._loop = None
+
+        asyncio.run_coroutine_threadsafe(self._close_session(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        logging.info("ASYNC-HTTP: Event loop stopped")
+
+    def _thread_main(self, ready: threading.Event) -> None:
+        loop = self._loop  # stop() clears self._loop before the loop exits
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._open_session())
+        finally:
+            ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _open_session(self) -> None:
+        # Connection events feed the per-host opened/reused counters
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        # The connector binds to the running loop, so the session is created on it
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=AsyncHttpConfig.TOTAL_CONNECTIONS,
+                ttl_dns_cache=AsyncHttpConfig.DNS_CACHE_TTL,
+                keepalive_timeout=AsyncHttpConfig.KEEPALIVE_TIMEOUT,
+            ),
+            trace_configs=[trace_config],
+        )
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        request_context = context.trace_request_ctx or {}
+        if "host" in request_context:
+            self._metrics(request_context["host"]).connections_opened += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        request_context = context.trace_request_ctx or {}
+        if "host" in request_context:
+            self._metrics(request_context["host"]).connections_reused += 1
+
+    async def _close_session(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # ---- coroutine API (runs on the loop) --------------------------------
+
+    def _metrics(self, host: str) -> _HostMetrics:
+        metrics = self._host_metrics.get(host)
+        if metrics is None:
+            metrics = self._host_metrics[host] = _HostMetrics()
+        return metrics
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            limit = AsyncHttpConfig.PER_HOST_LIMITS.get(host, AsyncHttpConfig.DEFAULT_PER_HOST_LIMIT)
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def request_async(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+        verify: Union[bool, str] = True,
+        retries: Optional[int] = None,
+    ) -> HttpResponse:
+        """
+        Perform one request on the loop; the whole call (queueing and retries included) honours timeout
+
+        Args:
+            verify: requests-style TLS verification (False, or a CA bundle path)
+            retries: Extra attempts for idempotent methods (default AsyncHttpConfig.RETRY_ATTEMPTS)
+        """
+        method = method.upper()
+        host = urlsplit(url).hostname or ""
+        if isinstance(timeout, tuple):  # requests-style (connect, read)
+            timeout = sum(part for part in timeout if part)
+        total = timeout if timeout is not None else AsyncHttpConfig.DEFAULT_TIMEOUT
+        client_timeout = aiohttp.ClientTimeout(total=total, connect=min(AsyncHttpConfig.CONNECT_TIMEOUT, total))
+        kwargs = {"params": _normalize_fields(params), "headers": headers, "json": json, "data": _normalize_fields(data)}
+        if verify is not True:
+            kwargs["ssl"] = _ssl_option(verify)
+
+        self.stats["requests"] += 1
+        try:
+            return await asyncio.wait_for(self._send_with_retries(host, method, url, client_timeout, retries, kwargs), timeout=total)
+        except asyncio.TimeoutError as e:
+            self.stats["errors"] += 1
+            self.stats["timeouts"] += 1
+            raise requests.exceptions.Timeout(f"{method} {url} timed out after {total}s") from e
+        except aiohttp.ClientError as e:
+            self.stats["errors"] += 1
+            raise requests.exceptions.ConnectionError(f"{method} {url} failed: {e}") from e
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+
+    async def _send_with_retries(
+        self, host: str, method: str, url: str, client_timeout: aiohttp.ClientTimeout, retries: Optional[int], kwargs: Dict
+    ) -> HttpResponse:
+        attempts = 1
+        if method in AsyncHttpConfig.RETRY_METHODS:
+            attempts += AsyncHttpConfig.RETRY_ATTEMPTS if retries is None else retries
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await self._send(host, method, url, client_timeout, **kwargs)
+            except aiohttp.ClientConnectionError:
+                # Refused/reset connections and keep-alive sockets closed by the server
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in AsyncHttpConfig.RETRY_STATUSES:
+                    return response
+
+            self.stats["retries"] += 1
+            self._metrics(host).retries += 1
+            await asyncio.sleep(AsyncHttpConfig.RETRY_BACKOFF * (2**attempt) * random.uniform(0.5, 1.5))
+
+    async def _send(self, host: str, method: str, url: str, client_timeout: aiohttp.ClientTimeout, **kwargs) -> HttpResponse:
+        metrics = self._metrics(host)
+        async with self._host_semaphore(host):
+            self._track(host, 1)
+            started = time.monotonic()
+            try:
+                async with self._session.request(
+                    method, url, timeout=client_timeout, trace_request_ctx={"host": host}, **kwargs
+                ) as response:
+                    content = await response.read()
+                    metrics.record(time.monotonic() - started, response.status)
+                    return HttpResponse(
+                        str(response.url),
+                        response.status,
+                        CaseInsensitiveDict(response.headers),
+                        content,
+                        response.reason or "",
+                    )
+            except Exception:
+                metrics.record_error()
+                raise
+            finally:
+                self._track(host, -1)
+
+    def _track(self, host: str, delta: int) -> None:
+        self._host_in_flight[host] = self._host_in_flight.get(host, 0) + delta
+        self.stats["in_flight"] += delta
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+
+    # ---- sync facade -----------------------------------------------------
+
+    def submit(self, method: str, url: str, **kwargs) -> concurrent.futures.Future:
+        """Schedule a request on the loop and return a concurrent.futures.Future"""
+        self.start()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Use request_async() from coroutines running on the async HTTP loop")
+        future = asyncio.run_coroutine_threadsafe(self.request_async(method, url, **kwargs), self._loop)
+        token = getattr(self._local, "token", None)
+        if token is not None:
+            token._register(future)
+        return future
+
+    @contextmanager
+    def cancel_scope(self, token: CancelToken):
+        """Register requests submitted by this thread with token for the duration of the block"""
+        previous = getattr(self._local, "token", None)
+        self._local.token = token
+        try:
+            yield token
+        finally:
+            self._local.token = previous
+
+    def scope_cancelled(self) -> bool:
+        """True when this thread runs inside a cancel scope whose token was cancelled"""
+        token = getattr(self._local, "token", None)
+        return token is not None and token.cancelled
+
+    def request(self, method: str, url: str, **kwargs) -> HttpResponse:
+        """Blocking request - the calling thread waits, the socket work happens on the loop"""
+        return self.submit(method, url, **kwargs).result()
+
+    def get(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("POST", url, **kwargs)
+
+    def session(self, headers: Optional[Dict] = None) -> HttpSession:
+        """requests.Session stand-in whose requests use this client's pool"""
+        return HttpSession(self, headers)
+
+    def get_many(self, calls: List[Dict]) -> List[Union[HttpResponse, Exception]]:
+        """
+        Run many requests concurrently and wait for all of them
+
+        Args:
+            calls: Request kwargs dicts ({"url", "params", "headers", "timeout", "method"})
+
+        Returns:
+            One HttpResponse or exception per call, in order
+        """
+        futures = []
+        for call in calls:
+            call = dict(call)
+            futures.append(self.submit(call.pop("method", "GET"), call.pop("url"), **call))
+
+        results: List[Union[HttpResponse, Exception]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def get_status(self) -> Dict:
+        """Loop state, per-host in-flight requests and metrics, and counters"""
+        return {
+            "running": self._loop is not None and self._thread is not None and self._thread.is_alive(),
+            "hosts": {
+                host: {
+                    "in_flight": self._host_in_flight.get(host, 0),
+                    "limit": AsyncHttpConfig.PER_HOST_LIMITS.get(host, AsyncHttpConfig.DEFAULT_PER_HOST_LIMIT),
+                    **metrics.get_status(),
+                }
+                for host, metrics in list(self._host_metrics.items())
+            },
+            **self.stats,
+        }
+
+
+# Global client shared by every upstream fetcher in the process
+async_http = AsyncHttpClient()
@@ -0,0 +1,180 @@
+"""
+Binance Request-Weight Budget
+
+Binance limits REQUEST_WEIGHT per IP in a fixed one-minute window and reports the
+weight already used in that window on every response (X-MBX-USED-WEIGHT-1M). This
+module models that window as a token bucket that refills at each minute boundary:
+
+- acquire(weight) reserves weight before a request and only blocks when the budget
+  for the current window is close to exhausted
+- record_response() reconciles the bucket with the server-reported usage (which also
+  counts requests made by other workers/processes on the same IP) and honours
+  Retry-After on 429/418 responses
+
+Callers share the module-level `binance_weight_budget` instance. Request-path callers
+pass a bounded timeout and raise WeightBudgetExhausted instead of waiting for the window.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TimeConfig
+
+WINDOW_SECONDS = 60
+USED_WEIGHT_HEADERS = ("X-MBX-USED-WEIGHT-1M", "X-MBX-USED-WEIGHT")
+RATE_LIMITED_STATUS_CODES = (418, 429)
+
+
+class WeightBudgetExhausted(Exception):
+    """Raised when request weight could not be reserved within the caller's timeout"""
+
+
+def klines_request_weight(limit: int) -> int:
+    """Weight of a GET /api/v3/klines request for the given limit"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class BinanceWeightBudget:
+    """
+    Token bucket for Binance request weight, synchronised from response headers
+    """
+
+    def __init__(
+        self,
+        limit_per_minute: int = TimeConfig.BINANCE_WEIGHT_LIMIT_PER_MINUTE,
+        budget_ratio: float = TimeConfig.BINANCE_WEIGHT_BUDGET_RATIO,
+    ):
+        self.limit_per_minute = limit_per_minute
+        self.capacity = max(1, int(limit_per_minute * budget_ratio))
+
+        self._condition = threading.Condition(threading.Lock())
+        self._window = self._current_window(time.time())
+        self._used = 0
+        self._blocked_until = 0.0
+
+        self.stats = {
+            "requests": 0,
+            "weight_acquired": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "rate_limited_responses": 0,
+            "last_server_used_weight": None,
+        }
+
+    @staticmethod
+    def _current_window(now: float) -> int:
+        return int(now // WINDOW_SECONDS)
+
+    def _roll_window(self, now: float) -> None:
+        """Refill the bucket when a new minute window starts (caller holds the lock)"""
+        window = self._current_window(now)
+        if window != self._window:
+            self._window = window
+            self._used = 0
+
+    def acquire(self, weight: int, timeout: Optional[float] = None) -> bool:
+        """
+        Reserve request weight, waiting for the next window only if the budget is spent
+
+        Args:
+            weight: Weight of the request about to be made
+            timeout: Maximum seconds to wait (None waits until weight is available)
+
+        Returns:
+            True if the weight was reserved, False if the timeout expired first
+        """
+        weight = min(max(1, weight), self.capacity)
+        deadline = time.time() + timeout if timeout is not None else None
+        waited_since = None
+
+        with self._condition:
+            while True:
+                now = time.time()
+                self._roll_window(now)
+
+                if now >= self._blocked_until and self._used + weight <= self.capacity:
+                    self._used += weight
+                    self.stats["requests"] += 1
+                    self.stats["weight_acquired"] += weight
+                    if waited_since is not None:
+                        self.stats["wait_seconds"] += now - waited_since
+                    return True
+
+                resume_at = max(self._blocked_until, (self._window + 1) * WINDOW_SECONDS)
+                if deadline is not None and resume_at > deadline:
+                    return False
+
+                if waited_since is None:
+                    waited_since = now
+                    self.stats["waits"] += 1
+                    logging.debug(
+                        f"BINANCE-WEIGHT: Budget exhausted ({self._used}/{self.capacity}), "
+                        f"waiting {resume_at - now:.1f}s for the next window"
+                    )
+
+                # Wake periodically so header updates and window rollovers are picked up
+                self._condition.wait(min(resume_at - now, 1.0))
+
+    def record_response(self, response) -> None:
+        """Reconcile the bucket with the weight Binance reports for this IP"""
+        headers = getattr(response, "headers", None) or {}
+
+        used_weight = None
+        for header in USED_WEIGHT_HEADERS:
+            value = headers.get(header)
+            if value is not None:
+                try:
+                    used_weight = int(value)
+                except (TypeError, ValueError):
+                    pass
+                break
+
+        with self._condition:
+            now = time.time()
+            self._roll_window(now)
+
+            if used_weight is not None:
+                self.stats["last_server_used_weight"] = used_weight
+                # Server usage includes other callers on this IP - never fall below it
+                self._used = max(self._used, min(used_weight, self.limit_per_minute))
+
+            if getattr(response, "status_code", None) in RATE_LIMITED_STATUS_CODES:
+                try:
+                    retry_after = float(headers.get("Retry-After", WINDOW_SECONDS))
+                except (TypeError, ValueError):
+                    retry_after = WINDOW_SECONDS
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self.stats["rate_limited_responses"] += 1
+                logging.warning(f"BINANCE-WEIGHT: Rate limited (HTTP {response.status_code}), pausing requests for {retry_after:.0f}s")
+
+            self._condition.notify_all()
+
+    def get_status(self) -> Dict:
+        """Current window usage and scheduler statistics"""
+        with self._condition:
+            now = time.time()
+            self._roll_window(now)
+            return {
+                "limit_per_minute": self.limit_per_minute,
+                "capacity": self.capacity,
+                "used_weight": self._used,
+                "remaining_weight": max(0, self.capacity - self._used),
+                "window_resets_in": round((self._window + 1) * WINDOW_SECONDS - now, 1),
+                "blocked_for": round(max(0.0, self._blocked_until - now), 1),
+                **{key: round(value, 2) if isinstance(value, float) else value for key, value in self.stats.items()},
+            }
+
+
+# Global budget shared by every Binance klines caller in this process
+binance_weight_budget = BinanceWeightBudget()
@@ -18,6 +18,7 @@ import os
 import sys
 import threading
 import time
+from concurrent.futures import CancelledError
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, Optional
@@ -139,6 +140,9 @@ class CircuitBreaker:
 
             return result
 
+        except CancelledError:
+            # Cancelled by the caller (e.g. a hedged request lost) - not a service failure
+            raise
         except self.expected_exception as e:
             with self._lock:
                 self._on_failure(e)
@@ -0,0 +1,267 @@
+"""
+Klines Backfill - resumable, paginated history fetches for klines_cache
+
+The planner asks KlinesCache.get_missing_ranges() which complete-candle ranges of a
+series are absent, then pages through each range with explicit startTime/endTime
+(up to KLINES_BACKFILL_PAGE_LIMIT candles per request). After every page the
+remaining ranges are checkpointed in klines_backfill_checkpoints, so a crash or
+restart resumes from the last saved page instead of starting over.
+
+Requires an app context. Requests are paced by the shared Binance weight budget.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from .async_http import async_http
+from .binance_weight_budget import binance_weight_budget, klines_request_weight
+from .circuit_breaker import with_circuit_breaker
+from .sync_metrics import sync_metrics
+from .models import (
+    KlinesBackfillCheckpoint,
+    KlinesCache,
+    db,
+    floor_to_period,
+    get_timeframe_seconds,
+    get_utc_now,
+    normalize_to_utc,
+    to_db_utc,
+)
+
+# Import configuration constants
+try:
+    from config import CacheConfig, CircuitBreakerConfig, TimeConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import CacheConfig, CircuitBreakerConfig, TimeConfig
+
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+
+
+def _to_ms(timestamp: datetime) -> int:
+    return int(normalize_to_utc(timestamp).timestamp() * 1000)
+
+
+def _from_ms(timestamp_ms: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+@with_circuit_breaker(
+    "binance_klines_backfill_api",
+    failure_threshold=CircuitBreakerConfig.BINANCE_FAILURE_THRESHOLD,
+    recovery_timeout=CircuitBreakerConfig.BINANCE_RECOVERY_TIMEOUT,
+    success_threshold=2,
+)
+def fetch_klines_range(symbol: str, timeframe: str, start_ms: int, end_ms: int, limit: int = 1000) -> List[Dict]:
+    """
+    Fetch one page of candles opening in [start_ms, end_ms) from Binance
+
+    Returns:
+        Candles in the standard OHLCV dict format, oldest first (at most `limit`)
+    """
+    params = {
+        "symbol": symbol,
+        "interval": timeframe,
+        "startTime": start_ms,
+        "endTime": end_ms - 1,  # Binance endTime is inclusive
+        "limit": min(limit, 1000),
+    }
+
+    weight = klines_request_weight(params["limit"])
+    binance_weight_budget.acquire(weight)
+    request_started = time.perf_counter()
+    response = async_http.get(BINANCE_KLINES_URL, params=params, timeout=TimeConfig.PRICE_API_TIMEOUT)
+    sync_metrics.record_fetch(time.perf_counter() - request_started, len(response.content), weight)
+    binance_weight_budget.record_response(response)
+    response.raise_for_status()
+
+    return [
+        {
+            "timestamp": _from_ms(int(kline[0])),
+            "open": float(kline[1]),
+            "high": float(kline[2]),
+            "low": float(kline[3]),
+            "close": float(kline[4]),
+            "volume": float(kline[5]),
+        }
+        for kline in response.json()
+    ]
+
+
+def plan_backfill(symbol: str, timeframe: str, start: datetime, end: Optional[datetime] = None) -> KlinesBackfillCheckpoint:
+    """
+    Create (or reset) the checkpoint of a series with the ranges missing in [start, end)
+
+    Only gaps reported by KlinesCache.get_missing_ranges are planned, so candles
+    already cached are never fetched again.
+    """
+    missing = KlinesCache.get_missing_ranges(symbol, timeframe, start, end)
+
+    checkpoint = KlinesBackfillCheckpoint.get_for_series(symbol, timeframe)
+    if checkpoint is None:
+        checkpoint = KlinesBackfillCheckpoint(symbol=symbol, timeframe=timeframe)
+        db.session.add(checkpoint)
+
+    checkpoint.target_start = to_db_utc(start)
+    checkpoint.target_end = to_db_utc(end) if end else to_db_utc(get_utc_now())
+    checkpoint.set_pending_ranges([[_to_ms(range_start), _to_ms(range_end)] for range_start, range_end in missing])
+    checkpoint.status = "pending" if missing else "complete"
+    checkpoint.pages_fetched = 0
+    checkpoint.candles_saved = 0
+    checkpoint.last_error = None
+    db.session.commit()
+
+    missing_candles = sum(
+        int((range_end - range_start).total_seconds() // get_timeframe_seconds(timeframe))
+        for range_start, range_end in missing
+    )
+    logging.info(f"KLINES-BACKFILL: Planned {symbol} {timeframe}: {len(missing)} missing ranges, ~{missing_candles} candles")
+    return checkpoint
+
+
+def run_backfill(
+    checkpoint: KlinesBackfillCheckpoint,
+    stop_event: Optional[threading.Event] = None,
+    max_pages: Optional[int] = None,
+    on_page: Optional[Callable[[KlinesBackfillCheckpoint], None]] = None,
+) -> Dict:
+    """
+    Page through a checkpoint's pending ranges, saving progress after every page
+
+    Args:
+        checkpoint: Planned (or interrupted) series checkpoint
+        stop_event: Optional event that pauses the backfill between pages
+        max_pages: Optional page budget for this call (the rest resumes later)
+        on_page: Optional progress callback run after every saved page (e.g. a liveness heartbeat)
+
+    Returns:
+        Checkpoint summary (see KlinesBackfillCheckpoint.to_dict)
+    """
+    symbol, timeframe = checkpoint.symbol, checkpoint.timeframe
+    with sync_metrics.task(symbol, timeframe, path="backfill"):
+        return _run_backfill_pages(checkpoint, stop_event, max_pages, on_page)
+
+
+def _run_backfill_pages(
+    checkpoint: KlinesBackfillCheckpoint,
+    stop_event: Optional[threading.Event],
+    max_pages: Optional[int],
+    on_page: Optional[Callable[[KlinesBackfillCheckpoint], None]],
+) -> Dict:
+    symbol, timeframe = checkpoint.symbol, checkpoint.timeframe
+    period_ms = get_timeframe_seconds(timeframe) * 1000
+    page_limit = CacheConfig.KLINES_BACKFILL_PAGE_LIMIT
+    ranges = checkpoint.get_pending_ranges()
+    pages = 0
+
+    try:
+        while ranges:
+            if stop_event is not None and stop_event.is_set():
+                break
+            if max_pages is not None and pages >= max_pages:
+                break
+
+            range_start_ms, range_end_ms = ranges[0]
+            candles = fetch_klines_range(symbol, timeframe, range_start_ms, range_end_ms, page_limit)
+            pages += 1
+
+            if candles:
+                saved = KlinesCache.save_klines_batch(symbol=symbol, timeframe=timeframe, candlesticks=candles) or 0
+                sync_metrics.record_rows(saved)
+                checkpoint.candles_saved += saved
+                next_start_ms = _to_ms(candles[-1]["timestamp"]) + period_ms
+            else:
+                # Nothing traded in this range (e.g. before the symbol was listed)
+                next_start_ms = range_end_ms
+
+            if next_start_ms >= range_end_ms:
+                ranges.pop(0)
+            else:
+                ranges[0] = [next_start_ms, range_end_ms]
+
+            checkpoint.pages_fetched += 1
+            checkpoint.set_pending_ranges(ranges)
+            checkpoint.status = "pending" if ranges else "complete"
+            checkpoint.last_error = None
+            db.session.commit()
+            if on_page is not None:
+                on_page(checkpoint)
+
+    except Exception as e:
+        sync_metrics.record_error(e)
+        db.session.rollback()
+        checkpoint.status = "failed"
+        checkpoint.last_error = str(e)[:500]
+        db.session.commit()
+        logging.warning(f"KLINES-BACKFILL: {symbol} {timeframe} interrupted after {pages} pages, will resume: {e}")
+
+    if checkpoint.status == "complete":
+        logging.info(f"KLINES-BACKFILL: Completed {symbol} {timeframe} ({checkpoint.candles_saved} candles, {checkpoint.pages_fetched} pages)")
+    return checkpoint.to_dict()
+
+
+def backfill_series(
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    stop_event: Optional[threading.Event] = None,
+    max_pages: Optional[int] = None,
+    on_page: Optional[Callable[[KlinesBackfillCheckpoint], None]] = None,
+) -> Dict:
+    """
+    Backfill [start, end) of a series, resuming an unfinished checkpoint for the same window
+
+    A checkpoint for a different window (or a completed one) is re-planned from the
+    current gap state.
+    """
+    checkpoint = KlinesBackfillCheckpoint.get_for_series(symbol, timeframe)
+    same_window = (
+        checkpoint is not None
+        and checkpoint.status in KlinesBackfillCheckpoint.RESUMABLE_STATUSES
+        and checkpoint.target_start == to_db_utc(start)
+        and (end is None or checkpoint.target_end == to_db_utc(end))
+    )
+    if not same_window:
+        checkpoint = plan_backfill(symbol, timeframe, start, end)
+    else:
+        logging.info(f"KLINES-BACKFILL: Resuming {symbol} {timeframe} from checkpoint ({checkpoint.pages_fetched} pages done)")
+
+    return run_backfill(checkpoint, stop_event=stop_event, max_pages=max_pages, on_page=on_page)
+
+
+def backfill_candles(symbol: str, timeframe: str, candles: int, **kwargs) -> Dict:
+    """Backfill the most recent `candles` complete candles of a series (may exceed 1000)"""
+    period = timedelta(seconds=get_timeframe_seconds(timeframe))
+    start = to_db_utc(floor_to_period(get_utc_now(), timeframe)) - period * candles
+    return backfill_series(symbol, timeframe, start, **kwargs)
+
+
+def resume_pending_backfills(
+    stop_event: Optional[threading.Event] = None,
+    max_pages: Optional[int] = None,
+    on_page: Optional[Callable[[KlinesBackfillCheckpoint], None]] = None,
+) -> List[Dict]:
+    """Resume every pending or failed checkpoint (e.g. after a restart)"""
+    results = []
+    for checkpoint in KlinesBackfillCheckpoint.get_resumable():
+        if stop_event is not None and stop_event.is_set():
+            break
+        logging.info(f"KLINES-BACKFILL: Resuming {checkpoint.symbol} {checkpoint.timeframe} after restart")
+        results.append(run_backfill(checkpoint, stop_event=stop_event, max_pages=max_pages, on_page=on_page))
+    return results
+
+
+def get_backfill_status() -> List[Dict]:
+    """Summaries of all backfill checkpoints"""
+    return [
+        checkpoint.to_dict()
+        for checkpoint in KlinesBackfillCheckpoint.query.order_by(
+            KlinesBackfillCheckpoint.symbol, KlinesBackfillCheckpoint.timeframe
+        )
+    ]
@@ -0,0 +1,547 @@
+"""
+Klines Partitioning - optional PostgreSQL declarative partitioning for klines_cache
+
+klines_cache is list-partitioned by timeframe, and each timeframe is range-partitioned
+by candle month (klines_cache_1h_202610, ...). Retention then detaches and drops whole
+monthly partitions instead of deleting rows, which keeps the table and its indexes
+free of churn bloat; the rolling-window row deletes are skipped on this layout. Only
+the default partitions (rows outside every monthly range) are pruned by row.
+SQLite and non-partitioned PostgreSQL keep the plain table.
+
+Enable with KLINES_PARTITIONING=1 for fresh databases, or convert an existing table
+with scripts/klines_partitioning.py.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .models import TIMEFRAME_SECONDS, db, get_timeframe_seconds, get_utc_now
+
+# Import configuration constants
+try:
+    from config import CacheConfig, DatabaseConfig, RollingWindowConfig
+except ImportError:
+    import os
+    import sys
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import CacheConfig, DatabaseConfig, RollingWindowConfig
+
+TABLE_NAME = "klines_cache"
+LEGACY_TABLE_NAME = "klines_cache_legacy"
+DEFAULT_SEQUENCE_NAME = "klines_cache_id_seq"
+
+# Column list shared by the migration copy and default-partition rescue
+KLINES_COLUMNS = "id, symbol, timeframe, timestamp, open, high, low, close, volume, created_at, expires_at, is_complete"
+
+_MONTH_PARTITION_RE = re.compile(r"^klines_cache_(?P<timeframe>\w+?)_(?P<month>\d{6})$")
+
+# Cached partitioning state (None = not checked yet)
+_partitioned_state: Optional[bool] = None
+
+
+def is_postgresql() -> bool:
+    """Check if the bound database is PostgreSQL"""
+    return db.engine.dialect.name == "postgresql"
+
+
+def is_klines_partitioned(refresh: bool = False) -> bool:
+    """Check if klines_cache is a partitioned table (cached after the first check)"""
+    global _partitioned_state
+
+    if _partitioned_state is not None and not refresh:
+        return _partitioned_state
+
+    if not is_postgresql():
+        _partitioned_state = False
+        return False
+
+    try:
+        result = db.session.execute(
+            text(
+                """
+            SELECT 1 FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = :table_name AND pg_table_is_visible(c.oid)
+        """
+            ),
+            {"table_name": TABLE_NAME},
+        )
+        _partitioned_state = result.scalar() is not None
+    except Exception as e:
+        logging.warning(f"KLINES-PARTITION: Could not check partitioning state: {e}")
+        db.session.rollback()
+        return False
+
+    return _partitioned_state
+
+
+def _table_exists(table_name: str) -> bool:
+    result = db.session.execute(text("SELECT to_regclass(:table_name)"), {"table_name": table_name})
+    return result.scalar() is not None
+
+
+def _month_start(moment: datetime) -> datetime:
+    """First instant of the month as a naive UTC datetime (DB storage format)"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month_start: datetime) -> datetime:
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def _timeframe_partition_name(timeframe: str) -> str:
+    return f"{TABLE_NAME}_{timeframe}"
+
+
+def _month_partition_name(timeframe: str, month_start: datetime) -> str:
+    return f"{TABLE_NAME}_{timeframe}_{month_start:%Y%m}"
+
+
+def get_retention_days(timeframe: str) -> int:
+    """
+    Days of candles a timeframe needs to keep. Covers the rolling window cleanup
+    threshold so partition drops never remove candles the window still wants.
+    """
+    window_seconds = RollingWindowConfig.get_cleanup_threshold(timeframe) * get_timeframe_seconds(timeframe)
+    window_days = int(window_seconds // 86400) + 1
+    return max(CacheConfig.KLINES_DATA_RETENTION_DAYS, window_days)
+
+
+def create_partitioned_table(sequence_name: str = DEFAULT_SEQUENCE_NAME) -> None:
+    """
+    Create klines_cache as a partitioned parent table (caller commits).
+
+    The primary key includes the partition keys as PostgreSQL requires; the
+    symbol/timeframe/timestamp unique constraint keeps ON CONFLICT upserts working.
+    """
+    db.session.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {sequence_name}"))
+    db.session.execute(
+        text(
+            f"""
+        CREATE TABLE {TABLE_NAME} (
+            id INTEGER NOT NULL DEFAULT nextval('{sequence_name}'),
+            symbol VARCHAR(20) NOT NULL,
+            timeframe VARCHAR(10) NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            open FLOAT NOT NULL,
+            high FLOAT NOT NULL,
+            low FLOAT NOT NULL,
+            close FLOAT NOT NULL,
+            volume FLOAT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            is_complete BOOLEAN DEFAULT TRUE,
+            CONSTRAINT {TABLE_NAME}_pkey PRIMARY KEY (id, timeframe, timestamp),
+            CONSTRAINT uq_klines_symbol_tf_timestamp UNIQUE (symbol, timeframe, timestamp)
+        ) PARTITION BY LIST (timeframe)
+    """
+        )
+    )
+    db.session.execute(text(f"ALTER SEQUENCE {sequence_name} OWNED BY {TABLE_NAME}.id"))
+
+    # Same index names as the plain table so startup migrations see them as present
+    db.session.execute(
+        text(f"CREATE INDEX idx_klines_symbol_timeframe_timestamp ON {TABLE_NAME}(symbol, timeframe, timestamp)")
+    )
+    db.session.execute(text(f"CREATE INDEX idx_klines_expires ON {TABLE_NAME}(expires_at)"))
+    db.session.execute(
+        text(f"CREATE INDEX idx_klines_symbol_timeframe_expires ON {TABLE_NAME}(symbol, timeframe, expires_at)")
+    )
+
+    # Catch-all for timeframes without their own partition
+    db.session.execute(text(f"CREATE TABLE {TABLE_NAME}_default PARTITION OF {TABLE_NAME} DEFAULT"))
+
+    global _partitioned_state
+    _partitioned_state = True
+    logging.info(f"KLINES-PARTITION: Created partitioned {TABLE_NAME} table")
+
+
+def _ensure_timeframe_partition(timeframe: str) -> bool:
+    """Create the per-timeframe range-partitioned child and its default partition"""
+    parent = _timeframe_partition_name(timeframe)
+    if _table_exists(parent):
+        return False
+
+    db.session.execute(
+        text(
+            f"CREATE TABLE {parent} PARTITION OF {TABLE_NAME} "
+            f"FOR VALUES IN ('{timeframe}') PARTITION BY RANGE (\"timestamp\")"
+        )
+    )
+    db.session.execute(text(f"CREATE TABLE {parent}_default PARTITION OF {parent} DEFAULT"))
+    return True
+
+
+def _ensure_month_partition(timeframe: str, month_start: datetime) -> bool:
+    """Create one monthly partition, moving any matching rows out of the default partition"""
+    parent = _timeframe_partition_name(timeframe)
+    name = _month_partition_name(timeframe, month_start)
+    if _table_exists(name):
+        return False
+
+    month_end = _next_month(month_start)
+    bounds = {"start": month_start, "end": month_end}
+    default_partition = f"{parent}_default"
+
+    # PostgreSQL refuses a new range if the default partition already holds rows for it
+    stranded = db.session.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {default_partition} "
+            f"WHERE timestamp >= :start AND timestamp < :end)"
+        ),
+        bounds,
+    ).scalar()
+
+    if stranded:
+        db.session.execute(
+            text(
+                f"CREATE TEMP TABLE klines_partition_move ON COMMIT DROP AS "
+                f"SELECT {KLINES_COLUMNS} FROM {default_partition} "
+                f"WHERE timestamp >= :start AND timestamp < :end"
+            ),
+            bounds,
+        )
+        db.session.execute(
+            text(f"DELETE FROM {default_partition} WHERE timestamp >= :start AND timestamp < :end"),
+            bounds,
+        )
+
+    db.session.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{month_end:%Y-%m-%d}')"
+        )
+    )
+
+    if stranded:
+        db.session.execute(
+            text(f"INSERT INTO {TABLE_NAME} ({KLINES_COLUMNS}) SELECT {KLINES_COLUMNS} FROM klines_partition_move")
+        )
+        db.session.execute(text("DROP TABLE klines_partition_move"))
+        logging.info(f"KLINES-PARTITION: Moved default-partition rows into {name}")
+
+    return True
+
+
+def ensure_klines_partitions(months_ahead: Optional[int] = None, since: Optional[datetime] = None) -> List[str]:
+    """
+    Make sure timeframe and monthly partitions exist from `since` (default: start
+    of the retention window) through `months_ahead` months past the current one.
+
+    Returns:
+        List of partition names that were created
+    """
+    if not is_klines_partitioned():
+        return []
+
+    if months_ahead is None:
+        months_ahead = DatabaseConfig.KLINES_PARTITION_MONTHS_AHEAD
+
+    created = []
+    now = get_utc_now()
+
+    try:
+        for timeframe in TIMEFRAME_SECONDS:
+            if _ensure_timeframe_partition(timeframe):
+                created.append(_timeframe_partition_name(timeframe))
+
+            start = since or (now - timedelta(days=get_retention_days(timeframe)))
+            month = _month_start(start)
+            last_month = _month_start(now)
+            for _ in range(months_ahead):
+                last_month = _next_month(last_month)
+
+            while month <= last_month:
+                if _ensure_month_partition(timeframe, month):
+                    created.append(_month_partition_name(timeframe, month))
+                month = _next_month(month)
+
+        db.session.commit()
+    except Exception as e:
+        logging.error(f"KLINES-PARTITION: Error ensuring partitions: {e}")
+        db.session.rollback()
+        return []
+
+    if created:
+        logging.info(f"KLINES-PARTITION: Created {len(created)} partitions: {', '.join(created)}")
+    return created
+
+
+def list_month_partitions() -> List[Tuple[str, str, datetime]]:
+    """List monthly partitions as (name, timeframe, month_start) sorted by timeframe and month"""
+    result = db.session.execute(
+        text(
+            """
+        SELECT child.relname FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname LIKE :pattern
+    """
+        ),
+        {"pattern": f"{TABLE_NAME}_%"},
+    )
+
+    partitions = []
+    for (name,) in result:
+        match = _MONTH_PARTITION_RE.match(name)
+        if match:
+            month_start = datetime.strptime(match.group("month"), "%Y%m")
+            partitions.append((name, match.group("timeframe"), month_start))
+
+    return sorted(partitions, key=lambda p: (p[1], p[2]))
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo is not None else moment
+
+
+def prune_default_partitions(now: Optional[datetime] = None) -> int:
+    """
+    Delete expired rows from the default partitions
+
+    Candles outside every monthly range (e.g. a deep backfill older than the retention
+    window) land in klines_cache_<tf>_default, and timeframes without their own partition
+    in klines_cache_default. No partition drop ever covers them, so they are deleted by
+    row against the same cutoffs; the defaults only hold such strays, so this stays small.
+
+    Returns:
+        Number of rows deleted
+    """
+    now = now or get_utc_now()
+    pruned = 0
+    targets = [
+        (f"{_timeframe_partition_name(timeframe)}_default", get_retention_days(timeframe))
+        for timeframe in TIMEFRAME_SECONDS
+    ]
+    # Unknown timeframes: the longest retention any known timeframe uses
+    targets.append((f"{TABLE_NAME}_default", max(get_retention_days(timeframe) for timeframe in TIMEFRAME_SECONDS)))
+
+    for partition, retention_days in targets:
+        if not _table_exists(partition):
+            continue
+        cutoff = _naive_utc(now - timedelta(days=retention_days))
+        deleted = db.session.execute(
+            text(f"DELETE FROM {partition} WHERE timestamp < :cutoff"), {"cutoff": cutoff}
+        ).rowcount
+        db.session.commit()
+        if deleted:
+            pruned += deleted
+            logging.info(f"KLINES-PARTITION: Pruned {deleted} expired rows from {partition}")
+    return pruned
+
+
+def drop_expired_partitions(now: Optional[datetime] = None) -> Dict:
+    """
+    Retention by partition: detach and drop monthly partitions whose whole month
+    lies before the timeframe's retention cutoff, then prune expired rows from the
+    default partitions (see prune_default_partitions).
+
+    Returns:
+        Dict with dropped partition names, the number of rows they held and the
+        rows pruned from default partitions
+    """
+    results = {"dropped": [], "rows_dropped": 0, "default_rows_pruned": 0}
+    if not is_klines_partitioned():
+        return results
+
+    now = now or get_utc_now()
+
+    try:
+        for name, timeframe, month_start in list_month_partitions():
+            cutoff = now - timedelta(days=get_retention_days(timeframe))
+            if _next_month(month_start) > _naive_utc(cutoff):
+                continue
+
+            row_count = db.session.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar() or 0
+            db.session.execute(text(f"ALTER TABLE {_timeframe_partition_name(timeframe)} DETACH PARTITION {name}"))
+            db.session.execute(text(f"DROP TABLE {name}"))
+            db.session.commit()
+
+            results["dropped"].append(name)
+            results["rows_dropped"] += row_count
+            logging.info(f"KLINES-PARTITION: Dropped expired partition {name} ({row_count} rows)")
+
+        results["default_rows_pruned"] = prune_default_partitions(now)
+    except Exception as e:
+        logging.error(f"KLINES-PARTITION: Error dropping expired partitions: {e}")
+        db.session.rollback()
+
+    return results
+
+
+def prepare_klines_table() -> bool:
+    """
+    Startup hook (before db.create_all): create klines_cache partitioned when
+    partitioning is enabled on PostgreSQL and the table does not exist yet.
+
+    Returns:
+        True if the partitioned table was created
+    """
+    if not DatabaseConfig.KLINES_PARTITIONING_ENABLED or not is_postgresql():
+        return False
+
+    try:
+        if _table_exists(TABLE_NAME):
+            if not is_klines_partitioned(refresh=True):
+                logging.warning(
+                    "KLINES-PARTITION: Partitioning enabled but klines_cache is a plain table - "
+                    "run scripts/klines_partitioning.py migrate to convert it"
+                )
+            return False
+
+        create_partitioned_table()
+        db.session.commit()
+    except Exception as e:
+        logging.error(f"KLINES-PARTITION: Could not create partitioned klines table: {e}")
+        db.session.rollback()
+        return False
+
+    ensure_klines_partitions()
+    return True
+
+
+def _rename_to_legacy() -> str:
+    """Move klines_cache (and its index names) aside as klines_cache_legacy; returns the id sequence name"""
+    db.session.execute(text(f"LOCK TABLE {TABLE_NAME} IN ACCESS EXCLUSIVE MODE"))
+
+    sequence_name = db.session.execute(
+        text("SELECT pg_get_serial_sequence(:table_name, 'id')"), {"table_name": TABLE_NAME}
+    ).scalar() or DEFAULT_SEQUENCE_NAME
+
+    db.session.execute(text(f"ALTER TABLE {TABLE_NAME} RENAME TO {LEGACY_TABLE_NAME}"))
+
+    # Index names are schema-wide, so free them up for the new table
+    index_names = db.session.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table_name"),
+        {"table_name": LEGACY_TABLE_NAME},
+    ).scalars().all()
+    for index_name in index_names:
+        db.session.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{index_name[:55]}_legacy"'))
+    return sequence_name
+
+
+def _create_migration_partitions() -> List[str]:
+    """Partitions for every month present in the legacy data, not just the retention window"""
+    oldest = db.session.execute(text(f"SELECT MIN(timestamp) FROM {LEGACY_TABLE_NAME}")).scalar()
+    created = []
+    for timeframe in TIMEFRAME_SECONDS:
+        if _ensure_timeframe_partition(timeframe):
+            created.append(_timeframe_partition_name(timeframe))
+    if not oldest:
+        return created
+
+    month = _month_start(oldest)
+    last_month = _month_start(get_utc_now())
+    for _ in range(DatabaseConfig.KLINES_PARTITION_MONTHS_AHEAD):
+        last_month = _next_month(last_month)
+    while month <= last_month:
+        for timeframe in TIMEFRAME_SECONDS:
+            if _ensure_month_partition(timeframe, month):
+                created.append(_month_partition_name(timeframe, month))
+        month = _next_month(month)
+    return created
+
+
+def _copy_legacy_rows(sequence_name: str) -> int:
+    """Copy legacy rows with their ids and hand the id sequence to the new table"""
+    copy_result = db.session.execute(
+        text(
+            f"INSERT INTO {TABLE_NAME} ({KLINES_COLUMNS}) "
+            f"SELECT {KLINES_COLUMNS} FROM {LEGACY_TABLE_NAME} "
+            f"ON CONFLICT (symbol, timeframe, timestamp) DO NOTHING"
+        )
+    )
+    db.session.execute(
+        text(f"SELECT setval('{sequence_name}', COALESCE((SELECT MAX(id) FROM {TABLE_NAME}), 0) + 1, false)")
+    )
+    return copy_result.rowcount
+
+
+def migrate_to_partitioned(drop_legacy: bool = False) -> Dict:
+    """
+    Convert an existing plain klines_cache into the partitioned layout in one transaction.
+
+    The old table is renamed to klines_cache_legacy (its indexes get a _legacy suffix),
+    rows are copied with their ids, and the id sequence is handed to the new table.
+
+    Returns:
+        Dict with success flag, rows_copied and created partitions (or error)
+    """
+    if not is_postgresql():
+        return {"success": False, "error": "Partitioning requires PostgreSQL"}
+
+    if is_klines_partitioned(refresh=True):
+        return {"success": True, "already_partitioned": True, "rows_copied": 0, "partitions_created": []}
+
+    if _table_exists(LEGACY_TABLE_NAME):
+        return {"success": False, "error": f"{LEGACY_TABLE_NAME} already exists - drop it before migrating again"}
+
+    try:
+        sequence_name = _rename_to_legacy()
+        create_partitioned_table(sequence_name=sequence_name)
+        created = _create_migration_partitions()
+        rows_copied = _copy_legacy_rows(sequence_name)
+
+        if drop_legacy:
+            db.session.execute(text(f"DROP TABLE {LEGACY_TABLE_NAME}"))
+
+        db.session.commit()
+    except Exception as e:
+        logging.error(f"KLINES-PARTITION: Migration failed, rolled back: {e}")
+        db.session.rollback()
+        is_klines_partitioned(refresh=True)
+        return {"success": False, "error": str(e)}
+
+    ensure_klines_partitions()
+    logging.info(f"KLINES-PARTITION: Migrated {rows_copied} rows into partitioned {TABLE_NAME}")
+    return {"success": True, "rows_copied": rows_copied, "partitions_created": created, "legacy_dropped": drop_legacy}
+
+
+def drop_legacy_table() -> bool:
+    """Drop the klines_cache_legacy backup left by migrate_to_partitioned"""
+    if not is_postgresql() or not _table_exists(LEGACY_TABLE_NAME):
+        return False
+
+    db.session.execute(text(f"DROP TABLE {LEGACY_TABLE_NAME}"))
+    db.session.commit()
+    return True
+
+
+def get_partitioning_status() -> Dict:
+    """Describe the klines_cache storage layout and partition row counts"""
+    status = {
+        "dialect": db.engine.dialect.name,
+        "enabled": DatabaseConfig.KLINES_PARTITIONING_ENABLED,
+        "partitioned": is_klines_partitioned(refresh=True),
+        "partitions": [],
+        "legacy_table_exists": False,
+    }
+
+    if not is_postgresql():
+        return status
+
+    status["legacy_table_exists"] = _table_exists(LEGACY_TABLE_NAME)
+
+    if status["partitioned"]:
+        for name, timeframe, month_start in list_month_partitions():
+            row_count = db.session.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar() or 0
+            status["partitions"].append(
+                {
+                    "name": name,
+                    "timeframe": timeframe,
+                    "month": month_start.strftime("%Y-%m"),
+                    "rows": row_count,
+                    "retention_days": get_retention_days(timeframe),
+                }
+            )
+
+    return status
@@ -0,0 +1,264 @@
+"""
+Klines Snapshot - compact columnar export/import of the klines store for fast cold start
+
+File layout (little-endian):
+    8 bytes   magic b"KLSNAP01"
+    4 bytes   uint32 header length
+    N bytes   JSON header: version, exported_at and the series list
+              (symbol, timeframe, rows, first_timestamp, last_timestamp in epoch ms)
+    rest      zlib-compressed column blocks, one block per series in header order:
+              timestamp int64 epoch ms, open/high/low/close/volume float64,
+              expires_at int64 epoch ms (version 2+; version 1 files re-derive the TTL on import)
+
+Only complete candles are exported - the open candle is partial and is fetched
+fresh by the sync service, which resumes from each series' last snapshot timestamp.
+"""
+
+import json
+import logging
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models import KlinesCache, db, get_utc_now, normalize_to_utc, to_db_utc
+
+# Import configuration constants
+try:
+    from config import CacheConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import CacheConfig
+
+SNAPSHOT_MAGIC = b"KLSNAP01"
+SNAPSHOT_VERSION = 2
+SUPPORTED_SNAPSHOT_VERSIONS = (1, 2)
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _column_bytes(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _column_from_bytes(typecode: str, data: bytes) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def _to_epoch_ms(timestamp: datetime) -> int:
+    return int(normalize_to_utc(timestamp).timestamp() * 1000)
+
+
+def export_snapshot(
+    path: str, symbols: Optional[List[str]] = None, timeframes: Optional[List[str]] = None
+) -> Dict:
+    """
+    Write all complete, unexpired cached candles to a snapshot file (requires app context)
+
+    Returns:
+        Dict with series count, total rows, file size and elapsed time
+    """
+    start_time = time.time()
+
+    query = db.session.query(
+        KlinesCache.symbol,
+        KlinesCache.timeframe,
+        KlinesCache.timestamp,
+        KlinesCache.open,
+        KlinesCache.high,
+        KlinesCache.low,
+        KlinesCache.close,
+        KlinesCache.volume,
+        KlinesCache.expires_at,
+    ).filter(
+        KlinesCache.is_complete.is_(True),
+        KlinesCache.expires_at > to_db_utc(get_utc_now()),
+    )
+    if symbols:
+        query = query.filter(KlinesCache.symbol.in_(symbols))
+    if timeframes:
+        query = query.filter(KlinesCache.timeframe.in_(timeframes))
+
+    # Group rows into per-series columns
+    series_columns: Dict[Tuple[str, str], Dict[str, list]] = {}
+    for symbol, timeframe, timestamp, *prices, expires_at in query.order_by(
+        KlinesCache.symbol, KlinesCache.timeframe, KlinesCache.timestamp
+    ):
+        columns = series_columns.get((symbol, timeframe))
+        if columns is None:
+            columns = {"timestamp": [], **{name: [] for name in PRICE_COLUMNS}, "expires_at": []}
+            series_columns[(symbol, timeframe)] = columns
+        columns["timestamp"].append(_to_epoch_ms(timestamp))
+        columns["expires_at"].append(_to_epoch_ms(expires_at))
+        for name, value in zip(PRICE_COLUMNS, prices):
+            columns[name].append(value)
+
+    series_meta = []
+    body = bytearray()
+    for (symbol, timeframe), columns in series_columns.items():
+        series_meta.append(
+            {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "rows": len(columns["timestamp"]),
+                "first_timestamp": columns["timestamp"][0],
+                "last_timestamp": columns["timestamp"][-1],
+            }
+        )
+        body += _column_bytes("q", columns["timestamp"])
+        for name in PRICE_COLUMNS:
+            body += _column_bytes("d", columns[name])
+        body += _column_bytes("q", columns["expires_at"])
+
+    header = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "exported_at": get_utc_now().isoformat(),
+            "series": series_meta,
+        }
+    ).encode("utf-8")
+
+    # Write to a temp file and rename so a crash never leaves a truncated snapshot
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC)
+        snapshot_file.write(struct.pack("<I", len(header)))
+        snapshot_file.write(header)
+        snapshot_file.write(zlib.compress(bytes(body), 6))
+    os.replace(temp_path, path)
+
+    total_rows = sum(meta["rows"] for meta in series_meta)
+    result = {
+        "path": path,
+        "series": len(series_meta),
+        "rows": total_rows,
+        "file_bytes": os.path.getsize(path),
+        "elapsed_seconds": round(time.time() - start_time, 3),
+    }
+    logging.info(f"KLINES-SNAPSHOT: Exported {total_rows} candles across {len(series_meta)} series to {path}")
+    return result
+
+
+def read_snapshot_header(path: str) -> Dict:
+    """Read only the JSON header of a snapshot file"""
+    with open(path, "rb") as snapshot_file:
+        header, _ = _read_header(snapshot_file)
+    return header
+
+
+def _read_header(snapshot_file) -> Tuple[Dict, int]:
+    magic = snapshot_file.read(len(SNAPSHOT_MAGIC))
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a klines snapshot file")
+
+    (header_length,) = struct.unpack("<I", snapshot_file.read(4))
+    header = json.loads(snapshot_file.read(header_length).decode("utf-8"))
+    if header.get("version") not in SUPPORTED_SNAPSHOT_VERSIONS:
+        raise ValueError(f"Unsupported klines snapshot version: {header.get('version')}")
+    return header, len(SNAPSHOT_MAGIC) + 4 + header_length
+
+
+def read_snapshot(path: str) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    Decode a snapshot file
+
+    Yields:
+        (series metadata, candles) with candles in the same dict format as the Binance fetchers,
+        plus the stored expires_at when the file carries it
+    """
+    with open(path, "rb") as snapshot_file:
+        header, _ = _read_header(snapshot_file)
+        body = zlib.decompress(snapshot_file.read())
+
+    offset = 0
+    for meta in header["series"]:
+        rows = meta["rows"]
+        block_size = rows * 8
+
+        timestamps = _column_from_bytes("q", body[offset : offset + block_size])
+        offset += block_size
+        prices = {}
+        for name in PRICE_COLUMNS:
+            prices[name] = _column_from_bytes("d", body[offset : offset + block_size])
+            offset += block_size
+        expiries = None
+        if header["version"] >= 2:
+            expiries = _column_from_bytes("q", body[offset : offset + block_size])
+            offset += block_size
+
+        candles = [
+            {
+                "timestamp": datetime.fromtimestamp(timestamps[i] / 1000, tz=timezone.utc),
+                "open": prices["open"][i],
+                "high": prices["high"][i],
+                "low": prices["low"][i],
+                "close": prices["close"][i],
+                "volume": prices["volume"][i],
+            }
+            for i in range(rows)
+        ]
+        if expiries is not None:
+            for candle, expires_ms in zip(candles, expiries):
+                candle["expires_at"] = datetime.fromtimestamp(expires_ms / 1000, tz=timezone.utc)
+        yield meta, candles
+
+
+def import_snapshot(path: str, skip_fresher: bool = True) -> Dict:
+    """
+    Load a snapshot into klines_cache (requires app context)
+
+    Args:
+        path: Snapshot file path
+        skip_fresher: Skip series whose cached data already reaches the snapshot's last candle
+
+    Returns:
+        Dict with imported/skipped series counts, rows and elapsed time
+    """
+    start_time = time.time()
+    header = read_snapshot_header(path)
+
+    freshness = KlinesCache.get_series_freshness(
+        [(meta["symbol"], meta["timeframe"]) for meta in header["series"]]
+    )
+
+    batch_size = CacheConfig.KLINES_SNAPSHOT_IMPORT_BATCH_SIZE
+    result = {"path": path, "series_imported": 0, "series_skipped": 0, "rows": 0, "resume_from": {}}
+
+    for meta, candles in read_snapshot(path):
+        series_key = (meta["symbol"], meta["timeframe"])
+        latest_complete = freshness.get(series_key, {}).get("latest_complete")
+
+        if skip_fresher and latest_complete and _to_epoch_ms(latest_complete) >= meta["last_timestamp"]:
+            result["series_skipped"] += 1
+            continue
+
+        for batch_start in range(0, len(candles), batch_size):
+            result["rows"] += KlinesCache.save_klines_batch(
+                symbol=meta["symbol"],
+                timeframe=meta["timeframe"],
+                candlesticks=candles[batch_start : batch_start + batch_size],
+            ) or 0
+
+        result["series_imported"] += 1
+        result["resume_from"][f"{meta['symbol']}_{meta['timeframe']}"] = datetime.fromtimestamp(
+            meta["last_timestamp"] / 1000, tz=timezone.utc
+        ).isoformat()
+
+    result["elapsed_seconds"] = round(time.time() - start_time, 3)
+    logging.info(
+        f"KLINES-SNAPSHOT: Imported {result['rows']} candles for {result['series_imported']} series "
+        f"({result['series_skipped']} already fresher) in {result['elapsed_seconds']}s"
+    )
+    return result
@@ -0,0 +1,304 @@
+"""
+Klines Stream - WebSocket kline ingestion for the tracked symbol/timeframe series
+
+Subscribes to the Binance combined kline stream (<symbol>@kline_<interval>) on a
+background asyncio thread:
+- open-candle updates are written in place through KlinesCache.update_open_candle
+  (coalesced by the open-candle write-behind buffer)
+- closed candles (k.x == true) are saved as complete and announced to candle-close
+  listeners registered with add_candle_close_listener()
+- dropped connections are re-established with exponential backoff and jitter
+
+REST polling in the unified data sync service stays in place as the fallback and gap
+filler: series whose stream has gone quiet (see is_series_live) are polled as before.
+For offline testing point KLINES_STREAM_URL at scripts/fake_kline_stream.py.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+# Import configuration constants
+try:
+    from config import CacheConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import CacheConfig
+
+# Open-candle TTLs, matching the REST open-candle updates
+OPEN_CANDLE_TTL_MINUTES = {"15m": 3, "1h": 2, "4h": 5, "1d": 15}
+
+CandleCloseListener = Callable[[str, str, Dict], None]
+
+
+def build_stream_url(base_url: str, symbols: List[str], timeframes: List[str]) -> str:
+    """Combined-stream URL subscribing to every symbol/timeframe kline stream"""
+    streams = "/".join(f"{symbol.lower()}@kline_{timeframe}" for symbol in symbols for timeframe in timeframes)
+    return f"{base_url.rstrip('/')}/stream?streams={streams}"
+
+
+def parse_kline_event(payload: Dict) -> Optional[Tuple[str, str, Dict, bool, int]]:
+    """
+    Extract (symbol, timeframe, candle, is_closed, close_time_ms) from a kline event
+
+    Accepts both combined-stream ({"stream", "data"}) and raw-stream payloads.
+    """
+    data = payload.get("data", payload)
+    if data.get("e") != "kline":
+        return None
+
+    kline = data["k"]
+    candle = {
+        "timestamp": datetime.fromtimestamp(int(kline["t"]) / 1000, tz=timezone.utc),
+        "open": float(kline["o"]),
+        "high": float(kline["h"]),
+        "low": float(kline["l"]),
+        "close": float(kline["c"]),
+        "volume": float(kline["v"]),
+    }
+    return kline["s"], kline["i"], candle, bool(kline["x"]), int(kline["T"])
+
+
+class KlinesStreamService:
+    """
+    Background WebSocket consumer keeping open candles current between REST sync cycles
+    """
+
+    def __init__(self):
+        self.app = None
+        self.symbols: List[str] = []
+        self.timeframes: List[str] = []
+        self.is_running = False
+        self.connected = False
+
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._lock = threading.RLock()
+        self._listeners: List[CandleCloseListener] = []
+        self._last_message_at: Dict[Tuple[str, str], float] = {}
+
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "messages": 0,
+            "open_candle_updates": 0,
+            "candle_closes": 0,
+            "errors": 0,
+            "last_error": None,
+            "connected_since": None,
+        }
+
+    def add_candle_close_listener(self, listener: CandleCloseListener) -> None:
+        """Register a callback(symbol, timeframe, candle) run after each closed candle is saved"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_candle_close_listener(self, listener: CandleCloseListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def is_series_live(self, symbol: str, timeframe: str) -> bool:
+        """True if the stream delivered this series recently enough to skip REST polling"""
+        if not self.connected:
+            return False
+        last_message = self._last_message_at.get((symbol, timeframe))
+        return last_message is not None and time.time() - last_message < CacheConfig.KLINES_STREAM_STALE_SECONDS
+
+    def start(self, app, symbols: List[str], timeframes: List[str]) -> None:
+        """Start the stream consumer thread for the given series"""
+        with self._lock:
+            if self.is_running:
+                return
+
+            self.app = app
+            self.symbols = list(symbols)
+            self.timeframes = list(timeframes)
+            self.is_running = True
+
+            self._thread = threading.Thread(target=self._thread_main, name="KlinesStream", daemon=True)
+            self._thread.start()
+            logging.info(
+                f"KLINES-STREAM: Started for {len(self.symbols)} symbols x {len(self.timeframes)} timeframes "
+                f"({CacheConfig.KLINES_STREAM_URL})"
+            )
+
+    def stop(self) -> None:
+        """Stop the consumer and close the WebSocket"""
+        with self._lock:
+            if not self.is_running:
+                return
+            self.is_running = False
+
+            if self._loop and self._stop_event:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        logging.info("KLINES-STREAM: Stopped")
+
+    def _thread_main(self) -> None:
+        try:
+            asyncio.run(self._run())
+        except Exception as e:
+            logging.error(f"KLINES-STREAM: Consumer thread crashed: {e}")
+        finally:
+            self.connected = False
+            with self._lock:
+                self.is_running = False
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if not self.is_running:
+            return
+
+        url = build_stream_url(CacheConfig.KLINES_STREAM_URL, self.symbols, self.timeframes)
+        delay = CacheConfig.KLINES_STREAM_RECONNECT_MIN_DELAY
+
+        async with aiohttp.ClientSession() as session:
+            while not self._stop_event.is_set():
+                try:
+                    async with session.ws_connect(url, heartbeat=CacheConfig.KLINES_STREAM_HEARTBEAT) as ws:
+                        self.connected = True
+                        self.stats["connects"] += 1
+                        self.stats["connected_since"] = datetime.now(timezone.utc).isoformat()
+                        delay = CacheConfig.KLINES_STREAM_RECONNECT_MIN_DELAY
+                        logging.info("KLINES-STREAM: Connected")
+
+                        await self._consume(ws)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    self.stats["last_error"] = str(e)
+                    logging.warning(f"KLINES-STREAM: Connection error: {e}")
+                finally:
+                    self.connected = False
+
+                if self._stop_event.is_set():
+                    break
+
+                # Exponential backoff with jitter; REST polling covers the series meanwhile
+                wait = delay * random.uniform(0.5, 1.0)
+                self.stats["reconnects"] += 1
+                logging.info(f"KLINES-STREAM: Disconnected, reconnecting in {wait:.1f}s")
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, CacheConfig.KLINES_STREAM_RECONNECT_MAX_DELAY)
+
+    async def _consume(self, ws) -> None:
+        stop_waiter = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            while True:
+                receive = asyncio.ensure_future(ws.receive())
+                done, _ = await asyncio.wait({receive, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+                if stop_waiter in done:
+                    receive.cancel()
+                    await ws.close()
+                    return
+
+                message = receive.result()
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle_message(message.data)
+                elif message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    return
+        finally:
+            stop_waiter.cancel()
+
+    async def _handle_message(self, raw: str) -> None:
+        try:
+            event = parse_kline_event(json.loads(raw))
+        except (ValueError, KeyError, TypeError) as e:
+            logging.debug(f"KLINES-STREAM: Ignoring malformed message: {e}")
+            return
+        if event is None:
+            return
+
+        symbol, timeframe, candle, is_closed, close_time_ms = event
+        if symbol not in self.symbols or timeframe not in self.timeframes:
+            return
+
+        self.stats["messages"] += 1
+        self._last_message_at[(symbol, timeframe)] = time.time()
+
+        try:
+            if is_closed:
+                # The close event can arrive a few ms before the period boundary - completeness
+                # is derived from the wall clock, so wait for the boundary before saving
+                remaining = (close_time_ms + 1) / 1000 - time.time()
+                if 0 < remaining < 5:
+                    await asyncio.sleep(remaining)
+                self._save_closed_candle(symbol, timeframe, candle)
+            else:
+                self._update_open_candle(symbol, timeframe, candle)
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.stats["last_error"] = str(e)
+            logging.error(f"KLINES-STREAM: Failed to store {symbol} {timeframe} candle: {e}")
+
+    def _update_open_candle(self, symbol: str, timeframe: str, candle: Dict) -> None:
+        with self.app.app_context():
+            from .models import KlinesCache
+
+            KlinesCache.update_open_candle(
+                symbol=symbol,
+                timeframe=timeframe,
+                open_price=candle["open"],
+                high=candle["high"],
+                low=candle["low"],
+                close=candle["close"],
+                volume=candle["volume"],
+                timestamp=candle["timestamp"],
+                cache_ttl_minutes=OPEN_CANDLE_TTL_MINUTES.get(timeframe, 3),
+            )
+        self.stats["open_candle_updates"] += 1
+
+    def _save_closed_candle(self, symbol: str, timeframe: str, candle: Dict) -> None:
+        with self.app.app_context():
+            from .models import KlinesCache
+
+            KlinesCache.save_klines_batch(symbol=symbol, timeframe=timeframe, candlesticks=[candle])
+        self.stats["candle_closes"] += 1
+        logging.debug(f"KLINES-STREAM: Candle closed {symbol} {timeframe} {candle['timestamp']} C:{candle['close']}")
+
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(symbol, timeframe, candle)
+            except Exception as e:
+                logging.error(f"KLINES-STREAM: Candle-close listener failed for {symbol} {timeframe}: {e}")
+
+    def get_status(self) -> Dict:
+        """Connection state, per-series liveness and counters"""
+        now = time.time()
+        live_series = sum(
+            1 for symbol in self.symbols for timeframe in self.timeframes if self.is_series_live(symbol, timeframe)
+        )
+        return {
+            "enabled": CacheConfig.KLINES_STREAM_ENABLED,
+            "running": self.is_running,
+            "connected": self.connected,
+            "live_series": live_series,
+            "tracked_series": len(self.symbols) * len(self.timeframes),
+            "oldest_message_age": round(
+                max((now - ts for ts in self._last_message_at.values()), default=0.0), 1
+            ),
+            **self.stats,
+        }
+
+
+# Global stream consumer (started by the unified data sync service when KLINES_STREAM is enabled)
+klines_stream = KlinesStreamService()
@@ -0,0 +1,176 @@
+"""
+Latency Model - per-source p50/p95 latency and success rate over a sliding window
+
+get_api_priority used to rank price sources by success_rate*100 - avg_response_time,
+with the average kept as an unsynchronised EWMA, and the per-symbol fallback always
+fired the top two sources together. Each source now keeps its recent samples
+(PriceHedgingConfig.WINDOW_SECONDS / MAX_SAMPLES_PER_SOURCE):
+- rank(): sources by expected cost - p50 plus a failure-rate penalty
+- hedge_delay(): how long the in-flight request to a source may take before the next
+  source is hedged - its p50 or p95 (PriceHedgingConfig.HEDGE_QUANTILE)
+
+Only completed requests are recorded; a request cancelled because another source won
+says nothing about its source. Hedge outcomes are counted in the model's stats. Batch
+requests (many symbols in one call) are slower by nature and are recorded in their own
+model, so they do not skew the per-symbol ranking and hedge delays.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+# Import configuration constants
+try:
+    from config import PriceHedgingConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import PriceHedgingConfig
+
+
+class _SourceWindow:
+    def __init__(self):
+        self.samples: Deque[Tuple[float, float, bool]] = deque(maxlen=PriceHedgingConfig.MAX_SAMPLES_PER_SOURCE)
+        self.requests = 0
+        self.successes = 0
+        self.last_success: Optional[float] = None
+
+    def trim(self, now: float) -> None:
+        cutoff = now - PriceHedgingConfig.WINDOW_SECONDS
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+
+class LatencyModel:
+    """
+    Sliding-window latency quantiles and success rates per upstream source
+    """
+
+    def __init__(self, sources: Iterable[str] = ()):
+        self._sources: Dict[str, _SourceWindow] = {source: _SourceWindow() for source in sources}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hedged_calls": 0,
+            "hedges_sent": 0,
+            "hedge_wins": 0,
+            "cancelled": 0,
+            "exhausted": 0,
+        }
+
+    def record(self, source: str, latency: float, success: bool) -> None:
+        """Record one completed request to a source"""
+        now = time.time()
+        with self._lock:
+            window = self._sources.get(source)
+            if window is None:
+                window = self._sources[source] = _SourceWindow()
+            window.samples.append((now, latency, success))
+            window.requests += 1
+            if success:
+                window.successes += 1
+                window.last_success = now
+
+    def record_hedge(self, name: str, count: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += count
+
+    # ---- estimates -------------------------------------------------------
+
+    def _estimate(self, window: _SourceWindow, now: float) -> Dict:
+        window.trim(now)
+        latencies = sorted(latency for _, latency, success in window.samples if success)
+        total = len(window.samples)
+        estimate = {
+            "samples": total,
+            "success_rate": (len(latencies) / total) if total else None,
+            "p50": None,
+            "p95": None,
+            "mean": None,
+        }
+        if len(latencies) >= PriceHedgingConfig.MIN_SAMPLES:
+            estimate["p50"] = latencies[min(len(latencies) - 1, int(0.5 * len(latencies)))]
+            estimate["p95"] = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        if latencies:
+            estimate["mean"] = sum(latencies) / len(latencies)
+        return estimate
+
+    def estimate(self, source: str) -> Dict:
+        """Window sample count, success rate, p50, p95 and mean latency (None while unknown)"""
+        with self._lock:
+            window = self._sources.get(source)
+            if window is None:
+                return {"samples": 0, "success_rate": None, "p50": None, "p95": None, "mean": None}
+            return self._estimate(window, time.time())
+
+    def expected_cost(self, source: str) -> float:
+        """Ranking score in seconds (lower is better)"""
+        estimate = self.estimate(source)
+        latency = estimate["p50"] if estimate["p50"] is not None else PriceHedgingConfig.DEFAULT_LATENCY
+        failure_rate = 1 - estimate["success_rate"] if estimate["success_rate"] is not None else 0.0
+        return latency + failure_rate * PriceHedgingConfig.FAILURE_PENALTY_SECONDS
+
+    def rank(self, sources: Optional[Iterable[str]] = None) -> List[str]:
+        """Sources ordered by expected cost, best first"""
+        sources = list(self._sources) if sources is None else list(sources)
+        return sorted(sources, key=self.expected_cost)
+
+    def hedge_delay(self, source: str) -> float:
+        """Seconds to wait on a request to source before hedging to the next source"""
+        quantile = PriceHedgingConfig.HEDGE_QUANTILE if PriceHedgingConfig.HEDGE_QUANTILE in ("p50", "p95") else "p95"
+        delay = self.estimate(source)[quantile]
+        if delay is None:
+            return PriceHedgingConfig.DEFAULT_HEDGE_DELAY
+        return max(PriceHedgingConfig.MIN_HEDGE_DELAY, delay)
+
+    # ---- status ----------------------------------------------------------
+
+    def get_source_status(self, source: str) -> Dict:
+        with self._lock:
+            window = self._sources.get(source)
+            if window is None:
+                return {}
+            estimate = self._estimate(window, time.time())
+            return {
+                "total_requests": window.requests,
+                "total_successes": window.successes,
+                "last_success": window.last_success,
+                "window_samples": estimate["samples"],
+                "success_rate": round(estimate["success_rate"], 4) if estimate["success_rate"] is not None else None,
+                **{name: round(estimate[name], 4) if estimate[name] is not None else None for name in ("p50", "p95", "mean")},
+            }
+
+    def get_status(self) -> Dict:
+        sources = self.rank()
+        status = {
+            "hedge_quantile": PriceHedgingConfig.HEDGE_QUANTILE,
+            "window_seconds": PriceHedgingConfig.WINDOW_SECONDS,
+            "ranking": sources,
+            "sources": {
+                source: {
+                    **self.get_source_status(source),
+                    "hedge_delay": round(self.hedge_delay(source), 4),
+                }
+                for source in sources
+            },
+        }
+        with self._lock:
+            status.update(self.stats)
+        return status
+
+    def reset(self) -> None:
+        with self._lock:
+            for source in list(self._sources):
+                self._sources[source] = _SourceWindow()
+            for name in self.stats:
+                self.stats[name] = 0
+        logging.info("LATENCY-MODEL: Reset")
+
+
+# Global model for the per-symbol price fallback sources
+price_latency_model = LatencyModel(("binance", "coingecko", "cryptocompare"))
+
+# Global model for the one-request-per-source batch price calls
+batch_latency_model = LatencyModel(("binance", "coingecko", "cryptocompare"))
@@ -0,0 +1,428 @@
+"""
+Leader Election - exactly one process runs each background service
+
+Under gunicorn every worker imports the app, so every worker used to start its own
+UnifiedDataSyncService (klines sync + cache cleanup) and ExchangeSyncService. Each
+service is now registered here and only started in the process holding its lock:
+- PostgreSQL: session-level advisory lock (pg_try_advisory_lock) on a dedicated
+  AUTOCOMMIT connection; the server drops it when the leader's session dies
+- anything else (SQLite): exclusive fcntl.flock on a per-service lock file, released
+  by the kernel when the leader process exits
+
+Advisory locks belong to a server session, so they need a direct connection. Behind a
+transaction-mode pooler (PgBouncer, Neon "-pooler" hosts) consecutive statements can
+run on different server sessions - the lock would leak or look held by nobody. Pooled
+URIs therefore fall back to the file lock (one leader per host); point
+LEADER_ELECTION_DATABASE_URL at the direct endpoint to elect across hosts.
+
+A daemon thread retries the lock every LeaderElectionConfig.INTERVAL seconds, so a
+follower takes over within that interval after the leader dies. The same pass verifies
+the leader still holds its lock and reconciles services against should_run() (e.g. the
+admin worker toggle), so settings changed through any worker reach the leader.
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - no flock, every process runs as leader
+    fcntl = None
+
+# Import configuration constants
+try:
+    from config import LeaderElectionConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import LeaderElectionConfig
+
+ROLE_LEADER = "leader"
+ROLE_FOLLOWER = "follower"
+
+
+def _advisory_lock_key(name: str) -> int:
+    """Stable signed int4 key for a service name"""
+    key = zlib.crc32(name.encode("utf-8"))
+    return key - (1 << 32) if key >= (1 << 31) else key
+
+
+def _is_pooled_uri(database_uri: str) -> bool:
+    """True if the URI points at a transaction pooler (PgBouncer, Neon pooled endpoint)"""
+    from sqlalchemy.engine import make_url
+
+    try:
+        url = make_url(database_uri)
+    except Exception:
+        return False
+    host = (url.host or "").lower()
+    return (
+        "-pooler" in host
+        or "pgbouncer" in host
+        or url.port == 6432
+        or str(url.query.get("pgbouncer", "")).lower() == "true"
+    )
+
+
+class PostgresAdvisoryLock:
+    """Session-level advisory lock held on a connection shared by all services"""
+
+    backend = "postgres_advisory_lock"
+
+    def __init__(self, election: "LeaderElection", name: str):
+        self.election = election
+        self.name = name
+        self.key = _advisory_lock_key(name)
+
+    def try_acquire(self) -> bool:
+        from sqlalchemy import text
+
+        connection = self.election._get_pg_connection()
+        return bool(
+            connection.execute(
+                text("SELECT pg_try_advisory_lock(:namespace, :key)"),
+                {"namespace": LeaderElectionConfig.ADVISORY_LOCK_NAMESPACE, "key": self.key},
+            ).scalar()
+        )
+
+    def is_held(self) -> bool:
+        from sqlalchemy import text
+
+        connection = self.election._pg_connection
+        if connection is None:
+            return False
+        try:
+            # Ask the server whether this session holds the lock - a live connection alone
+            # doesn't prove it (pg_locks reports the two int keys as unsigned oids)
+            return bool(
+                connection.execute(
+                    text(
+                        "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' "
+                        "AND pid = pg_backend_pid() AND classid::bigint = :namespace "
+                        "AND objid::bigint = :key AND objsubid = 2 AND granted)"
+                    ),
+                    {
+                        "namespace": LeaderElectionConfig.ADVISORY_LOCK_NAMESPACE & 0xFFFFFFFF,
+                        "key": self.key & 0xFFFFFFFF,
+                    },
+                ).scalar()
+            )
+        except Exception as e:
+            # Session gone - the server already released its advisory locks
+            logging.warning(f"LEADER-ELECTION: Lock connection lost: {e}")
+            self.election._close_pg_connection()
+            return False
+
+    def release(self) -> None:
+        from sqlalchemy import text
+
+        connection = self.election._pg_connection
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:namespace, :key)"),
+                {"namespace": LeaderElectionConfig.ADVISORY_LOCK_NAMESPACE, "key": self.key},
+            )
+        except Exception as e:
+            logging.debug(f"LEADER-ELECTION: Advisory unlock of {self.name} failed: {e}")
+
+    def holder_pid(self) -> Optional[int]:
+        return os.getpid() if self.election.is_leader(self.name) else None
+
+
+class FileLock:
+    """Exclusive non-blocking flock on a per-service lock file"""
+
+    backend = "file_lock"
+
+    def __init__(self, election: "LeaderElection", name: str):
+        self.name = name
+        self.path = os.path.join(election.lock_dir, f"leader-{name}-{election.namespace}.lock")
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if fcntl is None:
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (BlockingIOError, PermissionError):
+            os.close(fd)
+            return False
+
+        # Record the holder for followers' status
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def is_held(self) -> bool:
+        # flock is tied to the open file; it only goes away with the fd or the process
+        return fcntl is None or self._fd is not None
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def holder_pid(self) -> Optional[int]:
+        try:
+            with open(self.path) as lock_file:
+                content = lock_file.read().strip()
+            return int(content) if content else None
+        except (OSError, ValueError):
+            return None
+
+
+class _ManagedService:
+    def __init__(self, name: str, start: Callable[[], None], stop: Callable[[], None], should_run: Optional[Callable[[], bool]]):
+        self.name = name
+        self.start = start
+        self.stop = stop
+        self.should_run = should_run
+        self.lock = None
+        self.is_leader = False
+        self.running = False
+        self.leader_since: Optional[datetime] = None
+        self.elections = 0
+        self.last_error: Optional[str] = None
+
+
+class LeaderElection:
+    """
+    Registry of leader-gated background services and the thread electing their leaders
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = LeaderElectionConfig.ENABLED
+        self.backend: Optional[str] = None
+        self.lock_dir = LeaderElectionConfig.LOCK_DIR or tempfile.gettempdir()
+        self.namespace = "default"
+        self.lock_database_uri = ""
+
+        self._services: Dict[str, _ManagedService] = {}
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._pg_connection = None
+
+    def register(
+        self,
+        name: str,
+        start: Callable[[], None],
+        stop: Callable[[], None],
+        should_run: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """
+        Register a background service that must run in exactly one process
+
+        Args:
+            name: Service name (also the lock name)
+            start: Starts the service in this process
+            stop: Stops it (called when leadership is lost or should_run turns False)
+            should_run: Optional check evaluated by the leader on every pass
+        """
+        with self._lock:
+            self._services[name] = _ManagedService(name, start, stop, should_run)
+
+    def start(self, app) -> None:
+        """Run the first election pass synchronously, then keep electing in the background"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.app = app
+
+            database_uri = app.config.get("SQLALCHEMY_DATABASE_URI", "") or ""
+            # Processes sharing a database share locks; other deployments on the host don't collide
+            self.namespace = hashlib.sha1(database_uri.encode("utf-8")).hexdigest()[:8]
+            # Advisory locks may use a separate direct endpoint when the app goes through a pooler
+            self.lock_database_uri = LeaderElectionConfig.DATABASE_URL or database_uri
+            if self.lock_database_uri.startswith("postgres://"):
+                self.lock_database_uri = self.lock_database_uri.replace("postgres://", "postgresql://", 1)
+            if not self.enabled:
+                self.backend = "disabled"
+            elif self.lock_database_uri.startswith("postgresql") and not _is_pooled_uri(self.lock_database_uri):
+                self.backend = PostgresAdvisoryLock.backend
+            else:
+                if self.lock_database_uri.startswith("postgresql"):
+                    logging.warning(
+                        "LEADER-ELECTION: Database URI goes through a connection pooler - advisory "
+                        "locks need a direct connection, using per-host file locks instead "
+                        "(set LEADER_ELECTION_DATABASE_URL to the direct endpoint)"
+                    )
+                self.backend = FileLock.backend
+                os.makedirs(self.lock_dir, exist_ok=True)
+
+            self._thread = threading.Thread(target=self._run, name="LeaderElection", daemon=True)
+
+        logging.info(
+            f"LEADER-ELECTION: pid {os.getpid()} electing {len(self._services)} services "
+            f"via {self.backend} (interval {LeaderElectionConfig.INTERVAL}s)"
+        )
+        self.reconcile()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop every service this process leads and release its locks"""
+        self._stop_event.set()
+        with self._lock:
+            for service in self._services.values():
+                self._stop_service(service)
+                self._demote(service)
+            self._close_pg_connection()
+
+    def reconcile(self) -> None:
+        """One election pass: acquire or verify each lock, then start/stop services to match"""
+        with self._lock:
+            if self.app is None:
+                return
+            for service in self._services.values():
+                try:
+                    self._elect(service)
+                    desired = service.is_leader and self._should_run(service)
+                    if desired and not service.running:
+                        logging.info(f"LEADER-ELECTION: Starting {service.name} in leader pid {os.getpid()}")
+                        service.start()
+                        service.running = True
+                    elif not desired and service.running:
+                        self._stop_service(service)
+                except Exception as e:
+                    service.last_error = str(e)
+                    logging.error(f"LEADER-ELECTION: Pass failed for {service.name}: {e}")
+
+    def is_leader(self, name: str) -> bool:
+        """True if this process leads the service (or the service is not leader-gated)"""
+        service = self._services.get(name)
+        return service is None or service.is_leader
+
+    def get_role(self, name: str) -> str:
+        return ROLE_LEADER if self.is_leader(name) else ROLE_FOLLOWER
+
+    def get_service_status(self, name: str) -> Dict:
+        """Role of this process for one service"""
+        service = self._services.get(name)
+        if service is None:
+            return {"role": ROLE_LEADER, "managed": False, "pid": os.getpid()}
+
+        return {
+            "role": ROLE_LEADER if service.is_leader else ROLE_FOLLOWER,
+            "managed": True,
+            "pid": os.getpid(),
+            "leader_pid": service.lock.holder_pid() if service.lock else None,
+            "backend": self.backend,
+            "running": service.running,
+            "leader_since": service.leader_since.isoformat() if service.leader_since else None,
+            "elections_won": service.elections,
+            "last_error": service.last_error,
+        }
+
+    def get_status(self) -> Dict:
+        """Roles of this process for every registered service"""
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend,
+            "pid": os.getpid(),
+            "interval": LeaderElectionConfig.INTERVAL,
+            "services": {name: self.get_service_status(name) for name in list(self._services)},
+        }
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(LeaderElectionConfig.INTERVAL):
+            self.reconcile()
+
+    def _elect(self, service: _ManagedService) -> None:
+        if not self.enabled:
+            if not service.is_leader:
+                self._promote(service)
+            return
+
+        if service.lock is None:
+            service.lock = (
+                PostgresAdvisoryLock(self, service.name)
+                if self.backend == PostgresAdvisoryLock.backend
+                else FileLock(self, service.name)
+            )
+
+        if service.is_leader:
+            if not service.lock.is_held():
+                logging.warning(f"LEADER-ELECTION: Lost {service.name} leadership in pid {os.getpid()}")
+                self._stop_service(service)
+                self._demote(service)
+            return
+
+        if service.lock.try_acquire():
+            self._promote(service)
+
+    def _promote(self, service: _ManagedService) -> None:
+        service.is_leader = True
+        service.leader_since = datetime.utcnow()
+        service.elections += 1
+        service.last_error = None
+        logging.info(f"LEADER-ELECTION: pid {os.getpid()} elected leader of {service.name}")
+
+    def _demote(self, service: _ManagedService) -> None:
+        if service.lock is not None and service.is_leader:
+            service.lock.release()
+        service.is_leader = False
+        service.leader_since = None
+
+    def _stop_service(self, service: _ManagedService) -> None:
+        if not service.running:
+            return
+        logging.info(f"LEADER-ELECTION: Stopping {service.name} in pid {os.getpid()}")
+        try:
+            service.stop()
+        finally:
+            service.running = False
+
+    def _should_run(self, service: _ManagedService) -> bool:
+        if service.should_run is None:
+            return True
+        try:
+            return bool(service.should_run())
+        except Exception as e:
+            logging.warning(f"LEADER-ELECTION: should_run check for {service.name} failed: {e}")
+            return service.running  # Keep the current state until the check works again
+
+    def _get_pg_connection(self):
+        if self._pg_connection is None:
+            from .models import db
+
+            if LeaderElectionConfig.DATABASE_URL:
+                from sqlalchemy import create_engine
+                from sqlalchemy.pool import NullPool
+
+                # Dedicated direct connection - never shared with the pooled app engine
+                engine = create_engine(self.lock_database_uri, poolclass=NullPool)
+                self._pg_connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            else:
+                with self.app.app_context():
+                    self._pg_connection = db.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        return self._pg_connection
+
+    def _close_pg_connection(self) -> None:
+        if self._pg_connection is None:
+            return
+        try:
+            self._pg_connection.invalidate()  # Never return a lock-holding session to the pool
+        except Exception:
+            pass
+        self._pg_connection = None
+
+
+# Global election shared by app startup, the service modules and the status endpoints
+leader_election = LeaderElection()
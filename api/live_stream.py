@@ -0,0 +1,209 @@
+"""
+Live Stream - Server-Sent Events framing and connection bookkeeping
+
+The mini app polled /api/positions/live-update every 10 seconds per open client, each
+poll a full request through auth, environment sync and position updates. Clients now
+hold one EventSource connection (/api/stream/live) that the server writes to when the
+price hub publishes a tick for a symbol the user cares about:
+- "prices": changed ticks ({symbol: {price, source, version, timestamp}})
+- "positions": position P&L entries that changed since the last event plus totals
+  (update_type "snapshot" on connect, "delta" afterwards)
+- comment heartbeats every LiveStreamConfig.HEARTBEAT_INTERVAL while nothing changes
+
+Position monitoring (paper TP/SL, break-even) runs once per process, not per stream: a
+single monitor thread waits for the price hub, runs the app's pass when a symbol followed
+by an open stream changed price, and then wakes the streams, which only read the
+updated positions.
+
+Event ids are price hub versions, so a reconnecting browser's Last-Event-ID resumes the
+price feed. Streams end after MAX_STREAM_SECONDS and the browser reconnects; the
+registry caps open streams per process (clients beyond it fall back to polling).
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Set
+
+# Import configuration constants
+try:
+    from config import LiveStreamConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import LiveStreamConfig
+
+
+def format_event(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """One SSE event (data is JSON-encoded on a single line)"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def format_comment(text: str) -> str:
+    """SSE comment line (ignored by EventSource, keeps the connection alive)"""
+    return f": {text}\n\n"
+
+
+def format_retry(milliseconds: int) -> str:
+    return f"retry: {milliseconds}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    """Price hub version from a Last-Event-ID header (0 when absent or invalid)"""
+    try:
+        return max(0, int(value)) if value else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def diff_positions(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Dict[str, Any]:
+    """Changed/new position entries and ids that disappeared since previous"""
+    changed = {trade_id: data for trade_id, data in current.items() if previous.get(trade_id) != data}
+    removed = [trade_id for trade_id in previous if trade_id not in current]
+    return {"positions": changed, "removed": removed}
+
+
+class LiveStreamRegistry:
+    """
+    Open streams in this process, with a cap and counters for the status endpoints
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pass_done = threading.Condition(self._lock)
+        self._streams: Dict[int, Dict] = {}
+        self._next_id = 1
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._monitor_pid: Optional[int] = None
+        self.pass_version = 0  # price hub version the last monitor pass covered
+        self.stats = {
+            "opened": 0,
+            "closed": 0,
+            "rejected": 0,
+            "events": 0,
+            "heartbeats": 0,
+            "monitor_passes": 0,
+            "monitor_errors": 0,
+        }
+
+    @contextmanager
+    def connection(self, user_id: int):
+        """
+        Hold a stream slot for the duration of the block
+
+        Raises:
+            RuntimeError: MAX_STREAMS_PER_PROCESS streams are already open
+        """
+        with self._lock:
+            if len(self._streams) >= LiveStreamConfig.MAX_STREAMS_PER_PROCESS:
+                self.stats["rejected"] += 1
+                raise RuntimeError("Too many open live streams")
+            stream_id = self._next_id
+            self._next_id += 1
+            self._streams[stream_id] = {"user_id": user_id, "opened_at": time.time(), "events": 0}
+            self.stats["opened"] += 1
+        try:
+            yield stream_id
+        finally:
+            with self._lock:
+                self._streams.pop(stream_id, None)
+                self.stats["closed"] += 1
+            logging.debug(f"LIVE-STREAM: Stream {stream_id} for user {user_id} closed")
+
+    def has_capacity(self) -> bool:
+        return len(self._streams) < LiveStreamConfig.MAX_STREAMS_PER_PROCESS
+
+    def user_ids(self) -> Set[int]:
+        with self._lock:
+            return {stream["user_id"] for stream in self._streams.values()}
+
+    # ---- shared position monitor -------------------------------------------
+
+    def start_monitor(self, hub, run_pass: Callable[[int], None]) -> None:
+        """
+        Start the process-wide monitor thread (also restarted lazily after a fork)
+
+        Args:
+            hub: Price hub whose version the monitor follows
+            run_pass: Called with the version the previous pass covered, on the monitor thread
+        """
+        with self._lock:
+            thread = self._monitor_thread
+            if thread is not None and self._monitor_pid == os.getpid() and thread.is_alive():
+                return
+            self._monitor_pid = os.getpid()
+            self.pass_version = hub.version
+            self._monitor_thread = threading.Thread(
+                target=self._monitor_loop, args=(hub, run_pass), name="LiveStreamMonitor", daemon=True
+            )
+            self._monitor_thread.start()
+        logging.info("LIVE-STREAM: Position monitor started")
+
+    def _monitor_loop(self, hub, run_pass: Callable[[int], None]) -> None:
+        last_pass = 0.0
+        while True:
+            version = hub.wait_for_update(self.pass_version, LiveStreamConfig.HEARTBEAT_INTERVAL)
+            if version == self.pass_version:
+                continue
+
+            # Batch ticks that arrive in quick succession into one pass
+            pause = LiveStreamConfig.MIN_UPDATE_INTERVAL - (time.time() - last_pass)
+            if pause > 0:
+                time.sleep(pause)
+            version = hub.version
+            last_pass = time.time()
+
+            if self._streams:
+                try:
+                    run_pass(self.pass_version)
+                    self.stats["monitor_passes"] += 1
+                except Exception as e:
+                    self.stats["monitor_errors"] += 1
+                    logging.error(f"LIVE-STREAM: Position monitor pass failed: {e}")
+
+            with self._pass_done:
+                self.pass_version = version
+                self._pass_done.notify_all()
+
+    def wait_for_pass(self, after_version: int, timeout: float) -> int:
+        """Block until a monitor pass covers a hub version newer than after_version (or timeout)"""
+        with self._pass_done:
+            self._pass_done.wait_for(lambda: self.pass_version > after_version, timeout)
+            return self.pass_version
+
+    def record_event(self, stream_id: int) -> None:
+        with self._lock:
+            self.stats["events"] += 1
+            stream = self._streams.get(stream_id)
+            if stream is not None:
+                stream["events"] += 1
+
+    def record_heartbeat(self) -> None:
+        with self._lock:
+            self.stats["heartbeats"] += 1
+
+    def get_status(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "enabled": LiveStreamConfig.ENABLED,
+                "open_streams": len(self._streams),
+                "max_streams": LiveStreamConfig.MAX_STREAMS_PER_PROCESS,
+                "users": len({stream["user_id"] for stream in self._streams.values()}),
+                "oldest_stream_seconds": round(max((now - s["opened_at"] for s in self._streams.values()), default=0), 1),
+                "monitor_running": self._monitor_thread is not None and self._monitor_thread.is_alive(),
+                "pass_version": self.pass_version,
+                **self.stats,
+            }
+
+
+# Global registry shared by the stream endpoint and the status endpoints
+live_streams = LiveStreamRegistry()
@@ -1,9 +1,13 @@
+import atexit
 import base64
 import hashlib
+import json
 import logging
 import os
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 from cryptography.fernet import Fernet
 from flask_sqlalchemy import SQLAlchemy
@@ -65,6 +69,20 @@ def normalize_to_utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+# Candle period length in seconds for every timeframe tracked by the sync service and analyzer
+TIMEFRAME_SECONDS = {
+    "15m": 900,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+
+def get_timeframe_seconds(timeframe: str) -> int:
+    """Get candle period length in seconds (defaults to hourly for unknown timeframes)"""
+    return TIMEFRAME_SECONDS.get(timeframe, 3600)
+
+
 def floor_to_period(dt_utc: datetime, timeframe: str) -> datetime:
     """Floor datetime to start of trading period (timezone-aware UTC)"""
     dt_utc = normalize_to_utc(dt_utc)
@@ -901,13 +919,25 @@ class KlinesCache(db.Model):
         # Get the most recent data, ordered by timestamp
         cached_data = query.order_by(cls.timestamp.desc()).limit(limit).all()
 
-        if not cached_data:
-            return []
-
         # Convert to list of dictionaries and reverse to get chronological order
         candlesticks = [
             candle.to_candlestick_dict() for candle in reversed(cached_data)
         ]
+        return cls._overlay_buffered(symbol, timeframe, candlesticks, limit, include_incomplete)
+
+    @classmethod
+    def _overlay_buffered(cls, symbol: str, timeframe: str, candlesticks: List[Dict], limit: int, include_incomplete: bool) -> List[Dict]:
+        """Apply an unflushed write-behind candle to chronological cached data"""
+        buffered = open_candle_buffer.get(symbol, timeframe)
+        if not buffered or (not include_incomplete and not buffered["is_complete"]):
+            return candlesticks
+
+        if candlesticks and candlesticks[-1]["timestamp"] == buffered["timestamp"]:
+            candlesticks[-1] = open_candle_buffer.overlay(candlesticks[-1], buffered)
+        elif not candlesticks or candlesticks[-1]["timestamp"] < buffered["timestamp"]:
+            candlesticks.append({field: buffered[field] for field in ("timestamp", "open", "high", "low", "close", "volume")})
+            candlesticks = candlesticks[-limit:]
+
         return candlesticks
 
     @classmethod
@@ -949,7 +979,10 @@ class KlinesCache(db.Model):
             is_complete = candle_period_start < current_period_start
 
             # Intelligent TTL: Complete candles get long cache time, incomplete get short
-            if is_complete:
+            if is_complete and candle.get("expires_at"):
+                # Keep an expiry carried over from elsewhere (e.g. a klines snapshot)
+                expires_at = normalize_to_utc(candle["expires_at"])
+            elif is_complete:
                 expires_at = current_time + timedelta(days=complete_candle_ttl_days)
             else:
                 expires_at = current_time + timedelta(minutes=incomplete_candle_ttl_minutes)
@@ -971,13 +1004,22 @@ class KlinesCache(db.Model):
             )
 
         if klines_to_insert:
-            # Use PostgreSQL ON CONFLICT for atomic upsert
+            # Fresher REST data supersedes any buffered open-candle refresh of the same candle
+            open_candle_buffer.discard(symbol, timeframe, {to_db_utc(k["timestamp"]) for k in klines_to_insert})
+
+            # Use ON CONFLICT for atomic upsert (PostgreSQL, or SQLite in development)
             try:
-                from sqlalchemy.dialects.postgresql import insert
                 from sqlalchemy import text
+
+                if db.engine.dialect.name == "sqlite":
+                    from sqlalchemy.dialects.sqlite import insert
+                    conflict_target = {"index_elements": ["symbol", "timeframe", "timestamp"]}
+                else:
+                    from sqlalchemy.dialects.postgresql import insert
+                    conflict_target = {"constraint": "uq_klines_symbol_tf_timestamp"}
                 
-                # Batch insert with ON CONFLICT DO UPDATE
-                stmt = insert(cls.__table__).values(klines_to_insert)  # type: ignore
+                # Batch insert with ON CONFLICT DO UPDATE (executemany keeps the compiled statement cached)
+                stmt = insert(cls.__table__)  # type: ignore
                 
                 # Only update if not downgrading: never change complete to incomplete
                 update_dict = {
@@ -993,19 +1035,19 @@ class KlinesCache(db.Model):
                 }
                 
                 upsert_stmt = stmt.on_conflict_do_update(
-                    constraint='uq_klines_symbol_tf_timestamp',
+                    **conflict_target,
                     set_=update_dict,
                     where=text('klines_cache.is_complete = false OR excluded.is_complete = true')
                 )
                 
-                result = db.session.execute(upsert_stmt)
+                result = db.session.execute(upsert_stmt, klines_to_insert)
                 db.session.commit()
                 
                 logging.debug(f"Klines batch upsert completed: {len(klines_to_insert)} records processed")
                 return len(klines_to_insert)
                 
             except Exception as e:
-                logging.warning(f"PostgreSQL upsert failed, falling back to individual operations: {e}")
+                logging.warning(f"Batch upsert failed, falling back to individual operations: {e}")
                 db.session.rollback()
                 
                 # Fallback to individual upsert operations
@@ -1092,47 +1134,30 @@ class KlinesCache(db.Model):
             else:
                 expires_at = current_time + timedelta(minutes=cache_ttl_minutes)  # Short TTL for open candles
             
-            # Check if candle already exists
-            existing_candle = cls.query.filter(
-                cls.symbol == symbol,
-                cls.timeframe == timeframe,
-                cls.timestamp == candle_time
-            ).first()
-            
-            if existing_candle:
-                # Update existing candle in place (much more efficient)
-                existing_candle.high = max(existing_candle.high, high)  # Keep highest high
-                existing_candle.low = min(existing_candle.low, low)     # Keep lowest low
-                existing_candle.close = close                           # Update current close
-                existing_candle.volume = volume                         # Update current volume
-                existing_candle.expires_at = expires_at               # Update expiry
-                existing_candle.created_at = current_time              # Update timestamp
-                
-                # Only promote incomplete→complete, never downgrade
-                if not existing_candle.is_complete and is_complete:
-                    existing_candle.is_complete = True
-                    
-                logging.debug(f"Updated open candle for {symbol} {timeframe}: H:{high} L:{low} C:{close} V:{volume}")
-                
-            else:
-                # Create new candle if doesn't exist
-                new_candle = cls(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    timestamp=candle_time,
-                    open=open_price,
-                    high=high,
-                    low=low,
-                    close=close,
-                    volume=volume,
-                    expires_at=expires_at,
-                    is_complete=is_complete,
-                    created_at=current_time
-                )
-                db.session.add(new_candle)
-                logging.debug(f"Created new candle for {symbol} {timeframe}: O:{open_price} H:{high} L:{low} C:{close} V:{volume}")
-            
-            db.session.commit()
+            # Coalesce in the write-behind buffer; it flushes in batches or on candle close
+            from config import CacheConfig
+
+            open_candle_buffer.put(
+                symbol,
+                timeframe,
+                {
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "timestamp": to_db_utc(candle_time),
+                    "open": float(open_price),
+                    "high": float(high),
+                    "low": float(low),
+                    "close": float(close),
+                    "volume": float(volume),
+                    "expires_at": to_db_utc(expires_at),
+                    "is_complete": is_complete,
+                    "created_at": to_db_utc(current_time),
+                },
+            )
+            if not CacheConfig.OPEN_CANDLE_WRITE_BEHIND:
+                open_candle_buffer.flush()
+
+            logging.debug(f"Buffered open candle for {symbol} {timeframe}: H:{high} L:{low} C:{close} V:{volume}")
             return True
             
         except Exception as e:
@@ -1140,6 +1165,43 @@ class KlinesCache(db.Model):
             db.session.rollback()
             return False
 
+    @classmethod
+    def upsert_open_candles(cls, rows: List[Dict]) -> int:
+        """
+        Batched upsert of buffered open candles. Existing rows keep their open price
+        and merge highs/lows; completeness is only ever promoted.
+        """
+        from sqlalchemy import func, text
+
+        if db.engine.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+            conflict_target = {"index_elements": ["symbol", "timeframe", "timestamp"]}
+            greatest, least = func.max, func.min  # SQLite's multi-argument scalar max/min
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+            conflict_target = {"constraint": "uq_klines_symbol_tf_timestamp"}
+            greatest, least = func.greatest, func.least
+
+        table = cls.__table__
+        stmt = insert(table)  # type: ignore
+        upsert_stmt = stmt.on_conflict_do_update(
+            **conflict_target,
+            set_={
+                "high": greatest(table.c.high, stmt.excluded.high),
+                "low": least(table.c.low, stmt.excluded.low),
+                "close": stmt.excluded.close,
+                "volume": stmt.excluded.volume,
+                "expires_at": stmt.excluded.expires_at,
+                "created_at": stmt.excluded.created_at,
+                # Only promote incomplete→complete, never downgrade
+                "is_complete": text("CASE WHEN klines_cache.is_complete = true THEN true ELSE excluded.is_complete END"),
+            },
+        )
+
+        db.session.execute(upsert_stmt, rows)
+        db.session.commit()
+        return len(rows)
+
     @classmethod
     def get_current_open_candle(cls, symbol: str, timeframe: str) -> Optional['KlinesCache']:
         """
@@ -1162,6 +1224,13 @@ class KlinesCache(db.Model):
                 cls.expires_at > to_db_utc(current_time)
             ).first()
             
+            # Serve unflushed write-behind updates (transient object, never added to the session)
+            buffered = open_candle_buffer.get(symbol, timeframe)
+            if buffered and buffered["timestamp"] == to_db_utc(current_period_start) and not buffered["is_complete"]:
+                if open_candle:
+                    buffered.update(open_candle_buffer.overlay(open_candle.to_candlestick_dict(), buffered))
+                return cls(**buffered)
+            
             return open_candle
             
         except Exception as e:
@@ -1169,109 +1238,154 @@ class KlinesCache(db.Model):
             return None
 
     @classmethod
-    def get_data_gaps(cls, symbol: str, timeframe: str, required_count: int):
-        """Identify gaps in cached data to determine what needs fetching"""
-        # Get the most recent cached complete data
-        latest_complete = (
-            cls.query.filter(
-                cls.symbol == symbol,
-                cls.timeframe == timeframe,
-                cls.is_complete.is_(True),
-                cls.expires_at > db_now(),
+    def get_series_freshness(cls, series: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Summarize cached klines for many symbol/timeframe series with a single aggregate query.
+
+        Args:
+            series: List of (symbol, timeframe) pairs to summarize
+
+        Returns:
+            dict: {(symbol, timeframe): summary} with an entry for every requested pair.
+            Each summary has total_count, complete_count, oldest_complete, latest_complete,
+            latest_timestamp, has_open_candle and current_period_start (timezone-aware UTC).
+        """
+        from sqlalchemy import case, func
+
+        current_time = get_utc_now()
+        requested = list(dict.fromkeys(series))
+        symbols = {symbol for symbol, _ in requested}
+        timeframes = {timeframe for _, timeframe in requested}
+
+        freshness = {}
+        for symbol, timeframe in requested:
+            freshness[(symbol, timeframe)] = {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "total_count": 0,
+                "complete_count": 0,
+                "oldest_complete": None,
+                "latest_complete": None,
+                "latest_timestamp": None,
+                "has_open_candle": False,
+                "current_period_start": floor_to_period(current_time, timeframe),
+            }
+
+        if not requested:
+            return freshness
+
+        complete_ts = case((cls.is_complete.is_(True), cls.timestamp))
+        open_ts = case((cls.is_complete.is_(False), cls.timestamp))
+
+        rows = (
+            db.session.query(
+                cls.symbol,
+                cls.timeframe,
+                func.count(cls.id),
+                func.count(func.distinct(complete_ts)),
+                func.min(complete_ts),
+                func.max(complete_ts),
+                func.max(open_ts),
+                func.max(cls.timestamp),
             )
-            .order_by(cls.timestamp.desc())
-            .first()
+            .filter(
+                cls.symbol.in_(symbols),
+                cls.timeframe.in_(timeframes),
+                cls.expires_at > to_db_utc(current_time),
+            )
+            .group_by(cls.symbol, cls.timeframe)
+            .all()
         )
 
-        if not latest_complete:
+        for symbol, timeframe, total, complete, oldest, latest, latest_open, newest in rows:
+            entry = freshness.get((symbol, timeframe))
+            if entry is None:
+                continue  # Pair not requested (symbol/timeframe IN filters are a superset)
+
+            entry["total_count"] = total or 0
+            entry["complete_count"] = complete or 0
+            entry["oldest_complete"] = normalize_to_utc(oldest) if oldest else None
+            entry["latest_complete"] = normalize_to_utc(latest) if latest else None
+            entry["latest_timestamp"] = normalize_to_utc(newest) if newest else None
+            # Open candle only counts if it belongs to the current period
+            entry["has_open_candle"] = (
+                latest_open is not None
+                and normalize_to_utc(latest_open) == entry["current_period_start"]
+            )
+
+        # Unflushed write-behind open candles count as present
+        for (symbol, timeframe), entry in freshness.items():
+            buffered = open_candle_buffer.get(symbol, timeframe)
+            if buffered and normalize_to_utc(buffered["timestamp"]) == entry["current_period_start"]:
+                entry["has_open_candle"] = True
+                if not entry["latest_timestamp"] or entry["latest_timestamp"] < entry["current_period_start"]:
+                    entry["latest_timestamp"] = entry["current_period_start"]
+
+        return freshness
+
+    @classmethod
+    def plan_fetch(cls, freshness: Optional[Dict], timeframe: str, required_count: int) -> Dict:
+        """
+        Decide what needs fetching for one series from its get_series_freshness summary.
+
+        Returns:
+            dict: needs_fetch, fetch_count, has_cached_data, has_open_candle and
+            (when cached data exists) from_timestamp of the latest complete candle
+        """
+        if not freshness or not freshness.get("latest_complete"):
             # No cached data, need to fetch everything
             return {
                 "needs_fetch": True,
                 "fetch_count": required_count,
                 "has_cached_data": False,
+                "has_open_candle": bool(freshness and freshness.get("has_open_candle")),
             }
 
-        # Count available complete data and find latest timestamp
-        from sqlalchemy import func
-        complete_query = cls.query.filter(
-            cls.symbol == symbol,
-            cls.timeframe == timeframe,
-            cls.is_complete.is_(True),
-            cls.expires_at > db_now(),
-        )
-        
-        available_count = complete_query.with_entities(func.count(func.distinct(cls.timestamp))).scalar()
-        latest_complete = complete_query.order_by(cls.timestamp.desc()).first()
+        has_open_candle = freshness["has_open_candle"]
+        latest_complete_period = floor_to_period(freshness["latest_complete"], timeframe)
 
-        # Calculate time period in seconds
-        period_seconds = {"1h": 3600, "4h": 14400, "1d": 86400}.get(timeframe, 3600)
-        current_time = get_utc_now()
-        current_period_start = floor_to_period(current_time, timeframe)
-        
-        if latest_complete:
-            # Normalize latest complete timestamp to UTC
-            latest_complete_utc = normalize_to_utc(latest_complete.timestamp)
-            latest_complete_period = floor_to_period(latest_complete_utc, timeframe)
-            
-            # Calculate periods elapsed from period start to period start (correct math)
-            time_diff = (current_period_start - latest_complete_period).total_seconds()
-            periods_elapsed = max(0, int(time_diff // period_seconds))
-            
-            # Check if current period's incomplete candle exists
-            current_incomplete = cls.query.filter(
-                cls.symbol == symbol,
-                cls.timeframe == timeframe,
-                cls.timestamp == current_period_start.replace(tzinfo=None),  # Store as naive UTC
-                cls.is_complete.is_(False),
-                cls.expires_at > to_db_utc(current_time),
-            ).first()
-            
-            # If no new periods elapsed and current incomplete exists, no fetch needed
-            if periods_elapsed == 0 and current_incomplete:
-                return {"needs_fetch": False, "fetch_count": 0, "has_cached_data": True}
-            
-            # Calculate how many new candles we need to fetch (fixed: no +1 over-fetching)
-            if periods_elapsed == 0:
-                # Only need current incomplete if it doesn't exist
-                fetch_count = 1 if not current_incomplete else 0
-            else:
-                # Fetch the missing periods (no +1 to avoid over-fetching)
-                fetch_count = min(required_count, periods_elapsed)
-                # Add 1 for current incomplete only if it doesn't exist
-                if not current_incomplete:
-                    fetch_count = min(required_count, fetch_count + 1)
-            
-            if fetch_count == 0:
-                return {"needs_fetch": False, "fetch_count": 0, "has_cached_data": True}
-            
-            return {
-                "needs_fetch": True,
-                "fetch_count": fetch_count,
-                "has_cached_data": True,
-                "from_timestamp": latest_complete.timestamp,
-            }
-        elif available_count >= required_count:
-            # Have enough old data but no recent - fetch just recent periods
-            fetch_count = min(required_count, 5)  # Fetch last 5 periods to get recent data
-            return {
-                "needs_fetch": True,
-                "fetch_count": fetch_count,
-                "has_cached_data": True,
-            }
+        # Calculate periods elapsed from period start to period start
+        time_diff = (freshness["current_period_start"] - latest_complete_period).total_seconds()
+        periods_elapsed = max(0, int(time_diff // get_timeframe_seconds(timeframe)))
+
+        if periods_elapsed == 0:
+            # Only need current incomplete candle if it doesn't exist
+            fetch_count = 0 if has_open_candle else 1
         else:
-            # Need to fetch additional data
-            missing_count = (
-                required_count - available_count + 1
-            )  # +1 for current incomplete candle
+            # Fetch the missing periods, plus the current incomplete one if it doesn't exist
+            fetch_count = min(required_count, periods_elapsed)
+            if not has_open_candle:
+                fetch_count = min(required_count, fetch_count + 1)
+
+        if fetch_count == 0:
             return {
-                "needs_fetch": True,
-                "fetch_count": missing_count,
+                "needs_fetch": False,
+                "fetch_count": 0,
                 "has_cached_data": True,
+                "has_open_candle": has_open_candle,
             }
 
+        return {
+            "needs_fetch": True,
+            "fetch_count": fetch_count,
+            "has_cached_data": True,
+            "has_open_candle": has_open_candle,
+            "from_timestamp": to_db_utc(freshness["latest_complete"]),
+        }
+
     @classmethod
-    def cleanup_expired(cls):
-        """Remove expired klines cache entries and promote completed incomplete candles"""
+    def get_data_gaps(cls, symbol: str, timeframe: str, required_count: int):
+        """Identify gaps in cached data to determine what needs fetching"""
+        freshness = cls.get_series_freshness([(symbol, timeframe)])
+        return cls.plan_fetch(freshness[(symbol, timeframe)], timeframe, required_count)
+
+    @classmethod
+    def cleanup_expired(cls, delete_expired: bool = True):
+        """Remove expired klines cache entries and promote completed incomplete candles
+
+        delete_expired=False only promotes candles - used when retention is handled by
+        dropping whole partitions (reads already skip expired rows)
+        """
         current_time = get_utc_now()
         current_time_naive = current_time.replace(tzinfo=None)
         
@@ -1294,6 +1408,10 @@ class KlinesCache(db.Model):
                 promoted_count += 1
                 logging.info(f"KLINES-FIX: Promoted expired incomplete candle to complete: {candle.symbol} {candle.timeframe} {candle.timestamp}")
         
+        if not delete_expired:
+            db.session.commit()
+            return 0
+
         # Now delete only candles that are truly expired (complete candles past retention or incomplete candles still in current period)
         expired_count = cls.query.filter(
             cls.expires_at <= current_time_naive,
@@ -1331,6 +1449,12 @@ class KlinesCache(db.Model):
             int: Number of candles deleted
         """
         from config import RollingWindowConfig
+        from .klines_partitioning import is_klines_partitioned
+        
+        # Partitioned storage: retention drops whole monthly partitions (drop_expired_partitions),
+        # so row deletes here would only add the churn bloat partitioning avoids
+        if is_klines_partitioned():
+            return 0
         
         try:
             # Count ALL candles for this symbol/timeframe
@@ -1389,7 +1513,7 @@ class KlinesCache(db.Model):
                     else:  # 1d
                         min_age_hours = 168  # Don't delete daily candles less than 7 days old
                         
-                    age_hours = (current_time - candle.timestamp).total_seconds() / 3600
+                    age_hours = (current_time - normalize_to_utc(candle.timestamp)).total_seconds() / 3600
                     if age_hours >= min_age_hours:
                         safe_candles.append(candle)
                         
@@ -1522,11 +1646,7 @@ class KlinesCache(db.Model):
         """
         try:
             # Calculate the expected interval in seconds
-            interval_seconds = {
-                "1h": 3600,      # 1 hour
-                "4h": 14400,     # 4 hours  
-                "1d": 86400,     # 1 day
-            }.get(timeframe, 3600)
+            interval_seconds = get_timeframe_seconds(timeframe)
             
             # Get cutoff time for analysis
             cutoff_time = get_utc_now() - timedelta(days=days_back)
@@ -1607,6 +1727,71 @@ class KlinesCache(db.Model):
                 "status": "error"
             }
 
+    @classmethod
+    def get_missing_ranges(cls, symbol: str, timeframe: str, start: datetime, end: Optional[datetime] = None) -> List[Tuple[datetime, datetime]]:
+        """
+        Missing complete-candle ranges of a series between start and end.
+        
+        Unlike detect_gaps this also reports the head (before the first cached candle) and
+        the tail (up to the current open candle), so the result is exactly what a backfill
+        has to fetch.
+        
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe ('15m', '1h', '4h', '1d')
+            start: First candle open time wanted (floored to the period)
+            end: Exclusive end (defaults to, and is capped at, the current open candle)
+            
+        Returns:
+            List of (range_start, range_end) naive UTC pairs, range_end exclusive
+        """
+        period = timedelta(seconds=get_timeframe_seconds(timeframe))
+        current_period_start = to_db_utc(floor_to_period(get_utc_now(), timeframe))
+        range_start = to_db_utc(floor_to_period(start, timeframe))
+        range_end = min(to_db_utc(end), current_period_start) if end else current_period_start
+        if range_start >= range_end:
+            return []
+        
+        cached = db.session.query(cls.timestamp).filter(
+            cls.symbol == symbol,
+            cls.timeframe == timeframe,
+            cls.is_complete == True,
+            cls.timestamp >= range_start,
+            cls.timestamp < range_end
+        ).order_by(cls.timestamp.asc())
+        
+        missing = []
+        expected = range_start
+        for (timestamp,) in cached:
+            if timestamp > expected:
+                missing.append((expected, timestamp))
+            expected = max(expected, timestamp + period)
+        if expected < range_end:
+            missing.append((expected, range_end))
+        return missing
+
+    @classmethod
+    def count_recent_complete(cls, symbol: str, timeframe: str, periods: int) -> Tuple[int, int]:
+        """
+        Count complete candles in the most recent `periods` closed periods of a series.
+
+        A single indexed COUNT - cheap enough to run around every rolling-window cleanup
+        to prove the cleanup left the recent window intact.
+
+        Returns:
+            (cached, expected) complete-candle counts for the window
+        """
+        current_period_start = to_db_utc(floor_to_period(get_utc_now(), timeframe))
+        window_start = current_period_start - timedelta(seconds=get_timeframe_seconds(timeframe) * periods)
+        cached = cls.query.filter(
+            cls.symbol == symbol,
+            cls.timeframe == timeframe,
+            cls.is_complete == True,
+            cls.timestamp >= window_start,
+            cls.timestamp < current_period_start
+        ).count()
+        return cached, periods
+
     @classmethod
     def detect_all_gaps(cls, days_back: int = 7, symbols: "Optional[List[str]]" = None, timeframes: "Optional[List[str]]" = None) -> Dict:
         """
@@ -1696,3 +1881,483 @@ class KlinesCache(db.Model):
 
     def __repr__(self):
         return f"<KlinesCache {self.symbol}:{self.timeframe} @ {self.timestamp}>"
+
+
+class OpenCandleWriteBuffer:
+    """
+    Write-behind buffer for open-candle refreshes.
+
+    update_open_candle coalesces updates per symbol/timeframe in memory (highest high,
+    lowest low, latest close/volume) and the buffer flushes all series in one batched
+    upsert every few seconds, or immediately when a candle closes. KlinesCache reads
+    overlay buffered candles so callers never see stale open candles.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._pending: Dict[Tuple[str, str], Dict] = {}
+        self._closed: List[Dict] = []  # Candles whose period ended - flushed right away
+        self._last_flush = time.time()
+        self._flush_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.stats = {"updates": 0, "flushes": 0, "rows_flushed": 0, "flush_errors": 0}
+
+    @staticmethod
+    def _flush_interval() -> float:
+        from config import CacheConfig
+
+        return CacheConfig.OPEN_CANDLE_FLUSH_INTERVAL
+
+    def put(self, symbol: str, timeframe: str, candle: Dict) -> None:
+        """Coalesce one open-candle refresh and flush if due (caller must hold an app context)"""
+        key = (symbol, timeframe)
+        with self.lock:
+            self.stats["updates"] += 1
+            entry = self._pending.get(key)
+
+            if entry and entry["timestamp"] == candle["timestamp"]:
+                entry["high"] = max(entry["high"], candle["high"])
+                entry["low"] = min(entry["low"], candle["low"])
+                entry["close"] = candle["close"]
+                entry["volume"] = candle["volume"]
+                entry["expires_at"] = candle["expires_at"]
+                entry["created_at"] = candle["created_at"]
+                entry["is_complete"] = entry["is_complete"] or candle["is_complete"]
+            else:
+                if entry and entry["timestamp"] < candle["timestamp"]:
+                    # Previous candle closed - it must reach the database now
+                    self._closed.append(entry)
+                elif entry:
+                    # Late update for an older candle than the buffered one - write it through
+                    self._closed.append(candle)
+                    candle = entry
+                self._pending[key] = dict(candle)
+
+            flush_due = (
+                bool(self._closed)
+                or self._pending[key]["is_complete"]
+                or time.time() - self._last_flush >= self._flush_interval()
+            )
+
+        if flush_due:
+            self.flush()
+
+    def get(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        """Get the buffered (not yet flushed) candle for a series"""
+        with self.lock:
+            entry = self._pending.get((symbol, timeframe))
+            return dict(entry) if entry else None
+
+    def discard(self, symbol: str, timeframe: str, timestamps) -> None:
+        """Drop a buffered candle superseded by a fresher batch write of the same timestamp"""
+        with self.lock:
+            entry = self._pending.get((symbol, timeframe))
+            if entry and entry["timestamp"] in timestamps:
+                del self._pending[(symbol, timeframe)]
+
+    def overlay(self, candle: Dict, entry: Dict) -> Dict:
+        """Merge a buffered entry onto a stored candle dict the same way the flush upsert does"""
+        return {
+            "timestamp": candle["timestamp"],
+            "open": candle["open"],
+            "high": max(candle["high"], entry["high"]),
+            "low": min(candle["low"], entry["low"]),
+            "close": entry["close"],
+            "volume": entry["volume"],
+        }
+
+    def _requeue(self, row: Dict) -> None:
+        """Put back a candle whose flush failed without losing it or newer buffered data (caller holds lock)"""
+        key = (row["symbol"], row["timeframe"])
+        entry = self._pending.get(key)
+
+        if entry is None:
+            self._pending[key] = row
+        elif entry["timestamp"] == row["timestamp"]:
+            # Same candle refreshed while flushing - the buffered entry holds the latest close/volume
+            entry["high"] = max(entry["high"], row["high"])
+            entry["low"] = min(entry["low"], row["low"])
+            entry["is_complete"] = entry["is_complete"] or row["is_complete"]
+        elif entry["timestamp"] < row["timestamp"]:
+            self._closed.append(entry)
+            self._pending[key] = row
+        else:
+            # Older candle (closed or late update) - retry it on the next flush
+            self._closed.append(row)
+
+    def flush(self) -> int:
+        """Write all buffered candles in one batched upsert (requires app context)"""
+        with self.lock:
+            rows = self._closed + list(self._pending.values())
+            self._closed = []
+            self._pending = {}
+            self._last_flush = time.time()
+
+        if not rows:
+            return 0
+
+        try:
+            KlinesCache.upsert_open_candles(rows)
+        except Exception as e:
+            logging.error(f"Open candle buffer flush failed ({len(rows)} candles), re-queueing: {e}")
+            db.session.rollback()
+            with self.lock:
+                self.stats["flush_errors"] += 1
+                for row in rows:
+                    self._requeue(row)
+            return 0
+
+        with self.lock:
+            self.stats["flushes"] += 1
+            self.stats["rows_flushed"] += len(rows)
+        logging.debug(f"Open candle buffer flushed {len(rows)} candles")
+        return len(rows)
+
+    def start(self, app) -> None:
+        """Start the periodic background flusher for this app"""
+        with self.lock:
+            if self._flush_thread and self._flush_thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop, args=(app,), name="OpenCandleWriteBuffer", daemon=True
+            )
+            self._flush_thread.start()
+
+        # Don't lose buffered candles on a clean interpreter shutdown
+        atexit.register(self.stop, app)
+
+    def stop(self, app=None) -> None:
+        """Stop the background flusher and write out anything still buffered"""
+        self._stop_event.set()
+        if app is not None:
+            with app.app_context():
+                self.flush()
+
+    def _flush_loop(self, app) -> None:
+        while not self._stop_event.wait(self._flush_interval()):
+            try:
+                with app.app_context():
+                    self.flush()
+            except Exception as e:
+                logging.error(f"Open candle buffer flush loop error: {e}")
+        logging.info("Open candle buffer flusher stopped")
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {**self.stats, "buffered_series": len(self._pending)}
+
+
+open_candle_buffer = OpenCandleWriteBuffer()
+
+
+class KlinesSeries(db.Model):
+    """Series dictionary for the compact klines schema: one small-integer id per symbol/timeframe"""
+
+    __tablename__ = "klines_series"
+
+    # SMALLINT on PostgreSQL; SQLite only auto-assigns ids for INTEGER primary keys
+    id = db.Column(db.SmallInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    symbol = db.Column(db.String(20), nullable=False)
+    timeframe = db.Column(db.String(10), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("symbol", "timeframe", name="uq_klines_series_symbol_tf"),
+    )
+
+    # Process-wide id lookup cache - series ids never change once assigned
+    _id_cache: Dict[Tuple[str, str], int] = {}
+
+    @classmethod
+    def get_series_id(cls, symbol: str, timeframe: str, create: bool = True) -> Optional[int]:
+        """Get (or create) the small-integer id for a symbol/timeframe series"""
+        key = (symbol, timeframe)
+        series_id = cls._id_cache.get(key)
+        if series_id is not None:
+            return series_id
+
+        series = cls.query.filter_by(symbol=symbol, timeframe=timeframe).first()
+        if series is None:
+            if not create:
+                return None
+            series = cls(symbol=symbol, timeframe=timeframe)
+            db.session.add(series)
+            db.session.commit()  # Commit before caching so a later rollback can't orphan the id
+
+        cls._id_cache[key] = series.id
+        return series.id
+
+    def __repr__(self):
+        return f"<KlinesSeries {self.id} {self.symbol}:{self.timeframe}>"
+
+
+class KlinesCompact(db.Model):
+    """
+    Compact klines schema variant: (series_id SMALLINT, open_time_ms BIGINT) primary key
+    instead of string symbol/timeframe and naive DateTime columns. Keys are 10 bytes
+    per row and timestamps are plain UTC epoch milliseconds, so no timezone
+    normalization is needed on reads or writes.
+    """
+
+    __tablename__ = "klines_compact"
+
+    series_id = db.Column(
+        db.SmallInteger().with_variant(db.Integer, "sqlite"),
+        db.ForeignKey("klines_series.id"),
+        primary_key=True,
+    )
+    open_time_ms = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+
+    # OHLCV data
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    volume = db.Column(db.Float, nullable=False)
+
+    # Cache metadata (epoch ms)
+    expires_at_ms = db.Column(db.BigInteger, nullable=False)
+    is_complete = db.Column(db.Boolean, default=True, nullable=False)
+
+    __table_args__ = (db.Index("idx_klines_compact_expires", "expires_at_ms"),)
+
+    @staticmethod
+    def to_epoch_ms(timestamp) -> int:
+        """Convert a datetime (naive UTC or aware), seconds or milliseconds value to epoch ms"""
+        if isinstance(timestamp, datetime):
+            return int(normalize_to_utc(timestamp).timestamp() * 1000)
+        if isinstance(timestamp, str):
+            return int(normalize_to_utc(datetime.fromisoformat(timestamp.replace("Z", "+00:00"))).timestamp() * 1000)
+        return int(timestamp)
+
+    @staticmethod
+    def now_ms() -> int:
+        return int(get_utc_now().timestamp() * 1000)
+
+    def to_candlestick_dict(self):
+        """Convert to the same candlestick dictionary format as KlinesCache (naive UTC timestamp)"""
+        return {
+            "timestamp": datetime.fromtimestamp(self.open_time_ms / 1000, tz=timezone.utc).replace(tzinfo=None),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+        }
+
+    @classmethod
+    def get_cached_data(cls, symbol: str, timeframe: str, limit: int = 100, include_incomplete: bool = True):
+        """Get the most recent cached candles in chronological order (KlinesCache-compatible)"""
+        series_id = KlinesSeries.get_series_id(symbol, timeframe, create=False)
+        if series_id is None:
+            return []
+
+        query = cls.query.filter(cls.series_id == series_id, cls.expires_at_ms > cls.now_ms())
+        if not include_incomplete:
+            query = query.filter(cls.is_complete.is_(True))
+
+        cached_data = query.order_by(cls.open_time_ms.desc()).limit(limit).all()
+        return [candle.to_candlestick_dict() for candle in reversed(cached_data)]
+
+    @classmethod
+    def get_range(cls, symbol: str, timeframe: str, start_ms: int, end_ms: int) -> List[Dict]:
+        """Range scan of unexpired candles with start_ms <= open time < end_ms"""
+        series_id = KlinesSeries.get_series_id(symbol, timeframe, create=False)
+        if series_id is None:
+            return []
+
+        candles = (
+            cls.query.filter(
+                cls.series_id == series_id,
+                cls.open_time_ms >= start_ms,
+                cls.open_time_ms < end_ms,
+                cls.expires_at_ms > cls.now_ms(),
+            )
+            .order_by(cls.open_time_ms.asc())
+            .all()
+        )
+        return [candle.to_candlestick_dict() for candle in candles]
+
+    @classmethod
+    def save_klines_batch(cls, symbol: str, timeframe: str, candlesticks: list, cache_ttl_minutes: int = 15):
+        """Upsert a batch of candles with the same TTL and never-downgrade rules as KlinesCache"""
+        from sqlalchemy import text
+
+        if not candlesticks:
+            return 0
+
+        series_id = KlinesSeries.get_series_id(symbol, timeframe)
+        now_ms = cls.now_ms()
+        period_ms = get_timeframe_seconds(timeframe) * 1000
+        current_period_start_ms = int(floor_to_period(get_utc_now(), timeframe).timestamp() * 1000)
+
+        rows = []
+        for candle in candlesticks:
+            open_time_ms = cls.to_epoch_ms(candle["timestamp"])
+            is_complete = (open_time_ms // period_ms) * period_ms < current_period_start_ms
+            rows.append(
+                {
+                    "series_id": series_id,
+                    "open_time_ms": open_time_ms,
+                    "open": float(candle["open"]),
+                    "high": float(candle["high"]),
+                    "low": float(candle["low"]),
+                    "close": float(candle["close"]),
+                    "volume": float(candle["volume"]),
+                    # Complete candles cached for 21 days (aligned with KlinesCache retention)
+                    "expires_at_ms": now_ms + (21 * 86400 * 1000 if is_complete else cache_ttl_minutes * 60 * 1000),
+                    "is_complete": is_complete,
+                }
+            )
+
+        if db.engine.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        stmt = insert(cls.__table__)  # type: ignore
+        upsert_stmt = stmt.on_conflict_do_update(
+            index_elements=["series_id", "open_time_ms"],
+            set_={
+                "open": stmt.excluded.open,
+                "high": stmt.excluded.high,
+                "low": stmt.excluded.low,
+                "close": stmt.excluded.close,
+                "volume": stmt.excluded.volume,
+                "expires_at_ms": stmt.excluded.expires_at_ms,
+                # Only promote incomplete→complete, never downgrade
+                "is_complete": text("CASE WHEN klines_compact.is_complete = true THEN true ELSE excluded.is_complete END"),
+            },
+            where=text("klines_compact.is_complete = false OR excluded.is_complete = true"),
+        )
+
+        db.session.execute(upsert_stmt, rows)
+        db.session.commit()
+        return len(rows)
+
+    @classmethod
+    def migrate_from_klines_cache(cls, batch_size: int = 5000) -> Dict:
+        """
+        Copy klines_cache into the compact schema, series by series in id-ordered batches.
+        Re-running is safe: existing rows are upserted.
+
+        Returns:
+            dict: series and rows migrated
+        """
+        from sqlalchemy.dialects import postgresql, sqlite
+
+        insert = sqlite.insert if db.engine.dialect.name == "sqlite" else postgresql.insert
+        results = {"series": 0, "rows": 0}
+
+        series_list = db.session.query(KlinesCache.symbol, KlinesCache.timeframe).distinct().all()
+        for symbol, timeframe in series_list:
+            series_id = KlinesSeries.get_series_id(symbol, timeframe)
+            last_id = 0
+
+            while True:
+                batch = (
+                    KlinesCache.query.filter(
+                        KlinesCache.symbol == symbol,
+                        KlinesCache.timeframe == timeframe,
+                        KlinesCache.id > last_id,
+                    )
+                    .order_by(KlinesCache.id.asc())
+                    .limit(batch_size)
+                    .all()
+                )
+                if not batch:
+                    break
+
+                rows = [
+                    {
+                        "series_id": series_id,
+                        "open_time_ms": cls.to_epoch_ms(candle.timestamp),
+                        "open": candle.open,
+                        "high": candle.high,
+                        "low": candle.low,
+                        "close": candle.close,
+                        "volume": candle.volume,
+                        "expires_at_ms": cls.to_epoch_ms(candle.expires_at),
+                        "is_complete": bool(candle.is_complete),
+                    }
+                    for candle in batch
+                ]
+                stmt = insert(cls.__table__)  # type: ignore
+                db.session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["series_id", "open_time_ms"],
+                        set_={column: getattr(stmt.excluded, column) for column in rows[0] if column not in ("series_id", "open_time_ms")},
+                    ),
+                    rows,
+                )
+                db.session.commit()
+
+                results["rows"] += len(rows)
+                last_id = batch[-1].id
+
+            results["series"] += 1
+            logging.info(f"Compact klines migration: {symbol}:{timeframe} -> series {series_id}")
+
+        return results
+
+    def __repr__(self):
+        return f"<KlinesCompact series={self.series_id} @ {self.open_time_ms}>"
+
+
+class KlinesBackfillCheckpoint(db.Model):
+    """Per-series progress of a paginated klines backfill, so an interrupted backfill resumes"""
+
+    __tablename__ = "klines_backfill_checkpoints"
+
+    id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(20), nullable=False)
+    timeframe = db.Column(db.String(10), nullable=False)
+    target_start = db.Column(db.DateTime, nullable=False)  # Requested window (naive UTC)
+    target_end = db.Column(db.DateTime, nullable=False)
+    pending_ranges = db.Column(db.Text, nullable=False, default="[]")  # JSON [[start_ms, end_ms], ...] still to fetch
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, complete, failed
+    pages_fetched = db.Column(db.Integer, nullable=False, default=0)
+    candles_saved = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("symbol", "timeframe", name="uq_klines_backfill_series"),
+    )
+
+    RESUMABLE_STATUSES = ("pending", "failed")
+
+    @classmethod
+    def get_for_series(cls, symbol: str, timeframe: str) -> Optional["KlinesBackfillCheckpoint"]:
+        return cls.query.filter_by(symbol=symbol, timeframe=timeframe).first()
+
+    @classmethod
+    def get_resumable(cls) -> List["KlinesBackfillCheckpoint"]:
+        return cls.query.filter(cls.status.in_(cls.RESUMABLE_STATUSES)).order_by(cls.updated_at.asc()).all()
+
+    def get_pending_ranges(self) -> List[List[int]]:
+        return json.loads(self.pending_ranges or "[]")
+
+    def set_pending_ranges(self, ranges: List[List[int]]) -> None:
+        self.pending_ranges = json.dumps(ranges)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ranges = self.get_pending_ranges()
+        return {
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "target_start": self.target_start.isoformat() if self.target_start else None,
+            "target_end": self.target_end.isoformat() if self.target_end else None,
+            "status": self.status,
+            "pending_ranges": len(ranges),
+            "resume_from": datetime.fromtimestamp(ranges[0][0] / 1000, tz=timezone.utc).isoformat() if ranges else None,
+            "pages_fetched": self.pages_fetched,
+            "candles_saved": self.candles_saved,
+            "last_error": self.last_error,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f"<KlinesBackfillCheckpoint {self.symbol}:{self.timeframe} {self.status}>"
@@ -0,0 +1,418 @@
+"""
+Price Hub - central price feed with in-memory reads
+
+get_live_market_price used to resolve prices on the caller's thread: on a cache miss
+the position monitors, SMC signal endpoints and position handlers could look up user
+credentials, build an exchange client and fan out HTTP calls. Now one background
+producer per process keeps the latest price, timestamp and source for every tracked
+symbol, and every other code path only reads memory:
+- get_tick / get_price / get_prices: O(1) dict reads with an explicit max_age; a tick
+  older than max_age reads as missing
+- a read for an unknown symbol starts tracking it and wakes the producer; the reader may
+  wait (wait=seconds) for the first tick but never performs upstream I/O itself. Only a
+  symbol the hub has never priced waits - a stale one returns at once (as None, or the
+  stale tick when stale_max_age allows it). Symbols that do not look like trading pairs,
+  or arrive once PriceHubConfig.MAX_DEMAND_SYMBOLS are already demanded, are not tracked
+- subscribe(callback): called with each new tick on the producer thread
+- wait_for_update / ticks_since: version counter for streaming consumers; it only moves
+  when a price changes (a re-fetch of the same price refreshes the tick's timestamp)
+
+Tracked symbols are the pinned set (TradingConfig.SUPPORTED_SYMBOLS), whatever the
+registered symbol providers return (open positions) and symbols read within
+PriceHubConfig.DEMAND_TTL. The fetcher registered by the app does the upstream work.
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Import configuration constants
+try:
+    from config import PriceHubConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import PriceHubConfig
+
+# symbol -> (price, source) or (price, source, fetched_at epoch seconds)
+PriceFetcher = Callable[[List[str]], Dict[str, Tuple]]
+TickListener = Callable[["PriceTick"], None]
+
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{2,20}$")
+
+
+class PriceTick:
+    """Immutable latest-price record for one symbol"""
+
+    __slots__ = ("symbol", "price", "source", "timestamp", "version")
+
+    def __init__(self, symbol: str, price: float, source: str, timestamp: float, version: int):
+        self.symbol = symbol
+        self.price = price
+        self.source = source
+        self.timestamp = timestamp
+        self.version = version
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.timestamp
+
+    def to_dict(self) -> Dict:
+        return {
+            "symbol": self.symbol,
+            "price": self.price,
+            "source": self.source,
+            "timestamp": self.timestamp,
+            "age_seconds": round(self.age(), 3),
+            "version": self.version,
+        }
+
+
+class PriceHub:
+    """
+    Latest price per symbol, kept current by a single background producer
+    """
+
+    def __init__(self):
+        self._ticks: Dict[str, PriceTick] = {}
+        self._pinned: set = set()
+        self._demand: Dict[str, float] = {}  # symbol -> last read (epoch seconds)
+        self._symbol_providers: List[Callable[[], Iterable[str]]] = []
+        self._fetcher: Optional[PriceFetcher] = None
+        self._listeners: Dict[int, TickListener] = {}
+        self._next_listener_id = 1
+
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._tracked_count = 0  # symbols in the last producer pass
+        self.version = 0
+
+        self.stats = {
+            "cycles": 0,
+            "ticks_published": 0,
+            "unchanged_ticks": 0,
+            "demand_rejected": 0,
+            "fetch_errors": 0,
+            "unresolved": 0,
+            "last_cycle_seconds": None,
+            "last_cycle_at": None,
+            "reads": 0,
+            "stale_reads": 0,
+            "stale_fallbacks": 0,
+        }
+
+    # ---- setup -----------------------------------------------------------
+
+    def configure(
+        self,
+        fetcher: PriceFetcher,
+        pinned: Optional[Iterable[str]] = None,
+        symbol_providers: Optional[List[Callable[[], Iterable[str]]]] = None,
+    ) -> None:
+        """
+        Register the upstream fetcher and the symbols the producer always tracks
+
+        Args:
+            fetcher: Resolves a list of symbols to {symbol: (price, source[, fetched_at])} (runs on the producer thread)
+            pinned: Symbols tracked regardless of demand
+            symbol_providers: Callables returning further symbols to track (e.g. open positions)
+        """
+        self._fetcher = fetcher
+        self._pinned = {symbol.upper() for symbol in (pinned or [])}
+        self._symbol_providers = list(symbol_providers or [])
+
+    def start(self) -> None:
+        """Start the producer thread (also restarted lazily after a fork)"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="PriceHubProducer", daemon=True)
+            self._thread.start()
+        logging.info(f"PRICE-HUB: Producer started (refresh every {PriceHubConfig.REFRESH_INTERVAL}s)")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+
+    def _ensure_running(self) -> None:
+        thread = self._thread
+        if self._fetcher is not None and (thread is None or self._pid != os.getpid() or not thread.is_alive()):
+            self.start()
+
+    # ---- reads (no upstream I/O) -----------------------------------------
+
+    def track(self, symbols: Iterable[str]) -> None:
+        """Mark symbols as wanted; new ones wake the producer (malformed or over-cap symbols are ignored)"""
+        now = time.time()
+        new_symbol = False
+        with self._lock:
+            for symbol in symbols:
+                if symbol in self._pinned:
+                    continue
+                if symbol not in self._demand:
+                    if not self._accepts_demand(symbol, now):
+                        self.stats["demand_rejected"] += 1
+                        continue
+                    new_symbol = True
+                self._demand[symbol] = now
+        if new_symbol:
+            self._wake.set()
+
+    def is_tracked(self, symbol: str) -> bool:
+        return symbol in self._pinned or symbol in self._demand or symbol in self._ticks
+
+    def _accepts_demand(self, symbol: str, now: float) -> bool:
+        """Whether a new reader-requested symbol may join the demand set (caller holds _lock)"""
+        if not SYMBOL_PATTERN.match(symbol):
+            return False
+        if len(self._demand) < PriceHubConfig.MAX_DEMAND_SYMBOLS:
+            return True
+        self._expire_demand(now)
+        return len(self._demand) < PriceHubConfig.MAX_DEMAND_SYMBOLS
+
+    def _expire_demand(self, now: float) -> None:
+        cutoff = now - PriceHubConfig.DEMAND_TTL
+        for symbol, last_read in list(self._demand.items()):
+            if last_read < cutoff:
+                self._demand.pop(symbol, None)
+
+    def get_tick(
+        self,
+        symbol: str,
+        max_age: Optional[float] = None,
+        wait: float = 0.0,
+        stale_max_age: Optional[float] = None,
+    ) -> Optional[PriceTick]:
+        """
+        Latest tick for a symbol, or None if there is none fresher than max_age
+
+        Args:
+            symbol: Trading symbol (e.g. 'BTCUSDT')
+            max_age: Maximum staleness in seconds (default PriceHubConfig.DEFAULT_MAX_AGE)
+            wait: Seconds to wait for the producer when the symbol has never been priced
+            stale_max_age: Accept an older tick up to this age instead of None (no waiting)
+        """
+        symbol = symbol.upper()
+        max_age = PriceHubConfig.DEFAULT_MAX_AGE if max_age is None else max_age
+        self.stats["reads"] += 1
+        self.track((symbol,))
+
+        tick = self._ticks.get(symbol)
+        if tick is not None and tick.age() <= max_age:
+            return tick
+
+        if tick is not None:
+            # Already priced - the producer refreshes it on its own cadence, don't block on it
+            self._ensure_running()
+            if stale_max_age is not None and tick.age() <= stale_max_age:
+                self.stats["stale_fallbacks"] += 1
+                return tick
+        elif wait > 0 and self.is_tracked(symbol):
+            self._ensure_running()
+            self._wake.set()
+            deadline = time.time() + wait
+            with self._updated:
+                while True:
+                    tick = self._ticks.get(symbol)
+                    if tick is not None and tick.age() <= max_age:
+                        return tick
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._updated.wait(remaining)
+
+        self.stats["stale_reads"] += 1
+        return None
+
+    def get_price(
+        self,
+        symbol: str,
+        max_age: Optional[float] = None,
+        wait: float = 0.0,
+        stale_max_age: Optional[float] = None,
+    ) -> Optional[float]:
+        """Latest price fresher than max_age (or stale_max_age as a fallback), or None"""
+        tick = self.get_tick(symbol, max_age=max_age, wait=wait, stale_max_age=stale_max_age)
+        return tick.price if tick is not None else None
+
+    def get_prices(
+        self,
+        symbols: Iterable[str],
+        max_age: Optional[float] = None,
+        wait: float = 0.0,
+        stale_max_age: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """Latest prices fresher than max_age for several symbols (missing symbols are omitted)
+
+        All never-priced symbols share one wait deadline, so a batch blocks at most wait seconds.
+        """
+        symbols = [symbol.upper() for symbol in dict.fromkeys(symbols)]
+        self.track(symbols)
+        deadline = time.time() + wait
+        prices = {}
+        for symbol in symbols:
+            tick = self.get_tick(
+                symbol,
+                max_age=max_age,
+                wait=max(0.0, deadline - time.time()),
+                stale_max_age=stale_max_age,
+            )
+            if tick is not None:
+                prices[symbol] = tick.price
+        return prices
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, PriceTick]:
+        """Current ticks (all, or the given symbols) without touching demand"""
+        if symbols is None:
+            return dict(self._ticks)
+        return {symbol: self._ticks[symbol] for symbol in symbols if symbol in self._ticks}
+
+    # ---- updates ---------------------------------------------------------
+
+    def publish(self, symbol: str, price: float, source: str, timestamp: Optional[float] = None) -> PriceTick:
+        """Store a new tick and notify subscribers and waiting readers
+
+        The version only moves when the price changes; an unchanged price refreshes the
+        tick's timestamp and source under its existing version.
+        """
+        symbol = symbol.upper()
+        price = float(price)
+        with self._updated:
+            current = self._ticks.get(symbol)
+            if current is not None and current.price == price:
+                version = current.version
+                self.stats["unchanged_ticks"] += 1
+            else:
+                self.version += 1
+                version = self.version
+            tick = PriceTick(symbol, price, source, timestamp or time.time(), version)
+            self._ticks[tick.symbol] = tick
+            self.stats["ticks_published"] += 1
+            self._updated.notify_all()
+            listeners = list(self._listeners.values())
+
+        for listener in listeners:
+            try:
+                listener(tick)
+            except Exception as e:
+                logging.error(f"PRICE-HUB: Subscriber failed for {tick.symbol}: {e}")
+        return tick
+
+    def subscribe(self, listener: TickListener) -> int:
+        """Call listener(tick) for every new tick; returns a token for unsubscribe()"""
+        with self._lock:
+            token = self._next_listener_id
+            self._next_listener_id += 1
+            self._listeners[token] = listener
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        with self._lock:
+            self._listeners.pop(token, None)
+
+    def wait_for_update(self, after_version: int, timeout: float) -> int:
+        """Block until a tick newer than after_version is published (or timeout); returns the version"""
+        with self._updated:
+            self._updated.wait_for(lambda: self.version > after_version, timeout)
+            return self.version
+
+    def ticks_since(self, after_version: int, symbols: Optional[Iterable[str]] = None) -> Dict[str, PriceTick]:
+        """Ticks published after a version (optionally limited to symbols)"""
+        ticks = self._ticks if symbols is None else self.snapshot(symbols)
+        return {symbol: tick for symbol, tick in list(ticks.items()) if tick.version > after_version}
+
+    # ---- producer --------------------------------------------------------
+
+    def tracked_symbols(self) -> List[str]:
+        """Pinned, provider and recently-read symbols (expired demand is dropped)"""
+        symbols = set(self._pinned)
+        for provider in self._symbol_providers:
+            try:
+                symbols.update(symbol.upper() for symbol in provider() if symbol)
+            except Exception as e:
+                logging.warning(f"PRICE-HUB: Symbol provider failed: {e}")
+
+        with self._lock:
+            self._expire_demand(time.time())
+            symbols.update(self._demand)
+        return sorted(symbols)
+
+    def refresh(self) -> int:
+        """One producer pass over every tracked symbol; returns the number of ticks published"""
+        if self._fetcher is None:
+            return 0
+        symbols = self.tracked_symbols()
+        self._tracked_count = len(symbols)
+        if not symbols:
+            return 0
+
+        started = time.time()
+        try:
+            results = self._fetcher(symbols)
+        except Exception as e:
+            self.stats["fetch_errors"] += 1
+            logging.warning(f"PRICE-HUB: Fetch for {len(symbols)} symbols failed: {e}")
+            results = {}
+
+        published = 0
+        for symbol, result in results.items():
+            price, source = result[0], result[1]
+            fetched_at = result[2] if len(result) > 2 else None
+            current = self._ticks.get(symbol.upper())
+            if fetched_at and current is not None and current.timestamp >= fetched_at:
+                published += 1  # already holds this fetch (e.g. from the shared cache)
+                continue
+            if price:
+                self.publish(symbol, price, source, timestamp=fetched_at)
+                published += 1
+
+        unresolved = len(symbols) - published
+        self.stats["unresolved"] += unresolved
+        if unresolved:
+            logging.debug(f"PRICE-HUB: {unresolved}/{len(symbols)} symbols unresolved this pass")
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_seconds"] = round(time.time() - started, 3)
+        self.stats["last_cycle_at"] = started
+        return published
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            started = time.time()
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"PRICE-HUB: Producer pass failed: {e}")
+            self._wake.wait(max(0.0, PriceHubConfig.REFRESH_INTERVAL - (time.time() - started)))
+            self._wake.clear()
+
+    # ---- status ----------------------------------------------------------
+
+    def get_status(self) -> Dict:
+        """Producer state as of the last pass (a read-only view - runs no providers)"""
+        now = time.time()
+        return {
+            "running": self._thread is not None and self._pid == os.getpid() and self._thread.is_alive(),
+            "refresh_interval": PriceHubConfig.REFRESH_INTERVAL,
+            "version": self.version,
+            "tracked": self._tracked_count,
+            "pinned": len(self._pinned),
+            "demanded": len(self._demand),
+            "subscribers": len(self._listeners),
+            "ticks": {
+                symbol: {"price": tick.price, "source": tick.source, "age_seconds": round(tick.age(now), 1)}
+                for symbol, tick in sorted(self._ticks.items())
+            },
+            **self.stats,
+        }
+
+
+# Global hub shared by the price readers and the producer
+price_hub = PriceHub()
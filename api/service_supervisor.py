@@ -0,0 +1,263 @@
+"""
+Service Supervisor - heartbeat liveness for the background service loops
+
+/api/health used to restart UnifiedDataSyncService on every uptime ping, tearing the
+worker down mid-fetch whether it was healthy or not. Background loops now report
+heartbeat(name, next_within=...) while they work - a promise that the next heartbeat
+follows within next_within seconds (the wait until the next cycle, or the time a phase
+may take). A daemon thread compares those deadlines with the clock and restarts only a
+service that is supposed to be running, missed its deadline by more than
+SupervisorConfig.STALL_GRACE_SECONDS and is not inside its restart cooldown/budget.
+
+Services also register a reconfigure callable, so intervals and symbol lists change at
+runtime through reconfigure(name, **changes) without restarting the loop. Liveness is
+per process - with leader election only the leader runs (and heartbeats) a service.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+# Import configuration constants
+try:
+    from config import SupervisorConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import SupervisorConfig
+
+STATE_ALIVE = "alive"
+STATE_STALLED = "stalled"
+STATE_STOPPED = "stopped"
+STATE_UNKNOWN = "unknown"  # running but no heartbeat reported yet
+
+
+class _Heartbeat:
+    def __init__(self, at: float, next_within: float, phase: Optional[str], details: Dict[str, Any]):
+        self.at = at
+        self.deadline = at + next_within
+        self.phase = phase
+        self.details = details
+        self.count = 1
+
+
+class _SupervisedService:
+    def __init__(
+        self,
+        name: str,
+        restart: Callable[[], Any],
+        is_running: Callable[[], bool],
+        reconfigure: Optional[Callable[..., Dict]],
+        get_config: Optional[Callable[[], Dict]],
+    ):
+        self.name = name
+        self.restart = restart
+        self.is_running = is_running
+        self.reconfigure = reconfigure
+        self.get_config = get_config
+        self.restarts: Deque[float] = deque()
+        self.restart_count = 0
+        self.last_restart: Optional[float] = None
+        self.last_stall: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class ServiceSupervisor:
+    """
+    Heartbeat registry plus a checker thread that restarts stalled services
+    """
+
+    def __init__(self):
+        self.enabled = SupervisorConfig.ENABLED
+        self._services: Dict[str, _SupervisedService] = {}
+        self._heartbeats: Dict[str, _Heartbeat] = {}
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def register(
+        self,
+        name: str,
+        restart: Callable[[], Any],
+        is_running: Callable[[], bool],
+        reconfigure: Optional[Callable[..., Dict]] = None,
+        get_config: Optional[Callable[[], Dict]] = None,
+    ) -> None:
+        """
+        Register a background service for liveness supervision
+
+        Args:
+            name: Service name (same name the loop uses for heartbeat())
+            restart: Restarts the service in this process
+            is_running: True while the service is supposed to be looping here
+            reconfigure: Optional callable applying runtime changes, returns the new config
+            get_config: Optional callable returning the current runtime config
+        """
+        with self._lock:
+            self._services[name] = _SupervisedService(name, restart, is_running, reconfigure, get_config)
+
+    def heartbeat(self, name: str, next_within: Optional[float] = None, phase: Optional[str] = None, **details) -> None:
+        """Report progress; the next heartbeat is due within next_within seconds"""
+        now = time.time()
+        next_within = SupervisorConfig.HEARTBEAT_TIMEOUT if next_within is None else max(0.0, next_within)
+        with self._lock:
+            previous = self._heartbeats.get(name)
+            heartbeat = _Heartbeat(now, next_within, phase, details)
+            if previous is not None:
+                heartbeat.count = previous.count + 1
+            self._heartbeats[name] = heartbeat
+
+    # ---- checker thread --------------------------------------------------
+
+    def start(self) -> None:
+        """Start the checker thread (liveness is still reported when restarts are disabled)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="ServiceSupervisor", daemon=True)
+            self._thread.start()
+        logging.info(
+            f"SUPERVISOR: Watching {len(self._services)} services every {SupervisorConfig.CHECK_INTERVAL}s "
+            f"(restarts {'enabled' if self.enabled else 'disabled'})"
+        )
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(SupervisorConfig.CHECK_INTERVAL):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"SUPERVISOR: Liveness check failed: {e}")
+
+    def check(self) -> Dict[str, str]:
+        """One liveness pass; restarts stalled services and returns every service's state"""
+        states = {}
+        for name, service in list(self._services.items()):
+            state = self._state(service)
+            states[name] = state
+            if state == STATE_STALLED:
+                self._handle_stall(service)
+        return states
+
+    def _state(self, service: _SupervisedService, now: Optional[float] = None) -> str:
+        try:
+            running = bool(service.is_running())
+        except Exception as e:
+            service.last_error = str(e)
+            return STATE_UNKNOWN
+        if not running:
+            return STATE_STOPPED
+
+        heartbeat = self._heartbeats.get(service.name)
+        if heartbeat is None:
+            return STATE_UNKNOWN
+        now = now if now is not None else time.time()
+        return STATE_STALLED if now > heartbeat.deadline + SupervisorConfig.STALL_GRACE_SECONDS else STATE_ALIVE
+
+    def _handle_stall(self, service: _SupervisedService) -> None:
+        now = time.time()
+        heartbeat = self._heartbeats.get(service.name)
+        if service.last_stall is None or (heartbeat and service.last_stall < heartbeat.at):
+            logging.error(
+                f"SUPERVISOR: {service.name} stalled - last heartbeat {now - heartbeat.at:.0f}s ago "
+                f"in phase {heartbeat.phase or 'unknown'}"
+            )
+        service.last_stall = now
+
+        if not self.enabled:
+            return
+        if service.last_restart is not None and now - service.last_restart < SupervisorConfig.RESTART_COOLDOWN_SECONDS:
+            return
+        while service.restarts and now - service.restarts[0] > 3600:
+            service.restarts.popleft()
+        if len(service.restarts) >= SupervisorConfig.MAX_RESTARTS_PER_HOUR:
+            logging.error(
+                f"SUPERVISOR: {service.name} restarted {len(service.restarts)} times in the last hour - "
+                f"not restarting again, needs attention"
+            )
+            return
+
+        logging.warning(f"SUPERVISOR: Restarting stalled service {service.name}")
+        service.restarts.append(now)
+        service.restart_count += 1
+        service.last_restart = now
+        try:
+            service.restart()
+            service.last_error = None
+        except Exception as e:
+            service.last_error = str(e)
+            logging.error(f"SUPERVISOR: Restart of {service.name} failed: {e}")
+
+    # ---- runtime configuration -------------------------------------------
+
+    def reconfigure(self, name: str, **changes) -> Dict:
+        """
+        Apply runtime changes (intervals, symbol lists) to a running service without restarting it
+
+        Raises:
+            KeyError: Unknown service
+            ValueError: Service does not support runtime changes, or invalid values
+        """
+        service = self._services.get(name)
+        if service is None:
+            raise KeyError(name)
+        if service.reconfigure is None:
+            raise ValueError(f"{name} does not support runtime configuration")
+        config = service.reconfigure(**changes)
+        logging.info(f"SUPERVISOR: Reconfigured {name}: {changes}")
+        return config
+
+    # ---- status ----------------------------------------------------------
+
+    def get_liveness(self) -> Dict[str, str]:
+        """State of every registered service (alive / stalled / stopped / unknown)"""
+        return {name: self._state(service) for name, service in list(self._services.items())}
+
+    def get_service_status(self, name: str) -> Dict:
+        service = self._services.get(name)
+        if service is None:
+            return {"registered": False}
+
+        now = time.time()
+        heartbeat = self._heartbeats.get(name)
+        status = {
+            "registered": True,
+            "state": self._state(service, now),
+            "last_heartbeat": datetime.utcfromtimestamp(heartbeat.at).isoformat() if heartbeat else None,
+            "heartbeat_age_seconds": round(now - heartbeat.at, 1) if heartbeat else None,
+            "next_heartbeat_due_in": round(heartbeat.deadline - now, 1) if heartbeat else None,
+            "phase": heartbeat.phase if heartbeat else None,
+            "details": heartbeat.details if heartbeat else {},
+            "heartbeats": heartbeat.count if heartbeat else 0,
+            "restarts": service.restart_count,
+            "last_restart": datetime.utcfromtimestamp(service.last_restart).isoformat() if service.last_restart else None,
+            "last_error": service.last_error,
+        }
+        if service.get_config is not None:
+            try:
+                status["config"] = service.get_config()
+            except Exception as e:
+                status["config"] = {"error": str(e)}
+        return status
+
+    def get_status(self) -> Dict:
+        """Liveness of every registered service in this process"""
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "pid": os.getpid(),
+            "check_interval": SupervisorConfig.CHECK_INTERVAL,
+            "stall_grace_seconds": SupervisorConfig.STALL_GRACE_SECONDS,
+            "services": {name: self.get_service_status(name) for name in list(self._services)},
+        }
+
+
+# Global supervisor shared by the background services and the health endpoints
+service_supervisor = ServiceSupervisor()
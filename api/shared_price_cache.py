@@ -0,0 +1,352 @@
+"""
+Shared Price Cache - optional cross-worker backend for enhanced_cache prices
+
+SmartCache keeps prices in a per-process dict, so under gunicorn every worker fetched
+and cached the same prices and each worker's volatility view drifted on its own. With
+SharedPriceCacheConfig.BACKEND set, enhanced_cache.set_price also writes the entry
+(price, source, timestamp, TTL, volatility) to a backend all workers read, and
+get_price returns the newest of the shared and local entries:
+- "mmap": fixed slot table in a shared memory file for single-host deployments. Writers
+  serialise on an fcntl lock and bump a per-slot sequence number around each write
+  (seqlock); readers take no lock and retry while a sequence is odd or changed. The file
+  name carries the layout version and slot count, so a deploy with a different layout
+  opens a new file; an existing file is never resized under workers that have it mapped.
+- "postgres": UNLOGGED table for multi-host deployments (no WAL, emptied on crash
+  recovery - prices are refetched within seconds anyway). Reads go through a short
+  per-process cache (PG_READ_TTL) so hot symbols cost one query per TTL per worker.
+
+Writes only replace an entry with a newer timestamp, so re-caching a price another
+worker published does not make it look fresh again. get_price/set_price keep their
+signatures; without a backend nothing changes.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - no flock, the mmap backend is unavailable
+    fcntl = None
+
+# Import configuration constants
+try:
+    from config import SharedPriceCacheConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import SharedPriceCacheConfig
+
+# Header: magic, layout version, slot count
+_HEADER = struct.Struct("<8sII")
+_MAGIC = b"TBPRICE1"
+_LAYOUT_VERSION = 1
+# Slot: sequence, symbol, price, source, timestamp (epoch), ttl, volatility
+_SLOT = struct.Struct("<Q16sd16sddd")
+_SEQ = struct.Struct("<Q")
+
+
+def _encode(value: str) -> bytes:
+    return value.encode("ascii", errors="replace")[:16]
+
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode("ascii", errors="replace")
+
+
+class MmapPriceBackend:
+    """Seqlock-protected slot table in a memory-mapped file shared by the processes on one host"""
+
+    name = "mmap"
+
+    def __init__(self, path: str, slots: int):
+        if fcntl is None:
+            raise RuntimeError("mmap price cache needs fcntl (POSIX)")
+        self.path = self.layout_path(path, slots)
+        self.slots = slots
+        self.stats = {"reads": 0, "writes": 0, "read_retries": 0, "stale_writes": 0, "table_full": 0}
+        self._lock = threading.Lock()  # fcntl locks are per process - threads serialise here first
+
+        size = _HEADER.size + slots * _SLOT.size
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            file_size = os.fstat(self._fd).st_size
+            if file_size == 0:
+                os.ftruncate(self._fd, size)
+            elif file_size != size:
+                # Shrinking or growing a file other workers have mapped would SIGBUS them
+                raise RuntimeError(f"{self.path} is {file_size} bytes, expected {size} - refusing to resize it")
+            self._map = mmap.mmap(self._fd, size)
+            magic, version, table_slots = _HEADER.unpack_from(self._map, 0)
+            if magic == b"\0" * len(_MAGIC):
+                _HEADER.pack_into(self._map, 0, _MAGIC, _LAYOUT_VERSION, slots)
+            elif magic != _MAGIC or version != _LAYOUT_VERSION or table_slots != slots:
+                self._map.close()
+                raise RuntimeError(f"{self.path} holds a different price table layout - refusing to overwrite it")
+        except Exception:
+            os.close(self._fd)  # also releases the lock
+            raise
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._pid = os.getpid()
+
+    @staticmethod
+    def layout_path(path: str, slots: int) -> str:
+        """Table file for this layout (e.g. prices.bin -> prices.v1-1024.bin)"""
+        root, extension = os.path.splitext(path)
+        return f"{root}.v{_LAYOUT_VERSION}-{slots}{extension}"
+
+    def _lock_fd(self) -> int:
+        # A forked worker shares its parent's open file description, and flock would not
+        # exclude the two - each process locks through its own descriptor
+        if self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR)
+            self._pid = os.getpid()
+        return self._fd
+
+    def _offset(self, index: int) -> int:
+        return _HEADER.size + index * _SLOT.size
+
+    def _probe(self, symbol: str):
+        start = zlib.crc32(symbol.encode("utf-8")) % self.slots
+        for step in range(self.slots):
+            yield (start + step) % self.slots
+
+    def _read_slot(self, index: int):
+        offset = self._offset(index)
+        for _ in range(SharedPriceCacheConfig.SEQLOCK_MAX_RETRIES):
+            sequence = _SEQ.unpack_from(self._map, offset)[0]
+            if sequence % 2:
+                self.stats["read_retries"] += 1
+                continue
+            record = _SLOT.unpack_from(self._map, offset)
+            if _SEQ.unpack_from(self._map, offset)[0] == sequence == record[0]:
+                return record
+            self.stats["read_retries"] += 1
+        return None
+
+    def read(self, symbol: str) -> Optional[Dict]:
+        self.stats["reads"] += 1
+        encoded = _encode(symbol)
+        for index in self._probe(symbol):
+            record = self._read_slot(index)
+            if record is None:
+                return None
+            _, slot_symbol, price, source, timestamp, ttl, volatility = record
+            if slot_symbol.rstrip(b"\0") == encoded:
+                if not timestamp:
+                    return None  # invalidated
+                return {"price": price, "source": _decode(source), "timestamp": timestamp, "ttl": ttl, "volatility": volatility}
+            if not slot_symbol.strip(b"\0"):
+                return None  # empty slot ends the probe chain
+        return None
+
+    def read_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        entries = {}
+        for symbol in symbols:
+            entry = self.read(symbol)
+            if entry is not None:
+                entries[symbol] = entry
+        return entries
+
+    def _write_record(self, symbol: str, price: float, source: str, timestamp: float, ttl: float, volatility: float, newer_only: bool) -> bool:
+        encoded = _encode(symbol)
+        with self._lock:
+            fd = self._lock_fd()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                for index in self._probe(symbol):
+                    offset = self._offset(index)
+                    record = _SLOT.unpack_from(self._map, offset)
+                    slot_symbol = record[1].rstrip(b"\0")
+                    if slot_symbol and slot_symbol != encoded:
+                        continue
+                    if newer_only and slot_symbol and record[4] >= timestamp:
+                        self.stats["stale_writes"] += 1
+                        return False
+                    sequence = record[0]
+                    _SEQ.pack_into(self._map, offset, sequence + 1)  # odd: write in progress
+                    _SLOT.pack_into(
+                        self._map, offset, sequence + 1, encoded, price, _encode(source or ""), timestamp, ttl, volatility
+                    )
+                    _SEQ.pack_into(self._map, offset, sequence + 2)
+                    return True
+                self.stats["table_full"] += 1
+                logging.warning(f"SHARED-PRICE-CACHE: Slot table full ({self.slots}) - {symbol} not shared")
+                return False
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def write(self, symbol: str, entry: Dict) -> bool:
+        """Store entry unless the table already holds a newer one for the symbol"""
+        self.stats["writes"] += 1
+        return self._write_record(
+            symbol, entry["price"], entry["source"], entry["timestamp"], entry["ttl"], entry["volatility"], newer_only=True
+        )
+
+    def invalidate(self, symbol: str) -> None:
+        # Slots are never freed (probe chains stay intact); a zero timestamp marks the entry gone
+        if self.read(symbol) is not None:
+            self._write_record(symbol, 0.0, "", 0.0, 0.0, 0.0, newer_only=False)
+
+    def get_status(self) -> Dict:
+        return {"backend": self.name, "path": self.path, "slots": self.slots, **self.stats}
+
+
+class PostgresPriceBackend:
+    """UNLOGGED table shared by every worker on every host using the same database"""
+
+    name = "postgres"
+
+    def __init__(self, engine, table: str):
+        from sqlalchemy import text
+
+        self.engine = engine
+        self.table = table
+        self.read_ttl = SharedPriceCacheConfig.PG_READ_TTL
+        self.stats = {"reads": 0, "local_hits": 0, "writes": 0, "errors": 0}
+        self._local: Dict[str, tuple] = {}  # symbol -> (read at, entry or None)
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"CREATE UNLOGGED TABLE IF NOT EXISTS {table} ("
+                    "symbol VARCHAR(32) PRIMARY KEY, price DOUBLE PRECISION NOT NULL, source VARCHAR(32), "
+                    "updated_at DOUBLE PRECISION NOT NULL, ttl DOUBLE PRECISION, volatility DOUBLE PRECISION)"
+                )
+            )
+
+    def read_many(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        from sqlalchemy import text
+
+        now = time.time()
+        entries = {}
+        pending = []
+        for symbol in symbols:
+            cached = self._local.get(symbol)
+            if cached is not None and now - cached[0] < self.read_ttl:
+                self.stats["local_hits"] += 1
+                if cached[1] is not None:
+                    entries[symbol] = cached[1]
+            else:
+                pending.append(symbol)
+        if not pending:
+            return entries
+        symbols = pending
+
+        self.stats["reads"] += 1
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(
+                    text(
+                        f"SELECT symbol, price, source, updated_at, ttl, volatility FROM {self.table} "
+                        "WHERE symbol = ANY(:symbols)"
+                    ),
+                    {"symbols": symbols},
+                ).fetchall()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.warning(f"SHARED-PRICE-CACHE: Read failed: {e}")
+            return entries
+
+        found = {
+            row.symbol: {
+                "price": row.price,
+                "source": row.source,
+                "timestamp": row.updated_at,
+                "ttl": row.ttl,
+                "volatility": row.volatility,
+            }
+            for row in rows
+        }
+        for symbol in symbols:
+            self._local[symbol] = (now, found.get(symbol))
+        entries.update(found)
+        return entries
+
+    def read(self, symbol: str) -> Optional[Dict]:
+        return self.read_many([symbol]).get(symbol)
+
+    def write(self, symbol: str, entry: Dict) -> bool:
+        from sqlalchemy import text
+
+        self.stats["writes"] += 1
+        try:
+            with self.engine.begin() as connection:
+                result = connection.execute(
+                    text(
+                        f"INSERT INTO {self.table} (symbol, price, source, updated_at, ttl, volatility) "
+                        "VALUES (:symbol, :price, :source, :timestamp, :ttl, :volatility) "
+                        "ON CONFLICT (symbol) DO UPDATE SET price = EXCLUDED.price, source = EXCLUDED.source, "
+                        "updated_at = EXCLUDED.updated_at, ttl = EXCLUDED.ttl, volatility = EXCLUDED.volatility "
+                        f"WHERE {self.table}.updated_at < EXCLUDED.updated_at"
+                    ),
+                    {"symbol": symbol, **entry},
+                )
+            if result.rowcount > 0:
+                self._local[symbol] = (time.time(), dict(entry))
+                return True
+            return False
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.warning(f"SHARED-PRICE-CACHE: Write for {symbol} failed: {e}")
+            return False
+
+    def invalidate(self, symbol: str) -> None:
+        from sqlalchemy import text
+
+        self._local.pop(symbol, None)
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(text(f"DELETE FROM {self.table} WHERE symbol = :symbol"), {"symbol": symbol})
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.warning(f"SHARED-PRICE-CACHE: Invalidate for {symbol} failed: {e}")
+
+    def get_status(self) -> Dict:
+        return {"backend": self.name, "table": self.table, **self.stats}
+
+
+def configure_shared_price_cache(app, cache) -> Optional[object]:
+    """
+    Attach the configured shared backend to a SmartCache (no-op when none is configured)
+
+    Returns:
+        The backend, or None when prices stay per process
+    """
+    backend_name = SharedPriceCacheConfig.BACKEND
+    if not backend_name:
+        return None
+
+    try:
+        if backend_name == "mmap":
+            backend = MmapPriceBackend(SharedPriceCacheConfig.MMAP_PATH, SharedPriceCacheConfig.MMAP_SLOTS)
+        elif backend_name == "postgres":
+            database_uri = app.config.get("SQLALCHEMY_DATABASE_URI", "") or ""
+            if not database_uri.startswith("postgresql"):
+                logging.warning("SHARED-PRICE-CACHE: postgres backend needs a PostgreSQL database - prices stay per process")
+                return None
+            from .models import db
+
+            with app.app_context():
+                engine = db.engine
+            backend = PostgresPriceBackend(engine, SharedPriceCacheConfig.PG_TABLE)
+        else:
+            logging.warning(f"SHARED-PRICE-CACHE: Unknown backend '{backend_name}' - prices stay per process")
+            return None
+    except Exception as e:
+        logging.error(f"SHARED-PRICE-CACHE: {backend_name} backend unavailable, prices stay per process: {e}")
+        return None
+
+    cache.attach_shared_backend(backend)
+    logging.info(f"SHARED-PRICE-CACHE: enhanced_cache prices shared via {backend.name} (pid {os.getpid()})")
+    return backend
+
+
+def shared_entry_age(entry: Dict, now: Optional[float] = None) -> float:
+    return (now if now is not None else time.time()) - entry["timestamp"]
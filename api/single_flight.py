@@ -0,0 +1,149 @@
+"""
+Single Flight - coalesce concurrent upstream fetches for the same key
+
+When several threads miss the same price or klines series at the same moment, each used
+to launch its own upstream request. SingleFlight.do(key, fetch) lets the first caller
+(the leader) run the fetch while every concurrent caller for that key (followers) waits
+for it and receives the same result - or the same exception. Nothing is cached: once the
+flight lands the key is free again and the next miss fetches anew.
+
+Two groups are shared process-wide:
+- price_flight: keyed by symbol (price hub per-symbol lookups)
+- klines_flight: keyed by (symbol, timeframe) (SMC candlestick misses)
+
+A follower stops waiting after SingleFlightConfig.FOLLOWER_TIMEOUT and fetches itself,
+so a hung leader cannot block its followers indefinitely.
+"""
+
+import logging
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Import configuration constants
+try:
+    from config import SingleFlightConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import SingleFlightConfig
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Per-key in-flight registry: one execution per key at a time, shared by concurrent callers
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = SingleFlightConfig.ENABLED
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "calls": 0,
+            "executions": 0,
+            "shared": 0,
+            "shared_errors": 0,
+            "follower_timeouts": 0,
+            "max_followers": 0,
+        }
+
+    def do(self, key: Hashable, fetch: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fetch() for key, or wait for the fetch already in flight for key
+
+        Returns:
+            (result, shared) - shared is True when the result came from another caller's fetch
+
+        Raises:
+            Whatever fetch() raised, for the leader and every follower of that flight
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            flight = self._flights.get(key) if self.enabled else None
+            if flight is None:
+                leader = True
+                flight = _Flight()
+                if self.enabled:
+                    self._flights[key] = flight
+                self.stats["executions"] += 1
+            else:
+                leader = False
+                flight.followers += 1
+                self.stats["max_followers"] = max(self.stats["max_followers"], flight.followers)
+
+        if leader:
+            return self._lead(key, flight, fetch), False
+
+        if not flight.done.wait(SingleFlightConfig.FOLLOWER_TIMEOUT):
+            with self._lock:
+                self.stats["follower_timeouts"] += 1
+                self.stats["executions"] += 1
+            logging.warning(
+                f"SINGLE-FLIGHT: {self.name} fetch for {key} still running after "
+                f"{SingleFlightConfig.FOLLOWER_TIMEOUT}s - fetching independently"
+            )
+            return fetch(), False
+
+        with self._lock:
+            self.stats["shared"] += 1
+            if flight.error is not None:
+                self.stats["shared_errors"] += 1
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def _lead(self, key: Hashable, flight: _Flight, fetch: Callable[[], Any]) -> Any:
+        try:
+            flight.result = fetch()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+            if flight.followers:
+                logging.debug(f"SINGLE-FLIGHT: {self.name} fetch for {key} shared with {flight.followers} callers")
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            in_flight = len(self._flights)
+        calls = stats["calls"]
+        return {
+            "enabled": self.enabled,
+            "in_flight": in_flight,
+            "coalesced_ratio": round(stats["shared"] / calls, 3) if calls else 0.0,
+            **stats,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+# Global flight groups shared by the price producer and the candlestick readers
+price_flight = SingleFlight("price")
+klines_flight = SingleFlight("klines")
+
+
+def get_single_flight_status() -> Dict:
+    """Status of every flight group"""
+    return {group.name: group.get_status() for group in (price_flight, klines_flight)}
@@ -11,10 +11,13 @@ from enum import Enum
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union, overload
 
 import numpy as np
-import requests
+
+from .async_http import async_http
 
 # Import circuit breaker functionality
+from .binance_weight_budget import WeightBudgetExhausted, binance_weight_budget, klines_request_weight
 from .circuit_breaker import CircuitBreakerError, with_circuit_breaker
+from .single_flight import klines_flight
 
 # Import configuration constants
 try:
@@ -220,9 +223,17 @@ class SMCAnalyzer:
         "binance_klines_api", failure_threshold=8, recovery_timeout=120
     )
     def get_candlestick_data(
-        self, symbol: str, timeframe: str = "1h", limit: int = 100
+        self,
+        symbol: str,
+        timeframe: str = "1h",
+        limit: int = 100,
+        freshness: Optional[Dict] = None,
     ) -> List[Dict]:
-        """Get candlestick data with cache-first approach, rolling window aware, and circuit breaker protection"""
+        """Get candlestick data with cache-first approach, rolling window aware, and circuit breaker protection
+
+        freshness: optional KlinesCache.get_series_freshness entry for this series, so batch
+        callers can plan every timeframe from a single aggregate query
+        """
         from config import CacheConfig, RollingWindowConfig
 
         from .models import KlinesCache
@@ -254,7 +265,11 @@ class SMCAnalyzer:
 
         # Step 2: Determine what to fetch - OPTIMIZED for user-triggered requests
         try:
-            gap_info = KlinesCache.get_data_gaps(symbol, timeframe, limit)
+            if freshness is None:
+                freshness = KlinesCache.get_series_freshness([(symbol, timeframe)])[
+                    (symbol, timeframe)
+                ]
+            gap_info = KlinesCache.plan_fetch(freshness, timeframe, limit)
             if not gap_info["needs_fetch"]:
                 logging.debug(
                     f"CACHE SUFFICIENT: Using existing cached data for {symbol} {timeframe}"
@@ -267,8 +282,7 @@ class SMCAnalyzer:
             # EFFICIENT OPTIMIZATION: If we have existing cache data, check if we just need to update open candle
             if len(cached_data) > 0:
                 # Check if we have current open candle already
-                current_open_candle = KlinesCache.get_current_open_candle(symbol, timeframe)
-                if current_open_candle and min_required_fetch <= 2:
+                if gap_info["has_open_candle"] and min_required_fetch <= 2:
                     # SAFE: Only use efficient update when no historical gaps exist
                     fetch_limit = 1
                     logging.info(
@@ -297,14 +311,94 @@ class SMCAnalyzer:
             # Conservative fallback: fetch more data when uncertain
             fetch_limit = min(10, limit) if len(cached_data) > 0 else limit
 
-        # Step 3: Fetch from Binance API with circuit breaker protection
+        # Steps 3-4: Fetch and cache - concurrent misses for this series share one upstream fetch
+        try:
+            while True:
+                flight, shared = klines_flight.do(
+                    (symbol, timeframe),
+                    lambda: self._fetch_and_cache_klines(symbol, timeframe, fetch_limit, len(cached_data) > 0),
+                )
+                # A shared fetch that asked for fewer candles than this caller needs does not cover it
+                if not shared or flight["fetch_limit"] >= fetch_limit:
+                    break
+        except WeightBudgetExhausted:
+            if not cached_data:
+                raise
+            # Don't hold the request waiting for the next weight window - serve what is cached
+            logging.warning(
+                f"BINANCE-WEIGHT: Budget exhausted, serving {len(cached_data)} cached candles for {symbol} {timeframe}"
+            )
+            return cached_data
+        candlesticks = flight["candlesticks"]
+        if flight["open_candle_updated"]:
+            # Return updated cached data including the new open candle
+            return KlinesCache.get_cached_data(symbol, timeframe, limit)
+
+        # Step 5: Return combined data (cached + fetched) if partial hit, else just fetched
+        try:
+            if len(cached_data) > 0 and len(candlesticks) > 0:
+                # Combine and deduplicate data
+                combined_data = cached_data + candlesticks
+                # Remove duplicates based on timestamp and normalize timezone
+                seen_timestamps = set()
+                unique_data = []
+                for candle in combined_data:
+                    # ISSUE #17 FIX: Create a copy to avoid mutating original data
+                    candle_copy = candle.copy()
+                    
+                    # Normalize timestamp to timezone-aware UTC for consistent comparison
+                    if isinstance(candle_copy["timestamp"], datetime):
+                        # Ensure all timestamps are timezone-aware UTC
+                        if candle_copy["timestamp"].tzinfo is None:
+                            normalized_timestamp = candle_copy["timestamp"].replace(tzinfo=timezone.utc)
+                        else:
+                            normalized_timestamp = candle_copy["timestamp"].astimezone(timezone.utc)
+                        candle_copy["timestamp"] = normalized_timestamp
+                        timestamp_key = normalized_timestamp.isoformat()
+                    else:
+                        timestamp_key = str(candle_copy["timestamp"])
+                        
+                    if timestamp_key not in seen_timestamps:
+                        seen_timestamps.add(timestamp_key)
+                        unique_data.append(candle_copy)
+
+                # Sort by timestamp (now all timezone-aware) and limit
+                unique_data.sort(key=lambda x: x["timestamp"])
+                return unique_data[-limit:] if len(unique_data) > limit else unique_data
+            else:
+                return candlesticks
+
+        except Exception as e:
+            logging.error(
+                f"Error combining cached and fetched data for {symbol} {timeframe}: {e}"
+            )
+            return candlesticks
+
+    def _fetch_and_cache_klines(
+        self, symbol: str, timeframe: str, fetch_limit: int, has_cached_data: bool
+    ) -> Dict[str, Any]:
+        """Fetch the latest fetch_limit candles for a series from Binance and write them to the cache
+
+        Runs once per in-flight (symbol, timeframe) - concurrent callers share the returned
+        {"fetch_limit", "candlesticks", "open_candle_updated"} result.
+        """
+        from config import CacheConfig, TimeConfig
+
+        from .models import KlinesCache
+
+        # Step 3: Fetch from Binance API
         tf_map = {"15m": "15m", "1h": "1h", "4h": "4h", "1d": "1d"}
         interval = tf_map.get(timeframe, "1h")
 
         url = f"https://api.binance.com/api/v3/klines"
         params = {"symbol": symbol, "interval": interval, "limit": fetch_limit}
 
-        response = requests.get(url, params=params, timeout=10)
+        # Share the process-wide Binance weight budget with the sync service
+        weight = klines_request_weight(fetch_limit)
+        if not binance_weight_budget.acquire(weight, timeout=TimeConfig.BINANCE_WEIGHT_REQUEST_WAIT):
+            raise WeightBudgetExhausted(f"No Binance weight budget for {symbol} {timeframe} within the request wait")
+        response = async_http.get(url, params=params, timeout=10)
+        binance_weight_budget.record_response(response)
         response.raise_for_status()
 
         klines = response.json()
@@ -329,10 +423,12 @@ class SMCAnalyzer:
             }
             candlesticks.append(candlestick)
 
+        result = {"fetch_limit": fetch_limit, "candlesticks": candlesticks, "open_candle_updated": False}
+
         # Step 4: Cache the fetched data efficiently
         try:
             # If we only fetched 1 candle and have existing cache, use efficient open candle update
-            if fetch_limit == 1 and len(cached_data) > 0 and len(candlesticks) == 1:
+            if fetch_limit == 1 and has_cached_data and len(candlesticks) == 1:
                 current_candle = candlesticks[0]
                 
                 # Calculate appropriate TTL for open candle
@@ -362,8 +458,8 @@ class SMCAnalyzer:
                 
                 if success:
                     logging.debug(f"SMC: Efficiently updated open candle for {symbol} {timeframe}")
-                    # Return updated cached data including the new open candle
-                    return KlinesCache.get_cached_data(symbol, timeframe, limit)
+                    result["open_candle_updated"] = True
+                    return result
                 else:
                     logging.warning(f"SMC: Failed to update open candle for {symbol} {timeframe}, falling back to batch save")
                     # Fall through to batch save as fallback
@@ -387,45 +483,7 @@ class SMCAnalyzer:
         except Exception as e:
             logging.error(f"Failed to cache data for {symbol} {timeframe}: {e}")
 
-        # Step 5: Return combined data (cached + fetched) if partial hit, else just fetched
-        try:
-            if len(cached_data) > 0 and len(candlesticks) > 0:
-                # Combine and deduplicate data
-                combined_data = cached_data + candlesticks
-                # Remove duplicates based on timestamp and normalize timezone
-                seen_timestamps = set()
-                unique_data = []
-                for candle in combined_data:
-                    # ISSUE #17 FIX: Create a copy to avoid mutating original data
-                    candle_copy = candle.copy()
-                    
-                    # Normalize timestamp to timezone-aware UTC for consistent comparison
-                    if isinstance(candle_copy["timestamp"], datetime):
-                        # Ensure all timestamps are timezone-aware UTC
-                        if candle_copy["timestamp"].tzinfo is None:
-                            normalized_timestamp = candle_copy["timestamp"].replace(tzinfo=timezone.utc)
-                        else:
-                            normalized_timestamp = candle_copy["timestamp"].astimezone(timezone.utc)
-                        candle_copy["timestamp"] = normalized_timestamp
-                        timestamp_key = normalized_timestamp.isoformat()
-                    else:
-                        timestamp_key = str(candle_copy["timestamp"])
-                        
-                    if timestamp_key not in seen_timestamps:
-                        seen_timestamps.add(timestamp_key)
-                        unique_data.append(candle_copy)
-
-                # Sort by timestamp (now all timezone-aware) and limit
-                unique_data.sort(key=lambda x: x["timestamp"])
-                return unique_data[-limit:] if len(unique_data) > limit else unique_data
-            else:
-                return candlesticks
-
-        except Exception as e:
-            logging.error(
-                f"Error combining cached and fetched data for {symbol} {timeframe}: {e}"
-            )
-            return candlesticks
+        return result
 
     def get_multi_timeframe_data(self, symbol: str) -> Dict[str, List[Dict]]:
         """Get candlestick data for multiple timeframes with circuit breaker protection"""
@@ -443,9 +501,22 @@ class SMCAnalyzer:
             f"Fetching batch candlestick data for {symbol} - 15m:{SMCConfig.TIMEFRAME_15M_LIMIT}, 1h:{SMCConfig.TIMEFRAME_1H_LIMIT}, 4h:{SMCConfig.TIMEFRAME_4H_LIMIT}, 1d:{SMCConfig.TIMEFRAME_1D_LIMIT} candles"
         )
 
+        # One aggregate query plans all timeframes instead of per-timeframe gap lookups
+        try:
+            from .models import KlinesCache
+
+            series_freshness = KlinesCache.get_series_freshness(
+                [(symbol, timeframe) for timeframe, _ in timeframe_configs]
+            )
+        except Exception as e:
+            logging.warning(f"Freshness check failed for {symbol}: {e}")
+            series_freshness = {}
+
         for timeframe, limit in timeframe_configs:
             try:
-                data = self.get_candlestick_data(symbol, timeframe, limit)
+                data = self.get_candlestick_data(
+                    symbol, timeframe, limit, series_freshness.get((symbol, timeframe))
+                )
                 timeframe_data[timeframe] = data
                 logging.debug(
                     f"Successfully fetched {len(data)} candles for {symbol} {timeframe}"
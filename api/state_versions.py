@@ -0,0 +1,176 @@
+"""
+State Versions - ETag and since=<version> delta support for the polling endpoints
+
+/api/margin-data, /api/positions and /api/positions/live-update rebuilt and re-sent the
+full payload on every poll even when nothing had changed. Each response now carries a
+version of the user's state for that endpoint:
+- StateVersions.update() compares the freshly built entries (positions by trade id plus
+  a summary entry) with the previous ones and bumps the version only when a value changed
+- the version is sent as a weak ETag; a matching If-None-Match gets 304 Not Modified
+- ?since=<version> returns only the entries changed after that version plus the ids
+  removed since then (changes_since() returns None when it cannot tell - the caller
+  then sends the full payload)
+
+Versions are per process: tokens carry a process epoch ("<epoch>.<n>"), so a version
+issued by another gunicorn worker is simply unknown here and gets a full response.
+/api/prices versions by price hub tick versions with the same token format; the hub only
+assigns a new tick version when the price changed.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Import configuration constants
+try:
+    from config import ConditionalResponseConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import ConditionalResponseConfig
+
+# Distinguishes this process's versions from another worker's (or a restarted one's)
+PROCESS_EPOCH = os.urandom(4).hex()
+
+
+def format_version(version: int) -> str:
+    return f"{PROCESS_EPOCH}.{version}"
+
+
+def parse_version(token: Optional[str]) -> Optional[int]:
+    """Version number from a token issued by this process (None if foreign or invalid)"""
+    if not token:
+        return None
+    epoch, _, number = str(token).partition(".")
+    if epoch != PROCESS_EPOCH:
+        return None
+    try:
+        return int(number)
+    except ValueError:
+        return None
+
+
+def make_etag(scope: str, key: Hashable, version: int) -> str:
+    """Opaque (unquoted) entity tag for a state version"""
+    return f"{scope}-{key}-{format_version(version)}"
+
+
+class _State:
+    __slots__ = ("version", "entries", "removed", "floor")
+
+    def __init__(self, floor: int):
+        self.version = floor
+        self.entries: Dict[str, Tuple[Any, int]] = {}  # entry id -> (value, version it last changed)
+        self.removed: "OrderedDict[str, int]" = OrderedDict()  # entry id -> version it was removed
+        self.floor = floor  # since= versions below this cannot be answered with a delta
+
+
+class StateVersions:
+    """
+    Per-(scope, key) entry versions for conditional and delta responses
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[Tuple[str, Hashable], _State]" = OrderedDict()
+        self._counter = 0
+        self.stats = {
+            "updates": 0,
+            "changes": 0,
+            "not_modified": 0,
+            "deltas": 0,
+            "full_fallbacks": 0,
+            "evicted": 0,
+        }
+
+    def update(self, scope: str, key: Hashable, entries: Dict[str, Any]) -> int:
+        """
+        Record the current entries of a state
+
+        Returns:
+            The state's version - unchanged when every entry equals the previous update's
+        """
+        with self._lock:
+            self.stats["updates"] += 1
+            state = self._states.get((scope, key))
+            if state is None:
+                state = self._states[(scope, key)] = _State(self._next())
+                self._evict()
+            else:
+                self._states.move_to_end((scope, key))
+
+            version = None
+            for entry_id, value in entries.items():
+                previous = state.entries.get(entry_id)
+                if previous is not None and previous[0] == value:
+                    continue
+                version = version or self._next()
+                state.entries[entry_id] = (value, version)
+                state.removed.pop(entry_id, None)
+            for entry_id in [entry_id for entry_id in state.entries if entry_id not in entries]:
+                version = version or self._next()
+                del state.entries[entry_id]
+                state.removed[entry_id] = version
+            while len(state.removed) > ConditionalResponseConfig.MAX_TOMBSTONES:
+                _, pruned_version = state.removed.popitem(last=False)
+                state.floor = max(state.floor, pruned_version)
+
+            if version is not None:
+                state.version = version
+                self.stats["changes"] += 1
+            return state.version
+
+    def changes_since(self, scope: str, key: Hashable, since: Optional[int]) -> Optional[Dict[str, List[str]]]:
+        """
+        Entry ids changed and removed after a version
+
+        Returns:
+            {"changed": [...], "removed": [...]}, or None when since is unknown here (foreign,
+            older than the remembered removals, or newer than the state) and a full response is needed
+        """
+        with self._lock:
+            state = self._states.get((scope, key))
+            if since is None or state is None or since < state.floor or since > state.version:
+                self.stats["full_fallbacks"] += 1
+                return None
+            self.stats["deltas"] += 1
+            return {
+                "changed": [entry_id for entry_id, (_, version) in state.entries.items() if version > since],
+                "removed": [entry_id for entry_id, version in state.removed.items() if version > since],
+            }
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.stats["not_modified"] += 1
+
+    def _next(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    def _evict(self) -> None:
+        while len(self._states) > ConditionalResponseConfig.MAX_TRACKED_STATES:
+            self._states.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": ConditionalResponseConfig.ENABLED,
+                "epoch": PROCESS_EPOCH,
+                "tracked_states": len(self._states),
+                "version": self._counter,
+                **self.stats,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+        logging.info("STATE-VERSIONS: Reset")
+
+
+# Global tracker shared by the polling endpoints
+user_state_versions = StateVersions()
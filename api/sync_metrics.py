@@ -0,0 +1,299 @@
+"""
+Sync Metrics - per-task instrumentation of the unified data sync cycle
+
+Every series refresh runs inside sync_metrics.task(symbol, timeframe). The fetchers and
+savers it calls report into the task on the same thread:
+- record_fetch(): upstream latency, response size and Binance request weight
+- record_rows(): rows upserted
+- record_error(): failure outcome (circuit_open / timeout / http_error / error)
+- set_path(): which strategy ran (stream, initial, resume, open_candle, incremental, backfill)
+
+Finished tasks feed per-series RollingHistograms. get_status() reports rolling-window
+quantiles for the status endpoints; prometheus_text() renders the cumulative buckets in
+the Prometheus text exposition format. Metrics are per process - with leader election
+only the leader's sync service records tasks.
+"""
+
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from .circuit_breaker import CircuitBreakerError
+
+# Import configuration constants
+try:
+    from config import SyncMetricsConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import SyncMetricsConfig
+
+OUTCOME_OK = "ok"
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_CIRCUIT_OPEN = "circuit_open"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_HTTP_ERROR = "http_error"
+OUTCOME_ERROR = "error"
+
+# metric name -> (bucket bounds, help text)
+HISTOGRAMS = {
+    "task_seconds": (SyncMetricsConfig.SECONDS_BUCKETS, "Wall time of one series refresh"),
+    "fetch_seconds": (SyncMetricsConfig.SECONDS_BUCKETS, "Upstream klines request latency"),
+    "response_bytes": (SyncMetricsConfig.BYTES_BUCKETS, "Upstream klines response size"),
+    "api_weight": (SyncMetricsConfig.WEIGHT_BUCKETS, "Binance request weight per fetch"),
+    "rows_upserted": (SyncMetricsConfig.ROWS_BUCKETS, "Klines rows written per series refresh"),
+}
+
+
+class RollingHistogram:
+    """
+    Cumulative bucket counts (for Prometheus) plus a time-bounded sample window (for quantiles)
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.bucket_counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=SyncMetricsConfig.MAX_SAMPLES_PER_SERIES)
+
+    def observe(self, value: float, now: Optional[float] = None) -> None:
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._samples.append((now if now is not None else time.time(), value))
+
+    def window_values(self, now: Optional[float] = None) -> List[float]:
+        cutoff = (now if now is not None else time.time()) - SyncMetricsConfig.WINDOW_SECONDS
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return [value for _, value in self._samples]
+
+    def summary(self, now: Optional[float] = None) -> Dict:
+        """Rolling-window count, mean and quantiles"""
+        values = sorted(self.window_values(now))
+        if not values:
+            return {"count": 0}
+
+        def quantile(q: float) -> float:
+            return values[min(len(values) - 1, int(q * len(values)))]
+
+        return {
+            "count": len(values),
+            "mean": round(sum(values) / len(values), 4),
+            "p50": round(quantile(0.5), 4),
+            "p95": round(quantile(0.95), 4),
+            "max": round(values[-1], 4),
+        }
+
+    def cumulative_buckets(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf"""
+        buckets, running = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.bucket_counts):
+            running += count
+            buckets.append(("+Inf" if bound == float("inf") else _format_number(bound), running))
+        return buckets
+
+
+class _TaskRecord:
+    def __init__(self, symbol: str, timeframe: str, path: Optional[str]):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.path = path
+        self.outcome: Optional[str] = None
+        self.fetches: List[Tuple[float, int, int]] = []  # (latency, bytes, weight)
+        self.rows = 0
+
+
+class SyncMetrics:
+    """
+    Per-series histograms and path/outcome counters for sync tasks
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms: Dict[Tuple[str, str], Dict[str, RollingHistogram]] = {}
+        self._paths: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._outcomes: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._cycle = RollingHistogram(SyncMetricsConfig.SECONDS_BUCKETS)
+        self._last_cycle: Optional[Dict] = None
+
+    # ---- task context ----------------------------------------------------
+
+    @contextmanager
+    def task(self, symbol: str, timeframe: str, path: Optional[str] = None):
+        """Collect everything reported on this thread into one task record for the series"""
+        record = _TaskRecord(symbol, timeframe, path)
+        previous = getattr(self._local, "record", None)
+        self._local.record = record
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            self.record_error(e)
+            raise
+        finally:
+            self._local.record = previous
+            self._finish(record, time.perf_counter() - started)
+
+    def set_path(self, path: str) -> None:
+        record = getattr(self._local, "record", None)
+        if record is not None:
+            record.path = path
+
+    def record_fetch(self, latency: float, response_bytes: int, weight: int) -> None:
+        record = getattr(self._local, "record", None)
+        if record is not None:
+            record.fetches.append((latency, response_bytes, weight))
+
+    def record_rows(self, rows: int) -> None:
+        record = getattr(self._local, "record", None)
+        if record is not None:
+            record.rows += int(rows or 0)
+
+    def record_error(self, error: Exception) -> None:
+        """Classify a failed fetch; the first failure of a task decides its outcome"""
+        record = getattr(self._local, "record", None)
+        if record is None or record.outcome is not None:
+            return
+        if isinstance(error, CircuitBreakerError):
+            record.outcome = OUTCOME_CIRCUIT_OPEN
+        elif isinstance(error, requests.exceptions.Timeout):
+            record.outcome = OUTCOME_TIMEOUT
+        elif isinstance(error, requests.exceptions.HTTPError):
+            record.outcome = OUTCOME_HTTP_ERROR
+        else:
+            record.outcome = OUTCOME_ERROR
+
+    def _finish(self, record: _TaskRecord, duration: float) -> None:
+        outcome = record.outcome or (OUTCOME_OK if record.fetches or record.rows else OUTCOME_SKIPPED)
+        key = (record.symbol, record.timeframe)
+        now = time.time()
+        with self._lock:
+            histograms = self._histograms.get(key)
+            if histograms is None:
+                histograms = self._histograms[key] = {name: RollingHistogram(bounds) for name, (bounds, _) in HISTOGRAMS.items()}
+
+            histograms["task_seconds"].observe(duration, now)
+            for latency, response_bytes, weight in record.fetches:
+                histograms["fetch_seconds"].observe(latency, now)
+                histograms["response_bytes"].observe(response_bytes, now)
+                histograms["api_weight"].observe(weight, now)
+            if record.fetches or record.rows:
+                histograms["rows_upserted"].observe(record.rows, now)
+
+            self._paths[key][record.path or "unknown"] += 1
+            self._outcomes[key][outcome] += 1
+
+    def record_cycle(self, duration: float, due_tasks: int, successful: int) -> None:
+        """Record one whole sync cycle"""
+        with self._lock:
+            self._cycle.observe(duration)
+            self._last_cycle = {
+                "duration": round(duration, 3),
+                "due_tasks": due_tasks,
+                "successful": successful,
+                "finished_at": time.time(),
+            }
+
+    # ---- exposition ------------------------------------------------------
+
+    def get_status(self) -> Dict:
+        """Rolling-window distributions per series (for the JSON status endpoints)"""
+        now = time.time()
+        with self._lock:
+            series = {}
+            for (symbol, timeframe), histograms in sorted(self._histograms.items()):
+                series[f"{symbol}_{timeframe}"] = {
+                    **{name: histogram.summary(now) for name, histogram in histograms.items()},
+                    "paths": dict(self._paths[(symbol, timeframe)]),
+                    "outcomes": dict(self._outcomes[(symbol, timeframe)]),
+                }
+
+            totals = defaultdict(float)
+            for histograms in self._histograms.values():
+                for name in ("task_seconds", "fetch_seconds", "api_weight", "rows_upserted"):
+                    totals[name] += sum(histograms[name].window_values(now))
+
+            return {
+                "window_seconds": SyncMetricsConfig.WINDOW_SECONDS,
+                "cycle_seconds": self._cycle.summary(now),
+                "last_cycle": self._last_cycle,
+                "window_totals": {name: round(value, 3) for name, value in totals.items()},
+                "series": series,
+            }
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition (cumulative histograms and counters)"""
+        lines: List[str] = []
+        with self._lock:
+            lines += _histogram_lines(
+                "klines_sync_cycle_seconds", "Wall time of one unified sync cycle", [({}, self._cycle)]
+            )
+            for name, (_, help_text) in HISTOGRAMS.items():
+                lines += _histogram_lines(
+                    f"klines_sync_{name}",
+                    help_text,
+                    [
+                        ({"symbol": symbol, "timeframe": timeframe}, histograms[name])
+                        for (symbol, timeframe), histograms in sorted(self._histograms.items())
+                    ],
+                )
+
+            for metric, label, counters, help_text in (
+                ("klines_sync_tasks_by_path_total", "path", self._paths, "Series refreshes by strategy"),
+                ("klines_sync_tasks_by_outcome_total", "outcome", self._outcomes, "Series refreshes by outcome"),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for (symbol, timeframe), values in sorted(counters.items()):
+                    for value_name, count in sorted(values.items()):
+                        labels = _labels({"symbol": symbol, "timeframe": timeframe, label: value_name})
+                        lines.append(f"{metric}{labels} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._paths.clear()
+            self._outcomes.clear()
+            self._cycle = RollingHistogram(SyncMetricsConfig.SECONDS_BUCKETS)
+            self._last_cycle = None
+        logging.info("SYNC-METRICS: Reset")
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(metric: str, help_text: str, series: List[Tuple[Dict[str, str], RollingHistogram]]) -> List[str]:
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for labels, histogram in series:
+        for le, count in histogram.cumulative_buckets():
+            lines.append(f"{metric}_bucket{_labels({**labels, 'le': le})} {count}")
+        lines.append(f"{metric}_sum{_labels(labels)} {_format_number(round(histogram.sum, 6))}")
+        lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+# Global metrics shared by the sync service, the backfill and the status endpoints
+sync_metrics = SyncMetrics()
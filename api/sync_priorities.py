@@ -0,0 +1,164 @@
+"""
+Sync Priorities - demand-driven refresh intervals per symbol/timeframe
+
+Each series gets a tier that scales its base refresh interval:
+- hot:  open trades, pending limit orders or an active boost (HOT_INTERVAL_FACTOR x base)
+- warm: an /api/smc-* request touched the symbol within SMC_DEMAND_WINDOW (base interval)
+- idle: no demand - the interval grows by IDLE_BACKOFF_MULTIPLIER on every idle refresh,
+        capped at IDLE_MAX_INTERVAL, and snaps back as soon as demand returns
+
+Trading demand is pulled from registered demand sources (callables returning the
+symbols with open or pending trades) once per sync cycle via refresh_demand().
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Import configuration constants
+try:
+    from config import SyncPriorityConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import SyncPriorityConfig
+
+TIER_HOT = "hot"
+TIER_WARM = "warm"
+TIER_IDLE = "idle"
+
+DemandSource = Callable[[], Iterable[str]]
+
+
+class SyncPriorityScheduler:
+    """
+    Tracks demand signals and turns them into per-series refresh intervals
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._demand_sources: List[DemandSource] = []
+        self._trading_symbols: Set[str] = set()
+        self._last_request: Dict[str, float] = {}  # symbol -> last /api/smc-* request
+        self._boosts: Dict[Tuple[str, Optional[str]], float] = {}  # (symbol, timeframe|None) -> expiry
+        self._idle_levels: Dict[Tuple[str, str], int] = {}
+
+    def register_demand_source(self, source: DemandSource) -> None:
+        """Register a callable returning symbols with open trades or pending orders"""
+        with self._lock:
+            if source not in self._demand_sources:
+                self._demand_sources.append(source)
+
+    def refresh_demand(self) -> Set[str]:
+        """Re-read trading demand from all sources (called once per sync cycle)"""
+        symbols: Set[str] = set()
+        with self._lock:
+            sources = list(self._demand_sources)
+        for source in sources:
+            try:
+                symbols.update(symbol.upper() for symbol in source() if symbol)
+            except Exception as e:
+                logging.warning(f"SYNC-PRIORITY: Demand source failed: {e}")
+        with self._lock:
+            self._trading_symbols = symbols
+            self._prune(time.time())
+        return symbols
+
+    def record_request(self, symbol: str) -> None:
+        """Mark a symbol as viewed (e.g. by an /api/smc-* request)"""
+        with self._lock:
+            self._last_request[symbol.upper()] = time.time()
+
+    def boost(self, symbol: str, timeframe: Optional[str] = None, duration: Optional[float] = None) -> float:
+        """
+        Treat a series (or every timeframe of a symbol) as hot for a while
+
+        Returns:
+            Boost expiry as epoch seconds
+        """
+        if duration is None:
+            duration = SyncPriorityConfig.BOOST_DEFAULT_DURATION
+        duration = max(0.0, min(float(duration), SyncPriorityConfig.BOOST_MAX_DURATION))
+        expires_at = time.time() + duration
+        with self._lock:
+            key = (symbol.upper(), timeframe)
+            self._boosts[key] = max(self._boosts.get(key, 0.0), expires_at)
+        logging.info(f"SYNC-PRIORITY: Boosted {symbol} {timeframe or 'all timeframes'} for {duration:.0f}s")
+        return expires_at
+
+    def get_tier(self, symbol: str, timeframe: str) -> str:
+        now = time.time()
+        with self._lock:
+            if symbol in self._trading_symbols:
+                return TIER_HOT
+            if self._boosts.get((symbol, timeframe), 0.0) > now or self._boosts.get((symbol, None), 0.0) > now:
+                return TIER_HOT
+            if now - self._last_request.get(symbol, 0.0) < SyncPriorityConfig.SMC_DEMAND_WINDOW:
+                return TIER_WARM
+            return TIER_IDLE
+
+    def get_interval(self, symbol: str, timeframe: str, base_interval: float) -> float:
+        """Refresh interval for a series given its timeframe's base interval"""
+        tier = self.get_tier(symbol, timeframe)
+        if tier == TIER_HOT:
+            return max(SyncPriorityConfig.MIN_INTERVAL, base_interval * SyncPriorityConfig.HOT_INTERVAL_FACTOR)
+        if tier == TIER_WARM:
+            return base_interval
+
+        with self._lock:
+            level = self._idle_levels.get((symbol, timeframe), 0)
+        return min(
+            base_interval * SyncPriorityConfig.IDLE_BACKOFF_MULTIPLIER ** level,
+            max(base_interval, SyncPriorityConfig.IDLE_MAX_INTERVAL),
+        )
+
+    def record_refresh(self, symbol: str, timeframe: str) -> None:
+        """Advance the idle backoff of a series after a refresh (reset when in demand)"""
+        tier = self.get_tier(symbol, timeframe)
+        with self._lock:
+            key = (symbol, timeframe)
+            if tier == TIER_IDLE:
+                self._idle_levels[key] = min(self._idle_levels.get(key, 0) + 1, 16)
+            else:
+                self._idle_levels.pop(key, None)
+
+    def _prune(self, now: float) -> None:
+        self._boosts = {key: expiry for key, expiry in self._boosts.items() if expiry > now}
+        self._last_request = {
+            symbol: ts for symbol, ts in self._last_request.items() if now - ts < SyncPriorityConfig.SMC_DEMAND_WINDOW
+        }
+
+    def get_status(self, symbols: Iterable[str], timeframes: Dict[str, float]) -> Dict:
+        """Tier and effective interval of every series"""
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            boosts = {
+                f"{symbol}_{timeframe or '*'}": round(expiry - now)
+                for (symbol, timeframe), expiry in self._boosts.items()
+            }
+            trading_symbols = sorted(self._trading_symbols)
+
+        series = {}
+        tier_counts = {TIER_HOT: 0, TIER_WARM: 0, TIER_IDLE: 0}
+        for symbol in symbols:
+            for timeframe, base_interval in timeframes.items():
+                tier = self.get_tier(symbol, timeframe)
+                tier_counts[tier] += 1
+                series[f"{symbol}_{timeframe}"] = {
+                    "tier": tier,
+                    "interval": round(self.get_interval(symbol, timeframe, base_interval)),
+                }
+
+        return {
+            "tiers": tier_counts,
+            "trading_symbols": trading_symbols,
+            "boosts": boosts,
+            "series": series,
+        }
+
+
+# Global scheduler shared by the sync service and the request handlers feeding it demand
+sync_priorities = SyncPriorityScheduler()
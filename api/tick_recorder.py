@@ -0,0 +1,407 @@
+"""
+Tick Recorder - append-only binary log of price ticks and a deterministic replay driver
+
+Performance problems and paper-trading edge cases in the monitoring loop could not be
+reproduced because prices only ever came live from the exchanges. Every tick the price
+hub publishes (symbol, source, price, timestamp) can now be appended to a compact log,
+and a recorded log can be fed back into the hub - and from there the enhanced cache and
+update_all_positions_with_live_data - at recorded speed or as fast as possible
+(scripts/tick_replay.py).
+
+File format (little-endian), one file per UTC day (of the write, not of the tick) and
+process: ticks-YYYYMMDD-<pid>.bin
+- segment header: MAGIC (8 bytes) + created_at (f64); every writer open starts a new
+  segment and the string table below restarts with it
+- string record: b"S" + id (u16) + length (u8) + UTF-8 bytes - symbols and sources
+- tick record:   b"T" + symbol id (u16) + source id (u16) + timestamp (f64) + price (f64),
+  21 bytes
+
+Writes are buffered and flushed in whole records every FLUSH_INTERVAL seconds by a
+background flusher (or as soon as FLUSH_BYTES are buffered), so a crash loses at most the
+unflushed ticks even when prices stop moving; a truncated tail is cut off when the file
+is reopened and skipped by the reader. Files are per process so gunicorn workers never
+interleave writes. Ticks carry their fetch time, which is not monotonic within a file
+(e.g. prices taken from the shared cache), so load_ticks() sorts each file before
+merging them by timestamp.
+"""
+
+import atexit
+import glob
+import heapq
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+# Import configuration constants
+try:
+    from config import TickRecorderConfig
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config import TickRecorderConfig
+
+MAGIC = b"\x89TICKS\r\n"
+SEGMENT = struct.Struct("<8sd")
+STRING = struct.Struct("<cHB")
+TICK = struct.Struct("<cHHdd")
+MAX_STRING_IDS = 0xFFFF
+
+FILE_PATTERN = "ticks-*.bin"
+
+
+class RecordedTick(NamedTuple):
+    timestamp: float
+    symbol: str
+    source: str
+    price: float
+
+
+def log_path(directory: str, timestamp: float, pid: Optional[int] = None) -> str:
+    day = time.strftime("%Y%m%d", time.gmtime(timestamp))
+    return os.path.join(directory, f"ticks-{day}-{pid or os.getpid()}.bin")
+
+
+def log_day(path: str) -> Optional[str]:
+    """YYYYMMDD of a log file name (None if it is not one)"""
+    parts = os.path.basename(path).split("-")
+    return parts[1] if len(parts) == 3 and parts[0] == "ticks" and parts[1].isdigit() else None
+
+
+def log_files(directory: str, day: Optional[str] = None) -> List[str]:
+    """Log files in a directory (optionally only one YYYYMMDD day), oldest day first"""
+    paths = [path for path in glob.glob(os.path.join(directory, FILE_PATTERN)) if log_day(path)]
+    if day:
+        paths = [path for path in paths if log_day(path) == day]
+    return sorted(paths)
+
+
+def _parse(data: bytes, path: str = "") -> Iterator[RecordedTick]:
+    strings: Dict[int, str] = {}
+    offset, end = 0, len(data)
+    while offset < end:
+        kind = data[offset : offset + 1]
+        if kind == b"T":
+            if offset + TICK.size > end:
+                break
+            _, symbol_id, source_id, timestamp, price = TICK.unpack_from(data, offset)
+            offset += TICK.size
+            yield RecordedTick(timestamp, strings.get(symbol_id, "?"), strings.get(source_id, "?"), price)
+        elif kind == b"S":
+            if offset + STRING.size > end:
+                break
+            _, string_id, length = STRING.unpack_from(data, offset)
+            start = offset + STRING.size
+            if start + length > end:
+                break
+            strings[string_id] = data[start : start + length].decode("utf-8", "replace")
+            offset = start + length
+        elif data.startswith(MAGIC, offset):
+            if offset + SEGMENT.size > end:
+                break
+            strings = {}
+            offset += SEGMENT.size
+        else:
+            logging.warning(f"TICK-RECORDER: Unknown record at byte {offset} of {path or 'log'}, rest skipped")
+            return
+    if offset < end:
+        logging.warning(f"TICK-RECORDER: Truncated record at byte {offset} of {path or 'log'} skipped")
+
+
+def valid_length(path: str) -> int:
+    """Bytes of a log file up to the end of its last complete record"""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset, end = 0, len(data)
+    while offset < end:
+        kind = data[offset : offset + 1]
+        if kind == b"T" and offset + TICK.size <= end:
+            offset += TICK.size
+        elif kind == b"S" and offset + STRING.size <= end and offset + STRING.size + data[offset + 3] <= end:
+            offset += STRING.size + data[offset + 3]
+        elif data.startswith(MAGIC, offset) and offset + SEGMENT.size <= end:
+            offset += SEGMENT.size
+        else:
+            break
+    return offset
+
+
+def read_ticks(path: str) -> Iterator[RecordedTick]:
+    """Ticks of one log file in recorded order (a truncated tail is skipped)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return _parse(data, path)
+
+
+def load_ticks(paths: Iterable[str]) -> Iterator[RecordedTick]:
+    """Ticks of several log files (e.g. one per worker) merged by timestamp"""
+
+    def by_timestamp(tick: RecordedTick) -> float:
+        return tick.timestamp
+
+    # Stable sort: ticks with equal timestamps keep their recorded order
+    return heapq.merge(*(sorted(read_ticks(path), key=by_timestamp) for path in paths), key=by_timestamp)
+
+
+class TickRecorder:
+    """
+    Price hub subscriber that appends every tick to the current day's log file
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or TickRecorderConfig.DIRECTORY
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._strings: Dict[str, int] = {}
+        self._file = None
+        self._path: Optional[str] = None
+        self._day: Optional[str] = None
+        self._pid: Optional[int] = None
+        self._last_flush = time.time()
+        self._hub = None
+        self._token: Optional[int] = None
+        self._atexit_registered = False
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        self._stop_event = threading.Event()
+        self.stats = {
+            "ticks": 0,
+            "bytes_written": 0,
+            "flushes": 0,
+            "files_opened": 0,
+            "files_deleted": 0,
+            "write_errors": 0,
+        }
+
+    def start(self, hub=None) -> None:
+        """Subscribe to the price hub (the global one by default)"""
+        if self._token is not None:
+            return
+        if hub is None:
+            from .price_hub import price_hub as hub
+        self._hub = hub
+        self._token = hub.subscribe(lambda tick: self.record(tick.symbol, tick.price, tick.source, tick.timestamp))
+        self._stop_event.clear()
+        self._ensure_flusher()
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+        logging.info(f"TICK-RECORDER: Recording price ticks to {self.directory}")
+
+    def stop(self) -> None:
+        """Unsubscribe, write what is buffered and close the file"""
+        if self._token is not None and self._hub is not None:
+            self._hub.unsubscribe(self._token)
+        self._token = None
+        self._stop_event.set()
+        with self._lock:
+            self._write()
+            self._close()
+
+    @property
+    def recording(self) -> bool:
+        return self._token is not None
+
+    def record(self, symbol: str, price: float, source: str, timestamp: float) -> None:
+        """Buffer one tick (rotates to a new file when the wall-clock UTC day changes)"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent owns its file and buffer
+                self._buffer.clear()
+                self._file = None
+                self._day = None
+                self._pid = os.getpid()
+                if self.recording:
+                    self._ensure_flusher()
+            # Rotate on the clock, not the tick's fetch time: ticks are not monotonic, and
+            # around midnight yesterday's and today's ticks would reopen the file every time
+            now = time.time()
+            day = time.strftime("%Y%m%d", time.gmtime(now))
+            if day != self._day:
+                self._write()
+                self._open(now, day)
+            if len(self._strings) >= MAX_STRING_IDS - 1:
+                self._start_segment()
+            self._buffer += TICK.pack(b"T", self._string_id(symbol), self._string_id(source or ""), timestamp, price)
+            self.stats["ticks"] += 1
+            if len(self._buffer) >= TickRecorderConfig.FLUSH_BYTES or (
+                time.time() - self._last_flush >= TickRecorderConfig.FLUSH_INTERVAL
+            ):
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                self._write()
+
+    def _ensure_flusher(self) -> None:
+        """Start the periodic flusher for this process (threads do not survive a fork)"""
+        if self._flusher is not None and self._flusher_pid == os.getpid() and self._flusher.is_alive():
+            return
+        self._flusher_pid = os.getpid()
+        self._flusher = threading.Thread(target=self._flush_loop, name="TickRecorderFlusher", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(TickRecorderConfig.FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"TICK-RECORDER: Periodic flush failed: {e}")
+
+    def _string_id(self, value: str) -> int:
+        string_id = self._strings.get(value)
+        if string_id is None:
+            encoded = value.encode("utf-8")[:255]
+            string_id = self._strings[value] = len(self._strings) + 1
+            self._buffer += STRING.pack(b"S", string_id, len(encoded)) + encoded
+        return string_id
+
+    def _start_segment(self) -> None:
+        self._strings = {}
+        self._buffer += SEGMENT.pack(MAGIC, time.time())
+
+    def _open(self, timestamp: float, day: str) -> None:
+        self._close()
+        self._day = day
+        self._path = log_path(self.directory, timestamp)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self._path):
+                length = valid_length(self._path)
+                if length != os.path.getsize(self._path):
+                    os.truncate(self._path, length)
+                    logging.warning(f"TICK-RECORDER: Cut truncated tail of {self._path} at byte {length}")
+            self._file = open(self._path, "ab")
+            self.stats["files_opened"] += 1
+        except OSError as e:
+            self._file = None
+            self.stats["write_errors"] += 1
+            logging.error(f"TICK-RECORDER: Cannot open {self._path}: {e}")
+        self._start_segment()
+        self._delete_expired(day)
+
+    def _write(self) -> None:
+        self._last_flush = time.time()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._buffer.clear()  # unwritable directory: drop rather than grow without bound
+            return
+        try:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self.stats["bytes_written"] += len(self._buffer)
+            self.stats["flushes"] += 1
+        except OSError as e:
+            self.stats["write_errors"] += 1
+            logging.error(f"TICK-RECORDER: Write to {self._path} failed: {e}")
+        self._buffer.clear()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._day = None
+
+    def _delete_expired(self, today: str) -> None:
+        if not TickRecorderConfig.RETENTION_DAYS:
+            return
+        cutoff = (datetime.strptime(today, "%Y%m%d") - timedelta(days=TickRecorderConfig.RETENTION_DAYS)).strftime("%Y%m%d")
+        for path in log_files(self.directory):
+            if log_day(path) < cutoff:
+                try:
+                    os.remove(path)
+                    self.stats["files_deleted"] += 1
+                    logging.info(f"TICK-RECORDER: Deleted expired log {os.path.basename(path)}")
+                except OSError as e:
+                    logging.warning(f"TICK-RECORDER: Cannot delete {path}: {e}")
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": TickRecorderConfig.ENABLED,
+                "recording": self.recording,
+                "directory": self.directory,
+                "file": self._path if self._file is not None else None,
+                "buffered_bytes": len(self._buffer),
+                **self.stats,
+            }
+
+
+class TickReplayer:
+    """
+    Feeds recorded ticks to a sink in recorded order
+
+    speed 0 replays as fast as possible, 1 at recorded speed, N at N times recorded speed.
+    With interval set, on_interval(recorded_time) runs each time the recorded clock
+    crosses an interval boundary - before the first tick past it is delivered, so the
+    callback sees exactly the ticks recorded up to the boundary regardless of speed.
+    Ticks are delivered with the current wall-clock time as timestamp (rebase=True) so
+    max_age checks in the price hub treat them as fresh.
+    """
+
+    def __init__(self, ticks: Iterable[RecordedTick], speed: float = 0.0, rebase: bool = True):
+        self.ticks = ticks
+        self.speed = max(0.0, speed)
+        self.rebase = rebase
+
+    def run(
+        self,
+        sink: Callable[[str, float, str, float], object],
+        interval: Optional[float] = None,
+        on_interval: Optional[Callable[[float], object]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict:
+        """
+        Replay into sink(symbol, price, source, timestamp) - price_hub.publish fits
+
+        Returns:
+            ticks delivered, interval callbacks, recorded span and wall time
+        """
+        delivered = intervals = 0
+        first = last = None
+        next_boundary = None
+        wall_start = time.perf_counter()
+
+        for tick in self.ticks:
+            if limit is not None and delivered >= limit:
+                break
+            if first is None:
+                first = tick.timestamp
+                next_boundary = first + interval if interval and on_interval else None
+            if self.speed:
+                delay = (tick.timestamp - first) / self.speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            if next_boundary is not None and tick.timestamp >= next_boundary:
+                on_interval(next_boundary)
+                intervals += 1
+                # Empty stretches of the recording collapse into one callback
+                next_boundary += interval * max(1, int((tick.timestamp - next_boundary) // interval) + 1)
+            sink(tick.symbol, tick.price, tick.source, time.time() if self.rebase else tick.timestamp)
+            delivered += 1
+            last = tick.timestamp
+
+        if next_boundary is not None and delivered:
+            on_interval(last)
+            intervals += 1
+
+        wall = time.perf_counter() - wall_start
+        return {
+            "ticks": delivered,
+            "intervals": intervals,
+            "recorded_seconds": round((last - first) if first is not None else 0.0, 3),
+            "wall_seconds": round(wall, 3),
+            "ticks_per_second": round(delivered / wall, 1) if wall > 0 else 0.0,
+        }
+
+
+# Global recorder (started by the app when TickRecorderConfig.ENABLED)
+tick_recorder = TickRecorder()
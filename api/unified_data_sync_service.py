@@ -10,69 +10,166 @@ coordinated service for better integration and synchronization:
 """
 
 import logging
-import statistics
+import math
+import os
 import threading
 import time
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-import requests
-
 # Import configuration constants
 try:
-    from config import CacheConfig, CircuitBreakerConfig, RollingWindowConfig, SMCConfig, TimeConfig, TradingConfig
+    from config import CacheConfig, CircuitBreakerConfig, RollingWindowConfig, SMCConfig, SyncPriorityConfig, TimeConfig, TradingConfig
 except ImportError:
-    import os
     import sys
 
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from config import CacheConfig, CircuitBreakerConfig, RollingWindowConfig, SMCConfig, TimeConfig, TradingConfig
+    from config import CacheConfig, CircuitBreakerConfig, RollingWindowConfig, SMCConfig, SyncPriorityConfig, TimeConfig, TradingConfig
 
+from .async_http import async_http
+from .binance_weight_budget import binance_weight_budget, klines_request_weight
 from .circuit_breaker import circuit_manager, with_circuit_breaker
+from .klines_stream import klines_stream
+from .leader_election import leader_election
+from .service_supervisor import service_supervisor
+from .shared_price_cache import shared_entry_age
+from .sync_metrics import OUTCOME_ERROR, sync_metrics
+from .sync_priorities import sync_priorities
+
+
+class _PriceWindow:
+    """
+    Ring buffer of recent prices with a running mean and sum of squared deviations (Welford)
+
+    The sums are kept over price - shift (a recent price), so rounding error scales with the
+    price moves rather than the price level.
+    """
+
+    __slots__ = (
+        "lock", "prices", "timestamps", "start", "count", "shift", "mean", "m2", "flat_run", "volatility", "evictions"
+    )
+
+    def __init__(self, capacity: int):
+        self.lock = threading.Lock()
+        self.prices = [0.0] * capacity
+        self.timestamps = [0.0] * capacity  # time.monotonic()
+        self.start = 0
+        self.count = 0
+        self.shift = 0.0
+        self.mean = 0.0  # of price - shift
+        self.m2 = 0.0
+        self.flat_run = 0  # trailing prices equal to the newest one
+        self.volatility: Optional[float] = None  # None until the window first holds 3 prices
+        self.evictions = 0
+
+    def expire(self, cutoff: float) -> None:
+        while self.count and self.timestamps[self.start] <= cutoff:
+            self._remove_oldest()
+
+    def append(self, price: float, timestamp: float) -> None:
+        capacity = len(self.prices)
+        if self.count == capacity:
+            self._remove_oldest()
+        index = (self.start + self.count) % capacity
+        newest = self.prices[index - 1] if self.count else None
+        self.flat_run = self.flat_run + 1 if price == newest else 1
+        self.prices[index] = price
+        self.timestamps[index] = timestamp
+        self.count += 1
+        if self.flat_run >= self.count:
+            # Every price in the window is equal: exact zero instead of rounding residue
+            self.shift, self.mean, self.m2 = price, 0.0, 0.0
+            return
+        value = price - self.shift
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def _remove_oldest(self) -> None:
+        value = self.prices[self.start] - self.shift
+        self.start = (self.start + 1) % len(self.prices)
+        self.count -= 1
+        self.flat_run = min(self.flat_run, self.count)
+        if self.count == 0:
+            self.mean, self.m2 = 0.0, 0.0
+            return
+        if self.flat_run >= self.count:
+            self.shift, self.mean, self.m2 = self.prices[self.start], 0.0, 0.0
+            return
+        previous_mean = self.mean
+        self.mean -= (value - previous_mean) / self.count
+        self.m2 -= (value - previous_mean) * (value - self.mean)
+
+        # Removals accumulate rounding error; recompute exactly once per buffer length (amortised O(1))
+        self.evictions += 1
+        if self.evictions >= len(self.prices):
+            self.evictions = 0
+            self._resync()
+
+    def _resync(self) -> None:
+        capacity = len(self.prices)
+        self.shift = self.prices[self.start]
+        values = [self.prices[(self.start + i) % capacity] - self.shift for i in range(self.count)]
+        self.mean = sum(values) / self.count
+        self.m2 = sum((value - self.mean) ** 2 for value in values)
+
+    def stdev_over_mean(self) -> float:
+        """Sample standard deviation / mean (statistics.stdev / statistics.mean)"""
+        mean = self.shift + self.mean
+        if mean == 0:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1)) / mean
 
 
 class VolatilityTracker:
-    """Track price volatility for smart cache invalidation"""
+    """
+    Track price volatility for smart cache invalidation
+
+    Each symbol keeps its last window_size prices from the past
+    CacheConfig.VOLATILITY_WINDOW_SECONDS in a ring buffer with running Welford sums, so
+    add_price and get_volatility are O(1) and only contend with writers of the same symbol.
+    """
 
     def __init__(self, window_size=None):
         self.window_size = window_size or CacheConfig.VOLATILITY_WINDOW_SIZE
-        self.price_history = defaultdict(list)  # {symbol: [prices]}
-        self.volatility_cache = {}  # {symbol: volatility_score}
-        self.lock = threading.Lock()
+        self._windows: Dict[str, _PriceWindow] = {}
+        self._lock = threading.Lock()  # guards creation of per-symbol windows only
+
+    def _window(self, symbol: str) -> _PriceWindow:
+        window = self._windows.get(symbol)
+        if window is None:
+            with self._lock:
+                window = self._windows.setdefault(symbol, _PriceWindow(self.window_size))
+        return window
 
     def add_price(self, symbol: str, price: float):
         """Add a new price point and calculate volatility"""
-        with self.lock:
-            self.price_history[symbol].append(
-                {"price": price, "timestamp": datetime.utcnow()}
-            )
-
-            # Keep only recent prices within window
-            cutoff_time = datetime.utcnow() - timedelta(minutes=5)
-            self.price_history[symbol] = [
-                p for p in self.price_history[symbol] if p["timestamp"] > cutoff_time
-            ][-self.window_size :]
+        window = self._window(symbol)
+        now = time.monotonic()
+        with window.lock:
+            window.expire(now - CacheConfig.VOLATILITY_WINDOW_SECONDS)
+            window.append(price, now)
 
             # Calculate volatility if we have enough data points
-            if len(self.price_history[symbol]) >= 3:
-                prices = [p["price"] for p in self.price_history[symbol]]
-
-                # Calculate standard deviation as volatility measure
-                try:
-                    volatility = (
-                        statistics.stdev(prices)
-                        / statistics.mean(prices)
-                        * CacheConfig.VOLATILITY_CALCULATION_MULTIPLIER
-                    )
-                    self.volatility_cache[symbol] = volatility
-                except (statistics.StatisticsError, ZeroDivisionError):
-                    self.volatility_cache[symbol] = 0.0
+            if window.count >= 3:
+                window.volatility = window.stdev_over_mean() * CacheConfig.VOLATILITY_CALCULATION_MULTIPLIER
 
     def get_volatility(self, symbol: str) -> float:
         """Get current volatility score for symbol (0-100+)"""
-        with self.lock:
-            return self.volatility_cache.get(symbol, 0.0)
+        window = self._windows.get(symbol)
+        # A float attribute read is atomic - no lock needed
+        volatility = window.volatility if window is not None else None
+        return volatility if volatility is not None else 0.0
+
+    @property
+    def volatility_cache(self) -> Dict[str, float]:
+        """{symbol: volatility_score} for every symbol with a computed volatility"""
+        return {
+            symbol: window.volatility
+            for symbol, window in list(self._windows.items())
+            if window.volatility is not None
+        }
 
     def is_high_volatility(
         self, symbol: str, threshold: Optional[float] = None
@@ -91,6 +188,8 @@ class SmartCache:
 
         # Price cache with enhanced metadata
         self.price_cache = {}  # {symbol: cache_entry}
+        # Optional cross-worker backend (see shared_price_cache.configure_shared_price_cache)
+        self.shared_backend = None
 
         # User data caches
         self.user_trade_configs_cache = {}  # {user_id: cache_entry}
@@ -105,6 +204,7 @@ class SmartCache:
             "user_data_misses": 0,
             "invalidations": 0,
             "total_requests": 0,
+            "shared_hits": 0,
         }
 
         # Cache configurations
@@ -163,12 +263,62 @@ class SmartCache:
             dynamic_ttl = int(base_ttl * ttl_multiplier)
             return min(self.config["max_price_ttl"], dynamic_ttl)
 
+    def attach_shared_backend(self, backend) -> None:
+        """Share prices with the other worker processes through backend (mmap or postgres)"""
+        self.shared_backend = backend
+
+    def _get_shared_price(self, symbol: str) -> Optional[Dict]:
+        """Valid shared entry for symbol, or None"""
+        if self.shared_backend is None:
+            return None
+        try:
+            entry = self.shared_backend.read(symbol)
+        except Exception as e:
+            logging.warning(f"Shared price cache read failed for {symbol}: {e}")
+            return None
+        if entry is None or shared_entry_age(entry) >= entry["ttl"]:
+            return None
+        return entry
+
+    def get_shared_prices(self, symbols: List[str], max_age: float) -> Dict[str, Dict]:
+        """Shared entries younger than max_age (empty without a shared backend)"""
+        if self.shared_backend is None:
+            return {}
+        try:
+            entries = self.shared_backend.read_many(symbols)
+        except Exception as e:
+            logging.warning(f"Shared price cache read failed: {e}")
+            return {}
+        now = time.time()
+        return {symbol: entry for symbol, entry in entries.items() if shared_entry_age(entry, now) < max_age}
+
     # Price Caching Methods
     def get_price(self, symbol: str) -> Optional[Tuple[float, str, Dict]]:
-        """Get cached price with metadata"""
+        """Get cached price with metadata (the newer of the shared and local entries)"""
+        shared_entry = self._get_shared_price(symbol)
+
         with self.lock:
             self.cache_stats["total_requests"] += 1
 
+            local_entry = self.price_cache.get(symbol)
+            local_age = (
+                (datetime.utcnow() - local_entry["timestamp"]).total_seconds() if local_entry else None
+            )
+            if shared_entry is not None and (local_age is None or shared_entry_age(shared_entry) < local_age):
+                self.cache_stats["price_hits"] += 1
+                self.cache_stats["shared_hits"] += 1
+                return (
+                    shared_entry["price"],
+                    shared_entry["source"],
+                    {
+                        "cached": True,
+                        "shared": True,
+                        "age_seconds": shared_entry_age(shared_entry),
+                        "hits": local_entry["hits"] if local_entry else 0,
+                        "volatility": shared_entry["volatility"],
+                    },
+                )
+
             if symbol in self.price_cache:
                 cache_entry = self.price_cache[symbol]
 
@@ -197,8 +347,12 @@ class SmartCache:
             self.cache_stats["price_misses"] += 1
             return None
 
-    def set_price(self, symbol: str, price: float, source: str) -> None:
-        """Cache price with dynamic TTL based on volatility"""
+    def set_price(self, symbol: str, price: float, source: str, timestamp: Optional[float] = None) -> None:
+        """Cache price with dynamic TTL based on volatility
+
+        timestamp: epoch seconds the price was fetched at (defaults to now); the shared
+        backend only takes entries newer than the one it holds
+        """
         # Track price for volatility calculation
         self.volatility_tracker.add_price(symbol, price)
 
@@ -220,6 +374,21 @@ class SmartCache:
             # Debug log for cache operations with volatility info
             logging.debug(f"Cached price {symbol}: ${price:.4f} (source: {source}, TTL: {dynamic_ttl}s, volatility: {volatility:.2f}%)")
 
+        if self.shared_backend is not None:
+            try:
+                self.shared_backend.write(
+                    symbol,
+                    {
+                        "price": price,
+                        "source": source,
+                        "timestamp": timestamp or time.time(),
+                        "ttl": dynamic_ttl,
+                        "volatility": volatility,
+                    },
+                )
+            except Exception as e:
+                logging.warning(f"Shared price cache write failed for {symbol}: {e}")
+
     def invalidate_price(self, symbol: Optional[str] = None) -> None:
         """Invalidate price cache for symbol or all symbols"""
         with self.lock:
@@ -227,11 +396,20 @@ class SmartCache:
                 if symbol in self.price_cache:
                     del self.price_cache[symbol]
                     self.cache_stats["invalidations"] += 1
+                symbols = [symbol]
             else:
+                symbols = list(self.price_cache)
                 count = len(self.price_cache)
                 self.price_cache.clear()
                 self.cache_stats["invalidations"] += count
 
+        if self.shared_backend is not None:
+            for invalidated in symbols:
+                try:
+                    self.shared_backend.invalidate(invalidated)
+                except Exception as e:
+                    logging.warning(f"Shared price cache invalidation failed for {invalidated}: {e}")
+
     # User Data Caching Methods
     def get_user_trade_configs(self, user_id: str) -> Optional[Tuple[Dict, Dict]]:
         """Get cached user trade configurations"""
@@ -442,6 +620,7 @@ class SmartCache:
                     "user_preferences": safe_cache_len(self.user_preferences_cache, "user_preferences"),
                 },
                 "detailed_stats": self.cache_stats.copy(),
+                "shared_backend": self.shared_backend.get_status() if self.shared_backend is not None else None,
                 "volatility_tracking": {
                     "symbols_tracked": safe_cache_len(getattr(self.volatility_tracker, 'volatility_cache', None), "volatility_tracker"),
                     "high_volatility_symbols": [
@@ -462,6 +641,7 @@ class SmartCache:
                 "user_data_misses": 0,
                 "invalidations": 0,
                 "total_requests": 0,
+                "shared_hits": 0,
             }
 
 
@@ -489,6 +669,16 @@ class UnifiedDataSyncService:
             "1d": 900    # Update every 15 minutes for daily candles
         }
         
+        # Symbols kept in sync - replaceable at runtime through reconfigure()
+        self.symbols: List[str] = list(TradingConfig.SUPPORTED_SYMBOLS)
+        
+        # Bumped on every start(): a loop thread from before a restart (e.g. one that was
+        # stalled) exits at its next iteration instead of running next to the new one
+        self._generation = 0
+        
+        # Set by reconfigure() to cut the wait between cycles short
+        self._reconfigured = threading.Event()
+        
         # Track last update times per symbol/timeframe
         self.last_klines_updates: Dict[str, Dict[str, datetime]] = {}
         self.last_cache_cleanup: Optional[datetime] = None
@@ -496,6 +686,17 @@ class UnifiedDataSyncService:
         # Track gap fill failures for exponential backoff
         self._gap_fill_failures = {}
         
+        # Last scan for missing ranges to backfill (epoch seconds)
+        self.last_backfill_scan: Optional[float] = None
+        
+        # Last expiry/retention maintenance (epoch seconds) - cycles run whenever a series is due, maintenance less often
+        self.last_klines_cleanup: Optional[float] = None
+        
+        # Incremental cleanup ledger per (symbol, timeframe): rows written since the series was last
+        # cleaned plus its last known row count - only series crossing their threshold get cleaned
+        self.cleanup_ledger: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.cleanup_ledger_lock = threading.Lock()
+        
         logging.info("Unified data sync service initialized")
 
     @with_circuit_breaker("binance_klines_bulk_api", failure_threshold=CircuitBreakerConfig.BINANCE_FAILURE_THRESHOLD, recovery_timeout=CircuitBreakerConfig.BINANCE_RECOVERY_TIMEOUT, success_threshold=2)
@@ -519,7 +720,13 @@ class UnifiedDataSyncService:
             "limit": min(limit, 1000)  # Binance API limit
         }
         
-        response = requests.get(url, params=params, timeout=TimeConfig.PRICE_API_TIMEOUT)
+        # Reserve request weight (blocks only when the per-minute budget is nearly spent)
+        weight = klines_request_weight(params["limit"])
+        binance_weight_budget.acquire(weight)
+        request_started = time.perf_counter()
+        response = async_http.get(url, params=params, timeout=TimeConfig.PRICE_API_TIMEOUT)
+        sync_metrics.record_fetch(time.perf_counter() - request_started, len(response.content), weight)
+        binance_weight_budget.record_response(response)
         response.raise_for_status()
         
         klines_raw = response.json()
@@ -573,9 +780,6 @@ class UnifiedDataSyncService:
         Returns:
             List of klines data in OHLCV format
         """
-        # Add delay before gap fill requests to respect rate limits
-        time.sleep(TimeConfig.BINANCE_KLINES_DELAY)
-        
         url = "https://api.binance.com/api/v3/klines"
         params = {
             "symbol": symbol,
@@ -583,7 +787,13 @@ class UnifiedDataSyncService:
             "limit": min(limit, 10)  # Conservative limit for gap fills
         }
         
-        response = requests.get(url, params=params, timeout=TimeConfig.PRICE_API_TIMEOUT)
+        # Rate limits are enforced by the shared weight budget rather than a fixed pre-request delay
+        weight = klines_request_weight(params["limit"])
+        binance_weight_budget.acquire(weight)
+        request_started = time.perf_counter()
+        response = async_http.get(url, params=params, timeout=TimeConfig.PRICE_API_TIMEOUT)
+        sync_metrics.record_fetch(time.perf_counter() - request_started, len(response.content), weight)
+        binance_weight_budget.record_response(response)
         response.raise_for_status()
         
         klines_raw = response.json()
@@ -641,7 +851,8 @@ class UnifiedDataSyncService:
         Returns:
             True if update is needed, False otherwise
         """
-        update_interval = self.timeframes.get(timeframe, 300)
+        # Demand-driven interval: hot series refresh faster, idle ones back off
+        update_interval = sync_priorities.get_interval(symbol, timeframe, self.timeframes.get(timeframe, 300))
         
         # Check if we have last update time tracked
         if symbol not in self.last_klines_updates:
@@ -667,106 +878,84 @@ class UnifiedDataSyncService:
             
         return needs_update
 
-    def _get_existing_data_info(self, symbol: str, timeframe: str) -> Dict:
+    def _get_series_freshness(self, symbols: List[str]) -> Dict[Tuple[str, str], Dict]:
         """
-        Get information about existing cached data for a symbol/timeframe
-        
+        Summarize cached data for every symbol/timeframe series with one aggregate query
+
         Returns:
-            Dict with keys: count, oldest_timestamp, newest_timestamp, needs_initial_population, has_recent_data
+            Dict keyed by (symbol, timeframe) - see KlinesCache.get_series_freshness
         """
+        if not self.app:
+            logging.debug("No app context available for klines freshness check")
+            return {}
+
         try:
-            # Skip database operations if no app context available
-            if not self.app:
-                logging.debug(f"No app context available for {symbol} {timeframe} data check")
-                return {
-                    "count": 0,
-                    "oldest_timestamp": None,
-                    "newest_timestamp": None,
-                    "needs_initial_population": True,
-                    "has_recent_data": False
-                }
-                
-            # Get existing cached data with proper app context
             with self.app.app_context():
-                from .models import KlinesCache, get_utc_now
-                
-                # Check for recent data (last 48 hours worth)
-                recent_limit = 48 if timeframe == "1h" else 12 if timeframe == "4h" else 2  # Last 48h worth
-                recent_data = KlinesCache.get_cached_data(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    limit=recent_limit,
-                    include_incomplete=True
-                )
-                
-                # Check total data count with a reasonable sample
-                total_data = KlinesCache.get_cached_data(
-                    symbol=symbol,
-                    timeframe=timeframe, 
-                    limit=200,  # Sample to check if we have substantial data
-                    include_incomplete=True
-                )
-                
-                if not total_data:
-                    return {
-                        "count": 0,
-                        "oldest_timestamp": None,
-                        "newest_timestamp": None,
-                        "needs_initial_population": True,
-                        "has_recent_data": False
-                    }
-                    
-                timestamps = [candle["timestamp"] for candle in total_data]
-                timestamps.sort()
-                
-                # Determine if we need initial population based on data age and completeness
-                required_candles = self._get_required_initial_candles(timeframe)
-                current_time = get_utc_now()
-                
-                # Check if we have reasonable historical coverage
-                coverage_ratio = len(total_data) / required_candles if required_candles > 0 else 0
-                
-                if len(total_data) >= required_candles * 0.7:  # 70% coverage is sufficient
-                    needs_initial = False
-                    logging.debug(f"{symbol} {timeframe} has sufficient data: {len(total_data)}/{required_candles} candles ({coverage_ratio:.1%} coverage)")
-                else:
-                    # Check if newest data is very old (more than 1 day old)
-                    newest_time = timestamps[-1] if timestamps else None
-                    if newest_time:
-                        # Ensure newest_time is timezone-aware for comparison
-                        from api.models import normalize_to_utc
-                        newest_time_utc = normalize_to_utc(newest_time)
-                        age_hours = (current_time - newest_time_utc).total_seconds() / 3600
-                        needs_initial = age_hours > 24  # If data older than 24h, do initial population
-                        if needs_initial:
-                            logging.debug(f"{symbol} {timeframe} needs initial population: newest data is {age_hours:.1f}h old (insufficient coverage: {coverage_ratio:.1%})")
-                        else:
-                            logging.debug(f"{symbol} {timeframe} recent data is {age_hours:.1f}h old, coverage {coverage_ratio:.1%} - no initial population needed")
-                    else:
-                        needs_initial = True
-                        logging.debug(f"{symbol} {timeframe} needs initial population: no existing data found")
-                
-                result = {
-                    "count": len(total_data),
-                    "oldest_timestamp": timestamps[0] if timestamps else None,
-                    "newest_timestamp": timestamps[-1] if timestamps else None, 
-                    "needs_initial_population": needs_initial,
-                    "has_recent_data": len(recent_data) > 0
-                }
-                
-                logging.debug(f"{symbol} {timeframe} data analysis: {len(total_data)} total candles, {len(recent_data)} recent, needs_initial={needs_initial}")
-                return result
-            
+                from .models import KlinesCache
+
+                series = [(symbol, timeframe) for symbol in symbols for timeframe in self.timeframes]
+                return KlinesCache.get_series_freshness(series)
         except Exception as e:
-            logging.warning(f"Error checking existing data for {symbol} {timeframe}: {e}")
+            logging.warning(f"Error checking klines freshness for {len(symbols)} symbols: {e}")
+            return {}
+
+    def _build_data_info(self, symbol: str, timeframe: str, freshness: Optional[Dict]) -> Dict:
+        """
+        Derive existing data information for a symbol/timeframe from its freshness summary
+
+        Returns:
+            Dict with keys: count, oldest_timestamp, newest_timestamp, needs_initial_population,
+            has_recent_data, has_open_candle
+        """
+        if not freshness or freshness["total_count"] == 0:
             return {
                 "count": 0,
                 "oldest_timestamp": None,
                 "newest_timestamp": None,
                 "needs_initial_population": True,
-                "has_recent_data": False
+                "has_recent_data": False,
+                "has_open_candle": False
             }
 
+        # Determine if we need initial population based on data age and completeness
+        required_candles = self._get_required_initial_candles(timeframe)
+        count = freshness["total_count"]
+        newest_time = freshness["latest_timestamp"]
+        coverage_ratio = count / required_candles if required_candles > 0 else 0
+
+        if count >= required_candles * 0.7:  # 70% coverage is sufficient
+            needs_initial = False
+            logging.debug(f"{symbol} {timeframe} has sufficient data: {count}/{required_candles} candles ({coverage_ratio:.1%} coverage)")
+        else:
+            from .models import get_utc_now
+
+            age_hours = (get_utc_now() - newest_time).total_seconds() / 3600
+            needs_initial = age_hours > 24  # If data older than 24h, do initial population
+            if needs_initial:
+                logging.debug(f"{symbol} {timeframe} needs initial population: newest data is {age_hours:.1f}h old (insufficient coverage: {coverage_ratio:.1%})")
+            else:
+                logging.debug(f"{symbol} {timeframe} recent data is {age_hours:.1f}h old, coverage {coverage_ratio:.1%} - no initial population needed")
+
+        return {
+            "count": count,
+            "oldest_timestamp": freshness["oldest_complete"],
+            "newest_timestamp": newest_time,
+            "needs_initial_population": needs_initial,
+            "has_recent_data": True,
+            "has_open_candle": freshness["has_open_candle"]
+        }
+
+    def _get_existing_data_info(self, symbol: str, timeframe: str) -> Dict:
+        """
+        Get information about existing cached data for a symbol/timeframe
+
+        Returns:
+            Dict with keys: count, oldest_timestamp, newest_timestamp, needs_initial_population,
+            has_recent_data, has_open_candle
+        """
+        freshness = self._get_series_freshness([symbol]).get((symbol, timeframe))
+        return self._build_data_info(symbol, timeframe, freshness)
+
     def _populate_initial_data(self, symbol: str, timeframe: str) -> bool:
         """
         Populate initial historical data for a symbol/timeframe combination
@@ -787,9 +976,8 @@ class UnifiedDataSyncService:
             try:
                 klines_data = self._fetch_binance_klines(symbol, timeframe, required_candles)
             except Exception as e:
+                sync_metrics.record_error(e)
                 logging.warning(f"Binance API failed for {symbol} {timeframe}: {e}")
-                # Wait before marking as failed to avoid rapid retries
-                time.sleep(TimeConfig.API_RETRY_DELAY)
                 logging.info(f"Skipping {symbol} {timeframe} - will retry in next cycle when Binance recovers")
                 return False
             
@@ -822,6 +1010,7 @@ class UnifiedDataSyncService:
                     cache_ttl_minutes=ttl_minutes
                 )
             
+            sync_metrics.record_rows(saved_count)
             print(f"[RENDER-KLINES] Successfully populated {saved_count} candles for {symbol} {timeframe}")
             logging.info(f"[RENDER-KLINES] Successfully populated {saved_count} candles for {symbol} {timeframe}")
             
@@ -843,6 +1032,123 @@ class UnifiedDataSyncService:
             logging.debug(f"Initial population error context: required_candles={required_candles}, app_context={self.app is not None}")
             return False
 
+    def _resume_recent_data(self, symbol: str, timeframe: str, missing_candles: int) -> bool:
+        """
+        Fetch the candles missed since the latest cached one (e.g. after a snapshot import
+        or downtime) instead of a full initial population
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe to resume
+            missing_candles: Candles from the latest cached one up to the current open candle
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            try:
+                klines_data = self._fetch_binance_klines(symbol, timeframe, missing_candles)
+            except Exception as e:
+                sync_metrics.record_error(e)
+                logging.warning(f"Binance API failed resuming {symbol} {timeframe}: {e}")
+                return False
+
+            if not klines_data or not self.app:
+                return False
+
+            with self.app.app_context():
+                from .models import KlinesCache, get_utc_now
+
+                saved_count = KlinesCache.save_klines_batch(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    candlesticks=klines_data,
+                    cache_ttl_minutes=3
+                )
+
+            sync_metrics.record_rows(saved_count)
+            logging.info(f"Resumed {symbol} {timeframe} from latest cached candle: {saved_count} candles saved")
+
+            with self.lock:
+                self.last_klines_updates.setdefault(symbol, {})[timeframe] = get_utc_now()
+
+            return True
+
+        except Exception as e:
+            logging.error(f"Error resuming recent data for {symbol} {timeframe}: {e}")
+            return False
+
+    def _import_boot_snapshot(self) -> None:
+        """Load the configured klines snapshot once at service start (skips series already fresher)"""
+        snapshot_path = CacheConfig.KLINES_SNAPSHOT_PATH
+        if not snapshot_path or not self.app:
+            return
+
+        if not os.path.exists(snapshot_path):
+            logging.warning(f"KLINES-SNAPSHOT: Configured snapshot {snapshot_path} not found - using Binance backfill")
+            return
+
+        try:
+            with self.app.app_context():
+                from .klines_snapshot import import_snapshot
+
+                import_snapshot(snapshot_path)
+        except Exception as e:
+            logging.error(f"KLINES-SNAPSHOT: Boot import failed, falling back to Binance backfill: {e}")
+
+    def _resume_backfills(self) -> None:
+        """Finish backfills interrupted by a restart from their per-series checkpoints"""
+        if not self.app:
+            return
+
+        try:
+            with self.app.app_context():
+                from .klines_backfill import resume_pending_backfills
+
+                resume_pending_backfills(
+                    stop_event=self.stop_event,
+                    on_page=lambda checkpoint: self._heartbeat("resume_backfills", symbol=checkpoint.symbol, timeframe=checkpoint.timeframe),
+                )
+        except Exception as e:
+            logging.error(f"KLINES-BACKFILL: Resuming checkpoints failed: {e}")
+
+    def _backfill_missing_ranges(self, symbols: List[str]) -> None:
+        """
+        Periodically fill mid-series gaps with paginated range fetches
+
+        The scan window is the rolling-window target per timeframe, so the backfill never
+        refetches candles the rolling-window cleanup is allowed to delete.
+        """
+        now = time.time()
+        if self.last_backfill_scan and now - self.last_backfill_scan < CacheConfig.KLINES_BACKFILL_GAP_SCAN_INTERVAL:
+            return
+        self.last_backfill_scan = now
+
+        if not self.app:
+            return
+
+        try:
+            with self.app.app_context():
+                from .klines_backfill import backfill_candles
+
+                for symbol in symbols:
+                    for timeframe in self.timeframes.keys():
+                        if self.stop_event.is_set():
+                            return
+                        self._heartbeat("gap_backfill", symbol=symbol, timeframe=timeframe)
+                        result = backfill_candles(
+                            symbol,
+                            timeframe,
+                            RollingWindowConfig.get_target_candles(timeframe),
+                            stop_event=self.stop_event,
+                            on_page=lambda checkpoint: self._heartbeat("gap_backfill", symbol=checkpoint.symbol, timeframe=checkpoint.timeframe),
+                        )
+                        self._record_rows_written(symbol, timeframe, result["candles_saved"])
+                        if result["candles_saved"]:
+                            logging.info(f"KLINES-BACKFILL: Filled {result['candles_saved']} missing candles for {symbol} {timeframe}")
+        except Exception as e:
+            logging.error(f"KLINES-BACKFILL: Gap backfill scan failed: {e}")
+
     def _update_recent_data(self, symbol: str, timeframe: str) -> bool:
         """
         EFFICIENT: Update only the current open candle in place instead of fetching multiple candles
@@ -870,9 +1176,8 @@ class UnifiedDataSyncService:
                     # Use dedicated circuit breaker for gap fills (more conservative)
                     current_klines = self._fetch_binance_klines_gap_fill(symbol, timeframe, 1)  # Only fetch 1 candle
                 except Exception as e:
+                    sync_metrics.record_error(e)
                     logging.warning(f"Open candle update failed for {symbol} {timeframe}: {e}")
-                    # Use proper klines delay for gap fills (more conservative than generic retry delay)
-                    time.sleep(TimeConfig.BINANCE_KLINES_DELAY)
                     return False
                     
                 if not current_klines:
@@ -905,6 +1210,7 @@ class UnifiedDataSyncService:
                 )
                 
                 if success:
+                    sync_metrics.record_rows(1)
                     if existing_open_candle:
                         logging.debug(f"Updated existing open candle for {symbol} {timeframe}: C:{current_candle['close']}")
                     else:
@@ -971,9 +1277,14 @@ class UnifiedDataSyncService:
             self._gap_fill_failures[key] = max_failures // 2
 
     def _cleanup_klines_data(self):
-        """Enhanced cleanup of old klines data with rolling window management"""
+        """
+        Expiry and retention maintenance for klines (expired entries, partitions, old data, SMC signals)
+        
+        Rolling windows are no longer trimmed here - _cleanup_written_series() handles only the
+        series whose row accounting crossed their threshold.
+        """
         cleanup_start_time = time.time()
-        logging.info("CLEANUP_DEBUG: Starting klines data cleanup process")
+        logging.info("CLEANUP_DEBUG: Starting klines maintenance cleanup")
         
         try:
             # Skip cleanup if no app context available
@@ -988,34 +1299,29 @@ class UnifiedDataSyncService:
                 from .models import KlinesCache, SMCSignalCache
                 logging.debug("CLEANUP_DEBUG: Successfully imported models and entered app context")
                 
-                # First, check current database state
-                try:
-                    total_candles_before = 0
-                    candles_by_timeframe = {}
-                    
-                    # Get total count before cleanup
-                    from sqlalchemy import text
-                    from api.models import db
-                    
-                    result = db.session.execute(text("SELECT COUNT(*) FROM klines_cache"))
-                    total_candles_before = result.scalar()
-                    
-                    # Get breakdown by timeframe
-                    result = db.session.execute(text("SELECT timeframe, COUNT(*) FROM klines_cache GROUP BY timeframe"))
-                    candles_by_timeframe = dict(result.fetchall())
-                    
-                    logging.info(f"CLEANUP_DEBUG: Database state before cleanup - Total candles: {total_candles_before}")
-                    for timeframe, count in candles_by_timeframe.items():
-                        logging.info(f"CLEANUP_DEBUG: {timeframe}: {count} candles")
-                        
-                except Exception as e:
-                    logging.error(f"CLEANUP_DEBUG: Error checking database state: {e}")
-                    total_candles_before = -1
-                
+                # Partitioned PostgreSQL storage: retention drops whole monthly partitions
+                from .klines_partitioning import (
+                    drop_expired_partitions,
+                    ensure_klines_partitions,
+                    is_klines_partitioned,
+                )
+
+                partitioned = is_klines_partitioned()
+                if partitioned:
+                    try:
+                        ensure_klines_partitions()
+                        partition_results = drop_expired_partitions()
+                        if partition_results["dropped"]:
+                            logging.info(f"CLEANUP_DEBUG: Dropped {len(partition_results['dropped'])} expired klines partitions ({partition_results['rows_dropped']} rows)")
+                        if partition_results["default_rows_pruned"]:
+                            logging.info(f"CLEANUP_DEBUG: Pruned {partition_results['default_rows_pruned']} expired rows from default klines partitions")
+                    except Exception as e:
+                        logging.error(f"CLEANUP_DEBUG: Error in partition retention: {e}")
+
                 # Clean up expired cache entries (small batches to avoid locks)
                 logging.debug("CLEANUP_DEBUG: Starting expired cache cleanup")
                 try:
-                    expired_count = KlinesCache.cleanup_expired()
+                    expired_count = KlinesCache.cleanup_expired(delete_expired=not partitioned)
                     if expired_count > 0:
                         logging.info(f"CLEANUP_DEBUG: Cleaned up {expired_count} expired klines cache entries")
                     else:
@@ -1023,39 +1329,10 @@ class UnifiedDataSyncService:
                 except Exception as e:
                     logging.error(f"CLEANUP_DEBUG: Error in expired cache cleanup: {e}")
                     
-                # ROLLING WINDOW CLEANUP - NEW FEATURE
-                # This maintains the configured window size for each timeframe
-                logging.debug("CLEANUP_DEBUG: Starting rolling window cleanup")
-                try:
-                    # Check if the cleanup method exists
-                    if not hasattr(KlinesCache, 'cleanup_all_rolling_windows'):
-                        logging.error("CLEANUP_DEBUG: KlinesCache.cleanup_all_rolling_windows method not found!")
-                        rolling_window_results = {"total_deleted": 0, "symbols_processed": 0, "details": {}}
-                    else:
-                        logging.debug(f"CLEANUP_DEBUG: Calling rolling window cleanup with batch_size={RollingWindowConfig.CLEANUP_BATCH_SIZE}")
-                        rolling_window_results = KlinesCache.cleanup_all_rolling_windows(
-                            batch_size=RollingWindowConfig.CLEANUP_BATCH_SIZE
-                        )
-                        logging.debug(f"CLEANUP_DEBUG: Rolling window cleanup completed, results: {rolling_window_results}")
-                        
-                    if rolling_window_results["total_deleted"] > 0:
-                        logging.info(f"CLEANUP_DEBUG: Rolling window cleanup: deleted {rolling_window_results['total_deleted']} old candles across {rolling_window_results['symbols_processed']} symbol/timeframe combinations")
-                        
-                        # Log details for each symbol/timeframe that had cleanup
-                        for key, count in rolling_window_results["details"].items():
-                            logging.info(f"CLEANUP_DEBUG: Rolling window: {key} deleted {count} candles")
-                    else:
-                        logging.debug("CLEANUP_DEBUG: Rolling window cleanup: no candles deleted")
-                        
-                except Exception as e:
-                    logging.error(f"CLEANUP_DEBUG: Error in rolling window cleanup: {e}")
-                    import traceback
-                    logging.error(f"CLEANUP_DEBUG: Rolling window cleanup traceback: {traceback.format_exc()}")
-                    
-                # Traditional cleanup of very old data as fallback
+                # Traditional cleanup of very old data as fallback (partition drops replace it when partitioned)
                 logging.debug("CLEANUP_DEBUG: Starting fallback old data cleanup")
                 try:
-                    old_count = KlinesCache.cleanup_old_data(days_to_keep=CacheConfig.KLINES_DATA_RETENTION_DAYS)
+                    old_count = 0 if partitioned else KlinesCache.cleanup_old_data(days_to_keep=CacheConfig.KLINES_DATA_RETENTION_DAYS)
                     if old_count > 0:
                         logging.info(f"CLEANUP_DEBUG: Fallback cleanup: {old_count} old klines entries beyond {CacheConfig.KLINES_DATA_RETENTION_DAYS} day retention")
                     else:
@@ -1074,27 +1351,7 @@ class UnifiedDataSyncService:
                 except Exception as e:
                     logging.error(f"CLEANUP_DEBUG: Error in SMC cleanup: {e}")
                 
-                # Check database state after cleanup
-                try:
-                    result = db.session.execute(text("SELECT COUNT(*) FROM klines_cache"))
-                    total_candles_after = result.scalar()
-                    
-                    result = db.session.execute(text("SELECT timeframe, COUNT(*) FROM klines_cache GROUP BY timeframe"))
-                    candles_after = dict(result.fetchall())
-                    
-                    cleanup_duration = time.time() - cleanup_start_time
-                    candles_removed = total_candles_before - total_candles_after if total_candles_before >= 0 else -1
-                    
-                    logging.info(f"CLEANUP_DEBUG: Database state after cleanup - Total candles: {total_candles_after} (removed: {candles_removed})")
-                    for timeframe, count in candles_after.items():
-                        before_count = candles_by_timeframe.get(timeframe, 0)
-                        removed = before_count - count
-                        logging.info(f"CLEANUP_DEBUG: {timeframe}: {count} candles (removed: {removed})")
-                    
-                    logging.info(f"CLEANUP_DEBUG: Cleanup completed in {cleanup_duration:.2f} seconds")
-                    
-                except Exception as e:
-                    logging.error(f"CLEANUP_DEBUG: Error checking database state after cleanup: {e}")
+                logging.info(f"CLEANUP_DEBUG: Maintenance completed in {time.time() - cleanup_start_time:.2f} seconds")
                 
         except Exception as e:
             cleanup_duration = time.time() - cleanup_start_time
@@ -1113,177 +1370,301 @@ class UnifiedDataSyncService:
             logging.error(f"Error during cache cleanup: {e}")
             return 0
 
-    def _check_for_gaps_before_cleanup(self, symbols: "List[str]") -> None:
-        """Check for gaps before cleanup to establish baseline"""
-        try:
-            if not self.app:
-                return
-                
-            with self.app.app_context():
-                from .models import KlinesCache
-                
-                # Quick gap check for 1h timeframe (most sensitive to issues)
-                for symbol in symbols[:2]:  # Check first 2 symbols to avoid too much overhead
-                    try:
-                        gap_analysis = KlinesCache.detect_gaps(symbol, "1h", days_back=2)
-                        
-                        if gap_analysis.get("total_gaps", 0) > 0:
-                            logging.warning(f"GAP_MONITOR: {symbol}:1h has {gap_analysis['total_gaps']} gaps BEFORE cleanup - largest: {gap_analysis.get('largest_gap_hours', 0):.1f}h")
-                        else:
-                            logging.debug(f"GAP_MONITOR: {symbol}:1h no gaps detected before cleanup")
-                            
-                    except Exception as e:
-                        logging.debug(f"Gap check error for {symbol}: {e}")
-                        
-        except Exception as e:
-            logging.error(f"Error in gap check before cleanup: {e}")
+    def _ledger_entry(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """Ledger entry for a series (caller holds cleanup_ledger_lock)"""
+        entry = self.cleanup_ledger.get((symbol, timeframe))
+        if entry is None:
+            entry = self.cleanup_ledger[(symbol, timeframe)] = {
+                "rows_since_cleanup": 0,
+                "rows_since_count": 0,
+                "known_count": None,
+                "last_cleanup": None,
+                "last_deleted": 0,
+            }
+        return entry
 
-    def _check_for_gaps_after_cleanup(self, symbols: "List[str]") -> None:
-        """Check for gaps after cleanup to detect if cleanup caused issues"""
+    def _record_rows_written(self, symbol: str, timeframe: str, rows: int) -> None:
+        """
+        Account rows written to a series since its last cleanup
+        
+        Upserts of existing candles count too, so the estimate is an upper bound - an
+        overestimate only costs one cheap exact count inside cleanup_rolling_window().
+        """
+        if not rows:
+            return
+        with self.cleanup_ledger_lock:
+            entry = self._ledger_entry(symbol, timeframe)
+            entry["rows_since_cleanup"] += rows
+            entry["rows_since_count"] += rows
+
+    def _on_stream_candle_close(self, symbol: str, timeframe: str, candle: Dict) -> None:
+        """Candle-close listener: every streamed closed candle is one row written"""
+        self._record_rows_written(symbol, timeframe, 1)
+
+    def _observe_series_counts(self, series_freshness: Dict[Tuple[str, str], Dict]) -> None:
+        """Re-anchor the row estimates on the counts the cycle's freshness query already returned"""
+        with self.cleanup_ledger_lock:
+            for (symbol, timeframe), freshness in series_freshness.items():
+                entry = self._ledger_entry(symbol, timeframe)
+                entry["known_count"] = freshness["total_count"]
+                entry["rows_since_count"] = 0
+
+    def _series_due_for_cleanup(self) -> List[Tuple[str, str]]:
+        """
+        Series whose estimated row count crossed their RollingWindowConfig cleanup threshold
+        
+        A series cleaned in this process is only reconsidered after CLEANUP_MIN_ROWS_WRITTEN
+        new rows, so one that cannot shrink yet (candles too recent) is not retried every cycle.
+        """
+        due = []
+        with self.cleanup_ledger_lock:
+            for (symbol, timeframe), entry in self.cleanup_ledger.items():
+                if entry["known_count"] is None or not RollingWindowConfig.is_enabled(timeframe):
+                    continue
+                if entry["last_cleanup"] is not None and entry["rows_since_cleanup"] < RollingWindowConfig.CLEANUP_MIN_ROWS_WRITTEN:
+                    continue
+                estimated_count = entry["known_count"] + entry["rows_since_count"]
+                if estimated_count > RollingWindowConfig.get_cleanup_threshold(timeframe):
+                    due.append((symbol, timeframe))
+        return due
+
+    def _cleanup_written_series(self, series: List[Tuple[str, str]]) -> Dict[str, int]:
+        """
+        Rolling-window cleanup of the given series, each verified with a cheap gap check
+        
+        The complete candles inside the target window are counted before and after the
+        cleanup (one indexed COUNT each); fewer afterwards means the cleanup deleted recent data.
+        
+        Returns:
+            Deleted candles per "SYMBOL_TIMEFRAME" (series with deletions only)
+        """
+        deleted: Dict[str, int] = {}
+        if not series or not self.app:
+            return deleted
+            
         try:
-            if not self.app:
-                return
-                
             with self.app.app_context():
                 from .models import KlinesCache
                 
-                # Quick gap check for 1h timeframe (most sensitive to issues)
-                gaps_detected = []
-                
-                for symbol in symbols[:2]:  # Check first 2 symbols to avoid too much overhead
+                for symbol, timeframe in series:
+                    if self.stop_event.is_set():
+                        break
+                    target = RollingWindowConfig.get_target_candles(timeframe)
                     try:
-                        gap_analysis = KlinesCache.detect_gaps(symbol, "1h", days_back=2)
-                        
-                        if gap_analysis.get("total_gaps", 0) > 0:
-                            gaps_detected.append(f"{symbol}:{gap_analysis['total_gaps']} gaps")
-                            logging.warning(f"GAP_MONITOR: {symbol}:1h has {gap_analysis['total_gaps']} gaps AFTER cleanup - largest: {gap_analysis.get('largest_gap_hours', 0):.1f}h")
-                            
-                            # Log recent gaps for investigation
-                            for gap in gap_analysis.get("gaps", [])[-2:]:  # Show last 2 gaps
-                                logging.warning(f"GAP_DETAIL: Recent gap in {symbol}:1h from {gap.get('start_time', 'unknown')} to {gap.get('end_time', 'unknown')} ({gap.get('duration_hours', 0):.1f}h, {gap.get('missing_candles', 0)} candles)")
-                        else:
-                            logging.debug(f"GAP_MONITOR: {symbol}:1h no gaps detected after cleanup")
-                            
+                        window_before, expected = KlinesCache.count_recent_complete(symbol, timeframe, target)
+                        removed = KlinesCache.cleanup_rolling_window(
+                            symbol,
+                            timeframe,
+                            RollingWindowConfig.get_max_candles(timeframe),
+                            batch_size=RollingWindowConfig.CLEANUP_BATCH_SIZE,
+                        )
+                        window_after = KlinesCache.count_recent_complete(symbol, timeframe, target)[0] if removed else window_before
                     except Exception as e:
-                        logging.debug(f"Gap check error for {symbol}: {e}")
-                
-                if gaps_detected:
-                    logging.error(f"GAP_ALERT: Data gaps detected after cleanup! {', '.join(gaps_detected)} - This may indicate cleanup is deleting valid data")
+                        logging.error(f"CLEANUP: Rolling window cleanup failed for {symbol} {timeframe}: {e}")
+                        continue
+                    
+                    with self.cleanup_ledger_lock:
+                        entry = self._ledger_entry(symbol, timeframe)
+                        if entry["known_count"] is not None:
+                            entry["known_count"] = max(0, entry["known_count"] + entry["rows_since_count"] - removed)
+                        entry["rows_since_count"] = 0
+                        entry["rows_since_cleanup"] = 0
+                        entry["last_cleanup"] = time.time()
+                        entry["last_deleted"] = removed
+                    
+                    if removed:
+                        deleted[f"{symbol}_{timeframe}"] = removed
+                        logging.info(f"CLEANUP: Rolling window {symbol} {timeframe} deleted {removed} oldest candles")
+                    
+                    if window_after < window_before:
+                        logging.error(f"GAP_ALERT: Cleanup of {symbol}:{timeframe} removed {window_before - window_after} candles inside the {target}-candle target window - cleanup is deleting valid data")
+                    elif window_after < expected:
+                        logging.debug(f"GAP_MONITOR: {symbol}:{timeframe} target window has {window_after}/{expected} complete candles (gap predates cleanup, left to the backfill)")
                         
         except Exception as e:
-            logging.error(f"Error in gap check after cleanup: {e}")
+            logging.error(f"CLEANUP: Incremental cleanup failed: {e}")
+        return deleted
+
+    def get_cleanup_status(self) -> Dict:
+        """Row accounting per series and what the next cycle would clean"""
+        with self.cleanup_ledger_lock:
+            ledger = {
+                f"{symbol}_{timeframe}": {
+                    **entry,
+                    "threshold": RollingWindowConfig.get_cleanup_threshold(timeframe),
+                }
+                for (symbol, timeframe), entry in sorted(self.cleanup_ledger.items())
+            }
+        return {
+            "last_maintenance": self.last_klines_cleanup,
+            "series_due": [f"{symbol}_{timeframe}" for symbol, timeframe in self._series_due_for_cleanup()],
+            "ledger": ledger,
+        }
+
+    def _seconds_until_next_due(self) -> int:
+        """Seconds until the earliest series refresh is due, within the loop wait bounds"""
+        from .models import get_utc_now
+
+        now = get_utc_now()
+        wait = SyncPriorityConfig.LOOP_MAX_WAIT
+        for symbol in self.symbols:
+            for timeframe, base_interval in self.timeframes.items():
+                last_update = self.last_klines_updates.get(symbol, {}).get(timeframe)
+                if last_update is None:
+                    return SyncPriorityConfig.LOOP_MIN_WAIT
+                interval = sync_priorities.get_interval(symbol, timeframe, base_interval)
+                wait = min(wait, interval - (now - last_update).total_seconds())
+        return int(max(SyncPriorityConfig.LOOP_MIN_WAIT, wait))
+
+    def _sync_series(self, symbol: str, timeframe: str, freshness: Optional[Dict]) -> bool:
+        """
+        Bring one symbol/timeframe series up to date (runs on a sync worker thread)
+        
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe to update
+            freshness: Series entry from the cycle's batched freshness query
+            
+        Returns:
+            True if data was fetched and saved, False if skipped or failed
+        """
+        if self.stop_event.is_set():
+            return False
+            
+        with sync_metrics.task(symbol, timeframe) as task_metrics:
+            success = self._refresh_series(symbol, timeframe, freshness)
+            if not success and task_metrics.outcome is None:
+                task_metrics.outcome = OUTCOME_ERROR
+        self._record_rows_written(symbol, timeframe, task_metrics.rows)
+        return success
+
+    def _refresh_series(self, symbol: str, timeframe: str, freshness: Optional[Dict]) -> bool:
+        """Pick the cheapest update strategy for a series and run it"""
+        from .models import KlinesCache, get_utc_now
+        
+        # Get existing data information (open candle presence included)
+        data_info = self._build_data_info(symbol, timeframe, freshness)
+        existing_open_candle = data_info["has_open_candle"]
+        fetch_plan = KlinesCache.plan_fetch(freshness, timeframe, self._get_required_initial_candles(timeframe))
+        
+        # SMART DECISION: Choose most efficient update method
+        if not data_info["needs_initial_population"] and fetch_plan["fetch_count"] <= 2 and klines_stream.is_series_live(symbol, timeframe):
+            # STREAMING: The WebSocket keeps the open candle current - no REST call needed
+            logging.debug(f"STRATEGY: Stream-maintained {symbol} {timeframe} (skipping REST poll)")
+            sync_metrics.set_path("stream")
+            with self.lock:
+                self.last_klines_updates.setdefault(symbol, {})[timeframe] = get_utc_now()
+            return True
+        elif data_info["needs_initial_population"]:
+            # Initial population: Get full historical data (happens once per symbol/timeframe)
+            logging.info(f"STRATEGY: Initial population chosen for {symbol} {timeframe} (missing historical data)")
+            sync_metrics.set_path("initial")
+            success = self._populate_initial_data(symbol, timeframe)
+        elif fetch_plan["fetch_count"] > 2:
+            # Resume: candles missing since the latest cached one (snapshot import or downtime)
+            logging.info(f"STRATEGY: Resume for {symbol} {timeframe} ({fetch_plan['fetch_count']} candles since latest cached)")
+            sync_metrics.set_path("resume")
+            success = self._resume_recent_data(symbol, timeframe, fetch_plan["fetch_count"])
+        elif existing_open_candle:
+            # MOST EFFICIENT: Just update the existing open candle in place
+            logging.debug(f"STRATEGY: Efficient open candle update for {symbol} {timeframe} (existing open candle found)")
+            sync_metrics.set_path("open_candle")
+            success = self._update_recent_data(symbol, timeframe)
+        else:
+            # No open candle exists, might need to create it or fetch recent data
+            logging.debug(f"STRATEGY: Incremental update for {symbol} {timeframe} (no open candle, creating new)")
+            sync_metrics.set_path("incremental")
+            success = self._update_recent_data(symbol, timeframe)
+            
+        if success:
+            logging.debug(f"Successfully processed {symbol} {timeframe}")
+        else:
+            logging.warning(f"Failed to process {symbol} {timeframe}")
+        return success
 
     def _run_coordinated_sync_cycle(self):
         """Execute one complete coordinated sync cycle"""
         try:
             start_time = time.time()
             
-            # Initialize variables at function level to avoid unbound variable issues
-            data_info = {"needs_initial_population": False}
-            existing_open_candle = None
-            
-            # Get list of supported symbols
-            symbols = TradingConfig.SUPPORTED_SYMBOLS
+            # Get list of synced symbols (runtime-configurable)
+            symbols = self.symbols
             total_klines_tasks = len(symbols) * len(self.timeframes)
             completed_klines_tasks = 0
             successful_fetches = 0  # Track successful data fetches
             
             logging.debug(f"Starting unified sync cycle for {len(symbols)} symbols, {len(self.timeframes)} timeframes")
             
-            # Phase 1: Update klines data (coordinated with volatility tracking)
-            for symbol in symbols:
-                if self.stop_event.is_set():
-                    break
-                    
-                for timeframe in self.timeframes.keys():
-                    if self.stop_event.is_set():
-                        break
-                        
+            # Only series whose demand-driven interval has elapsed are refreshed this cycle
+            sync_priorities.refresh_demand()
+            due_series = [
+                (symbol, timeframe)
+                for symbol in symbols
+                for timeframe in self.timeframes.keys()
+                if self._should_update_timeframe(symbol, timeframe)
+            ]
+            completed_klines_tasks = total_klines_tasks - len(due_series)
+            if not due_series:
+                logging.debug("No series due for refresh this cycle")
+                return
+            
+            # Plan the whole cycle from one aggregate freshness query instead of per-series lookups
+            series_freshness = self._get_series_freshness(symbols)
+            self._observe_series_counts(series_freshness)
+            
+            # Phase 1: Update klines data concurrently - pacing comes from the shared Binance
+            # weight budget, so requests only slow down when the per-minute budget runs low
+            with ThreadPoolExecutor(
+                max_workers=TimeConfig.KLINES_SYNC_MAX_CONCURRENCY, thread_name_prefix="KlinesSync"
+            ) as executor:
+                futures = {
+                    executor.submit(self._sync_series, symbol, timeframe, series_freshness.get((symbol, timeframe))): (symbol, timeframe)
+                    for symbol, timeframe in due_series
+                }
+                
+                # Counters are only touched from this thread as results come back
+                for future in as_completed(futures):
+                    symbol, timeframe = futures[future]
+                    completed_klines_tasks += 1
+                    self._heartbeat("sync_cycle", completed=completed_klines_tasks, total=total_klines_tasks)
                     try:
-                        # Initialize variables for safe error handling
-                        data_info = {"needs_initial_population": False}
-                        success = False  # Initialize success flag
-                        
-                        # Check if this timeframe needs updating
-                        if not self._should_update_timeframe(symbol, timeframe):
-                            completed_klines_tasks += 1
-                            continue
-                            
-                        # Get existing data information
-                        data_info = self._get_existing_data_info(symbol, timeframe)
-                        
-                        # Check if we just need to update current open candle (most efficient)
-                        existing_open_candle = None  # Initialize variable
-                        if not data_info["needs_initial_population"]:
-                            try:
-                                if self.app:  # Check app exists before using context
-                                    with self.app.app_context():
-                                        from .models import KlinesCache
-                                        existing_open_candle = KlinesCache.get_current_open_candle(symbol, timeframe)
-                            except Exception:
-                                pass
-                        
-                        # SMART DECISION: Choose most efficient update method
-                        if data_info["needs_initial_population"]:
-                            # Initial population: Get full historical data (happens once per symbol/timeframe)
-                            logging.info(f"STRATEGY: Initial population chosen for {symbol} {timeframe} (missing historical data)")
-                            success = self._populate_initial_data(symbol, timeframe)
-                        elif existing_open_candle:
-                            # MOST EFFICIENT: Just update the existing open candle in place
-                            logging.debug(f"STRATEGY: Efficient open candle update for {symbol} {timeframe} (existing open candle found)")
-                            success = self._update_recent_data(symbol, timeframe)
-                        else:
-                            # No open candle exists, might need to create it or fetch recent data
-                            logging.debug(f"STRATEGY: Incremental update for {symbol} {timeframe} (no open candle, creating new)")
-                            success = self._update_recent_data(symbol, timeframe)
-                            
-                        if success:
+                        if future.result():
                             successful_fetches += 1
-                            logging.debug(f"Successfully processed {symbol} {timeframe}")
-                        else:
-                            logging.warning(f"Failed to process {symbol} {timeframe}")
-                            
+                            sync_priorities.record_refresh(symbol, timeframe)
                     except Exception as e:
                         logging.error(f"Error processing {symbol} {timeframe}: {e}")
-                        success = False
-                        
-                    completed_klines_tasks += 1
-                    
-                    # Proper delay between requests to respect API rate limits
-                    time.sleep(TimeConfig.BINANCE_KLINES_DELAY)
-                    
-                    # Variable delay based on operation type  
-                    try:
-                        if data_info.get("needs_initial_population", False):
-                            time.sleep(5.0)  # Extra 5 seconds for initial population/gap fill (heavy bulk operation - prevent rate limits)
-                        elif existing_open_candle:
-                            time.sleep(1.5)  # Conservative delay for open candle updates to prevent rate limiting
-                    except (NameError, UnboundLocalError):
-                        pass  # Variables may not be defined in error scenarios
-
-            # Phase 2: COORDINATED cleanup after data updates
-            # FIXED: Only run cleanup if we had successful data fetches to prevent data loss
+
+            # Phase 1b: Fill mid-series gaps with paginated range fetches (throttled)
             if successful_fetches > 0:
-                logging.info(f"SYNC_DEBUG: Starting cleanup phase after {successful_fetches} successful data updates out of {completed_klines_tasks} attempts")
-                
-                # NEW: Check for gaps before cleanup to detect issues
-                self._check_for_gaps_before_cleanup(symbols)
-                
-                logging.debug("SYNC_DEBUG: Calling klines data cleanup")
-                self._cleanup_klines_data()  # Database cleanup
-                
-                logging.debug("SYNC_DEBUG: Calling cache data cleanup")
-                cache_removed = self._cleanup_cache_data()  # Memory cache cleanup
-                
-                # NEW: Check for gaps after cleanup to detect if cleanup caused issues
-                self._check_for_gaps_after_cleanup(symbols)
+                self._backfill_missing_ranges(symbols)
+
+            # Phase 2: Incremental cleanup after data updates - only series whose rows written since
+            # their last cleanup pushed them past the RollingWindowConfig threshold
+            # Only run cleanup if we had successful data fetches to prevent data loss
+            cache_removed = 0
+            if successful_fetches > 0:
+                cleanup_series = self._series_due_for_cleanup()
+                if cleanup_series:
+                    cleaned = self._cleanup_written_series(cleanup_series)
+                    logging.info(f"SYNC_DEBUG: Incremental cleanup checked {len(cleanup_series)} series over threshold, deleted {sum(cleaned.values())} candles from {len(cleaned)}")
+                else:
+                    logging.debug("SYNC_DEBUG: No series crossed its rolling-window threshold - skipping cleanup")
                 
-                logging.debug(f"SYNC_DEBUG: Cleanup phase completed - cache entries removed: {cache_removed}")
+                # Expiry/retention maintenance keeps its own, slower cadence
+                maintenance_due = (
+                    self.last_klines_cleanup is None
+                    or time.time() - self.last_klines_cleanup >= RollingWindowConfig.CLEANUP_INTERVAL_SECONDS
+                )
+                if maintenance_due:
+                    self.last_klines_cleanup = time.time()
+                    self._cleanup_klines_data()  # Database expiry/retention
+                    cache_removed = self._cleanup_cache_data()  # Memory cache cleanup
+                    logging.debug(f"SYNC_DEBUG: Maintenance completed - cache entries removed: {cache_removed}")
             else:
                 logging.warning(f"SYNC_DEBUG: Skipping cleanup phase - no successful data updates (all {completed_klines_tasks} attempts failed). This prevents data loss when API is unavailable.")
-                cache_removed = 0
             
             cycle_time = time.time() - start_time
+            sync_metrics.record_cycle(cycle_time, len(due_series), successful_fetches)
             # Log cycle performance and efficiency metrics
             task_efficiency = (completed_klines_tasks / total_klines_tasks * 100) if total_klines_tasks > 0 else 0
             fetch_efficiency = (successful_fetches / completed_klines_tasks * 100) if completed_klines_tasks > 0 else 0
@@ -1326,16 +1707,24 @@ class UnifiedDataSyncService:
                 logging.info("INIT_DEBUG: Setting service as running and starting worker thread")
                 self.is_running = True
                 self.stop_event.clear()
+                self._generation += 1
+                self._heartbeat("starting")
                 
                 self.worker_thread = threading.Thread(
                     target=self._service_loop,
+                    args=(self._generation,),
                     name="UnifiedDataSyncService",
                     daemon=True
                 )
                 self.worker_thread.start()
                 
-                logging.info(f"INIT_DEBUG: Unified data sync service started - monitoring {len(TradingConfig.SUPPORTED_SYMBOLS)} symbols across {len(self.timeframes)} timeframes")
-                logging.debug(f"INIT_DEBUG: Service configuration: symbols={TradingConfig.SUPPORTED_SYMBOLS}, timeframes={list(self.timeframes.keys())}, intervals={self.timeframes}")
+                # Optional WebSocket ingestion; the REST cycle keeps filling gaps and covers outages
+                if CacheConfig.KLINES_STREAM_ENABLED and self.app:
+                    klines_stream.add_candle_close_listener(self._on_stream_candle_close)
+                    klines_stream.start(self.app, self.symbols, list(self.timeframes.keys()))
+                
+                logging.info(f"INIT_DEBUG: Unified data sync service started - monitoring {len(self.symbols)} symbols across {len(self.timeframes)} timeframes")
+                logging.debug(f"INIT_DEBUG: Service configuration: symbols={self.symbols}, timeframes={list(self.timeframes.keys())}, intervals={self.timeframes}")
                 
         except Exception as e:
             logging.error(f"INIT_DEBUG: Error in UnifiedDataSyncService.start(): {e}")
@@ -1350,6 +1739,8 @@ class UnifiedDataSyncService:
                 
             self.is_running = False
             self.stop_event.set()
+            klines_stream.stop()
+            klines_stream.remove_candle_close_listener(self._on_stream_candle_close)
             
             if self.worker_thread and self.worker_thread.is_alive():
                 self.worker_thread.join(timeout=10)
@@ -1364,21 +1755,36 @@ class UnifiedDataSyncService:
         self.start()
         return True
 
-    def _service_loop(self):
+    def _heartbeat(self, phase: str, next_within: Optional[float] = None, **details) -> None:
+        """Report loop progress to the supervisor (the next report is due within next_within seconds)"""
+        service_supervisor.heartbeat(UNIFIED_SERVICE_NAME, next_within, phase=phase, **details)
+
+    def _service_loop(self, generation: int = 0):
         """Main service loop"""
         logging.info("Unified data sync service loop started")
         cycle_count = 0
         
-        while not self.stop_event.is_set():
+        # Cold start: load the klines snapshot so the first cycle only resumes from its last candle
+        self._heartbeat("boot_snapshot")
+        self._import_boot_snapshot()
+        
+        # Finish any paginated backfill a previous run was interrupted in
+        self._heartbeat("resume_backfills")
+        self._resume_backfills()
+        
+        while not self.stop_event.is_set() and generation == self._generation:
             try:
                 cycle_count += 1
                 logging.debug(f"Starting sync cycle #{cycle_count}")
+                self._heartbeat("sync_cycle", cycle=cycle_count)
+                self._reconfigured.clear()
                 
                 # Run one complete coordinated cycle
                 self._run_coordinated_sync_cycle()
                 
-                # Wait before next cycle - Balanced for open candle updates and API limits
-                cycle_interval = 120  # 2 minutes between cycles for coordinated updates
+                # Wait until the next series is due (hot series shorten the wait, idle ones lengthen it)
+                cycle_interval = self._seconds_until_next_due()
+                self._heartbeat("waiting", next_within=cycle_interval + SyncPriorityConfig.LOOP_MAX_WAIT, cycle=cycle_count)
                 
                 logging.debug(f"Sync cycle #{cycle_count} completed, waiting {cycle_interval}s before next cycle")
                 
@@ -1386,18 +1792,75 @@ class UnifiedDataSyncService:
                     if self.stop_event.is_set():
                         logging.debug(f"Stop event received during wait period after cycle #{cycle_count}")
                         break
+                    if self._reconfigured.is_set():
+                        logging.debug("Runtime configuration changed - starting the next cycle early")
+                        break
                     time.sleep(1)
                     
             except Exception as e:
                 logging.error(f"Unexpected error in unified service loop (cycle #{cycle_count}): {e}")
                 logging.debug(f"Error context: cycle_count={cycle_count}, is_running={self.is_running}, stop_event={self.stop_event.is_set()}")
+                self._heartbeat("error_backoff", next_within=30, error=str(e))
                 # Wait before retrying to avoid rapid error loops
                 time.sleep(30)
                 
         logging.info(f"Unified data sync service loop ended after {cycle_count} cycles")
 
+    def get_config(self) -> Dict:
+        """Runtime configuration: synced symbols and base refresh interval per timeframe"""
+        return {"symbols": list(self.symbols), "intervals": dict(self.timeframes)}
+
+    def reconfigure(self, symbols: Optional[List[str]] = None, intervals: Optional[Dict[str, int]] = None) -> Dict:
+        """
+        Change the synced symbols and/or base refresh intervals without restarting the loop
+        
+        The next cycle picks the new values up (the wait before it is cut short); only the
+        klines stream is resubscribed when the symbol list changes.
+        
+        Args:
+            symbols: New symbol list (e.g. ['BTCUSDT', 'ETHUSDT'])
+            intervals: Base refresh interval in seconds per existing timeframe (e.g. {'1h': 60})
+            
+        Returns:
+            The configuration now in effect
+            
+        Raises:
+            ValueError: Empty symbol list, unknown timeframe or non-positive interval
+        """
+        if symbols is not None:
+            symbols = list(dict.fromkeys(str(symbol).strip().upper() for symbol in symbols if str(symbol).strip()))
+            if not symbols:
+                raise ValueError("symbols must contain at least one symbol")
+        if intervals is not None:
+            unknown = set(intervals) - set(self.timeframes)
+            if unknown:
+                raise ValueError(f"Unknown timeframes: {sorted(unknown)} (supported: {list(self.timeframes)})")
+            try:
+                intervals = {timeframe: int(seconds) for timeframe, seconds in intervals.items()}
+            except (TypeError, ValueError):
+                raise ValueError("intervals must map timeframes to seconds")
+            if any(seconds <= 0 for seconds in intervals.values()):
+                raise ValueError("intervals must be positive")
+        
+        with self.lock:
+            symbols_changed = symbols is not None and symbols != self.symbols
+            # Swap whole objects so worker threads iterating the old ones are unaffected
+            if intervals:
+                self.timeframes = {**self.timeframes, **intervals}
+            if symbols_changed:
+                self.symbols = symbols
+                if klines_stream.is_running:
+                    klines_stream.stop()
+                    klines_stream.start(self.app, self.symbols, list(self.timeframes.keys()))
+            self._reconfigured.set()
+        
+        logging.info(f"Unified data sync service reconfigured: symbols={self.symbols}, intervals={self.timeframes}")
+        return self.get_config()
+
     def get_status(self) -> Dict:
         """Get comprehensive service status and statistics"""
+        from .models import open_candle_buffer
+        
         with self.lock:
             cache_stats = self.cache.get_cache_stats()
             
@@ -1420,10 +1883,17 @@ class UnifiedDataSyncService:
                 "klines_tracking": {
                     "tracked_symbols": len(self.last_klines_updates),
                     "total_timeframes": sum(len(tf_data) for tf_data in self.last_klines_updates.values()),
-                    "supported_symbols": TradingConfig.SUPPORTED_SYMBOLS,
+                    "supported_symbols": self.symbols,
                     "supported_timeframes": list(self.timeframes.keys()),
                 },
                 "cache_statistics": cache_stats,
+                "open_candle_buffer": open_candle_buffer.get_stats(),
+                "binance_weight_budget": binance_weight_budget.get_status(),
+                "async_http": async_http.get_status(),
+                "klines_stream": klines_stream.get_status(),
+                "sync_priorities": sync_priorities.get_status(self.symbols, self.timeframes),
+                "sync_metrics": sync_metrics.get_status(),
+                "incremental_cleanup": self.get_cleanup_status(),
                 "circuit_breaker_status": circuit_breaker_status
             }
 
@@ -1432,10 +1902,23 @@ class UnifiedDataSyncService:
 enhanced_cache = SmartCache()  # Maintain compatibility
 unified_service = None
 
+# Leader-election name of the unified service (klines sync + cache cleanup run in one process)
+UNIFIED_SERVICE_NAME = "unified_data_sync"
+
+
+def _is_service_leader() -> bool:
+    """Refuse to start the service in a follower process (the elected leader runs it)"""
+    if leader_election.is_leader(UNIFIED_SERVICE_NAME):
+        return True
+    logging.info(f"Unified data sync service not started in pid {os.getpid()}: follower process")
+    return False
+
 # Compatibility functions for existing cache interface
 def start_cache_cleanup_worker(app=None):
     """Legacy interface: Start cache cleanup (now part of unified service)"""
     global unified_service
+    if not _is_service_leader():
+        return
     if unified_service is None:
         unified_service = UnifiedDataSyncService(app)
     unified_service.start()
@@ -1444,6 +1927,8 @@ def start_cache_cleanup_worker(app=None):
 def restart_cache_cleanup_worker(app=None):
     """Legacy interface: Restart cache cleanup worker"""
     global unified_service
+    if not _is_service_leader():
+        return False
     if unified_service is None:
         unified_service = UnifiedDataSyncService(app)
     return unified_service.restart()
@@ -1456,7 +1941,8 @@ def get_cache_cleanup_worker_status():
             'enabled': False,
             'thread_alive': False,
             'last_cleanup': 'never',
-            'worker_running_flag': False
+            'worker_running_flag': False,
+            'role': leader_election.get_role(UNIFIED_SERVICE_NAME)
         }
     
     status = unified_service.get_status()
@@ -1464,13 +1950,16 @@ def get_cache_cleanup_worker_status():
         'enabled': status['service_running'],
         'thread_alive': status['service_running'],
         'last_cleanup': status['last_cache_cleanup'],
-        'worker_running_flag': status['service_running']
+        'worker_running_flag': status['service_running'],
+        'role': leader_election.get_role(UNIFIED_SERVICE_NAME)
     }
 
 # Compatibility functions for existing klines interface
 def start_klines_background_worker(app=None):
     """Legacy interface: Start klines background worker (now part of unified service)"""
     global unified_service
+    if not _is_service_leader():
+        return
     if unified_service is None:
         unified_service = UnifiedDataSyncService(app)
     unified_service.start()
@@ -1493,6 +1982,8 @@ def start_unified_data_sync_service(app=None):
     """Start the unified data sync service"""
     logging.info("INIT_DEBUG: start_unified_data_sync_service called")
     global unified_service
+    if not _is_service_leader():
+        return
     try:
         if unified_service is None:
             logging.info("INIT_DEBUG: Creating new UnifiedDataSyncService instance")
@@ -1522,6 +2013,8 @@ def restart_unified_data_sync_service(app=None):
     logging.info("[RENDER-KLINES] Restarting unified data sync service")
     
     global unified_service
+    if not _is_service_leader():
+        return False
     if unified_service is None:
         print(f"[RENDER-KLINES] Creating new unified service instance")
         logging.info("[RENDER-KLINES] Creating new unified service instance")
@@ -1538,9 +2031,29 @@ def restart_unified_data_sync_service(app=None):
     
     return restart_result
 
+def is_unified_service_running() -> bool:
+    """True while the unified service loop is supposed to run in this process"""
+    return unified_service is not None and unified_service.is_running
+
+def get_unified_service_config() -> Dict:
+    """Runtime configuration of the unified service in this process"""
+    if unified_service is None:
+        return {}
+    return unified_service.get_config()
+
+def reconfigure_unified_data_sync_service(symbols=None, intervals=None) -> Dict:
+    """Apply runtime symbol/interval changes to the unified service in this process"""
+    if unified_service is None:
+        raise ValueError("Unified data sync service is not initialized in this process")
+    return unified_service.reconfigure(symbols=symbols, intervals=intervals)
+
 def get_unified_service_status() -> Dict:
     """Get unified service status"""
     global unified_service
     if unified_service is None:
-        return {"service_running": False, "error": "Service not initialized"}
-    return unified_service.get_status()
\ No newline at end of file
+        status = {"service_running": False, "error": "Service not initialized"}
+    else:
+        status = unified_service.get_status()
+    status["leadership"] = leader_election.get_service_status(UNIFIED_SERVICE_NAME)
+    status["liveness"] = service_supervisor.get_service_status(UNIFIED_SERVICE_NAME)
+    return status
\ No newline at end of file
@@ -8,13 +8,13 @@ import hmac
 import inspect
 import json
 import logging
+import os
+import threading
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
+from typing import Any, Dict, List, Optional, Protocol, Tuple, runtime_checkable
 from urllib.parse import urlencode
 
-import requests
-
 
 @runtime_checkable
 class ExchangeTradeProtocol(Protocol):
@@ -332,6 +332,8 @@ class OrderParameterAdapter:
 
 from config import APIConfig, TradingConfig
 
+from .async_http import async_http
+
 # Hyperliquid SDK imports
 try:
     from hyperliquid.exchange import Exchange
@@ -375,8 +377,8 @@ class ToobitClient:
                 "TOOBIT TESTNET DISABLED: Toobit does not support testnet mode. Using mainnet/live trading instead."
             )
 
-        # Request session for connection pooling
-        self.session = requests.Session()
+        # Requests go through the process-wide connection pool (shared by every client instance)
+        self.session = async_http.session()
 
     def _generate_signature(self, query_string: str) -> str:
         """
@@ -519,6 +521,23 @@ class ToobitClient:
             logging.warning(f"Failed to get ticker price for {symbol}: {e}")
             return None
 
+    def get_ticker_prices(self, symbols) -> Dict[str, float]:
+        """Current ticker prices for several symbols from one all-symbols ticker request"""
+        wanted = {self.convert_to_toobit_symbol(symbol): symbol for symbol in symbols}
+        tickers = self._public_request(f"/api/v1/futures/ticker/24hr")
+        if not isinstance(tickers, list):
+            return {}
+
+        prices = {}
+        for ticker in tickers:
+            symbol = wanted.get(ticker.get("symbol"))
+            if symbol and ticker.get("price"):
+                try:
+                    prices[symbol] = float(ticker["price"])
+                except (TypeError, ValueError):
+                    continue
+        return prices
+
     def get_exchange_info(self) -> Optional[Dict]:
         """Get exchange information - try different possible endpoints"""
         # Try the standard exchangeInfo first
@@ -1048,8 +1067,8 @@ class LBankClient:
         # Track last error for debugging
         self.last_error = None
 
-        # Request session for connection pooling
-        self.session = requests.Session()
+        # Requests go through the process-wide connection pool (shared by every client instance)
+        self.session = async_http.session()
         self.session.headers.update(
             {
                 "User-Agent": "LBank-Python-Client/1.0",
@@ -2348,7 +2367,12 @@ class HyperliquidClient:
     """
 
     def __init__(
-        self, api_key: str, api_secret: str, passphrase: str = "", testnet: bool = False
+        self,
+        api_key: str,
+        api_secret: str,
+        passphrase: str = "",
+        testnet: bool = False,
+        market_data_only: bool = False,
     ):
         # Enforce SDK availability with clear error message
         if not HYPERLIQUID_SDK_AVAILABLE:
@@ -2357,15 +2381,15 @@ class HyperliquidClient:
                 "Please install with: pip install hyperliquid-python-sdk"
             )
         
-        # Validate required credentials
-        if not api_key or not api_secret:
+        # Validate required credentials (public market data needs none)
+        if not market_data_only and (not api_key or not api_secret):
             raise ValueError(
                 "Hyperliquid client requires both account address (api_key) and private key (api_secret). "
                 "api_key should be the wallet address, api_secret should be the private key."
             )
         
         # Validate private key format (should be hex string)
-        if not isinstance(api_secret, str) or len(api_secret) < 32:
+        if not market_data_only and (not isinstance(api_secret, str) or len(api_secret) < 32):
             raise ValueError(
                 "Invalid private key format. Private key should be a hex string (64+ characters) or 0x-prefixed hex."
             )
@@ -2393,6 +2417,9 @@ class HyperliquidClient:
             # Info client for market data and account info (no signing required)
             if Info is not None:
                 self.info_client = Info(self.base_url, skip_ws=True)
+                # Info requests go through the process-wide connection pool instead of the SDK's own session
+                if hasattr(self.info_client, "session"):
+                    self.info_client.session = async_http.session({"Content-Type": "application/json"})
             else:
                 self.info_client = None
 
@@ -3524,6 +3551,27 @@ class ExchangeClientFactory:
             logging.error(error_msg)
             raise ValueError(error_msg)
 
+    @staticmethod
+    def create_market_data_client(exchange_name: str, testnet: bool = False):
+        """
+        Create a credential-free client for public market data (tickers, exchange info)
+
+        Raises:
+            ValueError: If exchange is not supported
+        """
+        exchange_name = exchange_name.lower().strip()
+
+        if exchange_name == "hyperliquid":
+            return HyperliquidClient(api_key="", api_secret="", testnet=testnet, market_data_only=True)
+
+        return ExchangeClientFactory.create_client(
+            exchange_name=exchange_name,
+            api_key=None,  # nosec B106 - Intentionally None for public access
+            api_secret=None,  # nosec B106 - Intentionally None for public access
+            passphrase=None,  # nosec B106 - Intentionally None for public access
+            testnet=testnet,
+        )
+
     @staticmethod
     def get_supported_exchanges():
         """Get list of supported exchanges"""
@@ -3719,13 +3767,95 @@ def create_wrapped_exchange_client(
         )
     else:
         # Create anonymous client for public data access
-        client = ExchangeClientFactory.create_client(
-            exchange_name=exchange_name,
-            api_key=None,  # nosec B106 - Intentionally None for public access
-            api_secret=None,  # nosec B106 - Intentionally None for public access
-            passphrase=None,  # nosec B106 - Intentionally None for public access
-            testnet=testnet,
-        )
+        client = ExchangeClientFactory.create_market_data_client(exchange_name, testnet)
         actual_exchange_name = exchange_name
 
     return ExchangeClientWrapper(client, actual_exchange_name)
+
+
+class MarketDataClients:
+    """
+    Long-lived credential-free clients for public market data, one per exchange and network
+
+    Price lookups built a new client on every call (for Hyperliquid a new SDK Info client,
+    which fetches exchange metadata when constructed) and looked up the caller's
+    credentials just to read a ticker. These clients are created once per process on
+    first use - and again after a fork - and their HTTP goes through the async_http pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, bool], ExchangeClientWrapper] = {}
+        self._pid: Optional[int] = None
+        self.stats = {
+            "created": 0,
+            "creation_errors": 0,
+            "price_reads": 0,
+            "batch_price_reads": 0,
+            "empty_reads": 0,
+        }
+
+    def get(self, exchange_name: str, testnet: bool = False) -> ExchangeClientWrapper:
+        """
+        Shared market-data client for an exchange
+
+        Raises:
+            ValueError: If exchange is not supported
+            ImportError: Hyperliquid SDK is not installed
+        """
+        key = (exchange_name.lower().strip(), testnet)
+        if self._pid == os.getpid():
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's clients are not shared
+                self._clients = {}
+                self._pid = os.getpid()
+            client = self._clients.get(key)
+            if client is None:
+                try:
+                    client = ExchangeClientWrapper(ExchangeClientFactory.create_market_data_client(*key), key[0])
+                except Exception:
+                    self.stats["creation_errors"] += 1
+                    raise
+                self._clients[key] = client
+                self.stats["created"] += 1
+                logging.info(f"MARKET-DATA: Created public {key[0]} client{' (testnet)' if testnet else ''}")
+            return client
+
+    def get_ticker_price(self, exchange_name: str, symbol: str, testnet: bool = False) -> Optional[float]:
+        """Public ticker price from an exchange (None when the exchange returned none)"""
+        price = self.get(exchange_name, testnet).get_ticker_price(symbol)
+        self.stats["price_reads"] += 1
+        if not price:
+            self.stats["empty_reads"] += 1
+        return price
+
+    def get_ticker_prices(self, exchange_name: str, symbols, testnet: bool = False) -> Dict[str, float]:
+        """Public ticker prices for several symbols in one request (empty if the exchange has no batch ticker)"""
+        client = self.get(exchange_name, testnet)
+        if not hasattr(client.client, "get_ticker_prices"):
+            return {}
+        prices = client.get_ticker_prices(symbols)
+        self.stats["batch_price_reads"] += 1
+        self.stats["price_reads"] += len(prices)
+        return prices
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "clients": sorted(f"{name}{':testnet' if testnet else ''}" for name, testnet in self._clients),
+                **self.stats,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clients = {}
+        logging.info("MARKET-DATA: Clients reset")
+
+
+# Global market-data clients shared by every price lookup in this process
+market_data_clients = MarketDataClients()
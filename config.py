@@ -5,6 +5,7 @@ All constants, magic numbers, timeouts, and API endpoints are defined here
 
 import logging
 import os
+import tempfile
 from typing import Dict, Optional
 from urllib.parse import urlparse
 
@@ -49,6 +50,38 @@ class APIConfig:
     USER_AGENT = "TradingExpert/1.0"
 
 
+class AsyncHttpConfig:
+    """Shared asyncio HTTP transport (api/async_http.py) for every upstream call - prices, klines, exchanges"""
+
+    # Connection pool - sockets are reused across requests to the same host
+    TOTAL_CONNECTIONS = int(os.environ.get("ASYNC_HTTP_TOTAL_CONNECTIONS", "200"))
+    KEEPALIVE_TIMEOUT = 30  # seconds an idle pooled connection stays open
+    DNS_CACHE_TTL = 300  # seconds
+
+    # In-flight requests per host (hosts not listed use DEFAULT_PER_HOST_LIMIT)
+    DEFAULT_PER_HOST_LIMIT = int(os.environ.get("ASYNC_HTTP_PER_HOST_LIMIT", "32"))
+    PER_HOST_LIMITS = {
+        "api.binance.com": 64,  # Request weight is paced separately by the weight budget
+        "api.coingecko.com": 4,  # Free tier rate limit is strict
+        "min-api.cryptocompare.com": 8,
+        "api.toobit.com": 16,  # Market data and signed trading calls share this pool
+        "lbkperp.lbank.com": 8,
+    }
+
+    # Timeouts
+    DEFAULT_TIMEOUT = 15  # seconds - whole request when the caller passes none
+    CONNECT_TIMEOUT = 5  # seconds - acquiring a connection and the TCP/TLS handshake
+
+    # Retry policy - idempotent methods only, within the caller's timeout
+    RETRY_ATTEMPTS = int(os.environ.get("ASYNC_HTTP_RETRIES", "2"))  # extra attempts after the first
+    RETRY_METHODS = ("GET", "HEAD", "OPTIONS")
+    RETRY_STATUSES = (502, 503, 504)  # never 429/418 - retrying a rate limit makes it worse
+    RETRY_BACKOFF = 0.2  # seconds, doubled per attempt (with jitter)
+
+    # Per-host latency quantiles are computed over this many recent requests
+    LATENCY_SAMPLES = 500
+
+
 # =============================================================================
 # TIMEOUTS AND INTERVALS
 # =============================================================================
@@ -71,6 +104,14 @@ class TimeConfig:
     API_RETRY_DELAY = 8.0  # seconds - Longer base delay for retries to prevent rate limit triggers
     API_BACKOFF_MULTIPLIER = 3.0  # Higher exponential backoff multiplier for extended data fetches
 
+    # Binance request-weight budget - klines fetches are scheduled against the per-IP weight
+    # window (reported in X-MBX-USED-WEIGHT-1M) instead of fixed sleeps between requests
+    BINANCE_WEIGHT_LIMIT_PER_MINUTE = int(os.environ.get("BINANCE_WEIGHT_LIMIT_PER_MINUTE", "6000"))
+    BINANCE_WEIGHT_BUDGET_RATIO = 0.8  # Stop issuing requests at 80% of the window (headroom for price lookups)
+    BINANCE_WEIGHT_REQUEST_WAIT = 2.0  # seconds - longest a request-path fetch waits for budget before giving up
+    BINANCE_INVALID_SYMBOL_TTL = 3600  # seconds - symbols Binance does not list are left out of batch requests this long
+    KLINES_SYNC_MAX_CONCURRENCY = int(os.environ.get("KLINES_SYNC_MAX_CONCURRENCY", "4"))  # Parallel klines fetches per cycle
+
     # Sync Intervals - COST OPTIMIZED FOR RENDER
     EXCHANGE_SYNC_INTERVAL = (
         30  # seconds - much slower background sync to reduce API pressure
@@ -128,6 +169,50 @@ class DatabaseConfig:
     SSL_MODE = "require"
     APPLICATION_NAME = "toobit-trading-bot"
 
+    # Klines Partitioning (PostgreSQL only) - klines_cache partitioned by timeframe and month
+    KLINES_PARTITIONING_ENABLED = os.environ.get("KLINES_PARTITIONING", "").lower() in ("1", "true", "yes")
+    KLINES_PARTITION_MONTHS_AHEAD = 2  # Monthly partitions pre-created beyond the current month
+
+
+class LeaderElectionConfig:
+    """Cross-process leader election for background services (one runner per service)"""
+
+    # Disable to run background services in every process (pre-election behaviour)
+    ENABLED = os.environ.get("LEADER_ELECTION", "true").lower() not in ("0", "false", "no")
+
+    # Followers retry the lock and the leader re-verifies it this often - bounds takeover time
+    INTERVAL = float(os.environ.get("LEADER_ELECTION_INTERVAL", "5"))  # seconds
+
+    # File-lock fallback (SQLite / non-PostgreSQL) - lock files are per host
+    LOCK_DIR = os.environ.get("LEADER_LOCK_DIR", "")  # empty = system temp directory
+
+    # Namespace for PostgreSQL advisory lock keys (two-int form: namespace, crc32(service))
+    ADVISORY_LOCK_NAMESPACE = 0x7B07
+
+    # Direct (non-pooled) PostgreSQL URI for the advisory locks; empty = the app database.
+    # Advisory locks are per server session, so PgBouncer/Neon "-pooler" URIs can't hold them
+    DATABASE_URL = os.environ.get("LEADER_ELECTION_DATABASE_URL", "")
+
+
+class SupervisorConfig:
+    """Heartbeat liveness supervision of the background service loops"""
+
+    # Disable to only report liveness (no automatic restarts)
+    ENABLED = os.environ.get("SERVICE_SUPERVISOR", "true").lower() not in ("0", "false", "no")
+
+    # How often the supervisor compares heartbeat deadlines with the clock
+    CHECK_INTERVAL = float(os.environ.get("SUPERVISOR_CHECK_INTERVAL", "15"))  # seconds
+
+    # A loop phase must report progress within this long unless its heartbeat says otherwise
+    HEARTBEAT_TIMEOUT = 300  # seconds
+
+    # Extra slack past a missed deadline before a service counts as stalled
+    STALL_GRACE_SECONDS = 60
+
+    # Restart throttling - a service that keeps stalling is left for an operator
+    RESTART_COOLDOWN_SECONDS = 120
+    MAX_RESTARTS_PER_HOUR = 6
+
 
 # =============================================================================
 # TRADING CONSTANTS
@@ -444,7 +529,11 @@ class RollingWindowConfig:
     
     # Batch cleanup settings - smaller batches to be gentler
     CLEANUP_BATCH_SIZE = 10   # Very small batches to avoid aggressive deletion
-    CLEANUP_INTERVAL_SECONDS = 300  # Less frequent cleanup (5 minutes) to be conservative
+    CLEANUP_INTERVAL_SECONDS = 300  # Expiry/retention maintenance cadence (5 minutes) to be conservative
+    
+    # Incremental cleanup: a series is only reconsidered after this many rows were written to it
+    # since its last cleanup, and only cleaned once its estimated count crosses get_cleanup_threshold()
+    CLEANUP_MIN_ROWS_WRITTEN = 5
     
     # Additional safety margin beyond target
     SAFETY_MARGIN = 20  # Keep 20 extra candles beyond target when cleaning up
@@ -494,12 +583,50 @@ class RollingWindowConfig:
         return timeframe_enabled.get(timeframe, True)  # Default to enabled
 
 
+class SyncPriorityConfig:
+    """Demand-driven refresh intervals for the unified data sync service"""
+
+    # Hot series (open trades, pending limit orders, admin boosts) refresh faster than the base interval
+    HOT_INTERVAL_FACTOR = 0.5
+    MIN_INTERVAL = 30  # seconds - floor for hot series
+
+    # Warm series - an /api/smc-* request touched the symbol recently
+    SMC_DEMAND_WINDOW = 900  # seconds a request keeps the symbol warm
+
+    # Idle series back off exponentially on every refresh without demand
+    IDLE_BACKOFF_MULTIPLIER = 2.0
+    IDLE_MAX_INTERVAL = 3600  # seconds - backoff cap
+
+    # Manual boosts
+    BOOST_DEFAULT_DURATION = 600  # seconds
+    BOOST_MAX_DURATION = 3600  # seconds
+
+    # Service loop - sleep until the next series is due, within these bounds
+    LOOP_MIN_WAIT = 15  # seconds
+    LOOP_MAX_WAIT = 120  # seconds
+
+
+class SyncMetricsConfig:
+    """Per-task instrumentation of the unified data sync cycle"""
+
+    # Rolling window behind the status-endpoint quantiles (Prometheus buckets are cumulative)
+    WINDOW_SECONDS = 3600
+    MAX_SAMPLES_PER_SERIES = 512  # per metric, oldest dropped first
+
+    # Histogram bucket upper bounds
+    SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+    WEIGHT_BUCKETS = (1, 2, 5, 10)
+    ROWS_BUCKETS = (0, 1, 10, 100, 500, 1000)
+
+
 # =============================================================================
 # CACHE CONFIGURATION
 # =============================================================================
 class CacheConfig:
     # Volatility Tracker Settings
     VOLATILITY_WINDOW_SIZE = 10  # Number of price points for volatility calculation
+    VOLATILITY_WINDOW_SECONDS = 300  # Price points older than this are dropped from the window
     VOLATILITY_CALCULATION_MULTIPLIER = (
         100  # Multiplier for volatility percentage calculation
     )
@@ -578,6 +705,161 @@ class CacheConfig:
     KLINES_DATA_RETENTION_DAYS = 21  # Keep klines data for 21 days (increased from 7 for better SMC analysis)
     KLINES_CLEANUP_INTERVAL = 180  # Clean up klines cache every 3 minutes (faster for short TTL)
 
+    # Klines Snapshot Settings - imported at service start to skip the Binance backfill warm-up
+    KLINES_SNAPSHOT_PATH = os.environ.get("KLINES_SNAPSHOT_PATH", "")
+    KLINES_SNAPSHOT_IMPORT_BATCH_SIZE = 1000  # Rows per upsert statement during import
+
+    # Open Candle Write-Behind - coalesce open-candle refreshes and flush them in batches
+    OPEN_CANDLE_WRITE_BEHIND = not os.environ.get("VERCEL")  # Serverless has no background flusher - write through
+    OPEN_CANDLE_FLUSH_INTERVAL = 3  # seconds between batched flushes (candle close flushes at once)
+
+    # Klines Streaming - WebSocket kline ingestion; REST polling stays as fallback and gap filler
+    KLINES_STREAM_ENABLED = os.environ.get("KLINES_STREAM", "").lower() in ("1", "true", "yes")
+    KLINES_STREAM_URL = os.environ.get("KLINES_STREAM_URL", "wss://stream.binance.com:9443")  # Point at scripts/fake_kline_stream.py offline
+    KLINES_STREAM_STALE_SECONDS = 30  # Series without a stream message for this long fall back to REST polling
+    KLINES_STREAM_RECONNECT_MIN_DELAY = 1.0  # seconds - first reconnect delay
+    KLINES_STREAM_RECONNECT_MAX_DELAY = 60.0  # seconds - backoff cap
+    KLINES_STREAM_HEARTBEAT = 20  # seconds between WebSocket pings
+
+    # Klines Backfill - paginated startTime/endTime fetches with per-series DB checkpoints
+    KLINES_BACKFILL_PAGE_LIMIT = 1000  # Candles per Binance page (API maximum)
+    KLINES_BACKFILL_GAP_SCAN_INTERVAL = 900  # seconds between sync-service scans for missing ranges
+
+
+class PriceHubConfig:
+    """Central price feed - one background producer, in-memory reads everywhere else"""
+
+    # Producer cadence: every tracked symbol is re-fetched this often
+    REFRESH_INTERVAL = float(os.environ.get("PRICE_HUB_REFRESH_INTERVAL", "5"))  # seconds
+
+    # Default maximum staleness accepted by readers (older ticks read as missing)
+    DEFAULT_MAX_AGE = 30  # seconds
+    # Maximum staleness for callers that asked for fresh data (use_cache=False)
+    FRESH_MAX_AGE = 10  # seconds
+
+    # How long a reader waits for the producer to deliver a symbol it has never priced
+    FIRST_TICK_WAIT = 5.0  # seconds
+    # Without a fresh tick, default-bound readers fall back to a tick up to this old instead
+    # of waiting on the producer (e.g. while every upstream source is failing)
+    STALE_MAX_AGE = 300  # seconds
+
+    # Symbols requested by readers stay tracked this long after their last read
+    DEMAND_TTL = 900  # seconds
+    # Reader-requested symbols beyond the pinned/provider sets (price reads are public,
+    # so unknown symbols must not grow the producer's work without bound)
+    MAX_DEMAND_SYMBOLS = int(os.environ.get("PRICE_HUB_MAX_DEMAND_SYMBOLS", "100"))
+
+
+class SingleFlightConfig:
+    """Coalescing of concurrent upstream fetches for the same price symbol or klines series"""
+
+    ENABLED = os.environ.get("SINGLE_FLIGHT", "true").lower() not in ("0", "false", "no")
+
+    # A caller waiting on another thread's in-flight fetch gives up after this long and fetches itself
+    FOLLOWER_TIMEOUT = 30  # seconds
+
+
+class PriceHedgingConfig:
+    """Per-source latency model and hedged requests for the per-symbol price fallbacks"""
+
+    # Sliding window the p50/p95 latencies and success rates are computed over
+    WINDOW_SECONDS = 900
+    MAX_SAMPLES_PER_SOURCE = 200
+    # Below this many successful samples a source has no latency estimate yet
+    MIN_SAMPLES = 5
+
+    # Quantile of the in-flight source's latency after which the next source is hedged ("p50" or "p95")
+    HEDGE_QUANTILE = os.environ.get("PRICE_HEDGE_QUANTILE", "p95")
+    # Hedge delay bounds (and the delay used while a source has too few samples)
+    MIN_HEDGE_DELAY = 0.05  # seconds
+    DEFAULT_HEDGE_DELAY = 1.0  # seconds
+    # Requests in flight per symbol at once (the primary plus hedges)
+    MAX_PARALLEL = 2
+
+    # Ranking: expected latency plus this penalty per unit of failure rate
+    FAILURE_PENALTY_SECONDS = 5.0
+    # Assumed p50 for sources without an estimate
+    DEFAULT_LATENCY = 0.5  # seconds
+
+
+class SharedPriceCacheConfig:
+    """Optional price cache shared by every worker process (enhanced_cache backend)"""
+
+    # "" (per-process only), "mmap" (single host, shared memory file) or "postgres" (UNLOGGED table)
+    BACKEND = os.environ.get("PRICE_CACHE_BACKEND", "").lower()
+
+    # mmap backend: fixed-size slot table in a shared memory file (the layout version and
+    # slot count are appended to the file name, e.g. trading_bot_prices.v1-1024.bin)
+    MMAP_PATH = os.environ.get(
+        "PRICE_CACHE_MMAP_PATH",
+        os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "trading_bot_prices.bin"),
+    )
+    MMAP_SLOTS = 1024  # symbols the table can hold (open addressing)
+    SEQLOCK_MAX_RETRIES = 100  # reader retries while a writer holds a slot
+
+    # postgres backend
+    PG_TABLE = "shared_price_cache"
+    PG_READ_TTL = 1.0  # seconds - per-process read-through cache in front of the table
+
+
+class LiveStreamConfig:
+    """Server-Sent Events stream of price ticks and position P&L for the mini app"""
+
+    ENABLED = os.environ.get("LIVE_STREAM", "true").lower() not in ("0", "false", "no")
+
+    # Comment line sent when nothing changed, so proxies keep the connection and dead clients are noticed
+    HEARTBEAT_INTERVAL = 15  # seconds
+    # Streams end after this long; the browser reconnects (Last-Event-ID resumes the price feed)
+    MAX_STREAM_SECONDS = 600
+    # Reconnect delay suggested to the browser
+    RETRY_MS = 5000
+    # Open streams per worker process; further clients are refused and fall back to polling.
+    # Each stream holds a gunicorn thread, so the default is half the worker's threads
+    # (GUNICORN_THREADS, defaulting as in gunicorn_config.py) to leave the rest for requests.
+    # Streams release their DB connection after the opening auth/sync, but a reconnect burst
+    # still needs one each, so the default also stays below the worker's DB pool capacity
+    _ON_RENDER = bool(os.environ.get("RENDER") or os.environ.get("RENDER_SERVICE_ID"))
+    _GUNICORN_THREADS = int(os.environ.get("GUNICORN_THREADS", "32" if _ON_RENDER else "16"))
+    _DB_POOL_CAPACITY = (
+        DatabaseConfig.RENDER_POOL_SIZE + DatabaseConfig.RENDER_MAX_OVERFLOW
+        if _ON_RENDER
+        else DatabaseConfig.STANDARD_POOL_SIZE + DatabaseConfig.STANDARD_MAX_OVERFLOW
+    )
+    MAX_STREAMS_PER_PROCESS = int(
+        os.environ.get(
+            "LIVE_STREAM_MAX_PER_PROCESS",
+            max(1, min(_GUNICORN_THREADS // 2, _DB_POOL_CAPACITY - 1)),
+        )
+    )
+    # Minimum spacing between position monitor passes (ticks in between are batched)
+    MIN_UPDATE_INTERVAL = 1.0  # seconds
+
+
+class ConditionalResponseConfig:
+    """ETag / If-None-Match and since=<version> delta responses for the polling endpoints"""
+
+    ENABLED = os.environ.get("CONDITIONAL_RESPONSES", "true").lower() not in ("0", "false", "no")
+
+    # (endpoint, user) states whose entry versions are remembered per process (least recently used evicted)
+    MAX_TRACKED_STATES = 5000
+    # Removed entries remembered per state; older since= versions get a full response
+    MAX_TOMBSTONES = 200
+
+
+class TickRecorderConfig:
+    """Append-only binary log of every price hub tick, for offline replay (scripts/tick_replay.py)"""
+
+    ENABLED = os.environ.get("TICK_RECORDER", "false").lower() in ("1", "true", "yes")
+    DIRECTORY = os.environ.get(
+        "TICK_RECORDER_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "ticks")
+    )
+
+    # Buffered ticks are written once this many bytes are pending or this many seconds have passed
+    FLUSH_BYTES = 64 * 1024
+    FLUSH_INTERVAL = 5  # seconds
+    # Daily files older than this are deleted at rotation (0 keeps everything)
+    RETENTION_DAYS = 7
+
 
 # =============================================================================
 # ERROR HANDLER CONFIGURATION
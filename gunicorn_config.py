@@ -17,7 +17,9 @@ bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
 if IS_RENDER:
     # Render: Optimized for starter plan performance
     workers = 2  # Fixed 2 workers for stable performance on starter plan
-    worker_class = "sync"
+    # Threaded workers: each open /api/stream/live connection holds a thread, not a whole worker
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", "32"))
     worker_connections = 500  # Reduced for better memory usage
 elif IS_VERCEL:
     # Vercel: Single worker for serverless
@@ -27,7 +29,8 @@ elif IS_VERCEL:
 else:
     # Replit: Single worker for development
     workers = 1
-    worker_class = "sync"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", "16"))
     worker_connections = 100
 
 # Worker configuration
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Async HTTP Benchmark
+Compares the async_http event-loop layer with blocking requests calls on a thread pool,
+against a local mock klines server (no network access needed)
+
+Usage:
+    python scripts/async_http_benchmark.py [--requests 500] [--latency 0.05] [--threads 4 32] [--per-host 64]
+
+The mock server answers /api/v3/klines after --latency seconds with --candles rows, like
+a slow upstream. Thread runs use one requests.get per call (the pre-async fetchers);
+the async run submits every request to the async_http loop at once from one caller thread.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from aiohttp import web
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def start_mock_server(latency, candles):
+    """Run the mock klines server on a background loop; returns its base URL"""
+    now_ms = int(time.time() * 1000)
+    payload = json.dumps(
+        [[now_ms - i * 900_000, "100.0", "101.0", "99.0", "100.5", "12.3"] for i in range(candles)][::-1]
+    )
+
+    async def klines(request):
+        await asyncio.sleep(latency)
+        return web.Response(text=payload, content_type="application/json")
+
+    ready = threading.Event()
+    state = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get("/api/v3/klines", klines)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0, backlog=1024)
+        loop.run_until_complete(site.start())
+        state["port"] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{state['port']}"
+
+
+def summarize(label, elapsed, latencies, errors, threads):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(
+        f"{label:<22} {len(latencies) / elapsed:8.1f} req/s   total {elapsed:6.2f}s   "
+        f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.1f}ms   p95 {p95 * 1000:7.1f}ms   "
+        f"errors {errors}   I/O threads {threads}"
+    )
+    return len(latencies) / elapsed if elapsed else 0.0
+
+
+def run_threads(url, params, count, workers):
+    latencies, errors = [], 0
+
+    def call(_):
+        start = time.perf_counter()
+        response = requests.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        response.json()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(lambda i: _safe(call, i), range(count)):
+            if isinstance(result, Exception):
+                errors += 1
+            else:
+                latencies.append(result)
+    return summarize(f"requests x{workers} threads", time.perf_counter() - start, latencies, errors, workers)
+
+
+def run_async(url, params, count):
+    from api.async_http import async_http
+
+    async_http.start()
+    calls = [{"url": url, "params": params, "timeout": 30} for _ in range(count)]
+
+    start = time.perf_counter()
+    futures = [async_http.submit("GET", call["url"], params=call["params"], timeout=call["timeout"]) for call in calls]
+    submitted = {future: time.perf_counter() for future in futures}
+    latencies, errors = [], 0
+    for future in futures:
+        try:
+            future.result().json()
+            latencies.append(time.perf_counter() - submitted[future])
+        except Exception:
+            errors += 1
+    rate = summarize("async_http (1 loop)", time.perf_counter() - start, latencies, errors, 1)
+    print(f"{'':<22} peak in flight {async_http.get_status()['peak_in_flight']}")
+    return rate
+
+
+def _safe(func, arg):
+    try:
+        return func(arg)
+    except Exception as e:
+        return e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="async_http vs thread-pool requests benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock server latency (seconds)")
+    parser.add_argument("--candles", type=int, default=200, help="Candles per mock response")
+    parser.add_argument("--threads", type=int, nargs="+", default=[4, 32], help="Thread-pool sizes to compare")
+    parser.add_argument("--per-host", type=int, default=64, help="async_http in-flight limit for the mock host")
+    args = parser.parse_args()
+
+    from config import AsyncHttpConfig
+
+    AsyncHttpConfig.DEFAULT_PER_HOST_LIMIT = args.per_host
+
+    base_url = start_mock_server(args.latency, args.candles)
+    url = f"{base_url}/api/v3/klines"
+    params = {"symbol": "BTCUSDT", "interval": "15m", "limit": args.candles}
+    print(
+        f"📊 {args.requests} requests per run, mock latency {args.latency * 1000:.0f}ms, "
+        f"{args.candles} candles per response\n"
+    )
+
+    results = {f"threads_{workers}": run_threads(url, params, args.requests, workers) for workers in args.threads}
+    results["async"] = run_async(url, params, args.requests)
+
+    best_threads = max(value for key, value in results.items() if key.startswith("threads_"))
+    print(f"\nasync_http vs best thread pool: {results['async'] / best_threads:.1f}x throughput")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
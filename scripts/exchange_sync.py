@@ -15,9 +15,13 @@ from api.models import (
     get_iran_time,
     utc_to_iran_time,
 )
+from api.service_supervisor import service_supervisor
 from api.unified_exchange_client import ToobitClient
 from config import TimeConfig
 
+# Leader-election / supervisor name of the background sync loop
+EXCHANGE_SYNC_SERVICE_NAME = "exchange_sync"
+
 
 class ExchangeSyncService:
     """Background service for synchronizing with Toobit exchange"""
@@ -28,6 +32,11 @@ class ExchangeSyncService:
         self.running = False
         self.sync_thread = None
 
+        # Bumped on every start() so a loop left over from before a restart exits
+        self._generation = 0
+        # Set to wake the loop early (stop, or a runtime interval change)
+        self._wake_event = threading.Event()
+
         # Import here to avoid circular import
         from config import Environment
 
@@ -48,7 +57,10 @@ class ExchangeSyncService:
         """Start the background synchronization service"""
         if not self.running:
             self.running = True
-            self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self._generation += 1
+            self._wake_event.clear()
+            service_supervisor.heartbeat(EXCHANGE_SYNC_SERVICE_NAME, phase="starting")
+            self.sync_thread = threading.Thread(target=self._sync_loop, args=(self._generation,), daemon=True)
             self.sync_thread.start()
             logging.info("Exchange synchronization service started")
             logging.info(f"Health ping boost enabled - boost duration: {TimeConfig.HEALTH_PING_BOOST_DURATION}s, boost interval: {TimeConfig.HEALTH_PING_BOOST_INTERVAL}s")
@@ -57,16 +69,24 @@ class ExchangeSyncService:
     def stop(self):
         """Stop the background synchronization service"""
         self.running = False
+        self._wake_event.set()
         if self.sync_thread:
             self.sync_thread.join(timeout=10)
         logging.info("Exchange synchronization service stopped")
 
-    def _sync_loop(self):
+    def restart(self):
+        """Restart the loop (used by the supervisor when the loop stops heartbeating)"""
+        self.stop()
+        self.start()
+        return True
+
+    def _sync_loop(self, generation=0):
         """Main synchronization loop with health ping boost and cost optimization"""
-        while self.running:
+        while self.running and generation == self._generation:
             try:
                 # Check if we're in boost period before syncing
                 current_interval = self._get_current_sync_interval()
+                service_supervisor.heartbeat(EXCHANGE_SYNC_SERVICE_NAME, phase="sync", interval=current_interval)
                 is_boost_active = (
                     (self.is_render or not self.is_vercel)
                     and self.last_health_ping
@@ -93,11 +113,24 @@ class ExchangeSyncService:
                     # Lighter check - just verify active users exist
                     self._quick_user_check()
 
-                # Sleep for the calculated interval
-                time.sleep(current_interval)
+                # Sleep for the calculated interval (reconfigure() and stop() wake the loop early)
+                service_supervisor.heartbeat(
+                    EXCHANGE_SYNC_SERVICE_NAME,
+                    next_within=current_interval + TimeConfig.VERCEL_SYNC_COOLDOWN,
+                    phase="waiting",
+                    interval=current_interval,
+                )
+                if self._wake_event.wait(current_interval):
+                    self._wake_event.clear()
 
             except Exception as e:
                 logging.error(f"Error in sync loop: {e}")
+                service_supervisor.heartbeat(
+                    EXCHANGE_SYNC_SERVICE_NAME,
+                    next_within=TimeConfig.VERCEL_SYNC_COOLDOWN * 2,
+                    phase="error_backoff",
+                    error=str(e),
+                )
                 time.sleep(TimeConfig.VERCEL_SYNC_COOLDOWN)  # Wait longer on error
 
     def _get_current_sync_interval(self):
@@ -131,10 +164,29 @@ class ExchangeSyncService:
             # Return to normal interval
             return self.sync_interval
 
+    def get_config(self) -> Dict:
+        """Runtime configuration of the sync loop"""
+        return {"sync_interval": self.sync_interval}
+
+    def reconfigure(self, sync_interval=None) -> Dict:
+        """Change the regular sync interval without restarting the loop"""
+        if sync_interval is not None:
+            try:
+                sync_interval = float(sync_interval)
+            except (TypeError, ValueError):
+                raise ValueError("sync_interval must be a number of seconds")
+            if sync_interval <= 0:
+                raise ValueError("sync_interval must be positive")
+            self.sync_interval = sync_interval
+            self._wake_event.set()
+            logging.info(f"Exchange sync interval changed to {sync_interval}s")
+        return self.get_config()
+
     def trigger_health_ping_boost(self):
         """Trigger extended monitoring after health ping"""
         # Allow boost for ALL environments (Render, Vercel, Replit)
         self.last_health_ping = datetime.utcnow()
+        self._wake_event.set()  # switch to the boost interval now, not after the current wait
         if self.is_render:
             env_name = "Render"
         elif self.is_vercel:
@@ -676,11 +728,16 @@ class ExchangeSyncService:
 sync_service = None
 
 
-def initialize_sync_service(app, db):
-    """Initialize and start the exchange synchronization service"""
+def initialize_sync_service(app, db, start=True):
+    """Initialize the exchange synchronization service
+
+    With start=False the background loop is left to the caller (leader election);
+    on-demand calls such as force_sync_user still work in every process.
+    """
     global sync_service
     sync_service = ExchangeSyncService(app, db)
-    sync_service.start()
+    if start:
+        sync_service.start()
     return sync_service
 
 
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Fake Kline Stream Server
+Local stand-in for the Binance combined kline WebSocket stream, for offline testing of
+KLINES_STREAM ingestion
+
+Usage:
+    python scripts/fake_kline_stream.py [--port 8765] [--interval 1.0] [--close-every 10] [--drop-after 0]
+
+Then run the app with:
+    KLINES_STREAM=1 KLINES_STREAM_URL=ws://127.0.0.1:8765
+
+Serves /stream?streams=btcusdt@kline_15m/... and pushes a random-walk open-candle update
+per stream every --interval seconds. The previous period's candle is sent as closed
+(k.x = true) right after connecting and every --close-every seconds, which exercises the
+candle-close path without waiting for a real period boundary. --drop-after closes each
+connection after that many seconds to exercise reconnect with backoff.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TIMEFRAME_MS = {"15m": 900_000, "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+BASE_PRICES = {"BTCUSDT": 65000.0, "ETHUSDT": 3200.0, "BNBUSDT": 580.0, "XRPUSDT": 0.6, "SOLUSDT": 150.0, "ADAUSDT": 0.45}
+
+
+class FakeSeries:
+    """Random-walk candle state for one symbol/timeframe stream"""
+
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.period_ms = TIMEFRAME_MS[timeframe]
+        self.price = BASE_PRICES.get(symbol, 100.0)
+        self.open_time = None
+        self._start_candle(self._period_start(int(time.time() * 1000)))
+
+    def _period_start(self, now_ms):
+        return now_ms - now_ms % self.period_ms
+
+    def _start_candle(self, open_time):
+        self.open_time = open_time
+        self.open = self.high = self.low = self.price
+        self.volume = 0.0
+
+    def tick(self):
+        """Advance the random walk, rolling over at real period boundaries"""
+        period_start = self._period_start(int(time.time() * 1000))
+        if period_start != self.open_time:
+            self._start_candle(period_start)
+        self.price = round(self.price * (1 + random.uniform(-0.0005, 0.0005)), 6)
+        self.high = max(self.high, self.price)
+        self.low = min(self.low, self.price)
+        self.volume = round(self.volume + random.uniform(0.1, 5.0), 4)
+
+    def event(self, closed=False):
+        """Binance combined-stream kline payload for the open (or previous, closed) candle"""
+        if closed:
+            open_time = self.open_time - self.period_ms
+            o, h, l, c = self.open, max(self.open, self.price) * 1.001, min(self.open, self.price) * 0.999, self.open
+            volume = 1000.0
+        else:
+            open_time = self.open_time
+            o, h, l, c, volume = self.open, self.high, self.low, self.price, self.volume
+        return {
+            "stream": f"{self.symbol.lower()}@kline_{self.timeframe}",
+            "data": {
+                "e": "kline",
+                "E": int(time.time() * 1000),
+                "s": self.symbol,
+                "k": {
+                    "t": open_time,
+                    "T": open_time + self.period_ms - 1,
+                    "s": self.symbol,
+                    "i": self.timeframe,
+                    "o": f"{o:.6f}",
+                    "c": f"{c:.6f}",
+                    "h": f"{h:.6f}",
+                    "l": f"{l:.6f}",
+                    "v": f"{volume:.4f}",
+                    "x": closed,
+                },
+            },
+        }
+
+
+def parse_streams(query_value):
+    series = []
+    for stream in filter(None, query_value.split("/")):
+        name, _, kind = stream.partition("@kline_")
+        if kind in TIMEFRAME_MS:
+            series.append(FakeSeries(name.upper(), kind))
+    return series
+
+
+async def stream_handler(request):
+    config = request.app["config"]
+    series = parse_streams(request.query.get("streams", ""))
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    print(f"🔌 Client connected: {len(series)} streams")
+
+    connected_at = time.time()
+    last_close = connected_at
+    try:
+        for entry in series:
+            await ws.send_str(json.dumps(entry.event(closed=True)))
+
+        while not ws.closed:
+            now = time.time()
+            if config.drop_after and now - connected_at >= config.drop_after:
+                print("✂️  Dropping connection (--drop-after)")
+                break
+
+            send_closes = config.close_every and now - last_close >= config.close_every
+            for entry in series:
+                entry.tick()
+                await ws.send_str(json.dumps(entry.event()))
+                if send_closes:
+                    await ws.send_str(json.dumps(entry.event(closed=True)))
+            if send_closes:
+                last_close = now
+
+            await asyncio.sleep(config.interval)
+    except (ConnectionResetError, asyncio.CancelledError):
+        pass
+    finally:
+        await ws.close()
+        print("🔌 Client disconnected")
+    return ws
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Binance kline WebSocket stream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between open-candle updates")
+    parser.add_argument("--close-every", type=float, default=10.0, help="Seconds between closed-candle events (0 disables)")
+    parser.add_argument("--drop-after", type=float, default=0.0, help="Close each connection after N seconds (0 disables)")
+    args = parser.parse_args()
+
+    app = web.Application()
+    app["config"] = args
+    app.router.add_get("/stream", stream_handler)
+
+    print(f"📡 Fake kline stream on ws://{args.host}:{args.port}/stream")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+HTTP Transport Benchmark
+Compares module-level requests.get calls with the shared async_http transport against a
+local HTTPS stand-in (self-signed certificate, no network access needed)
+
+Usage:
+    python scripts/http_transport_benchmark.py [--requests 300] [--latency 0.005] [--threads 1 16]
+
+The stand-in answers /api/v3/ticker/price after --latency seconds and counts the TLS
+connections it accepts. Each run issues --requests calls from a thread pool of the
+given size: once with requests.get (a new TCP + TLS connection per call, like the
+fetchers did) and once through async_http (pooled keep-alive connections).
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from aiohttp import web
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def create_certificate(directory):
+    """Self-signed certificate for 127.0.0.1; returns (cert_path, key_path)"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "standin.pem")
+    key_path = os.path.join(directory, "standin.key")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            )
+        )
+    return cert_path, key_path
+
+
+class StandIn:
+    """HTTPS price endpoint on a background loop that counts accepted connections"""
+
+    def __init__(self, cert_path, key_path, latency):
+        self.latency = latency
+        self.connections = set()
+        self.base_url = None
+        self._cert_path, self._key_path = cert_path, key_path
+
+    async def ticker(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(self.latency)
+        symbol = request.query.get("symbol", "BTCUSDT")
+        return web.Response(text=json.dumps({"symbol": symbol, "price": "65000.10"}), content_type="application/json")
+
+    def start(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        async def serve():
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(self._cert_path, self._key_path)
+            app = web.Application()
+            app.router.add_get("/api/v3/ticker/price", self.ticker)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=context)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.base_url = f"https://127.0.0.1:{port}"
+            ready.set()
+
+        def main():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(serve())
+            loop.run_forever()
+
+        threading.Thread(target=main, daemon=True).start()
+        ready.wait()
+        return self.base_url
+
+
+def run(label, fetch, count, threads, standin):
+    standin.connections.clear()
+    latencies = []
+
+    def call(index):
+        started = time.perf_counter()
+        response = fetch(index)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(count)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "rate": count / wall,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "connections": len(standin.connections),
+    }
+    print(
+        f"{label:<24} {threads:>7} {result['rate']:>9.0f} {result['mean_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+        f"{result['connections']:>12}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="requests.get vs shared async_http transport over HTTPS")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per run")
+    parser.add_argument("--latency", type=float, default=0.005, help="Stand-in response delay (seconds)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 16], help="Caller thread counts to compare")
+    args = parser.parse_args()
+
+    from api.async_http import async_http
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = create_certificate(directory)
+        standin = StandIn(cert_path, key_path, args.latency)
+        url = f"{standin.start()}/api/v3/ticker/price"
+        print(f"📊 {args.requests} requests per run against {url} (TLS, {args.latency * 1000:.0f}ms handler delay)\n")
+        print(f"{'transport':<24} {'threads':>7} {'req/s':>9} {'mean ms':>9} {'p95 ms':>9} {'connections':>12}")
+
+        results = []
+        for threads in args.threads:
+            baseline = run(
+                "requests.get per call",
+                lambda i: requests.get(url, params={"symbol": f"SYM{i % 20}USDT"}, timeout=10, verify=cert_path),
+                args.requests,
+                threads,
+                standin,
+            )
+            pooled = run(
+                "async_http (pooled)",
+                lambda i: async_http.get(url, params={"symbol": f"SYM{i % 20}USDT"}, timeout=10, verify=cert_path),
+                args.requests,
+                threads,
+                standin,
+            )
+            results.append((threads, baseline, pooled))
+
+        print()
+        for threads, baseline, pooled in results:
+            print(
+                f"{threads} threads: {baseline['connections']} -> {pooled['connections']} TLS handshakes, "
+                f"mean latency {baseline['mean_ms']:.1f} -> {pooled['mean_ms']:.1f}ms, "
+                f"{pooled['rate'] / baseline['rate']:.1f}x throughput"
+            )
+
+        host_status = async_http.get_status()["hosts"].get("127.0.0.1", {})
+        print(
+            f"\nasync_http host metrics: {host_status.get('requests')} requests, "
+            f"{host_status.get('connections_opened')} connections opened, reuse ratio {host_status.get('reuse_ratio')}, "
+            f"p50 {host_status.get('latency_p50_ms')}ms, p95 {host_status.get('latency_p95_ms')}ms"
+        )
+        async_http.stop()
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Klines Backfill Tool
+Fills missing klines ranges with paginated startTime/endTime fetches, checkpointed per series
+
+Usage:
+    python scripts/klines_backfill.py run BTCUSDT 1h --candles 3000
+    python scripts/klines_backfill.py run BTCUSDT 4h --start 2025-01-01 [--end 2025-06-01]
+    python scripts/klines_backfill.py resume
+    python scripts/klines_backfill.py status
+
+Only ranges missing from klines_cache are fetched. Interrupt at any time - `resume`
+(or the unified data sync service at startup) continues from the last saved page.
+Rolling-window cleanup still applies to live series; raise the RollingWindowConfig
+targets to keep deep history for backtests.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_utc(value):
+    parsed = datetime.fromisoformat(value)
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable paginated klines backfill")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Backfill the missing ranges of one series")
+    run_parser.add_argument("symbol")
+    run_parser.add_argument("timeframe", choices=["15m", "1h", "4h", "1d"])
+    window = run_parser.add_mutually_exclusive_group(required=True)
+    window.add_argument("--candles", type=int, help="Most recent N complete candles")
+    window.add_argument("--start", type=parse_utc, help="Window start (ISO date/time, UTC)")
+    run_parser.add_argument("--end", type=parse_utc, help="Window end (default: current open candle)")
+    run_parser.add_argument("--max-pages", type=int, help="Stop after N pages (resume later)")
+
+    subparsers.add_parser("resume", help="Resume every pending or failed checkpoint")
+    subparsers.add_parser("status", help="Show backfill checkpoints")
+
+    args = parser.parse_args()
+
+    from api.app import app
+    from api.klines_backfill import backfill_candles, backfill_series, get_backfill_status, resume_pending_backfills
+    from api.models import db
+
+    with app.app_context():
+        db.create_all()  # Ensures klines_backfill_checkpoints exists
+
+        if args.command == "status":
+            result = get_backfill_status()
+        elif args.command == "resume":
+            result = resume_pending_backfills()
+        elif args.candles:
+            result = backfill_candles(args.symbol.upper(), args.timeframe, args.candles, max_pages=args.max_pages)
+        else:
+            result = backfill_series(args.symbol.upper(), args.timeframe, args.start, args.end, max_pages=args.max_pages)
+
+    print(json.dumps(result, indent=2))
+    if isinstance(result, dict):
+        return result["status"] != "failed"
+    return all(entry["status"] != "failed" for entry in result)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Compact Klines Schema Tool
+Migrates klines_cache into the integer-keyed compact schema (klines_series + klines_compact)
+and benchmarks index size and range-scan latency of both schemas
+
+Usage:
+    python scripts/klines_compact.py migrate [--batch-size 5000]
+    python scripts/klines_compact.py benchmark [--rows 3000000] [--database-url URL] [--queries 500]
+
+The benchmark builds both schemas in a scratch database (a temporary SQLite file by
+default; pass a PostgreSQL URL, e.g. a container from Dockerfile.postgres, for
+production-like numbers) and drops the tables afterwards unless --keep is given.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_TIMEFRAMES = {"15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+RANGE_CANDLES = 500  # Candles per range scan (analyzer-sized window)
+INSERT_CHUNK = 10000
+
+
+def run_migrate(batch_size):
+    """Copy the live klines_cache into the compact schema"""
+    from api.app import app
+    from api.models import KlinesCompact, KlinesSeries, db
+
+    with app.app_context():
+        db.create_all()  # Ensures klines_series / klines_compact exist
+        start_time = time.time()
+        results = KlinesCompact.migrate_from_klines_cache(batch_size=batch_size)
+        print(
+            f"✅ Migrated {results['rows']} candles across {results['series']} series "
+            f"in {time.time() - start_time:.1f}s ({KlinesSeries.query.count()} series ids)"
+        )
+    return True
+
+
+def _index_sizes(connection, dialect, tables):
+    """Index bytes per table (PostgreSQL catalog, or SQLite dbstat when compiled in)"""
+    from sqlalchemy import text
+
+    sizes = {table: {} for table in tables}
+    if dialect == "postgresql":
+        rows = connection.execute(
+            text(
+                "SELECT relname, indexrelname, pg_relation_size(indexrelid) "
+                "FROM pg_stat_user_indexes WHERE relname = ANY(:tables)"
+            ),
+            {"tables": list(tables)},
+        )
+        for table, index, size in rows:
+            sizes[table][index] = size
+        return sizes
+
+    try:
+        rows = connection.execute(
+            text(
+                "SELECT m.tbl_name, s.name, SUM(s.pgsize) FROM dbstat s "
+                "JOIN sqlite_master m ON m.name = s.name "
+                "WHERE m.type = 'index' "
+                "GROUP BY s.name"
+            )
+        )
+        for table, index, size in rows:
+            if table in sizes:
+                sizes[table][index] = size
+    except Exception as e:
+        print(f"⚠️  SQLite dbstat unavailable, index sizes skipped: {e}")
+    return sizes
+
+
+def _populate(connection, legacy_table, series_table, compact_table, rows_total):
+    """Generate identical synthetic candles into both schemas"""
+    series_count = max(1, rows_total // 20000)
+    rows_per_series = rows_total // series_count
+    now = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    expires = now + timedelta(days=21)
+    expires_ms = int(expires.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    series = []
+    for index in range(series_count):
+        timeframe = list(BENCH_TIMEFRAMES)[index % len(BENCH_TIMEFRAMES)]
+        series.append({"id": index + 1, "symbol": f"BENCH{index // len(BENCH_TIMEFRAMES):04d}USDT", "timeframe": timeframe, "created_at": now})
+    connection.execute(series_table.insert(), series)
+
+    for entry in series:
+        period = timedelta(seconds=BENCH_TIMEFRAMES[entry["timeframe"]])
+        start = now - period * rows_per_series
+        for chunk_start in range(0, rows_per_series, INSERT_CHUNK):
+            legacy_rows, compact_rows = [], []
+            for offset in range(chunk_start, min(chunk_start + INSERT_CHUNK, rows_per_series)):
+                timestamp = start + period * offset
+                price = 100.0 + random.random()
+                legacy_rows.append(
+                    {
+                        "symbol": entry["symbol"], "timeframe": entry["timeframe"], "timestamp": timestamp,
+                        "open": price, "high": price + 1, "low": price - 1, "close": price, "volume": 10.0,
+                        "created_at": now, "expires_at": expires, "is_complete": True,
+                    }
+                )
+                compact_rows.append(
+                    {
+                        "series_id": entry["id"], "open_time_ms": int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000),
+                        "open": price, "high": price + 1, "low": price - 1, "close": price, "volume": 10.0,
+                        "expires_at_ms": expires_ms, "is_complete": True,
+                    }
+                )
+            connection.execute(legacy_table.insert(), legacy_rows)
+            connection.execute(compact_table.insert(), compact_rows)
+
+    return series, rows_per_series, now
+
+
+def _time_queries(connection, statement, params_list):
+    latencies = []
+    for params in params_list:
+        start = time.perf_counter()
+        connection.execute(statement, params).fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "mean_ms": statistics.fmean(latencies),
+    }
+
+
+def run_benchmark(rows_total, database_url, queries, keep):
+    """Build both schemas in a scratch database and compare index size and range scans"""
+    from sqlalchemy import MetaData, create_engine, text
+
+    from api.models import KlinesCache, KlinesCompact, KlinesSeries
+
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'klines_bench.db')}"
+    if database_url == os.environ.get("DATABASE_URL"):
+        print("❌ Refusing to benchmark against the application DATABASE_URL - use a scratch database")
+        return False
+
+    engine = create_engine(database_url)
+    metadata = MetaData()
+    legacy_table = KlinesCache.__table__.to_metadata(metadata)
+    series_table = KlinesSeries.__table__.to_metadata(metadata)
+    compact_table = KlinesCompact.__table__.to_metadata(metadata)
+    tables = [legacy_table.name, compact_table.name]
+
+    print(f"🔧 Benchmark database: {engine.dialect.name} ({database_url.split('@')[-1]})")
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    try:
+        with engine.begin() as connection:
+            start_time = time.time()
+            series, rows_per_series, now = _populate(connection, legacy_table, series_table, compact_table, rows_total)
+            print(f"📥 Loaded {len(series) * rows_per_series} rows into each schema in {time.time() - start_time:.1f}s")
+
+        with engine.connect() as connection:
+            if engine.dialect.name == "postgresql":
+                connection.execute(text("ANALYZE klines_cache"))
+                connection.execute(text("ANALYZE klines_compact"))
+            else:
+                connection.execute(text("ANALYZE"))
+
+            sizes = _index_sizes(connection, engine.dialect.name, tables)
+
+            legacy_params, compact_params = [], []
+            for _ in range(queries):
+                entry = random.choice(series)
+                period = timedelta(seconds=BENCH_TIMEFRAMES[entry["timeframe"]])
+                offset = random.randint(0, max(0, rows_per_series - RANGE_CANDLES))
+                range_start = now - period * (rows_per_series - offset)
+                range_end = range_start + period * RANGE_CANDLES
+                legacy_params.append(
+                    {"symbol": entry["symbol"], "timeframe": entry["timeframe"], "start": range_start, "end": range_end}
+                )
+                compact_params.append(
+                    {
+                        "series_id": entry["id"],
+                        "start": int(range_start.replace(tzinfo=timezone.utc).timestamp() * 1000),
+                        "end": int(range_end.replace(tzinfo=timezone.utc).timestamp() * 1000),
+                    }
+                )
+
+            legacy_latency = _time_queries(
+                connection,
+                text(
+                    "SELECT timestamp, open, high, low, close, volume FROM klines_cache "
+                    "WHERE symbol = :symbol AND timeframe = :timeframe "
+                    "AND timestamp >= :start AND timestamp < :end ORDER BY timestamp"
+                ),
+                legacy_params,
+            )
+            compact_latency = _time_queries(
+                connection,
+                text(
+                    "SELECT open_time_ms, open, high, low, close, volume FROM klines_compact "
+                    "WHERE series_id = :series_id AND open_time_ms >= :start AND open_time_ms < :end "
+                    "ORDER BY open_time_ms"
+                ),
+                compact_params,
+            )
+
+        print("=" * 60)
+        for table in tables:
+            total = sum(sizes[table].values())
+            print(f"📦 {table} index bytes: {total / 1024 / 1024:.1f} MiB")
+            for index, size in sorted(sizes[table].items()):
+                print(f"     {index:<40} {size / 1024 / 1024:8.1f} MiB")
+        print(f"⏱️  Range scan ({RANGE_CANDLES} candles, {queries} queries)")
+        for name, latency in (("klines_cache", legacy_latency), ("klines_compact", compact_latency)):
+            print(
+                f"     {name:<16} p50={latency['p50_ms']:.2f}ms p95={latency['p95_ms']:.2f}ms "
+                f"mean={latency['mean_ms']:.2f}ms"
+            )
+        print("=" * 60)
+    finally:
+        if not keep:
+            metadata.drop_all(engine)
+        engine.dispose()
+
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact klines schema migration and benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Copy klines_cache into klines_compact")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000)
+
+    bench_parser = subparsers.add_parser("benchmark", help="Compare index size and range-scan latency")
+    bench_parser.add_argument("--rows", type=int, default=3000000, help="Rows generated into each schema")
+    bench_parser.add_argument("--database-url", help="Scratch database URL (default: temporary SQLite file)")
+    bench_parser.add_argument("--queries", type=int, default=500, help="Range scans per schema")
+    bench_parser.add_argument("--keep", action="store_true", help="Keep the benchmark tables afterwards")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        return run_migrate(args.batch_size)
+    return run_benchmark(args.rows, args.database_url, args.queries, args.keep)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Klines Snapshot Tool
+Exports the klines store to a compact columnar snapshot and imports it for fast cold starts
+
+Usage:
+    python scripts/klines_snapshot.py export klines.snap [--symbols BTCUSDT ETHUSDT] [--timeframes 1h 4h]
+    python scripts/klines_snapshot.py import klines.snap [--force]
+    python scripts/klines_snapshot.py info klines.snap
+
+Set KLINES_SNAPSHOT_PATH to have the unified data sync service import the snapshot at boot.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def print_info(header):
+    """Print snapshot header contents"""
+    print(f"Snapshot version {header['version']}, exported at {header['exported_at']}")
+    for series in header["series"]:
+        first = datetime.fromtimestamp(series["first_timestamp"] / 1000, tz=timezone.utc)
+        last = datetime.fromtimestamp(series["last_timestamp"] / 1000, tz=timezone.utc)
+        print(f"  {series['symbol']:<10} {series['timeframe']:>4} rows={series['rows']:<6} {first:%Y-%m-%d %H:%M} -> {last:%Y-%m-%d %H:%M}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export/import klines snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write cached complete candles to a snapshot file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--symbols", nargs="+", help="Only these symbols")
+    export_parser.add_argument("--timeframes", nargs="+", help="Only these timeframes")
+
+    import_parser = subparsers.add_parser("import", help="Load a snapshot file into klines_cache")
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--force", action="store_true", help="Import series even if the database already has newer candles"
+    )
+
+    info_parser = subparsers.add_parser("info", help="Show the series contained in a snapshot")
+    info_parser.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "info":
+        from api.klines_snapshot import read_snapshot_header
+
+        print_info(read_snapshot_header(args.path))
+        return True
+
+    from api.app import app
+    from api.klines_snapshot import export_snapshot, import_snapshot
+
+    with app.app_context():
+        if args.command == "export":
+            result = export_snapshot(args.path, symbols=args.symbols, timeframes=args.timeframes)
+        else:
+            if not os.path.exists(args.path):
+                print(f"❌ Snapshot not found: {args.path}")
+                return False
+            result = import_snapshot(args.path, skip_fresher=not args.force)
+
+    print(json.dumps(result, indent=2))
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
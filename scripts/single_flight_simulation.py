@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Simulation
+Counts upstream calls under a simulated polling load with and without request coalescing
+
+Usage:
+    python scripts/single_flight_simulation.py [--clients 50] [--duration 10] [--poll 1.0] [--ttl 1.0] [--latency 0.2]
+
+Every client polls like the mini app: each --poll seconds (with jitter) it reads the
+prices of all --symbols and one candlestick series per symbol. A read hits a shared
+TTL cache; a miss calls the mock upstream (--latency seconds per call). The same load
+runs twice - once with every miss fetching on its own, once through SingleFlight
+groups keyed by symbol and by (symbol, timeframe).
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class MockUpstream:
+    """Counts calls per key and sleeps like a slow upstream"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def fetch(self, key):
+        with self._lock:
+            self.calls[key] += 1
+        time.sleep(self.latency)
+        return {"key": key, "fetched_at": time.time()}
+
+
+class TTLCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def set(self, key, value):
+        self._entries[key] = (time.time(), value)
+
+
+def run_load(args, coalesce):
+    from api.single_flight import SingleFlight
+
+    upstream = MockUpstream(args.latency)
+    cache = TTLCache(args.ttl)
+    flights = {"price": SingleFlight("price"), "klines": SingleFlight("klines")}
+    for flight in flights.values():
+        flight.enabled = coalesce
+
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    reads = Counter()
+    stop = threading.Event()
+
+    def read(group, key):
+        reads[group] += 1
+        value = cache.get((group, key))
+        if value is None:
+            value, _ = flights[group].do(key, lambda: upstream.fetch((group, key)))
+            cache.set((group, key), value)
+        return value
+
+    def client(index):
+        rng = random.Random(index)
+        time.sleep(rng.uniform(0, args.poll))
+        while not stop.is_set():
+            for symbol in symbols:
+                read("price", symbol)
+                read("klines", (symbol, "15m"))
+            stop.wait(args.poll * rng.uniform(0.9, 1.1))
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    totals = Counter()
+    for (group, _), count in upstream.calls.items():
+        totals[group] += count
+    return totals, reads, {name: flight.get_status() for name, flight in flights.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upstream calls with and without single-flight coalescing")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent polling clients")
+    parser.add_argument("--symbols", type=int, default=4, help="Symbols each client polls")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    parser.add_argument("--poll", type=float, default=1.0, help="Client polling interval (seconds)")
+    parser.add_argument("--ttl", type=float, default=1.0, help="Cache TTL (seconds)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock upstream latency (seconds)")
+    args = parser.parse_args()
+
+    print(
+        f"📊 {args.clients} clients x {args.symbols} symbols, poll {args.poll}s, cache TTL {args.ttl}s, "
+        f"upstream latency {args.latency * 1000:.0f}ms, {args.duration:.0f}s per run\n"
+    )
+    baseline, reads, _ = run_load(args, coalesce=False)
+    coalesced, _, status = run_load(args, coalesce=True)
+
+    print(f"{'group':<8} {'reads':>8} {'no coalescing':>14} {'single-flight':>14}")
+    for group in ("price", "klines"):
+        print(f"{group:<8} {reads[group]:>8} {baseline[group]:>14} {coalesced[group]:>14}")
+    print()
+    for group, group_status in status.items():
+        print(
+            f"{group}: {group_status['shared']} of {group_status['calls']} misses shared a flight, "
+            f"max {group_status['max_followers']} followers"
+        )
+
+    total_before = sum(baseline.values())
+    total_after = sum(coalesced.values())
+    print(f"\nUpstream calls: {total_before} -> {total_after} ({total_before / max(total_after, 1):.1f}x fewer)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
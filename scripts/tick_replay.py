@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Tick Replay Tool
+Inspects, synthesises and replays price tick logs written by the tick recorder
+(TICK_RECORDER=true, files in TickRecorderConfig.DIRECTORY)
+
+Usage:
+    python scripts/tick_replay.py info [--dir DIR] [--day YYYYMMDD] [FILE ...]
+    python scripts/tick_replay.py synth --out DIR [--symbols 20] [--ticks 200000] [--interval 1.0] [--volatility 0.002]
+    python scripts/tick_replay.py replay [--dir DIR] [--day YYYYMMDD] [FILE ...] [--speed 0] [--interval 5]
+                                          [--positions 50] [--tp 2 4 6] [--sl 3] [--breakeven tp1] [--persist]
+
+replay loads the app, stops everything that would feed or touch positions behind the
+replay's back (service supervisor, leader-elected exchange sync, price hub producer),
+opens --positions synthetic paper positions (user --user-id, alternating long/short,
+entered at each symbol's first recorded price) and feeds the log into the price hub:
+- --speed 0 replays as fast as possible, 1 at recorded speed, N at N times that
+- --interval S runs update_all_positions_with_live_data every S recorded seconds
+  (the monitoring cadence); 0 runs it after every tick
+Pass latency, TP/SL/break-even triggers and an outcome digest are reported; the same log
+and options give the same digest. Closed trades are counted, not written to the
+database, unless --persist is given. SESSION_SECRET must be set as for the app.
+"""
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Replayed ticks must never be recorded again
+os.environ["TICK_RECORDER"] = "false"
+
+
+def resolve_paths(args):
+    from api.tick_recorder import log_files
+    from config import TickRecorderConfig
+
+    if args.files:
+        return args.files
+    return log_files(args.dir or TickRecorderConfig.DIRECTORY, args.day)
+
+
+def run_info(args):
+    from api.tick_recorder import load_ticks
+
+    paths = resolve_paths(args)
+    if not paths:
+        print("❌ No tick logs found")
+        return False
+
+    size = sum(os.path.getsize(path) for path in paths)
+    count, first, last = 0, None, None
+    symbols, sources = {}, {}
+    for tick in load_ticks(paths):
+        count += 1
+        first = tick.timestamp if first is None else first
+        last = tick.timestamp
+        symbols[tick.symbol] = symbols.get(tick.symbol, 0) + 1
+        sources[tick.source] = sources.get(tick.source, 0) + 1
+
+    print(f"📁 {len(paths)} files, {size:,} bytes, {count:,} ticks ({size / max(count, 1):.1f} bytes/tick)")
+    if count:
+        span = last - first
+        print(
+            f"🕒 {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(first))} → "
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(last))} UTC ({span:,.0f}s, {count / max(span, 1e-9):.1f} ticks/s)"
+        )
+        print(f"📈 {len(symbols)} symbols: " + ", ".join(f"{s} {n}" for s, n in sorted(symbols.items(), key=lambda i: -i[1])[:10]))
+        print("🔌 Sources: " + ", ".join(f"{s} {n}" for s, n in sorted(sources.items(), key=lambda i: -i[1])))
+    return True
+
+
+def run_synth(args):
+    """Random-walk log (for load tests when no recording is at hand)"""
+    from api.tick_recorder import TickRecorder
+
+    rng = random.Random(args.seed)
+    names = [f"SYM{i}USDT" for i in range(args.symbols)]
+    prices = {name: 10 ** rng.uniform(-2, 5) for name in names}
+    recorder = TickRecorder(args.out)
+    timestamp = time.time() - args.ticks * args.interval / args.symbols
+
+    for index in range(args.ticks):
+        name = names[index % args.symbols]
+        prices[name] *= 1 + rng.gauss(0, args.volatility)
+        recorder.record(name, prices[name], "synthetic", timestamp)
+        if index % args.symbols == args.symbols - 1:
+            timestamp += args.interval
+    recorder.stop()
+
+    print(f"✅ Wrote {args.ticks:,} ticks for {args.symbols} symbols to {recorder.get_status()['directory']}")
+    return True
+
+
+def isolate_app():
+    """Import the app with nothing but the replay feeding prices or processing positions"""
+    import api.app as app_module
+    from api.leader_election import leader_election
+    from api.price_hub import price_hub
+    from api.service_supervisor import service_supervisor
+    from api.tick_recorder import tick_recorder
+
+    service_supervisor.stop()
+    leader_election.stop()  # stops the exchange sync loop (it processes paper positions too)
+    tick_recorder.stop()
+    price_hub.configure(None)
+    price_hub.stop()
+    deadline = time.time() + 30
+    while price_hub.get_status()["running"] and time.time() < deadline:
+        time.sleep(0.05)  # let an in-flight producer pass finish before the first replayed tick
+    return app_module
+
+
+def open_positions(app_module, first_prices, args):
+    """Synthetic paper positions spread over the recorded symbols"""
+    from config import TradingConfig
+
+    symbols = sorted(first_prices)
+    trades = app_module.user_trade_configs.setdefault(args.user_id, {})
+    app_module.user_paper_balances[args.user_id] = TradingConfig.DEFAULT_TRIAL_BALANCE
+
+    allocations = [round(100 / len(args.tp), 2)] * len(args.tp) if args.tp else []
+    for index in range(args.positions):
+        symbol = symbols[index % len(symbols)]
+        config = app_module.TradeConfig(f"replay_{index}", f"Replay {index}")
+        config.symbol = symbol
+        config.side = "long" if index % 2 == 0 else "short"
+        config.amount = args.amount
+        config.leverage = args.leverage
+        config.entry_type = "market"
+        config.take_profits = [{"percentage": tp, "allocation": allocation} for tp, allocation in zip(args.tp, allocations)]
+        config.stop_loss_percent = args.sl
+        config.breakeven_after = args.breakeven if args.breakeven == "tp1" else float(args.breakeven or 0)
+        config.paper_trading_mode = True
+
+        app_module._configure_trade_position(config, first_prices[symbol])
+        app_module._setup_paper_tp_sl_orders(config, app_module.calculate_tp_sl_prices_and_amounts(config))
+        app_module.user_paper_balances[args.user_id] -= config.amount
+        trades[config.trade_id] = config
+    return trades
+
+
+def outcome_digest(trades):
+    """Hash of every position's end state - equal digests mean the replays agreed"""
+    lines = []
+    for trade_id, config in sorted(trades.items()):
+        triggered = [level["level"] for level in getattr(config, "paper_tp_levels", []) if level.get("triggered")]
+        lines.append(
+            f"{trade_id}|{config.status}|{triggered}|{getattr(config, 'breakeven_sl_triggered', False)}|"
+            f"{round(config.final_pnl, 6)}|{round(getattr(config, 'realized_pnl', 0.0), 6)}"
+        )
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()[:16]
+
+
+def load_replay_ticks(args):
+    """Ticks to replay (honouring --limit) and each symbol's first price, or None"""
+    from api.tick_recorder import load_ticks
+
+    paths = resolve_paths(args)
+    if not paths:
+        print("❌ No tick logs found")
+        return None
+    ticks = list(load_ticks(paths))
+    if args.limit:
+        ticks = ticks[: args.limit]
+    if not ticks:
+        print("❌ Tick logs are empty")
+        return None
+    first_prices = {}
+    for tick in ticks:
+        first_prices.setdefault(tick.symbol, tick.price)
+    return paths, ticks, first_prices
+
+
+def replay_ticks(app_module, ticks, first_prices, args):
+    """Feed the ticks into the price hub, running monitoring passes at the --interval cadence"""
+    from api.price_hub import price_hub
+    from api.tick_recorder import TickReplayer
+
+    pass_latencies = []
+    warmed_up = {"done": False, "skipped": 0}
+
+    def monitoring_pass(recorded_time=None):
+        # Until every position's symbol has a replayed tick a pass would block on the hub's first-tick wait
+        if not warmed_up["done"]:
+            if len(price_hub.snapshot(first_prices)) < len(first_prices):
+                warmed_up["skipped"] += 1
+                return
+            warmed_up["done"] = True
+        started = time.perf_counter()
+        app_module.update_all_positions_with_live_data(args.user_id)
+        pass_latencies.append(time.perf_counter() - started)
+
+    replayer = TickReplayer(ticks, speed=args.speed)
+    if args.interval:
+        result = replayer.run(price_hub.publish, interval=args.interval, on_interval=monitoring_pass)
+    else:
+
+        def publish_and_monitor(symbol, price, source, timestamp):
+            price_hub.publish(symbol, price, source, timestamp)
+            monitoring_pass()
+
+        result = replayer.run(publish_and_monitor)
+    return result, sorted(pass_latencies), warmed_up["skipped"]
+
+
+def report_replay(app_module, trades, result, latencies, skipped, saves, args):
+    statuses = {}
+    for config in trades.values():
+        statuses[config.status] = statuses.get(config.status, 0) + 1
+    tp_hits = sum(level.get("triggered", False) for c in trades.values() for level in getattr(c, "paper_tp_levels", []))
+    sl_hits = sum(getattr(c, "paper_sl_data", {}).get("triggered", False) for c in trades.values())
+    breakevens = sum(getattr(c, "breakeven_sl_triggered", False) for c in trades.values())
+
+    print(
+        f"⏱️  {result['ticks']:,} ticks in {result['wall_seconds']:.2f}s ({result['ticks_per_second']:,.0f} ticks/s) "
+        f"covering {result['recorded_seconds']:,.0f}s recorded"
+    )
+    if latencies:
+        print(
+            f"🔁 {len(latencies):,} monitoring passes: mean {statistics.mean(latencies) * 1000:.2f}ms, "
+            f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.2f}ms, max {latencies[-1] * 1000:.2f}ms "
+            f"({skipped} skipped before every symbol had a tick)"
+        )
+    print(f"🎯 {tp_hits} take profits, {sl_hits} stop losses, {breakevens} break-evens; positions {statuses}")
+    print(
+        f"💰 Paper balance ${app_module.user_paper_balances[args.user_id]:,.2f}, "
+        f"{saves['count'] if not args.persist else 'persisted'} trade saves"
+        + ("" if args.persist else " (not written)")
+    )
+    print(f"🔑 Outcome digest {outcome_digest(trades)}")
+
+
+def run_replay(args):
+    loaded = load_replay_ticks(args)
+    if loaded is None:
+        return False
+    paths, ticks, first_prices = loaded
+
+    app_module = isolate_app()
+    saves = {"count": 0}
+    if not args.persist:
+
+        def count_save(user_id, trade_config):
+            saves["count"] += 1
+            return True
+
+        app_module.save_trade_to_db = count_save
+
+    trades = open_positions(app_module, first_prices, args)
+    print(
+        f"📊 Replaying {len(ticks):,} ticks ({len(first_prices)} symbols) from {len(paths)} files into "
+        f"{len(trades)} paper positions, speed {'max' if not args.speed else f'{args.speed:g}x'}, "
+        f"monitoring {'every tick' if not args.interval else f'every {args.interval:g}s recorded'}"
+    )
+
+    result, latencies, skipped = replay_ticks(app_module, ticks, first_prices, args)
+    report_replay(app_module, trades, result, latencies, skipped, saves, args)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Price tick log inspection and deterministic replay")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_source_arguments(subparser):
+        subparser.add_argument("files", nargs="*", help="Log files (default: every file in --dir)")
+        subparser.add_argument("--dir", help="Log directory (default TickRecorderConfig.DIRECTORY)")
+        subparser.add_argument("--day", help="Only files of this UTC day (YYYYMMDD)")
+
+    info = subparsers.add_parser("info", help="Summarise tick logs")
+    add_source_arguments(info)
+
+    synth = subparsers.add_parser("synth", help="Write a random-walk tick log")
+    synth.add_argument("--out", required=True, help="Directory for the log file")
+    synth.add_argument("--symbols", type=int, default=20)
+    synth.add_argument("--ticks", type=int, default=200000)
+    synth.add_argument("--interval", type=float, default=1.0, help="Recorded seconds between ticks of one symbol")
+    synth.add_argument("--volatility", type=float, default=0.002, help="Per-tick relative price step (stdev)")
+    synth.add_argument("--seed", type=int, default=7)
+
+    replay = subparsers.add_parser("replay", help="Replay tick logs through the position monitoring loop")
+    add_source_arguments(replay)
+    replay.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible, 1 = recorded speed")
+    replay.add_argument("--interval", type=float, default=5.0, help="Recorded seconds between monitoring passes (0 = every tick)")
+    replay.add_argument("--positions", type=int, default=50)
+    replay.add_argument("--user-id", type=int, default=900000001, help="Synthetic paper trading user")
+    replay.add_argument("--amount", type=float, default=100.0)
+    replay.add_argument("--leverage", type=int, default=10)
+    replay.add_argument("--tp", type=float, nargs="*", default=[2.0, 4.0, 6.0], help="Take profit percentages")
+    replay.add_argument("--sl", type=float, default=3.0, help="Stop loss percentage (0 = none)")
+    replay.add_argument("--breakeven", default="tp1", help="Break-even trigger: tp1, a profit percentage, or 0")
+    replay.add_argument("--limit", type=int, help="Replay only the first N ticks")
+    replay.add_argument("--persist", action="store_true", help="Write closed trades to the database")
+
+    args = parser.parse_args()
+    if args.command == "info":
+        return run_info(args)
+    if args.command == "synth":
+        return run_synth(args)
+    return run_replay(args)
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
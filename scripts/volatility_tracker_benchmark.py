@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Volatility Tracker Benchmark
+Compares the ring-buffer VolatilityTracker with the previous list-rebuilding implementation
+
+Usage:
+    python scripts/volatility_tracker_benchmark.py [--rate 10000] [--duration 5] [--symbols 50] [--threads 4]
+
+Three parts:
+- equivalence: the same random-walk ticks go through both trackers; every volatility
+  value is compared (relative tolerance --tolerance)
+- throughput: add_price + get_volatility (what SmartCache.set_price does) per second,
+  single thread, for both trackers
+- paced load: --threads producers feed --rate ticks/sec in total for --duration seconds;
+  reports the achieved rate, CPU used and add_price latency percentiles
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class LegacyVolatilityTracker:
+    """The previous implementation: list of dicts, rebuilt and re-summarised on every price"""
+
+    def __init__(self, window_size):
+        from config import CacheConfig
+
+        self.config = CacheConfig
+        self.window_size = window_size
+        self.price_history = defaultdict(list)
+        self.volatility_cache = {}
+        self.lock = threading.Lock()
+
+    def add_price(self, symbol, price):
+        with self.lock:
+            self.price_history[symbol].append({"price": price, "timestamp": datetime.utcnow()})
+            cutoff_time = datetime.utcnow() - timedelta(minutes=5)
+            self.price_history[symbol] = [
+                p for p in self.price_history[symbol] if p["timestamp"] > cutoff_time
+            ][-self.window_size :]
+            if len(self.price_history[symbol]) >= 3:
+                prices = [p["price"] for p in self.price_history[symbol]]
+                try:
+                    self.volatility_cache[symbol] = (
+                        statistics.stdev(prices) / statistics.mean(prices) * self.config.VOLATILITY_CALCULATION_MULTIPLIER
+                    )
+                except (statistics.StatisticsError, ZeroDivisionError):
+                    self.volatility_cache[symbol] = 0.0
+
+    def get_volatility(self, symbol):
+        with self.lock:
+            return self.volatility_cache.get(symbol, 0.0)
+
+
+def generate_ticks(count, symbols, seed=7):
+    """Random-walk prices per symbol, spanning BTC-like to sub-cent magnitudes"""
+    rng = random.Random(seed)
+    names = [f"SYM{i}USDT" for i in range(symbols)]
+    prices = {name: 10 ** rng.uniform(-3, 5) for name in names}
+    ticks = []
+    for _ in range(count):
+        name = rng.choice(names)
+        step = rng.choice((0.0, rng.gauss(0, 0.002)))  # flat stretches exercise the zero-variance path
+        prices[name] = max(prices[name] * (1 + step), 1e-9)
+        ticks.append((name, prices[name]))
+    return ticks
+
+
+def check_equivalence(ticks, window_size, tolerance):
+    from api.unified_data_sync_service import VolatilityTracker
+
+    new, legacy = VolatilityTracker(window_size), LegacyVolatilityTracker(window_size)
+    worst = 0.0
+    mismatches = 0
+    for symbol, price in ticks:
+        new.add_price(symbol, price)
+        legacy.add_price(symbol, price)
+        expected, actual = legacy.get_volatility(symbol), new.get_volatility(symbol)
+        error = abs(actual - expected) / max(abs(expected), 1e-12) if expected else abs(actual)
+        worst = max(worst, error)
+        if error > tolerance:
+            mismatches += 1
+    return mismatches, worst
+
+
+def measure_throughput(tracker, ticks):
+    start = time.perf_counter()
+    for symbol, price in ticks:
+        tracker.add_price(symbol, price)
+        tracker.get_volatility(symbol)
+    return len(ticks) / (time.perf_counter() - start)
+
+
+def run_paced(ticks, rate, duration, threads, window_size):
+    """Feed rate ticks/sec across producer threads; returns achieved rate, CPU share and latencies"""
+    from api.unified_data_sync_service import VolatilityTracker
+
+    tracker = VolatilityTracker(window_size)
+    per_thread_rate = rate / threads
+    latencies = [[] for _ in range(threads)]
+    sent = [0] * threads
+
+    def producer(index):
+        interval = 1.0 / per_thread_rate
+        next_at = time.perf_counter()
+        end = next_at + duration
+        position = index
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            if now < next_at:
+                time.sleep(min(next_at - now, 0.001))
+                continue
+            # Catch up in small batches when sleep granularity lags the schedule
+            while next_at <= now:
+                symbol, price = ticks[position % len(ticks)]
+                started = time.perf_counter()
+                tracker.add_price(symbol, price)
+                tracker.get_volatility(symbol)
+                latencies[index].append(time.perf_counter() - started)
+                sent[index] += 1
+                position += threads
+                next_at += interval
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    workers = [threading.Thread(target=producer, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    samples = sorted(latency for per_thread in latencies for latency in per_thread)
+
+    def quantile(q):
+        return samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6 if samples else 0.0
+
+    return sum(sent) / wall, cpu / wall, quantile(0.5), quantile(0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VolatilityTracker micro-benchmark")
+    parser.add_argument("--rate", type=int, default=10000, help="Paced load: ticks per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="Paced load: seconds")
+    parser.add_argument("--symbols", type=int, default=50, help="Symbols the ticks are spread over")
+    parser.add_argument("--threads", type=int, default=4, help="Paced load: producer threads")
+    parser.add_argument("--ticks", type=int, default=100000, help="Ticks for the equivalence and throughput runs")
+    parser.add_argument(
+        "--tolerance", type=float, default=1e-8, help="Relative tolerance vs statistics.stdev (exact rational arithmetic)"
+    )
+    args = parser.parse_args()
+
+    from api.unified_data_sync_service import VolatilityTracker
+    from config import CacheConfig
+
+    window_size = CacheConfig.VOLATILITY_WINDOW_SIZE
+    ticks = generate_ticks(args.ticks, args.symbols)
+    print(f"📊 {args.ticks} ticks over {args.symbols} symbols, window {window_size} prices\n")
+
+    mismatches, worst = check_equivalence(ticks, window_size, args.tolerance)
+    print(f"Equivalence: {mismatches} of {len(ticks)} values outside {args.tolerance:g} (worst relative error {worst:.2e})")
+
+    legacy_rate = measure_throughput(LegacyVolatilityTracker(window_size), ticks)
+    new_rate = measure_throughput(VolatilityTracker(window_size), ticks)
+    print(f"Throughput:  legacy {legacy_rate:,.0f} ticks/s, ring buffer {new_rate:,.0f} ticks/s ({new_rate / legacy_rate:.1f}x)")
+
+    achieved, cpu_share, p50, p99 = run_paced(ticks, args.rate, args.duration, args.threads, window_size)
+    print(
+        f"Paced load:  {args.rate:,} ticks/s target, {achieved:,.0f} achieved over {args.duration:.0f}s "
+        f"({args.threads} threads), {cpu_share * 100:.0f}% of one core, add_price p50 {p50:.1f}µs p99 {p99:.1f}µs"
+    )
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,29 @@
+"""
+Shared pytest setup - repo root on sys.path, the environment the app modules expect
+and a throwaway SQLite app for tests that touch the database
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SESSION_SECRET", "test-session-secret")
+
+
+@pytest.fixture
+def db_app(tmp_path):
+    """Flask app on a throwaway SQLite file with every model's table (inside an app context)"""
+    from flask import Flask
+
+    from api.models import db
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'test.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,90 @@
+"""
+Columnar klines snapshot: export, header, read-back and import into an empty store
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from api.klines_snapshot import (
+    SNAPSHOT_VERSION,
+    export_snapshot,
+    import_snapshot,
+    read_snapshot,
+    read_snapshot_header,
+)
+from api.models import KlinesCache, db
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _candles(count, timeframe_hours=1):
+    return [
+        {
+            "timestamp": START + timedelta(hours=i * timeframe_hours),
+            "open": 100.0 + i,
+            "high": 101.5 + i,
+            "low": 99.25 + i,
+            "close": 100.75 + i,
+            "volume": 1000.0 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def _stored(symbol, timeframe):
+    rows = (
+        KlinesCache.query.filter_by(symbol=symbol, timeframe=timeframe)
+        .order_by(KlinesCache.timestamp)
+        .all()
+    )
+    return [
+        (
+            row.timestamp.replace(tzinfo=None),
+            row.open,
+            row.high,
+            row.low,
+            row.close,
+            row.volume,
+        )
+        for row in rows
+    ]
+
+
+def test_snapshot_round_trip(db_app, tmp_path):
+    KlinesCache.save_klines_batch("BTCUSDT", "1h", _candles(48))
+    KlinesCache.save_klines_batch("ETHUSDT", "4h", _candles(12, timeframe_hours=4))
+    expected = {
+        series: _stored(*series) for series in (("BTCUSDT", "1h"), ("ETHUSDT", "4h"))
+    }
+    path = str(tmp_path / "klines.snap")
+
+    exported = export_snapshot(path)
+    assert (exported["series"], exported["rows"]) == (2, 60)
+
+    header = read_snapshot_header(path)
+    assert header["version"] == SNAPSHOT_VERSION
+    assert [
+        (meta["symbol"], meta["timeframe"], meta["rows"]) for meta in header["series"]
+    ] == [
+        ("BTCUSDT", "1h", 48),
+        ("ETHUSDT", "4h", 12),
+    ]
+    assert sum(len(candles) for _, candles in read_snapshot(path)) == 60
+
+    KlinesCache.query.delete()
+    db.session.commit()
+
+    imported = import_snapshot(path)
+    assert (imported["series_imported"], imported["rows"]) == (2, 60)
+    assert {series: _stored(*series) for series in expected} == expected
+
+
+def test_import_skips_series_already_fresher(db_app, tmp_path):
+    KlinesCache.save_klines_batch("BTCUSDT", "1h", _candles(24))
+    path = str(tmp_path / "klines.snap")
+    export_snapshot(path)
+
+    imported = import_snapshot(path)
+    assert (imported["series_imported"], imported["series_skipped"]) == (0, 1)
+
+    imported = import_snapshot(path, skip_fresher=False)
+    assert imported["series_imported"] == 1
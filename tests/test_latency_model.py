@@ -0,0 +1,92 @@
+"""
+Sliding-window latency estimates, source ranking and hedge delays
+"""
+
+import pytest
+
+from api.latency_model import LatencyModel
+from config import PriceHedgingConfig
+
+
+def _record(model, source, latencies, success=True):
+    for latency in latencies:
+        model.record(source, latency, success)
+
+
+def test_unknown_source_has_no_estimate():
+    model = LatencyModel(("binance",))
+
+    assert model.estimate("binance")["p50"] is None
+    assert model.estimate("kraken") == {
+        "samples": 0,
+        "success_rate": None,
+        "p50": None,
+        "p95": None,
+        "mean": None,
+    }
+    assert model.hedge_delay("binance") == PriceHedgingConfig.DEFAULT_HEDGE_DELAY
+
+
+def test_quantiles_need_min_samples():
+    model = LatencyModel()
+    _record(model, "binance", [0.1] * (PriceHedgingConfig.MIN_SAMPLES - 1))
+
+    assert model.estimate("binance")["p50"] is None
+    assert model.estimate("binance")["mean"] == pytest.approx(0.1)
+
+    model.record("binance", 0.1, True)
+    assert model.estimate("binance")["p50"] == pytest.approx(0.1)
+
+
+def test_p50_and_p95_come_from_successful_samples():
+    model = LatencyModel()
+    _record(model, "binance", [i / 100 for i in range(1, 101)])
+    _record(model, "binance", [9.0] * 10, success=False)
+
+    estimate = model.estimate("binance")
+    assert estimate["samples"] == 110
+    assert estimate["success_rate"] == pytest.approx(100 / 110)
+    assert estimate["p50"] == pytest.approx(0.51)
+    assert estimate["p95"] == pytest.approx(0.96)
+
+
+def test_rank_penalises_failures():
+    model = LatencyModel(("fast_flaky", "slow_reliable"))
+    _record(model, "fast_flaky", [0.05] * 10)
+    _record(model, "fast_flaky", [0.05] * 10, success=False)
+    _record(model, "slow_reliable", [0.5] * 10)
+
+    # 0.05 + 0.5 * FAILURE_PENALTY_SECONDS vs 0.5
+    assert model.rank() == ["slow_reliable", "fast_flaky"]
+
+
+def test_rank_prefers_the_lower_p50():
+    model = LatencyModel(("coingecko", "binance"))
+    _record(model, "coingecko", [0.4] * 10)
+    _record(model, "binance", [0.1] * 10)
+
+    assert model.rank() == ["binance", "coingecko"]
+    assert model.rank(["coingecko"]) == ["coingecko"]
+
+
+def test_hedge_delay_follows_the_quantile_with_a_floor(monkeypatch):
+    model = LatencyModel()
+    _record(model, "binance", [i / 100 for i in range(1, 101)])
+
+    monkeypatch.setattr(PriceHedgingConfig, "HEDGE_QUANTILE", "p50")
+    assert model.hedge_delay("binance") == pytest.approx(0.51)
+    monkeypatch.setattr(PriceHedgingConfig, "HEDGE_QUANTILE", "p95")
+    assert model.hedge_delay("binance") == pytest.approx(0.96)
+
+    _record(model, "fast", [0.001] * 10)
+    assert model.hedge_delay("fast") == PriceHedgingConfig.MIN_HEDGE_DELAY
+
+
+def test_samples_outside_the_window_are_dropped(monkeypatch):
+    model = LatencyModel()
+    _record(model, "binance", [0.1] * 10)
+
+    monkeypatch.setattr(PriceHedgingConfig, "WINDOW_SECONDS", -1)
+    assert model.estimate("binance")["samples"] == 0
+    # Lifetime counters survive the window
+    assert model.get_source_status("binance")["total_requests"] == 10
@@ -0,0 +1,109 @@
+"""
+Write-behind open-candle buffer: coalescing, batched flush and re-queue on failure
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.models import KlinesCache, OpenCandleWriteBuffer
+from config import CacheConfig
+
+CANDLE_TIME = datetime(2024, 1, 1, 12, 0)
+
+
+def _candle(high, low, close, timestamp=CANDLE_TIME, is_complete=False):
+    return {
+        "symbol": "BTCUSDT",
+        "timeframe": "1h",
+        "timestamp": timestamp,
+        "open": 100.0,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": close * 10,
+        "expires_at": datetime(2099, 1, 1),
+        "is_complete": is_complete,
+        "created_at": datetime(2024, 1, 1, 12, 30),
+    }
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    # Only flush when a test asks for it (or a candle closes)
+    monkeypatch.setattr(CacheConfig, "OPEN_CANDLE_FLUSH_INTERVAL", 3600)
+    return OpenCandleWriteBuffer()
+
+
+def test_updates_coalesce_per_series(buffer):
+    buffer.put("BTCUSDT", "1h", _candle(105.0, 99.0, 101.0))
+    buffer.put("BTCUSDT", "1h", _candle(103.0, 97.0, 102.0))
+
+    entry = buffer.get("BTCUSDT", "1h")
+    assert (entry["high"], entry["low"], entry["close"]) == (105.0, 97.0, 102.0)
+    assert buffer.get_stats()["buffered_series"] == 1
+
+
+def test_flush_writes_buffered_candles(db_app, buffer):
+    buffer.put("BTCUSDT", "1h", _candle(105.0, 99.0, 101.0))
+
+    assert buffer.flush() == 1
+    stored = KlinesCache.query.filter_by(symbol="BTCUSDT", timeframe="1h").one()
+    assert (stored.high, stored.low, stored.close) == (105.0, 99.0, 101.0)
+    assert buffer.get("BTCUSDT", "1h") is None
+
+
+def test_failed_flush_requeues_every_candle(db_app, buffer, monkeypatch):
+    buffer.put("BTCUSDT", "1h", _candle(105.0, 99.0, 101.0))
+
+    def fail(rows):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(KlinesCache, "upsert_open_candles", fail)
+    assert buffer.flush() == 0
+    assert buffer.stats["flush_errors"] == 1
+    assert buffer.get("BTCUSDT", "1h")["close"] == 101.0
+
+    monkeypatch.undo()
+    assert buffer.flush() == 1
+    assert KlinesCache.query.filter_by(symbol="BTCUSDT").count() == 1
+
+
+def test_requeue_keeps_updates_buffered_during_the_failed_flush(
+    db_app, buffer, monkeypatch
+):
+    buffer.put("BTCUSDT", "1h", _candle(105.0, 99.0, 101.0))
+
+    def refresh_then_fail(rows):
+        # The same candle is refreshed while the flush is in flight
+        buffer.put("BTCUSDT", "1h", _candle(104.0, 98.0, 103.0))
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(KlinesCache, "upsert_open_candles", refresh_then_fail)
+    buffer.flush()
+
+    entry = buffer.get("BTCUSDT", "1h")
+    # Extremes merged from both, close/volume from the newer refresh
+    assert (entry["high"], entry["low"], entry["close"]) == (105.0, 98.0, 103.0)
+
+
+def test_requeue_behind_a_newer_candle_keeps_both(db_app, buffer, monkeypatch):
+    buffer.put("BTCUSDT", "1h", _candle(105.0, 99.0, 101.0))
+    next_hour = CANDLE_TIME + timedelta(hours=1)
+    flushed = []
+
+    def open_next_then_fail(rows):
+        # Not flushing again from inside the failing flush keeps the test about the re-queue
+        with buffer.lock:
+            buffer._pending[("BTCUSDT", "1h")] = _candle(102.0, 100.0, 101.5, next_hour)
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(KlinesCache, "upsert_open_candles", open_next_then_fail)
+    buffer.flush()
+    assert buffer.get("BTCUSDT", "1h")["timestamp"] == next_hour
+
+    monkeypatch.setattr(
+        KlinesCache, "upsert_open_candles", lambda rows: flushed.extend(rows)
+    )
+    buffer.flush()
+    assert sorted(row["timestamp"] for row in flushed) == [CANDLE_TIME, next_hour]
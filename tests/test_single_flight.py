@@ -0,0 +1,118 @@
+"""
+Coalescing of concurrent upstream fetches per key
+"""
+
+import threading
+import time
+
+from api.single_flight import SingleFlight
+from config import SingleFlightConfig
+
+
+def _run_concurrently(flight, key, fetch, callers):
+    """Start callers threads on flight.do(key, fetch); results and errors fill in as they finish"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, fetch))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    threads, results, errors = _run_concurrently(flight, "BTCUSDT", fetch, 5)
+    # Every follower has joined the leader's flight before it lands
+    while flight.stats["calls"] < 5:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert not errors
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False)] + [(42, True)] * 4
+    assert flight.in_flight() == 0
+
+
+def test_followers_receive_the_leaders_exception():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    threads, results, errors = _run_concurrently(flight, "BTCUSDT", fetch, 3)
+    while flight.stats["calls"] < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert not results
+    assert len(errors) == 3
+    assert all(str(error) == "upstream down" for error in errors)
+    assert flight.stats["shared_errors"] == 2
+
+
+def test_nothing_is_cached_after_the_flight_lands():
+    flight = SingleFlight("test")
+    values = iter([1, 2])
+
+    assert flight.do("BTCUSDT", lambda: next(values)) == (1, False)
+    assert flight.do("BTCUSDT", lambda: next(values)) == (2, False)
+    assert flight.stats["executions"] == 2
+
+
+def test_follower_fetches_itself_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(SingleFlightConfig, "FOLLOWER_TIMEOUT", 0.05)
+    flight = SingleFlight("test")
+    release = threading.Event()
+    leader = threading.Thread(
+        target=flight.do, args=("BTCUSDT", lambda: release.wait(5))
+    )
+    leader.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.01)
+
+    try:
+        assert flight.do("BTCUSDT", lambda: "own") == ("own", False)
+        assert flight.stats["follower_timeouts"] == 1
+    finally:
+        release.set()
+        leader.join(5)
+
+
+def test_disabled_group_never_coalesces():
+    flight = SingleFlight("test")
+    flight.enabled = False
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(0.2)
+        return len(calls)
+
+    threads, results, errors = _run_concurrently(flight, "BTCUSDT", fetch, 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 3
+    assert all(not shared for _, shared in results)
@@ -0,0 +1,183 @@
+"""
+State versions behind the ETag / since=<version> polling responses
+"""
+
+import pytest
+
+from api.state_versions import (
+    PROCESS_EPOCH,
+    StateVersions,
+    format_version,
+    make_etag,
+    parse_version,
+)
+from config import ConditionalResponseConfig
+
+# A version token issued by another worker (or before a restart)
+FOREIGN_EPOCH = "ffffffff" if PROCESS_EPOCH != "ffffffff" else "00000000"
+
+
+@pytest.fixture
+def versions():
+    return StateVersions()
+
+
+def test_unchanged_entries_keep_the_version(versions):
+    entries = {"t1": {"pnl": 1.0}, "__state__": {"total": 1.0}}
+    first = versions.update("positions", 1, entries)
+
+    assert versions.update("positions", 1, dict(entries)) == first
+    assert versions.changes_since("positions", 1, first) == {
+        "changed": [],
+        "removed": [],
+    }
+
+
+def test_changed_entry_moves_the_version(versions):
+    first = versions.update("positions", 1, {"t1": {"pnl": 1.0}, "t2": {"pnl": 2.0}})
+    second = versions.update("positions", 1, {"t1": {"pnl": 1.5}, "t2": {"pnl": 2.0}})
+
+    assert second > first
+    assert versions.changes_since("positions", 1, first) == {
+        "changed": ["t1"],
+        "removed": [],
+    }
+
+
+def test_removal_leaves_a_tombstone(versions):
+    first = versions.update("positions", 1, {"t1": {"pnl": 1.0}, "t2": {"pnl": 2.0}})
+    second = versions.update("positions", 1, {"t1": {"pnl": 1.0}})
+
+    assert second > first
+    assert versions.changes_since("positions", 1, first) == {
+        "changed": [],
+        "removed": ["t2"],
+    }
+    # Nothing happened after the removal
+    assert versions.changes_since("positions", 1, second) == {
+        "changed": [],
+        "removed": [],
+    }
+
+
+def test_readded_entry_drops_its_tombstone(versions):
+    first = versions.update("positions", 1, {"t1": 1})
+    versions.update("positions", 1, {})
+    versions.update("positions", 1, {"t1": 2})
+
+    assert versions.changes_since("positions", 1, first) == {
+        "changed": ["t1"],
+        "removed": [],
+    }
+
+
+def test_tombstone_pruning_raises_the_floor(versions, monkeypatch):
+    monkeypatch.setattr(ConditionalResponseConfig, "MAX_TOMBSTONES", 2)
+    start = versions.update("positions", 1, {f"t{i}": i for i in range(4)})
+
+    removal_versions = []
+    for remaining in (3, 2, 1):
+        removal_versions.append(
+            versions.update("positions", 1, {f"t{i}": i for i in range(remaining)})
+        )
+
+    # The oldest removal was forgotten - a version before it can't be answered with a delta
+    assert versions.changes_since("positions", 1, start) is None
+    assert versions.changes_since("positions", 1, removal_versions[0] - 1) is None
+    assert versions.changes_since("positions", 1, removal_versions[0]) == {
+        "changed": [],
+        "removed": ["t2", "t1"],
+    }
+
+
+def test_unknown_versions_need_a_full_payload(versions):
+    version = versions.update("positions", 1, {"t1": 1})
+
+    assert versions.changes_since("positions", 1, None) is None
+    assert versions.changes_since("positions", 1, version + 1) is None
+    assert versions.changes_since("positions", 2, version) is None
+    assert versions.stats["full_fallbacks"] == 3
+
+
+def test_foreign_epoch_token_is_not_parsed():
+    assert parse_version(format_version(7)) == 7
+    assert parse_version(f"{FOREIGN_EPOCH}.7") is None
+    assert parse_version(f"{PROCESS_EPOCH}.x") is None
+    assert parse_version("") is None
+
+
+def test_etag_changes_with_the_version():
+    assert make_etag("positions", 1, 3) != make_etag("positions", 1, 4)
+    assert make_etag("positions", 1, 3) != make_etag("live", 1, 3)
+
+
+# ---- _conditional_state_response -------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def flask_app():
+    from api.app import app
+
+    return app
+
+
+def _positions_payload(pnl, timestamp="2024-01-01T00:00:00"):
+    return {
+        "positions": {"t1": {"pnl": pnl}, "t2": {"pnl": 2.0}},
+        "total_pnl": pnl + 2.0,
+        "timestamp": timestamp,
+    }
+
+
+def test_matching_etag_is_not_modified(flask_app):
+    from api.app import _conditional_state_response
+
+    with flask_app.test_request_context("/api/positions"):
+        first = _conditional_state_response("test-etag", 1, _positions_payload(1.0))
+    etag = first.headers["ETag"]
+
+    # Only the timestamp differs - the state version and so the ETag stay the same
+    headers = {"If-None-Match": etag}
+    with flask_app.test_request_context("/api/positions", headers=headers):
+        response = _conditional_state_response(
+            "test-etag", 1, _positions_payload(1.0, "later")
+        )
+    assert response.status_code == 304
+
+    with flask_app.test_request_context("/api/positions", headers=headers):
+        response = _conditional_state_response("test-etag", 1, _positions_payload(1.5))
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_since_returns_only_changed_positions(flask_app):
+    from api.app import _conditional_state_response
+
+    with flask_app.test_request_context("/api/positions"):
+        version = _conditional_state_response(
+            "test-since", 1, _positions_payload(1.0)
+        ).get_json()["version"]
+
+    payload = _positions_payload(1.5)
+    del payload["positions"]["t2"]
+    with flask_app.test_request_context(
+        "/api/positions", query_string={"since": version}
+    ):
+        body = _conditional_state_response("test-since", 1, payload).get_json()
+
+    assert body["delta"] is True
+    assert body["positions"] == {"t1": {"pnl": 1.5}}
+    assert body["removed"] == ["t2"]
+
+
+def test_foreign_epoch_since_gets_the_full_payload(flask_app):
+    from api.app import _conditional_state_response
+
+    payload = _positions_payload(1.0)
+    with flask_app.test_request_context(
+        "/api/positions", query_string={"since": f"{FOREIGN_EPOCH}.1"}
+    ):
+        body = _conditional_state_response("test-foreign", 1, payload).get_json()
+
+    assert "delta" not in body
+    assert body["positions"] == payload["positions"]